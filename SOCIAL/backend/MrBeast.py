@@ -19,14 +19,11 @@ import logging
 import os
 import traceback
 import uuid
-import httpx
 import json
 import re
 import random
 import subprocess
 from typing import List, Dict, Optional
-import tempfile
-import shutil
 import gc
 from datetime import datetime
 from PIL import Image, ImageDraw, ImageFont
@@ -34,6 +31,12 @@ import base64
 import hashlib
 from urllib.parse import quote, urlparse, parse_qs
 
+from ffmpeg_pool import run_ffmpeg_async, run_process_async, ffmpeg_job, PRIORITY_INTERACTIVE
+from render_worker import render
+from pipeline import Pipeline, Stage, PipelineError
+from http_clients import pooled_client
+from llm_gateway import llm_client
+
 logger = logging.getLogger("MrBeast")
 logger.setLevel(logging.INFO)
 
@@ -97,14 +100,10 @@ def get_file_size_mb(filepath: str) -> float:
     except:
         return 0
 
-def run_ffmpeg(cmd: list, timeout: int = FFMPEG_TIMEOUT) -> bool:
-    try:
-        result = subprocess.run(cmd, capture_output=True, timeout=timeout, check=False)
-        gc.collect()
-        return result.returncode == 0
-    except:
-        gc.collect()
-        return False
+async def run_ffmpeg(cmd: list, timeout: int = FFMPEG_TIMEOUT) -> bool:
+    success = await run_ffmpeg_async(cmd, timeout)
+    gc.collect()
+    return success
 
 def extract_video_id(url: str) -> Optional[str]:
     """Extract video ID from any YouTube URL format"""
@@ -153,7 +152,7 @@ async def download_with_cobalt(url: str, output_path: str) -> bool:
             "https://cobalt-api.kwiatekkk.com"
         ]
         
-        async with httpx.AsyncClient(timeout=120, follow_redirects=True) as client:
+        async with pooled_client(timeout=120, follow_redirects=True) as client:
             for instance in cobalt_instances:
                 try:
                     # Request download link
@@ -345,7 +344,7 @@ async def download_with_invidious(url: str, output_path: str) -> bool:
         if not video_id:
             return False
         
-        async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
+        async with pooled_client(timeout=60, follow_redirects=True) as client:
             for instance in INVIDIOUS_INSTANCES:
                 try:
                     # Get video info
@@ -397,7 +396,7 @@ async def download_with_y2mate(url: str, output_path: str) -> bool:
         if not video_id:
             return False
         
-        async with httpx.AsyncClient(timeout=120, follow_redirects=True) as client:
+        async with pooled_client(timeout=120, follow_redirects=True) as client:
             # Step 1: Get video info
             response = await client.post(
                 "https://www.y2mate.com/mates/analyzeV2/ajax",
@@ -465,7 +464,7 @@ async def download_with_savefrom(url: str, output_path: str) -> bool:
     try:
         logger.info("   🔷 SaveFrom simulation")
         
-        async with httpx.AsyncClient(timeout=120, follow_redirects=True) as client:
+        async with pooled_client(timeout=120, follow_redirects=True) as client:
             # Request download info
             response = await client.get(
                 "https://api.savefrom.net/info",
@@ -519,7 +518,7 @@ async def download_with_direct_stream(url: str, output_path: str) -> bool:
         if not video_id:
             return False
         
-        async with httpx.AsyncClient(timeout=120, follow_redirects=True) as client:
+        async with pooled_client(timeout=120, follow_redirects=True) as client:
             # Get video page
             page_url = f"https://www.youtube.com/watch?v={video_id}"
             response = await client.get(page_url, headers=get_random_headers())
@@ -664,13 +663,13 @@ async def download_youtube_video(url: str, temp_dir: str) -> Optional[str]:
 # REST OF THE CODE (Same as before)
 # ============================================================================
 
-def get_video_duration(video_path: str) -> float:
+async def get_video_duration(video_path: str) -> float:
     try:
         cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", video_path]
-        result = subprocess.run(cmd, capture_output=True, timeout=10, check=False)
+        result = await run_process_async(cmd, 10)
         
-        if result.returncode == 0:
-            duration = float(result.stdout.decode().strip())
+        if result.success:
+            duration = float(result.stdout.strip())
             logger.info(f"📏 Duration: {duration:.1f}s")
             return duration
         return 0
@@ -684,12 +683,12 @@ async def extract_transcript(video_path: str, temp_dir: str) -> Optional[str]:
         
         cmd = ["ffmpeg", "-i", video_path, "-vn", "-acodec", "libmp3lame", "-b:a", "128k", "-ar", "16000", "-y", audio_path]
         
-        if not run_ffmpeg(cmd, 60):
+        if not await run_ffmpeg(cmd, 60):
             return None
         
         logger.info("🧠 Transcribing...")
         
-        async with httpx.AsyncClient(timeout=120) as client:
+        async with pooled_client(timeout=120) as client:
             with open(audio_path, 'rb') as f:
                 response = await client.post(
                     "https://api.groq.com/openai/v1/audio/transcriptions",
@@ -733,7 +732,7 @@ JSON:
     "hook": "Hook"
 }}"""
 
-        async with httpx.AsyncClient(timeout=45) as client:
+        async with llm_client(timeout=45) as client:
             response = await client.post(
                 "https://api.mistral.ai/v1/chat/completions",
                 headers={"Authorization": f"Bearer {MISTRAL_API_KEY}"},
@@ -767,7 +766,7 @@ async def generate_hindi_voiceover_11x(text: str, temp_dir: str) -> Optional[str
         
         # Try ElevenLabs
         if ELEVENLABS_API_KEY and len(ELEVENLABS_API_KEY) > 20:
-            async with httpx.AsyncClient(timeout=60) as client:
+            async with pooled_client(timeout=60) as client:
                 response = await client.post(
                     f"https://api.elevenlabs.io/v1/text-to-speech/{HINDI_VOICE_ID}",
                     headers={"xi-api-key": ELEVENLABS_API_KEY},
@@ -784,7 +783,7 @@ async def generate_hindi_voiceover_11x(text: str, temp_dir: str) -> Optional[str
                     
                     cmd = ["ffmpeg", "-i", base, "-filter:a", "atempo=1.1,loudnorm=I=-16:TP=-1.5", "-y", final]
                     
-                    if run_ffmpeg(cmd, 30):
+                    if await run_ffmpeg(cmd, 30):
                         force_cleanup(base)
                         logger.info(f"✅ Voice: {get_file_size_mb(final):.2f}MB")
                         return final
@@ -797,7 +796,7 @@ async def generate_hindi_voiceover_11x(text: str, temp_dir: str) -> Optional[str
         
         cmd = ["ffmpeg", "-i", base, "-filter:a", "atempo=1.1,loudnorm=I=-16:TP=-1.5", "-y", final]
         
-        if run_ffmpeg(cmd, 25):
+        if await run_ffmpeg(cmd, 25):
             force_cleanup(base)
             logger.info(f"✅ Voice: {get_file_size_mb(final):.2f}MB")
             return final
@@ -812,7 +811,7 @@ async def download_background_music(temp_dir: str, duration: float) -> Optional[
         music_url = random.choice(BG_MUSIC_URLS)
         logger.info(f"🎵 Downloading music...")
         
-        async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
+        async with pooled_client(timeout=60, follow_redirects=True) as client:
             response = await client.get(music_url)
             
             if response.status_code == 200:
@@ -824,7 +823,7 @@ async def download_background_music(temp_dir: str, duration: float) -> Optional[
                 
                 cmd = ["ffmpeg", "-i", raw, "-vn", "-acodec", "libmp3lame", "-b:a", "128k", "-t", str(duration + 2), "-y", mp3]
                 
-                if run_ffmpeg(cmd, 60):
+                if await run_ffmpeg(cmd, 60):
                     force_cleanup(raw)
                     logger.info(f"✅ Music: {get_file_size_mb(mp3):.2f}MB")
                     return mp3
@@ -833,7 +832,7 @@ async def download_background_music(temp_dir: str, duration: float) -> Optional[
     except:
         return None
 
-def crop_and_zoom_video(video_path: str, temp_dir: str) -> Optional[str]:
+async def crop_and_zoom_video(video_path: str, temp_dir: str) -> Optional[str]:
     try:
         output = os.path.join(temp_dir, "cropped.mp4")
         logger.info("✂️ Cropping to 9:16 + zoom...")
@@ -849,7 +848,7 @@ def crop_and_zoom_video(video_path: str, temp_dir: str) -> Optional[str]:
         
         cmd = ["ffmpeg", "-i", video_path, "-filter_complex", filter_complex, "-map", "[v]", "-c:v", "libx264", "-crf", "23", "-preset", "medium", "-an", "-y", output]
         
-        if run_ffmpeg(cmd, 180):
+        if await run_ffmpeg(cmd, 180):
             logger.info(f"✅ Cropped: {get_file_size_mb(output):.1f}MB")
             return output
         
@@ -857,7 +856,7 @@ def crop_and_zoom_video(video_path: str, temp_dir: str) -> Optional[str]:
     except:
         return None
 
-def add_captions_to_video(video_path: str, script: str, hook: str, temp_dir: str) -> Optional[str]:
+async def add_captions_to_video(video_path: str, script: str, hook: str, temp_dir: str) -> Optional[str]:
     try:
         output = os.path.join(temp_dir, "captioned.mp4")
         logger.info("📝 Adding captions...")
@@ -868,7 +867,7 @@ def add_captions_to_video(video_path: str, script: str, hook: str, temp_dir: str
         
         cmd = ["ffmpeg", "-i", video_path, "-vf", filter_str, "-c:v", "libx264", "-crf", "23", "-c:a", "copy", "-y", output]
         
-        if run_ffmpeg(cmd, 120):
+        if await run_ffmpeg(cmd, 120):
             logger.info(f"✅ Captioned: {get_file_size_mb(output):.1f}MB")
             return output
         
@@ -890,7 +889,7 @@ async def combine_video_voice_music(video: str, voice: str, music: Optional[str]
         else:
             cmd = ["ffmpeg", "-i", video, "-i", voice, "-map", "0:v", "-map", "1:a", "-c:v", "copy", "-c:a", "aac", "-shortest", "-y", output]
         
-        if run_ffmpeg(cmd, 120):
+        if await run_ffmpeg(cmd, 120):
             logger.info(f"✅ Final: {get_file_size_mb(output):.1f}MB")
             return output
         
@@ -945,89 +944,90 @@ async def upload_to_youtube(video: str, title: str, description: str, user_id: s
         logger.error(f"Upload error: {e}")
         return {"success": False, "error": str(e)}
 
-async def generate_mrbeast_short(youtube_url: str, target_duration: int, user_id: str, database_manager) -> dict:
-    temp_dir = None
-    
+# ============================================================================
+# PIPELINE (checkpointed stages - a retry resumes from the last good stage)
+# ============================================================================
+
+async def check_duration(video_path: str, target_duration: int) -> float:
+    duration = await get_video_duration(video_path)
+    if duration < target_duration:
+        raise PipelineError(f"Video too short: {duration:.0f}s")
+    return duration
+
+async def captions_stage(cropped: str, script: str, hook: str, workdir: str) -> Optional[str]:
+    captioned = await add_captions_to_video(cropped, script, hook, workdir)
+    if captioned:
+        force_cleanup(cropped)
+    return captioned
+
+async def upload_stage(final: str, title: str, script: str, user_id: str, database_manager) -> dict:
+    upload_result = await upload_to_youtube(final, title, script, user_id, database_manager)
+    if not upload_result.get("success"):
+        raise PipelineError(upload_result.get("error") or "Upload failed")
+    return upload_result
+
+MRBEAST_PIPELINE = Pipeline("mrbeast", [
+    Stage("download", lambda youtube_url, workdir: download_youtube_video(youtube_url, workdir),
+          inputs=("youtube_url", "workdir"), outputs=("video_path",), files=("video_path",),
+          error="Download failed - all 8 methods failed"),
+    Stage("duration", check_duration, inputs=("video_path", "target_duration"), outputs=("duration",)),
+    Stage("transcript", lambda video_path, workdir: extract_transcript(video_path, workdir),
+          inputs=("video_path", "workdir"), outputs=("transcript",), error="Transcription failed"),
+    Stage("rewrite", lambda transcript, target_duration: rewrite_script_creatively(transcript, target_duration),
+          inputs=("transcript", "target_duration"), outputs=("script", "title", "hook"), optional=("hook",)),
+    Stage("voice", lambda script, workdir: generate_hindi_voiceover_11x(script, workdir),
+          inputs=("script", "workdir"), outputs=("voice",), files=("voice",), error="Voice generation failed"),
+    Stage("music", lambda target_duration, workdir: download_background_music(workdir, target_duration),
+          inputs=("target_duration", "workdir"), outputs=("music",), files=("music",), optional=("music",)),
+    # Runs alongside transcription, so the original stays until the workspace is discarded
+    Stage("crop", lambda video_path, workdir: crop_and_zoom_video(video_path, workdir),
+          inputs=("video_path", "workdir"), outputs=("cropped",), files=("cropped",), error="Cropping failed"),
+    Stage("captions", captions_stage, inputs=("cropped", "script", "hook", "workdir"), outputs=("captioned",),
+          files=("captioned",), error="Caption failed"),
+    Stage("combine", lambda captioned, voice, music, workdir: combine_video_voice_music(captioned, voice, music, workdir),
+          inputs=("captioned", "voice", "music", "workdir"), outputs=("final",), files=("final",),
+          error="Combining failed"),
+    Stage("upload", upload_stage, inputs=("final", "title", "script", "user_id", "database_manager"),
+          outputs=("upload",)),
+])
+
+async def generate_mrbeast_short(youtube_url: str, target_duration: int, user_id: str, database_manager,
+                                job_key: Optional[str] = None) -> dict:
+    """Pass job_key (the job / idempotency key) to let a retry of the same job resume it"""
+    key = job_key or f"generate:{user_id}:{uuid.uuid4().hex}"
     try:
-        temp_dir = tempfile.mkdtemp(prefix="mrbeast_")
         logger.info(f"🎬 START: {youtube_url} | {target_duration}s")
         
-        # 1. Download
-        video_path = await download_youtube_video(youtube_url, temp_dir)
-        if not video_path:
-            return {"success": False, "error": "Download failed - all 8 methods failed"}
-        
-        # 2. Duration check
-        duration = get_video_duration(video_path)
-        if duration < target_duration:
-            return {"success": False, "error": f"Video too short: {duration:.0f}s"}
-        
-        # 3. Transcript
-        transcript = await extract_transcript(video_path, temp_dir)
-        if not transcript:
-            return {"success": False, "error": "Transcription failed"}
-        
-        # 4. AI Rewrite
-        rewrite = await rewrite_script_creatively(transcript, target_duration)
-        script = rewrite["script"]
-        title = rewrite["title"]
-        hook = rewrite["hook"]
-        
-        # 5. Voice (1.1x)
-        voice = await generate_hindi_voiceover_11x(script, temp_dir)
-        if not voice:
-            return {"success": False, "error": "Voice generation failed"}
-        
-        # 6. Music
-        music = await download_background_music(temp_dir, target_duration)
-        
-        # 7. Crop + Zoom
-        cropped = crop_and_zoom_video(video_path, temp_dir)
-        if not cropped:
-            return {"success": False, "error": "Cropping failed"}
-        
-        force_cleanup(video_path)
-        
-        # 8. Captions
-        captioned = add_captions_to_video(cropped, script, hook, temp_dir)
-        if not captioned:
-            return {"success": False, "error": "Caption failed"}
-        
-        force_cleanup(cropped)
-        
-        # 9. Combine
-        final = await combine_video_voice_music(captioned, voice, music, temp_dir)
-        if not final:
-            return {"success": False, "error": "Combining failed"}
-        
-        final_size = get_file_size_mb(final)
-        
-        # 10. Upload
-        upload_result = await upload_to_youtube(final, title, script, user_id, database_manager)
-        
-        # Cleanup
-        if temp_dir:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        run = await MRBEAST_PIPELINE.run(
+            key,
+            ["upload"],
+            {"youtube_url": youtube_url, "target_duration": target_duration, "user_id": user_id},
+            {"database_manager": database_manager}
+        )
+        values = run.values
+        final_size = get_file_size_mb(values["final"])
+        run.discard()
         gc.collect()
         
-        if upload_result.get("success"):
-            return {
-                "success": True,
-                "video_id": upload_result["video_id"],
-                "video_url": upload_result["video_url"],
-                "title": title,
-                "script": script[:200] + "...",
-                "size": f"{final_size:.1f}MB"
-            }
-        else:
-            return {"success": False, "error": upload_result.get("error")}
+        script = values["script"]
+        return {
+            "success": True,
+            "video_id": values["upload"]["video_id"],
+            "video_url": values["upload"]["video_url"],
+            "title": values["title"],
+            "script": script[:200] + "...",
+            "size": f"{final_size:.1f}MB"
+        }
         
     except Exception as e:
-        logger.error(f"❌ Error: {e}")
-        logger.error(traceback.format_exc())
-        
-        if temp_dir:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        if isinstance(e, PipelineError):
+            logger.error(f"❌ {e}")
+        else:
+            logger.error(f"❌ Error: {e}")
+            logger.error(traceback.format_exc())
+        if not job_key:
+            # Nobody can resume a one-off run
+            MRBEAST_PIPELINE.discard(key)
         gc.collect()
         
         return {"success": False, "error": str(e)}
@@ -1052,10 +1052,16 @@ async def generate_endpoint(request: Request):
         
         from Supermain import database_manager
         
-        result = await asyncio.wait_for(
-            generate_mrbeast_short(youtube_url, target_duration, user_id, database_manager),
-            timeout=900
-        )
+        # Only a client retry of the same request (same idempotency_key) resumes its pipeline workspace
+        idempotency_key = data.get("idempotency_key")
+        job_key = f"mrbeast:{user_id}:{idempotency_key}" if idempotency_key else None
+        
+        with ffmpeg_job(user_id, PRIORITY_INTERACTIVE):
+            result = await asyncio.wait_for(
+                render("mrbeast", user_id, database_manager, youtube_url=youtube_url, target_duration=target_duration,
+                       job_key=job_key),
+                timeout=900
+            )
         
         return JSONResponse(content=result)
         
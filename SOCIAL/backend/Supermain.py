@@ -16,7 +16,6 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
-import asyncio
 import logging
 from typing import Optional
 from datetime import datetime, timedelta
@@ -38,7 +37,7 @@ from urllib.parse import quote
 # import base64          gdf;lh,er
 from PIL import Image, ImageDraw, ImageFont
 import io
-from datetime import time as time_type, timezone
+from datetime import time as time_type
 
 from mainY import app
 from YTscrapADS import get_product_scraper
@@ -48,6 +47,22 @@ from YTdatabase import database_manager
 
 
 from Viral_pixel import router as viral_pixel_router
+from ffmpeg_pool import get_ffmpeg_pool, ffmpeg_job, PRIORITY_INTERACTIVE, PRIORITY_SCHEDULED
+from media_cache import get_media_cache
+from scrape_cache import get_scrape_cache
+from http_clients import pooled_client, get_http_registry
+from llm_gateway import get_llm_gateway
+from llm_router import get_llm_router
+from llm_stream import JsonArrayParser, LabeledFieldParser, sse_response, stream_chat
+from script_dedup import get_script_index
+from render_ahead import get_render_ahead
+from automation_scheduler import get_automation_scheduler
+from job_queue import get_job_queue, job_key
+from render_worker import render
+from pipeline import get_pipelines_status
+from youtube_client import get_youtube_executor, get_youtube_service_cache
+from youtube_mirror import get_video_mirror
+from comment_ingest import get_comment_ingestor
 
 
 
@@ -138,6 +153,7 @@ class UnifiedDatabaseManager:
         self.automation_configs = None
         self.scheduled_posts = None
         self.scrape_urls = None
+        self.scraped_products = None
         
     async def connect(self):
         """Initialize MongoDB connection"""
@@ -157,10 +173,21 @@ class UnifiedDatabaseManager:
             self.automation_configs = self.db.automation_configs
             self.scheduled_posts = self.db.scheduled_posts
             self.scrape_urls = self.db.scrape_urls
+            self.scraped_products = self.db.scraped_products
             
             # Test connection
             await self.client.admin.command('ping')
             
+            # Crawled product seen-set (per user and crawl source, deduped by site product ID)
+            try:
+                await self.scraped_products.drop_index("user_id_1_product_id_1")
+            except Exception:
+                pass  # already replaced by the per-source index
+            await self.scraped_products.create_index(
+                [("user_id", 1), ("source_url", 1), ("product_id", 1)], unique=True
+            )
+            await self.scraped_products.create_index([("user_id", 1), ("processed", 1), ("discovered_at", 1)])
+            
             self.connected = True
             logger.info("✅ Unified database connected successfully")
             return True
@@ -415,7 +442,7 @@ class UnifiedDatabaseManager:
             # ✅ DYNAMIC USER-AGENT with actual Reddit username
             user_agent = f"VelocityPost/1.0 by /u/{reddit_username}"
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with pooled_client(timeout=30.0) as client:
                 response = await client.post(
                     "https://www.reddit.com/api/v1/access_token",
                     headers={
@@ -718,6 +745,7 @@ class UnifiedDatabaseManager:
                     "$set": {
                         "user_id": user_id,
                         "url": url,
+                        "search_query": None,
                         "created_at": datetime.now(),
                         "last_scraped": None,
                         "total_products_found": 0,
@@ -809,6 +837,96 @@ class UnifiedDatabaseManager:
             logger.error(f"❌ Get next product failed: {e}")
             return None
 
+    @staticmethod
+    def scrape_source_key(url: str, search_query: str = None) -> str:
+        """Crawl source a scraped product belongs to - one key format for every route"""
+        return f"{url}|{search_query}" if search_query else url
+
+    async def add_scraped_products(self, user_id: str, products: list, source_url: str = None) -> int:
+        """Insert crawled products not seen before for this user and source; returns how many were new"""
+        try:
+            if not self.connected or not products:
+                return 0
+            
+            from pymongo import UpdateOne
+            now = datetime.now()
+            operations = [
+                UpdateOne(
+                    {"user_id": user_id, "source_url": source_url, "product_id": product["product_id"]},
+                    {
+                        "$setOnInsert": {
+                            "user_id": user_id,
+                            "product_id": product["product_id"],
+                            "url": product.get("url"),
+                            "title": product.get("title"),
+                            "image": product.get("image"),
+                            "price": product.get("price"),
+                            "source_url": source_url,
+                            "processed": False,
+                            "discovered_at": now
+                        },
+                        "$set": {"last_seen": now}
+                    },
+                    upsert=True
+                )
+                for product in products if product.get("product_id")
+            ]
+            result = await self.scraped_products.bulk_write(operations, ordered=False)
+            return result.upserted_count
+        except Exception as e:
+            logger.error(f"❌ Add scraped products failed: {e}")
+            return 0
+
+    async def get_next_scraped_product(self, user_id: str, source_url: str = None) -> dict:
+        """Oldest crawled product not yet turned into a video (optionally from one crawl source)"""
+        try:
+            if not self.connected:
+                logger.error("Database not connected")
+                return None
+            
+            query = {"user_id": user_id, "processed": False}
+            if source_url:
+                query["source_url"] = source_url
+            return await self.scraped_products.find_one(query, sort=[("discovered_at", 1)])
+        except Exception as e:
+            logger.error(f"❌ Get next scraped product failed: {e}")
+            return None
+
+    async def mark_scraped_product_processed(self, user_id: str, product_id: str, source_url: str = None) -> bool:
+        """Mark a crawled product as used (in one crawl source when given)"""
+        try:
+            if not self.connected:
+                logger.error("Database not connected")
+                return False
+            
+            query = {"user_id": user_id, "product_id": product_id}
+            if source_url:
+                query["source_url"] = source_url
+            await self.scraped_products.update_many(
+                query,
+                {"$set": {"processed": True, "processed_at": datetime.now()}}
+            )
+            return True
+        except Exception as e:
+            logger.error(f"❌ Mark scraped product failed: {e}")
+            return False
+
+    async def count_scraped_products(self, user_id: str, source_url: str = None) -> dict:
+        """Total and unprocessed crawled products for user"""
+        try:
+            if not self.connected:
+                return {"total": 0, "unprocessed": 0}
+            
+            query = {"user_id": user_id}
+            if source_url:
+                query["source_url"] = source_url
+            total = await self.scraped_products.count_documents(query)
+            unprocessed = await self.scraped_products.count_documents({**query, "processed": False})
+            return {"total": total, "unprocessed": unprocessed}
+        except Exception as e:
+            logger.error(f"❌ Count scraped products failed: {e}")
+            return {"total": 0, "unprocessed": 0}
+
     async def get_automation_posts_count(self, user_id: str, date) -> int:
         """Get number of automation posts for a specific date"""
         try:
@@ -1302,35 +1420,32 @@ async def cleanup_all_services():
 # ============================================================================
 # FASTAPI LIFESPAN
 # ============================================================================
-# Global variable for background task
-automation_task = None
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown"""
-    global automation_task
-    
     # Startup
+    await get_http_registry().startup()
     success = await initialize_all_services()
     if not success:
         logger.error("⚠️ Service initialization incomplete - some features may not work")
     
-    # ✅ START AUTOMATION BACKGROUND TASK
-    logger.info("🤖 Starting product automation background task...")
-    automation_task = asyncio.create_task(run_product_automation_tasks())
-    logger.info("✅ Background automation task started")
+    # ✅ START AUTOMATION SCHEDULER
+    start_automation_scheduler()
+    start_render_ahead()
     
     yield
     
     # Shutdown
-    if automation_task:
-        automation_task.cancel()
-        try:
-            await automation_task
-        except asyncio.CancelledError:
-            logger.info("Background task cancelled")
-    
+    await get_automation_scheduler().stop()
+    await get_job_queue().stop()
+    await get_render_ahead().stop()
     await cleanup_all_services()
+    await get_product_scraper().browser_pool.shutdown()
+    await get_video_mirror().stop()
+    await get_youtube_service_cache().stop()
+    get_youtube_executor().shutdown()
+    # Last: everything above may still finish requests on the shared pools
+    await get_http_registry().shutdown()
 
 
 
@@ -1714,6 +1829,8 @@ try:
         upload_thumbnail_image,
         generate_video_thumbnails,
         generate_youtube_content,
+        generate_youtube_content_stream,
+        generate_community_post_stream,
         get_user_videos,
         get_youtube_comments,
         reply_to_comment,
@@ -1747,6 +1864,8 @@ try:
     app.post("/api/youtube/upload-thumbnail-image")(upload_thumbnail_image)
     app.post("/api/youtube/generate-thumbnails")(generate_video_thumbnails)
     app.post("/api/ai/generate-youtube-content")(generate_youtube_content)
+    app.post("/api/ai/generate-youtube-content/stream")(generate_youtube_content_stream)
+    app.post("/api/ai/generate-community-post/stream")(generate_community_post_stream)
     app.get("/api/youtube/user-videos/{user_id}")(get_user_videos)
     app.get("/api/youtube/comments/{user_id}")(get_youtube_comments)
     app.post("/api/youtube/reply-comment")(reply_to_comment)
@@ -2445,40 +2564,86 @@ async def generate_reddit_ai_post(request: Request, current_user: dict = Depends
     try:
         data = await request.json()
         
-        post_type = data.get("post_type", "discussion")
-        tone = data.get("tone", "casual")
-        length = data.get("length", "medium")
-        domain = data.get("domain", "tech")
-        business_type = data.get("business_type", "business")
-        business_description = data.get("business_description", "")
-        
-        domain_subreddits = {
-            "education": ["test", "CasualConversation", "self"],
-            "restaurant": ["test", "CasualConversation", "self"],
-            "tech": ["test", "CasualConversation", "self"],
-            "health": ["test", "CasualConversation", "self"],
-            "business": ["test", "CasualConversation", "self"]
-        }
+        prompt, business_type = reddit_post_prompt(data)
+        gateway = get_llm_gateway()
         
-        domain_topics = {
-            "education": f"my experience with {business_type}",
-            "restaurant": f"found this great {business_type}",
-            "tech": f"thoughts on {business_type}",
-            "health": f"my journey with {business_type}",
-            "business": f"lessons from {business_type}"
-        }
+        ai_response, ai_service_used = None, None
+        for provider, url, headers, payload in reddit_post_routes(prompt):
+            ai_response = await gateway.complete(url, headers, payload, timeout=30.0)
+            if ai_response:
+                ai_service_used = provider
+                logger.info(f"✅ {ai_service_used} success")
+                break
         
-        topic = domain_topics.get(domain, business_type)
-        subreddit_options = domain_subreddits.get(domain, ["test"])
+        return reddit_post_result(ai_response, ai_service_used, business_type)
         
-        length_map = {
-            "short": "2-3 sentences",
-            "medium": "2-3 paragraphs",
-            "long": "4-5 paragraphs"
-        }
+    except Exception as e:
+        logger.error(f"Generation error: {e}")
+        logger.error(traceback.format_exc())
         
-        # ✅ SUPER EXPLICIT PROMPT WITH EXAMPLES
-        prompt = f"""Create a casual Reddit post about: {topic}
+        return {
+            "success": True,
+            "subreddit": "test",
+            "title": "thoughts on ai automation tools?",
+            "content": "so i recently started using some ai automation stuff and honestly its been interesting. saves time with repetitive tasks but im still figuring out if its worth the learning curve. has anyone used these long term? would love to hear your experiences tbh",
+            "human_score": 75,
+            "ai_service": "fallback"
+        }
+
+
+@app.post("/api/reddit/generate-ai-post/stream")
+async def generate_reddit_ai_post_stream(request: Request, current_user: dict = Depends(get_current_user)):
+    """Streaming variant of /api/reddit/generate-ai-post (Server-Sent Events; `done` carries the full result)"""
+    data = await request.json()
+    prompt, business_type = reddit_post_prompt(data)
+    
+    async def events():
+        parser = LabeledFieldParser(["SUBREDDIT", "TITLE", "CONTENT"])
+        async for event, payload in stream_chat(reddit_post_routes(prompt), parser, timeout=30.0):
+            if event == "complete":
+                yield "done", reddit_post_result(payload["text"], payload["service"], business_type)
+            else:
+                yield event, payload
+    
+    return sse_response(events())
+
+
+def reddit_post_prompt(data: dict):
+    """Prompt for generate-ai-post (and its stream variant); returns (prompt, business_type)"""
+    post_type = data.get("post_type", "discussion")
+    tone = data.get("tone", "casual")
+    length = data.get("length", "medium")
+    domain = data.get("domain", "tech")
+    business_type = data.get("business_type", "business")
+    business_description = data.get("business_description", "")
+    
+    domain_subreddits = {
+        "education": ["test", "CasualConversation", "self"],
+        "restaurant": ["test", "CasualConversation", "self"],
+        "tech": ["test", "CasualConversation", "self"],
+        "health": ["test", "CasualConversation", "self"],
+        "business": ["test", "CasualConversation", "self"]
+    }
+    
+    domain_topics = {
+        "education": f"my experience with {business_type}",
+        "restaurant": f"found this great {business_type}",
+        "tech": f"thoughts on {business_type}",
+        "health": f"my journey with {business_type}",
+        "business": f"lessons from {business_type}"
+    }
+    
+    topic = domain_topics.get(domain, business_type)
+    subreddit_options = domain_subreddits.get(domain, ["test"])
+    
+    length_map = {
+        "short": "2-3 sentences",
+        "medium": "2-3 paragraphs",
+        "long": "4-5 paragraphs"
+    }
+    
+    # ✅ SUPER EXPLICIT PROMPT WITH EXAMPLES
+    prompt = f"""Create a casual Reddit post about: {topic}
 
 CRITICAL INSTRUCTIONS:
 1. Title = SHORT question (5-12 words ONLY)
@@ -2506,189 +2671,139 @@ TITLE: are ai tools useful CONTENT: ive been trying them out...
 Make it casual with words like: kinda, gonna, tbh, imo
 Add 1-2 typos like: teh, recieve
 """
-
-        mistral_api_key = os.getenv("MISTRAL_API_KEY")
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        
-        ai_response = None
-        ai_service_used = None
-        
-        # Try Mistral
-        if mistral_api_key:
-            try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        "https://api.mistral.ai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {mistral_api_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": "mistral-large-latest",
-                            "messages": [
-                                {
-                                    "role": "system", 
-                                    "content": "You are a Reddit user. Follow the format EXACTLY. Put TITLE and CONTENT on separate lines. Title must be SHORT (max 12 words). Content must be LONG (multiple sentences). No formatting symbols."
-                                },
-                                {"role": "user", "content": prompt}
-                            ],
-                            "temperature": 0.7,
-                            "max_tokens": 800
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        ai_response = result["choices"][0]["message"]["content"]
-                        ai_service_used = "mistral"
-                        logger.info("✅ Mistral success")
-                    elif response.status_code == 429:
-                        logger.warning("⚠️ Mistral rate limit, waiting...")
-                        await asyncio.sleep(2)
-                    else:
-                        logger.error(f"Mistral error: {response.status_code}")
-                        
-            except Exception as e:
-                logger.error(f"Mistral error: {e}")
-        
-        # Fallback to Groq
-        if not ai_response and groq_api_key:
-            try:
-                await asyncio.sleep(1)
-                
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        "https://api.groq.com/openai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {groq_api_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": "llama-3.1-70b-versatile",
-                            "messages": [
-                                {
-                                    "role": "system", 
-                                    "content": "You are a Reddit user. Follow format EXACTLY. TITLE and CONTENT on separate lines. Title SHORT. Content LONG. No symbols."
-                                },
-                                {"role": "user", "content": prompt}
-                            ],
-                            "temperature": 0.8,
-                            "max_tokens": 800
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        ai_response = result["choices"][0]["message"]["content"]
-                        ai_service_used = "groq"
-                        logger.info("✅ Groq success")
-                    else:
-                        logger.error(f"Groq error: {response.status_code}")
-                        
-            except Exception as e:
-                logger.error(f"Groq error: {e}")
-        
-        # Fallback content
-        if not ai_response:
-            logger.warning("⚠️ Using fallback content")
-            ai_service_used = "fallback"
-            ai_response = f"""SUBREDDIT: test
+    return prompt, business_type
+
+
+def reddit_post_routes(prompt: str) -> list:
+    """(provider, url, headers, payload) for each configured provider, Mistral first"""
+    mistral_api_key = os.getenv("MISTRAL_API_KEY")
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    routes = []
+    if mistral_api_key:
+        routes.append(("mistral", "https://api.mistral.ai/v1/chat/completions", {
+            "Authorization": f"Bearer {mistral_api_key}",
+            "Content-Type": "application/json"
+        }, {
+            "model": "mistral-large-latest",
+            "messages": [
+                {
+                    "role": "system", 
+                    "content": "You are a Reddit user. Follow the format EXACTLY. Put TITLE and CONTENT on separate lines. Title must be SHORT (max 12 words). Content must be LONG (multiple sentences). No formatting symbols."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 800
+        }))
+    if groq_api_key:
+        routes.append(("groq", "https://api.groq.com/openai/v1/chat/completions", {
+            "Authorization": f"Bearer {groq_api_key}",
+            "Content-Type": "application/json"
+        }, {
+            "model": "llama-3.1-70b-versatile",
+            "messages": [
+                {
+                    "role": "system", 
+                    "content": "You are a Reddit user. Follow format EXACTLY. TITLE and CONTENT on separate lines. Title SHORT. Content LONG. No symbols."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.8,
+            "max_tokens": 800
+        }))
+    return routes
+
+
+def reddit_post_result(ai_response: Optional[str], ai_service_used: Optional[str], business_type: str) -> dict:
+    """Parse/clean an AI Reddit post into the generate-ai-post response"""
+    # Fallback content
+    if not ai_response:
+        logger.warning("⚠️ Using fallback content")
+        ai_service_used = "fallback"
+        ai_response = f"""SUBREDDIT: test
 TITLE: thoughts on {business_type}?
 CONTENT: so i recently tried {business_type} and honestly its pretty interesting. the experience has been good so far and i kinda like how it works. has anyone else tried this? would love to hear your thoughts tbh"""
+    
+    # ✅ CLEAN FORMATTING
+    ai_response = clean_ai_formatting(ai_response)
+    
+    logger.info(f"🔍 Raw AI response:\n{ai_response}")
+    
+    # ✅ ROBUST PARSING WITH MULTIPLE STRATEGIES
+    subreddit = "test"
+    title = ""
+    content = ""
+    
+    # Strategy 1: Standard regex parsing
+    subreddit_match = re.search(r'SUBREDDIT:\s*([^\n]+)', ai_response, re.IGNORECASE)
+    title_match = re.search(r'TITLE:\s*([^\n]+)', ai_response, re.IGNORECASE)
+    content_match = re.search(r'CONTENT:\s*(.+?)(?:\n\n|\Z)', ai_response, re.IGNORECASE | re.DOTALL)
+    
+    if subreddit_match:
+        subreddit = subreddit_match.group(1).strip().replace('r/', '')
+    
+    if title_match:
+        title = title_match.group(1).strip()
         
-        # ✅ CLEAN FORMATTING
-        ai_response = clean_ai_formatting(ai_response)
-        
-        logger.info(f"🔍 Raw AI response:\n{ai_response}")
-        
-        # ✅ ROBUST PARSING WITH MULTIPLE STRATEGIES
+    if content_match:
+        content = content_match.group(1).strip()
+    
+    # ✅ Strategy 2: If "CONTENT:" appears in title, split it
+    if "CONTENT:" in title.upper():
+        logger.warning("⚠️ CONTENT label found in title, splitting...")
+        parts = re.split(r'CONTENT:', title, flags=re.IGNORECASE)
+        title = parts[0].strip()
+        if len(parts) > 1:
+            content = parts[1].strip() + " " + content
+    
+    # ✅ Strategy 3: If title is too long, treat as content and generate new title
+    title_words = title.split()
+    if len(title_words) > 20:
+        logger.warning(f"⚠️ Title too long ({len(title_words)} words), extracting...")
+        # Use first 10 words as title
+        title = ' '.join(title_words[:10])
+        # Rest becomes content
+        content = ' '.join(title_words[10:]) + " " + content
+    
+    # ✅ Strategy 4: If content is empty or too short, use rest of text
+    if not content or len(content) < 50:
+        logger.warning("⚠️ Content too short, using fallback")
+        content = f"so i recently tried this and honestly its pretty interesting. the experience has been good so far and i kinda like how it works. has anyone else tried this? would love to hear your thoughts tbh"
+    
+    # ✅ Strategy 5: Ensure title ends properly (no trailing "CONTENT:")
+    title = re.sub(r'\s*CONTENT:.*$', '', title, flags=re.IGNORECASE).strip()
+    
+    # ✅ Final cleanup
+    title = title.strip().rstrip('?!.,:;') + ('?' if not title.endswith('?') else '')
+    content = content.strip()
+    
+    # ✅ Force safe subreddit
+    if subreddit not in ["test", "CasualConversation", "self"]:
         subreddit = "test"
-        title = ""
-        content = ""
-        
-        # Strategy 1: Standard regex parsing
-        subreddit_match = re.search(r'SUBREDDIT:\s*([^\n]+)', ai_response, re.IGNORECASE)
-        title_match = re.search(r'TITLE:\s*([^\n]+)', ai_response, re.IGNORECASE)
-        content_match = re.search(r'CONTENT:\s*(.+?)(?:\n\n|\Z)', ai_response, re.IGNORECASE | re.DOTALL)
-        
-        if subreddit_match:
-            subreddit = subreddit_match.group(1).strip().replace('r/', '')
-        
-        if title_match:
-            title = title_match.group(1).strip()
-            
-        if content_match:
-            content = content_match.group(1).strip()
-        
-        # ✅ Strategy 2: If "CONTENT:" appears in title, split it
-        if "CONTENT:" in title.upper():
-            logger.warning("⚠️ CONTENT label found in title, splitting...")
-            parts = re.split(r'CONTENT:', title, flags=re.IGNORECASE)
-            title = parts[0].strip()
-            if len(parts) > 1:
-                content = parts[1].strip() + " " + content
-        
-        # ✅ Strategy 3: If title is too long, treat as content and generate new title
-        title_words = title.split()
-        if len(title_words) > 20:
-            logger.warning(f"⚠️ Title too long ({len(title_words)} words), extracting...")
-            # Use first 10 words as title
-            title = ' '.join(title_words[:10])
-            # Rest becomes content
-            content = ' '.join(title_words[10:]) + " " + content
-        
-        # ✅ Strategy 4: If content is empty or too short, use rest of text
-        if not content or len(content) < 50:
-            logger.warning("⚠️ Content too short, using fallback")
-            content = f"so i recently tried this and honestly its pretty interesting. the experience has been good so far and i kinda like how it works. has anyone else tried this? would love to hear your thoughts tbh"
-        
-        # ✅ Strategy 5: Ensure title ends properly (no trailing "CONTENT:")
-        title = re.sub(r'\s*CONTENT:.*$', '', title, flags=re.IGNORECASE).strip()
-        
-        # ✅ Final cleanup
-        title = title.strip().rstrip('?!.,:;') + ('?' if not title.endswith('?') else '')
-        content = content.strip()
-        
-        # ✅ Force safe subreddit
-        if subreddit not in ["test", "CasualConversation", "self"]:
-            subreddit = "test"
-        
-        # ✅ Add human touches to content only (not title)
-        content = add_enhanced_human_touches(content)
-        
-        # ✅ Calculate score
-        human_score = calculate_enhanced_human_score(content)
-        
-        logger.info(f"✅ Final result - Title: '{title}' ({len(title)} chars)")
-        logger.info(f"✅ Final result - Content: '{content[:50]}...' ({len(content)} chars)")
-        
-        return {
-            "success": True,
-            "subreddit": subreddit,
-            "title": title,
-            "content": content,
-            "human_score": human_score,
-            "ai_service": ai_service_used,
-            "debug": {
-                "title_length": len(title),
-                "content_length": len(content),
-                "title_word_count": len(title.split()),
-                "content_word_count": len(content.split())
-            }
-        }
-        
-    except Exception as e:
-        logger.error(f"Generation error: {e}")
-        logger.error(traceback.format_exc())
-        
-        return {
-            "success": True,
-            "subreddit": "test",
-            "title": "thoughts on ai automation tools?",
-            "content": "so i recently started using some ai automation stuff and honestly its been interesting. saves time with repetitive tasks but im still figuring out if its worth the learning curve. has anyone used these long term? would love to hear your experiences tbh",
-            "human_score": 75,
-            "ai_service": "fallback"
+    
+    # ✅ Add human touches to content only (not title)
+    content = add_enhanced_human_touches(content)
+    
+    # ✅ Calculate score
+    human_score = calculate_enhanced_human_score(content)
+    
+    logger.info(f"✅ Final result - Title: '{title}' ({len(title)} chars)")
+    logger.info(f"✅ Final result - Content: '{content[:50]}...' ({len(content)} chars)")
+    
+    return {
+        "success": True,
+        "subreddit": subreddit,
+        "title": title,
+        "content": content,
+        "human_score": human_score,
+        "ai_service": ai_service_used,
+        "debug": {
+            "title_length": len(title),
+            "content_length": len(content),
+            "title_word_count": len(title.split()),
+            "content_word_count": len(content.split())
         }
+    }
 
 
 def clean_ai_formatting(text: str) -> str:
@@ -2846,7 +2961,7 @@ async def post_now_to_reddit(request: Request, current_user: dict = Depends(get_
         # ✅ DYNAMIC USER-AGENT
         user_agent = f"VelocityPost/1.0 by /u/{reddit_username}"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with pooled_client(timeout=30.0) as client:
             response = await client.post(
                 "https://oauth.reddit.com/api/submit",
                 headers={
@@ -3045,7 +3160,7 @@ async def generate_ai_thumbnails(request: Request):
                 
                 logger.info(f"📥 Fetching AI thumbnail {i} from Pollinations...")
                 
-                async with httpx.AsyncClient(timeout=30.0) as client:
+                async with pooled_client(timeout=30.0) as client:
                     response = await client.get(image_url)
                     
                     if response.status_code == 200:
@@ -3619,6 +3734,8 @@ async def start_product_automation(request: Request, current_user: dict = Depend
                 content={"success": False, "error": "Failed to store config"}
             )
         
+        await get_automation_scheduler().replan("product", user_id)
+        
         logger.info(f"✅ Product automation STARTED for user: {user_email} ({user_id})")
         logger.info(f"   Base URL: {base_url}")
         logger.info(f"   Search: {search_query}")
@@ -3667,6 +3784,7 @@ async def stop_product_automation(request: Request, current_user: dict = Depends
         
         # Disable automation by setting enabled = False
         success = await database_manager.disable_automation(user_id, "product_automation")
+        await get_automation_scheduler().replan("product", user_id)
         
         if not success:
             return JSONResponse(
@@ -3705,7 +3823,7 @@ async def stop_product_automation(request: Request, current_user: dict = Depends
 # Look for: @app.post("/api/product-automation/stop")
 # Add these routes RIGHT AFTER that section
 
-from datetime import datetime, time as time_type, timezone, timedelta
+from datetime import datetime, time as time_type, timedelta
 
 # ============================================================================
 # START PIXABAY AUTOMATION
@@ -3806,6 +3924,8 @@ async def start_pixabay_automation(request: Request, current_user: dict = Depend
                 content={"success": False, "error": "Failed to store config"}
             )
         
+        await get_automation_scheduler().replan("pixabay", user_id)
+        
         logger.info(f"✅ Pixabay automation STARTED for user: {user_email} ({user_id})")
         logger.info(f"   Niche: {niche}")
         logger.info(f"   Times: {upload_times}")
@@ -3855,6 +3975,7 @@ async def stop_pixabay_automation(request: Request, current_user: dict = Depends
         
         # Disable automation
         success = await database_manager.disable_automation(user_id, "pixabay_automation")
+        await get_automation_scheduler().replan("pixabay", user_id)
         
         if not success:
             return JSONResponse(
@@ -4116,124 +4237,172 @@ async def get_pixabay_automation_logs(user_id: str, limit: int = 20):
 # ============================================================================
 # FIND THIS FUNCTION (around line 2900) AND REPLACE IT WITH THIS VERSION:
 
-async def run_product_automation_tasks():
+# ============================================================================
+# RENDER-AHEAD BUILDERS
+# ============================================================================
+
+async def _enabled_automation_configs(automation_type: str) -> list:
+    """(user_id, config_data) for every enabled automation of one type"""
+    if not database_manager or not database_manager.connected:
+        return []
+    configs = await database_manager.get_all_automation_configs_by_type(automation_type)
+    return [
+        (config.get("user_id"), config.get("config_data", {}))
+        for config in configs
+        if config.get("user_id") and config.get("config_data", {}).get("enabled", False)
+    ]
+
+
+async def build_product_bundle(user_id: str, config_data: dict):
+    """Render the next product video ahead of its slot (product stays reserved until upload)"""
+    if not config_data.get("base_url") or not config_data.get("search_query"):
+        return None
+    rendered = await render_product_video(user_id, config_data, reserve=True)
+    if not rendered.get("success"):
+        return None
+    video_path = rendered.pop("video_path")
+    rendered.pop("success", None)
+    return {"video_path": video_path, "metadata": rendered}
+
+
+async def release_product_bundle(bundle: dict):
+    """Expired / unused product bundle: put its product back in the crawl queue"""
+    metadata = bundle.get("metadata", {})
+    product_id = metadata.get("product_id")
+    user_id = bundle.get("user_id")
+    if product_id and user_id and database_manager:
+        query = {"user_id": user_id, "product_id": product_id}
+        if metadata.get("source_url"):
+            query["source_url"] = metadata["source_url"]
+        await database_manager.scraped_products.update_many(query, {"$set": {"processed": False}})
+
+
+async def build_pixabay_bundle(user_id: str, config_data: dict):
+    """Render the next Pixabay video (script, voice, mix) ahead of its slot"""
+    rendered = await render(
+        "pixabay_render",
+        user_id,
+        database_manager,
+        niche=config_data.get("niche", "spiritual"),
+        language=config_data.get("language", "hindi"),
+        target_duration=config_data.get("target_duration", 40),
+        custom_bg_music=config_data.get("custom_bg_music") or None,
+        user_input=config_data.get("user_input") or None
+    )
+    if not rendered.get("success"):
+        return None
+    return {
+        "video_path": rendered.pop("video_path"),
+        "thumbnail_path": rendered.pop("thumbnail_path"),
+        "cleanup_dir": rendered.pop("temp_dir"),
+        "metadata": {k: v for k, v in rendered.items() if k != "success"},
+    }
+
+
+def start_render_ahead():
+    """Register both automation kinds with the render-ahead planner and start it"""
+    planner = get_render_ahead()
+    planner.register(
+        "product",
+        lambda: _enabled_automation_configs("product_automation"),
+        build_product_bundle,
+        on_discard=release_product_bundle
+    )
+    planner.register(
+        "pixabay",
+        lambda: _enabled_automation_configs("pixabay_automation"),
+        build_pixabay_bundle
+    )
+    planner.start()
+
+
+# ============================================================================
+# AUTOMATION SCHEDULER HOOKS
+# ============================================================================
+
+async def _scheduler_configs(automation_type: str) -> list:
+    """Full config list for the scheduler - raises while the DB is down so plans aren't wiped"""
+    if not database_manager or not database_manager.connected:
+        raise RuntimeError("Database not connected")
+    return await _enabled_automation_configs(automation_type)
+
+
+async def _scheduler_user_config(user_id: str, automation_type: str) -> Optional[dict]:
+    config = await database_manager.get_automation_config(user_id, automation_type)
+    return (config or {}).get("config_data")
+
+
+async def _fire_scheduled_automation(automation_type: str, user_id: str, config_data: dict, slot: datetime):
     """
-    Background task with detailed logging
-    Runs BOTH product automation AND Pixabay automation
+    One upload slot: enqueue it on the shared job queue. Every instance's
+    scheduler fires the same slot; the idempotency key lets only one through.
     """
-    logger.info("=" * 70)
-    logger.info("🚀 UNIFIED AUTOMATION BACKGROUND TASK STARTED")
-    logger.info("   - Product Automation")
-    logger.info("   - Pixabay Automation")
-    logger.info("=" * 70)
+    logger.info(f"🔔 {automation_type} TRIGGER: {slot.strftime('%H:%M')} for user {user_id}")
+    await get_job_queue().enqueue(
+        automation_type,
+        user_id,
+        {"config_data": config_data, "slot": slot.isoformat()},
+        job_key(automation_type, user_id, slot),
+        max_attempts=1                      # uploads; a retry after a crash could post twice
+    )
+
+
+async def _run_automation_job(label: str, execute, default_max_posts: int, job: dict):
+    """Job handler: check the daily limit, then run the automation under the job's lease"""
+    user_id = job["user_id"]
+    config_data = job["payload"]["config_data"]
     
-    while True:
-        try:
-            # Get current IST time
-            IST = timezone(timedelta(hours=5, minutes=30))
-            current_time = datetime.now(IST).strftime('%H:%M')
-            current_minute = datetime.now().minute
-            
-            # Log every 5 minutes
-            if current_minute % 5 == 0:
-                logger.info(f"🕐 Automation check at {current_time} IST")
-            
-            if not database_manager or not database_manager.connected:
-                if current_minute % 5 == 0:
-                    logger.warning("⚠️ Database not connected")
-                await asyncio.sleep(60)
-                continue
-            
-            # ============================================================
-            # 1️⃣ CHECK PRODUCT AUTOMATION
-            # ============================================================
-            product_configs = await database_manager.get_all_automation_configs_by_type("product_automation")
-            
-            if current_minute % 5 == 0:
-                logger.info(f"📦 Found {len(product_configs)} product automation configs")
-            
-            for config in product_configs:
-                try:
-                    user_id = config.get("user_id")
-                    config_data = config.get("config_data", {})
-                    enabled = config_data.get("enabled", False)
-                    
-                    if not enabled:
-                        continue
-                    
-                    upload_times = config_data.get("upload_times", [])
-                    
-                    if current_time in upload_times:
-                        logger.info(f"🔔 PRODUCT AUTOMATION TRIGGER: {current_time} for user {user_id}")
-                        
-                        # Check daily limit
-                        posts_today = await database_manager.get_automation_posts_count(
-                            user_id,
-                            date=datetime.now().date()
-                        )
-                        
-                        max_posts = config_data.get("max_posts_per_day", 200)
-                        
-                        if posts_today >= max_posts:
-                            logger.warning(f"   ❌ Daily limit reached ({posts_today}/{max_posts})")
-                            continue
-                        
-                        # Execute
-                        asyncio.create_task(execute_product_automation(user_id, config_data))
-                    
-                except Exception as e:
-                    logger.error(f"❌ Product config error: {e}")
-                    continue
-            
-            # ============================================================
-            # 2️⃣ CHECK PIXABAY AUTOMATION
-            # ============================================================
-            pixabay_configs = await database_manager.get_all_automation_configs_by_type("pixabay_automation")
-            
-            if current_minute % 5 == 0:
-                logger.info(f"🖼️ Found {len(pixabay_configs)} Pixabay automation configs")
-            
-            for config in pixabay_configs:
-                try:
-                    user_id = config.get("user_id")
-                    config_data = config.get("config_data", {})
-                    enabled = config_data.get("enabled", False)
-                    
-                    if not enabled:
-                        continue
-                    
-                    upload_times = config_data.get("upload_times", [])
-                    
-                    if current_time in upload_times:
-                        logger.info(f"🔔 PIXABAY AUTOMATION TRIGGER: {current_time} for user {user_id}")
-                        
-                        # Check daily limit
-                        posts_today = await database_manager.get_automation_posts_count(
-                            user_id,
-                            date=datetime.now().date()
-                        )
-                        
-                        max_posts = config_data.get("max_posts_per_day", 10)
-                        
-                        if posts_today >= max_posts:
-                            logger.warning(f"   ❌ Daily limit reached ({posts_today}/{max_posts})")
-                            continue
-                        
-                        # Execute
-                        asyncio.create_task(execute_pixabay_automation(user_id, config_data))
-                    
-                except Exception as e:
-                    logger.error(f"❌ Pixabay config error: {e}")
-                    continue
-            
-            # Wait 60 seconds before next check
-            await asyncio.sleep(60)
-            
-        except Exception as e:
-            logger.error(f"❌ Task error: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            await asyncio.sleep(60)
+    posts_today = await database_manager.get_automation_posts_count(
+        user_id,
+        date=datetime.now().date()
+    )
+    max_posts = config_data.get("max_posts_per_day", default_max_posts)
+    
+    if posts_today >= max_posts:
+        logger.warning(f"   ❌ {label}: daily limit reached for {user_id} ({posts_today}/{max_posts})")
+        return
+    
+    with ffmpeg_job(user_id, PRIORITY_SCHEDULED):
+        await execute(user_id, config_data)
+
+
+def start_automation_scheduler():
+    """Register product + Pixabay automations with the timer-heap scheduler and job queue, and start both"""
+    queue = get_job_queue()
+    queue.register(
+        "product_automation",
+        lambda job: _run_automation_job("PRODUCT", execute_product_automation, 200, job)
+    )
+    queue.register(
+        "pixabay_automation",
+        lambda job: _run_automation_job(
+            "PIXABAY",
+            # A retry of the same slot job resumes its render; a new slot starts fresh
+            lambda user_id, config_data: execute_pixabay_automation(user_id, config_data, job["idempotency_key"]),
+            10,
+            job
+        )
+    )
+    queue.start()
+    
+    scheduler = get_automation_scheduler()
+    scheduler.register(
+        "product",
+        lambda: _scheduler_configs("product_automation"),
+        lambda user_id: _scheduler_user_config(user_id, "product_automation"),
+        lambda user_id, config_data, slot: _fire_scheduled_automation(
+            "product_automation", user_id, config_data, slot
+        )
+    )
+    scheduler.register(
+        "pixabay",
+        lambda: _scheduler_configs("pixabay_automation"),
+        lambda user_id: _scheduler_user_config(user_id, "pixabay_automation"),
+        lambda user_id, config_data, slot: _fire_scheduled_automation(
+            "pixabay_automation", user_id, config_data, slot
+        )
+    )
+    scheduler.start()
 
 # ============================================================================
 # BACKGROUND AUTOMATION TASK - REPLACE execute_product_automation
@@ -4548,42 +4717,233 @@ async def log_step(step: str, success: bool, details: str = "", error: str = "")
 #         await log_step("fatal_error", False, error=str(e))
 
 
-async def execute_product_automation(user_id: str, config: dict):
+async def render_product_video(user_id: str, config: dict, log_step=None, reserve: bool = False) -> dict:
     """
-    ✅ FIXED: Execute automation with proper credential retrieval
+    Steps 2-6 of the product automation: pick the next crawled product, scrape it
+    and render the slideshow. reserve=True marks the product used immediately
+    (render-ahead bundles) so the next build picks a different one.
     """
+    if log_step is None:
+        async def log_step(step: str, success: bool, details: str = "", error: str = ""):
+            pass
     
-    # ✅ CRITICAL: Declare global variables at the very top
-    global youtube_scheduler
+    base_url = config.get("base_url", "https://www.flipkart.com")
+    search_query = config.get("search_query", "")
     
-    # Helper function to log each step
-    async def log_step(step: str, success: bool, details: str = "", error: str = ""):
-        """Log automation step to database"""
-        try:
-            await database_manager.db.automation_logs.insert_one({
-                "user_id": user_id,
-                "timestamp": datetime.now(),
-                "step": step,
-                "success": success,
-                "details": details,
-                "error": error,
-                "product_url": "",
-                "video_id": ""
-            })
-        except Exception as e:
-            logger.error(f"Failed to log step: {e}")
+    # STEP 2: Scrape search results
+    logger.info(f"📍 STEP 2: Scraping search results page...")
     
-    try:
-        logger.info("=" * 70)
-        logger.info(f"🔄 EXECUTING AUTOMATION FOR USER: {user_id}")
-        logger.info("=" * 70)
+    from YTscrapADS import get_product_scraper
+    scraper = get_product_scraper()
+    
+    # Crawled products live in the per-user seen-set - only crawl when it has nothing left
+    crawl_source = database_manager.scrape_source_key(base_url, search_query)
+    next_product = await database_manager.get_next_scraped_product(user_id, crawl_source)
+    
+    if not next_product:
+        async def store_batch(batch):
+            await database_manager.add_scraped_products(user_id, batch, crawl_source)
         
-        # ✅ CRITICAL FIX: Validate user_id is not None/empty
-        if not user_id or user_id == "undefined" or user_id == "null":
-            error_msg = f"Invalid user_id: {user_id}"
-            logger.error(f"❌ {error_msg}")
-            await log_step("validation", False, error=error_msg)
-            return
+        product_links = await scraper.crawl_category(
+            base_url,
+            search_query=search_query,
+            on_products=store_batch
+        )
+        
+        if not product_links or len(product_links) == 0:
+            error_msg = f"No products found for: {search_query}"
+            logger.error(f"   ❌ {error_msg}")
+            await log_step("scrape_search", False, error=error_msg)
+            return {"success": False, "error": error_msg}
+        
+        logger.info(f"   ✅ Found {len(product_links)} products")
+        await log_step("scrape_search", True, f"Found {len(product_links)} products")
+        
+        next_product = await database_manager.get_next_scraped_product(user_id, crawl_source)
+        
+        if not next_product:
+            # Every crawled product has been used - start the rotation over
+            await database_manager.scraped_products.update_many(
+                {"user_id": user_id, "source_url": crawl_source},
+                {"$set": {"processed": False}}
+            )
+            next_product = await database_manager.get_next_scraped_product(user_id, crawl_source)
+    else:
+        logger.info(f"   ✅ Using crawled product queue")
+        await log_step("scrape_search", True, "Using crawled product queue")
+    
+    if not next_product:
+        error_msg = f"No products available for: {search_query}"
+        logger.error(f"   ❌ {error_msg}")
+        await log_step("select_product", False, error=error_msg)
+        return {"success": False, "error": error_msg}
+    
+    # STEP 3: Get next product to process
+    logger.info(f"📍 STEP 3: Selecting next product...")
+    
+    counts = await database_manager.count_scraped_products(user_id, crawl_source)
+    total_products = max(counts["total"], 1)
+    processed_count = counts["total"] - counts["unprocessed"]
+    
+    await database_manager.scrape_urls.update_one(
+        {"user_id": user_id},
+        {
+            "$set": {
+                "url": base_url,
+                "search_query": search_query,
+                "total_products_found": total_products,
+                "products_processed": processed_count
+            },
+            "$setOnInsert": {"created_at": datetime.now()}
+        },
+        upsert=True
+    )
+    
+    product_url = next_product.get('url')
+    product_id = next_product.get('product_id')
+    
+    logger.info(f"   ✅ Selected product {processed_count + 1}/{total_products}")
+    logger.info(f"   URL: {product_url}")
+    await log_step("select_product", True, f"Product {processed_count + 1}/{total_products}")
+    
+    # STEP 4: Scrape product details
+    logger.info(f"📍 STEP 4: Scraping product details...")
+    
+    product_data = await scraper.scrape_product(product_url)
+    
+    if not product_data.get("success"):
+        error_msg = f"Scraping failed: {product_data.get('error', 'Unknown error')}"
+        logger.error(f"   ❌ {error_msg}")
+        await log_step("scrape_product", False, error=error_msg)
+        return {"success": False, "error": error_msg}
+    
+    product_name = product_data.get('product_name', 'Product')
+    brand = product_data.get('brand', 'Brand')
+    price = product_data.get('price', 0)
+    
+    logger.info(f"   ✅ Product: {brand} - {product_name}")
+    logger.info(f"   Price: Rs.{price}")
+    await log_step("scrape_product", True, f"{brand} - {product_name} (Rs.{price})")
+    
+    # STEP 5: Download images and convert to base64
+    logger.info(f"📍 STEP 5: Downloading product images...")
+    
+    images = product_data.get("images", [])[:6]
+    
+    if len(images) < 3:
+        error_msg = "No images found"
+        logger.error(f"   ❌ {error_msg}")
+        await log_step("download_images", False, error=error_msg)
+        return {"success": False, "error": error_msg}
+    
+    logger.info(f"   Found {len(images)} images")
+    
+    # Convert to base64
+    base64_images = []
+    async with pooled_client(timeout=30) as client:
+        for i, img_url in enumerate(images):
+            try:
+                logger.info(f"   Downloading image {i+1}/{len(images)}...")
+                response = await client.get(img_url)
+                if response.status_code == 200:
+                    img_base64 = base64.b64encode(response.content).decode()
+                    base64_images.append(f"data:image/jpeg;base64,{img_base64}")
+                    logger.info(f"      ✅ Image {i+1} downloaded")
+            except Exception as e:
+                logger.warning(f"      ⚠️ Image {i+1} failed: {e}")
+                continue
+    
+    if not base64_images:
+        error_msg = "Failed to download images"
+        logger.error(f"   ❌ {error_msg}")
+        await log_step("download_images", False, error=error_msg)
+        return {"success": False, "error": error_msg}
+    
+    logger.info(f"   ✅ Downloaded {len(base64_images)} images")
+    await log_step("download_images", True, f"{len(base64_images)} images downloaded")
+    
+    # STEP 6: Generate video slideshow
+    logger.info(f"📍 STEP 6: Generating video slideshow...")
+
+    video_result = await render(
+        "slideshow",
+        user_id,
+        images=base64_images,
+        title=product_name,
+        language='english',
+        duration_per_image=2.0,
+        transition='fade',
+        add_text=True,
+        aspect_ratio="9:16",
+        product_data=product_data,
+        add_music=True,
+        music_style='upbeat'
+    )
+    
+    if not video_result.get("success"):
+        error_msg = f"Video generation failed: {video_result.get('error', 'Unknown')}"
+        logger.error(f"   ❌ {error_msg}")
+        await log_step("generate_video", False, error=error_msg)
+        return {"success": False, "error": error_msg}
+    
+    video_path = video_result.get('local_path')
+    logger.info(f"   ✅ Video generated: {video_path}")
+    await log_step("generate_video", True, f"Video: {video_path}")
+    
+    if reserve:
+        await database_manager.mark_scraped_product_processed(user_id, product_id, crawl_source)
+    
+    return {
+        "success": True,
+        "video_path": video_path,
+        "product_data": product_data,
+        "product_url": product_url,
+        "product_id": product_id,
+        "source_url": crawl_source,
+        "processed_count": processed_count,
+        "total_products": total_products
+    }
+
+
+async def execute_product_automation(user_id: str, config: dict):
+    """
+    ✅ FIXED: Execute automation with proper credential retrieval
+    """
+    
+    # ✅ CRITICAL: Declare global variables at the very top
+    global youtube_scheduler
+    
+    # Helper function to log each step
+    async def log_step(step: str, success: bool, details: str = "", error: str = ""):
+        """Log automation step to database"""
+        try:
+            await database_manager.db.automation_logs.insert_one({
+                "user_id": user_id,
+                "timestamp": datetime.now(),
+                "step": step,
+                "success": success,
+                "details": details,
+                "error": error,
+                "product_url": "",
+                "video_id": ""
+            })
+        except Exception as e:
+            logger.error(f"Failed to log step: {e}")
+    
+    bundle = None
+    uploaded = False
+    
+    try:
+        logger.info("=" * 70)
+        logger.info(f"🔄 EXECUTING AUTOMATION FOR USER: {user_id}")
+        logger.info("=" * 70)
+        
+        # ✅ CRITICAL FIX: Validate user_id is not None/empty
+        if not user_id or user_id == "undefined" or user_id == "null":
+            error_msg = f"Invalid user_id: {user_id}"
+            logger.error(f"❌ {error_msg}")
+            await log_step("validation", False, error=error_msg)
+            return
         
         # ✅ STEP 0: VERIFY YOUTUBE CREDENTIALS FIRST
         logger.info(f"📍 STEP 0: Verifying YouTube connection for user: {user_id}")
@@ -4719,144 +5079,25 @@ async def execute_product_automation(user_id: str, config: dict):
         
         await log_step("start", True, f"Starting automation for: {search_query}")
         
-        # STEP 2: Scrape search results
-        logger.info(f"📍 STEP 2: Scraping search results page...")
+        # STEPS 2-6: Use a render-ahead bundle when one is waiting, otherwise render now
+        bundle = get_render_ahead().inventory.take(user_id, "product")
         
-        from YTscrapADS import get_product_scraper
-        scraper = get_product_scraper()
-        
-        product_links = await scraper.scrape_category_page(
-            base_url,
-            max_products=50,
-            search_query=search_query
-        )
-        
-        if not product_links or len(product_links) == 0:
-            error_msg = f"No products found for: {search_query}"
-            logger.error(f"   ❌ {error_msg}")
-            await log_step("scrape_search", False, error=error_msg)
-            return
-        
-        logger.info(f"   ✅ Found {len(product_links)} products")
-        await log_step("scrape_search", True, f"Found {len(product_links)} products")
-        
-        # STEP 3: Get next product to process
-        logger.info(f"📍 STEP 3: Selecting next product...")
-        
-        url_doc = await database_manager.scrape_urls.find_one({"user_id": user_id})
-        
-        if not url_doc:
-            await database_manager.scrape_urls.insert_one({
-                "user_id": user_id,
-                "url": base_url,
-                "search_query": search_query,
-                "total_products_found": len(product_links),
-                "products_processed": 0,
-                "created_at": datetime.now()
-            })
-            processed_count = 0
+        if bundle:
+            logger.info(f"📦 Using render-ahead bundle {bundle['bundle_id']} - upload only")
+            await log_step("render_ahead", True, f"Bundle {bundle['bundle_id']}")
+            rendered = {**bundle["metadata"], "video_path": bundle["video_path"]}
         else:
-            processed_count = url_doc.get('products_processed', 0)
-            
-            if processed_count >= len(product_links):
-                processed_count = 0
-                await database_manager.scrape_urls.update_one(
-                    {"user_id": user_id},
-                    {"$set": {"products_processed": 0}}
-                )
-        
-        next_product = product_links[processed_count]
-        product_url = next_product.get('url')
-        
-        logger.info(f"   ✅ Selected product {processed_count + 1}/{len(product_links)}")
-        logger.info(f"   URL: {product_url}")
-        await log_step("select_product", True, f"Product {processed_count + 1}/{len(product_links)}")
-        
-        # STEP 4: Scrape product details
-        logger.info(f"📍 STEP 4: Scraping product details...")
-        
-        product_data = await scraper.scrape_product(product_url)
-        
-        if not product_data.get("success"):
-            error_msg = f"Scraping failed: {product_data.get('error', 'Unknown error')}"
-            logger.error(f"   ❌ {error_msg}")
-            await log_step("scrape_product", False, error=error_msg)
-            return
+            rendered = await render_product_video(user_id, config, log_step)
+            if not rendered.get("success"):
+                return
         
+        product_data = rendered["product_data"]
+        product_url = rendered["product_url"]
+        product_id = rendered["product_id"]
+        processed_count = rendered["processed_count"]
         product_name = product_data.get('product_name', 'Product')
         brand = product_data.get('brand', 'Brand')
-        price = product_data.get('price', 0)
-        
-        logger.info(f"   ✅ Product: {brand} - {product_name}")
-        logger.info(f"   Price: Rs.{price}")
-        await log_step("scrape_product", True, f"{brand} - {product_name} (Rs.{price})")
-        
-        # STEP 5: Download images and convert to base64
-        logger.info(f"📍 STEP 5: Downloading product images...")
-        
-        images = product_data.get("images", [])[:6]
-        
-        if len(images) < 3:
-            error_msg = "No images found"
-            logger.error(f"   ❌ {error_msg}")
-            await log_step("download_images", False, error=error_msg)
-            return
-        
-        logger.info(f"   Found {len(images)} images")
-        
-        # Convert to base64
-        base64_images = []
-        async with httpx.AsyncClient(timeout=30) as client:
-            for i, img_url in enumerate(images):
-                try:
-                    logger.info(f"   Downloading image {i+1}/{len(images)}...")
-                    response = await client.get(img_url)
-                    if response.status_code == 200:
-                        img_base64 = base64.b64encode(response.content).decode()
-                        base64_images.append(f"data:image/jpeg;base64,{img_base64}")
-                        logger.info(f"      ✅ Image {i+1} downloaded")
-                except Exception as e:
-                    logger.warning(f"      ⚠️ Image {i+1} failed: {e}")
-                    continue
-        
-        if not base64_images:
-            error_msg = "Failed to download images"
-            logger.error(f"   ❌ {error_msg}")
-            await log_step("download_images", False, error=error_msg)
-            return
-        
-        logger.info(f"   ✅ Downloaded {len(base64_images)} images")
-        await log_step("download_images", True, f"{len(base64_images)} images downloaded")
-        
-        # STEP 6: Generate video slideshow
-        logger.info(f"📍 STEP 6: Generating video slideshow...")
-
-        from slideshow_generator import get_slideshow_generator
-        
-        slideshow_gen = get_slideshow_generator()
-        
-        video_result = await slideshow_gen.generate_slideshow(
-            images=base64_images,
-            title=product_name,
-            language='english',
-            duration_per_image=2.0,
-            transition='fade',
-            add_text=True,
-            aspect_ratio="9:16",
-            product_data=product_data,
-            add_music=True,
-            music_style='upbeat'
-        )
-        
-        if not video_result.get("success"):
-            error_msg = f"Video generation failed: {video_result.get('error', 'Unknown')}"
-            logger.error(f"   ❌ {error_msg}")
-            await log_step("generate_video", False, error=error_msg)
-            return
-        
-        video_path = video_result.get('local_path')
-        logger.info(f"   ✅ Video generated: {video_path}")
-        await log_step("generate_video", True, f"Video: {video_path}")
+        video_path = rendered["video_path"]
         
         # STEP 7: Upload to YouTube
         logger.info(f"📍 STEP 7: Uploading to YouTube...")
@@ -4906,6 +5147,7 @@ async def execute_product_automation(user_id: str, config: dict):
         )
         
         if upload_result.get("success"):
+            uploaded = True
             video_id = upload_result.get("video_id")
             logger.info(f"   ✅ Uploaded! Video ID: {video_id}")
             logger.info(f"   URL: https://youtube.com/shorts/{video_id}")
@@ -4924,6 +5166,7 @@ async def execute_product_automation(user_id: str, config: dict):
             })
             
             # Update processed count
+            await database_manager.mark_scraped_product_processed(user_id, product_id, rendered.get("source_url"))
             await database_manager.scrape_urls.update_one(
                 {"user_id": user_id},
                 {"$set": {"products_processed": processed_count + 1}}
@@ -4946,6 +5189,16 @@ async def execute_product_automation(user_id: str, config: dict):
         import traceback
         logger.error(traceback.format_exc())
         await log_step("fatal_error", False, error=str(e))
+    
+    finally:
+        if bundle:
+            if not uploaded:
+                # The bundle reserved this product - hand it back to the queue
+                try:
+                    await release_product_bundle(bundle)
+                except Exception as release_error:
+                    logger.warning(f"Product bundle release failed: {release_error}")
+            get_render_ahead().inventory.discard(bundle)
 
 
 
@@ -4958,7 +5211,7 @@ async def execute_product_automation(user_id: str, config: dict):
 # PASTE THIS AFTER execute_product_automation() function (around line 3100)
 # This function will be called by the background scheduler
 
-async def execute_pixabay_automation(user_id: str, config: dict):
+async def execute_pixabay_automation(user_id: str, config: dict, job_key: Optional[str] = None):
     """
     Execute Pixabay automation: generate video and upload to YouTube
     Called automatically at scheduled times
@@ -5058,18 +5311,34 @@ async def execute_pixabay_automation(user_id: str, config: dict):
         
         try:
             # Import the Pixabay video generator
-            from Pixabay import generate_pixabay_video
-            
-            # Generate video
-            video_result = await generate_pixabay_video(
-                niche=niche,
-                language=language,
-                user_id=user_id,
-                database_manager=database_manager,
-                target_duration=target_duration,
-                custom_bg_music=custom_bg_music if custom_bg_music else None,
-                user_input=user_input if user_input else None
-            )
+            from Pixabay import publish_pixabay_video
+            
+            # Pre-rendered bundle waiting for this slot? Then only the upload runs
+            bundle = get_render_ahead().inventory.take(user_id, "pixabay")
+            
+            if bundle:
+                logger.info(f"   📦 Using render-ahead bundle {bundle['bundle_id']} - upload only")
+                try:
+                    video_result = await publish_pixabay_video(
+                        {**bundle["metadata"], "video_path": bundle["video_path"], "thumbnail_path": bundle["thumbnail_path"]},
+                        user_id,
+                        database_manager
+                    )
+                finally:
+                    get_render_ahead().inventory.discard(bundle)
+            else:
+                # Generate video
+                video_result = await render(
+                    "pixabay",
+                    user_id,
+                    database_manager,
+                    niche=niche,
+                    language=language,
+                    target_duration=target_duration,
+                    custom_bg_music=custom_bg_music if custom_bg_music else None,
+                    user_input=user_input if user_input else None,
+                    job_key=job_key
+                )
             
             if not video_result.get("success"):
                 error_msg = f"Video generation failed: {video_result.get('error', 'Unknown error')}"
@@ -5136,8 +5405,7 @@ async def execute_pixabay_automation(user_id: str, config: dict):
 async def shorten_url_async(long_url: str) -> str:
     """Shorten URL using TinyURL (async version)"""
     try:
-        import httpx
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with pooled_client(timeout=10) as client:
             response = await client.get(
                 f"http://tinyurl.com/api-create.php?url={long_url}"
             )
@@ -5325,6 +5593,90 @@ except Exception as e:
 # ============================================================================
 # PASTE THIS IN YOUR Supermain.py - REPLACE THE EXISTING AUTOMATION ROUTES
 # ============================================================================
+@app.get("/api/debug/ffmpeg-pool")
+async def debug_ffmpeg_pool():
+    """Shared ffmpeg pool: running/queued jobs and per-user usage"""
+    return {"success": True, "pool": get_ffmpeg_pool().get_status()}
+
+
+@app.get("/api/debug/http-pools")
+async def debug_http_pools():
+    """Shared outbound HTTP pools (per service) and HTTP/2 availability"""
+    return {"success": True, "registry": get_http_registry().get_status()}
+
+
+@app.get("/api/debug/automation-scheduler")
+async def debug_automation_scheduler():
+    """Timer-heap automation scheduler: next slots, fired/late/missed counters"""
+    return {"success": True, "scheduler": get_automation_scheduler().get_status()}
+
+
+@app.get("/api/debug/job-queue")
+async def debug_job_queue():
+    """Shared automation job queue: this worker's leases and job counts per type/status"""
+    return {"success": True, "queue": await get_job_queue().get_status()}
+
+
+@app.get("/api/debug/pipelines")
+async def debug_pipelines():
+    """Checkpointed video pipelines run in this process: stages run vs. reused, seconds saved, stage parallelism"""
+    return {"success": True, "pipelines": get_pipelines_status()}
+
+
+@app.get("/api/debug/llm-gateway")
+async def debug_llm_gateway():
+    """Per-key Mistral/Groq token buckets, coalescing and micro-batch counters"""
+    return {"success": True, "gateway": get_llm_gateway().get_status()}
+
+
+@app.get("/api/debug/ai/providers")
+async def debug_ai_providers():
+    """Per provider/model circuit state, success and 429 rates, EWMA latency and routing score"""
+    return {"success": True, "router": get_llm_router().get_status()}
+
+
+@app.get("/api/debug/script-index")
+async def debug_script_index():
+    """Loaded per-user/niche MinHash indexes used by Pixabay script dedup"""
+    return {"success": True, "index": get_script_index().get_status()}
+
+
+@app.get("/api/debug/render-ahead")
+async def debug_render_ahead():
+    """Pre-rendered upload bundles per user and the planner's build counters"""
+    return {"success": True, "render_ahead": get_render_ahead().get_status()}
+
+
+@app.get("/api/debug/youtube-api")
+async def debug_youtube_api():
+    """YouTube Data API pool, service/token cache, channel video mirror and comment ingestion"""
+    return {
+        "success": True,
+        "executor": get_youtube_executor().get_status(),
+        "services": get_youtube_service_cache().get_status(),
+        "video_mirror": get_video_mirror().get_status(),
+        "comment_ingest": get_comment_ingestor().get_status(),
+    }
+
+
+@app.get("/api/debug/browser-pool")
+async def debug_browser_pool():
+    """Warm Playwright browsers used by the product scraper"""
+    return {"success": True, "pool": get_product_scraper().browser_pool.get_status()}
+
+
+@app.get("/api/debug/scrape-cache")
+async def debug_scrape_cache():
+    """Product scrape result cache: entries, TTLs, hit/revalidation counters"""
+    return {"success": True, "cache": get_scrape_cache().get_status()}
+
+
+@app.get("/api/debug/media-cache")
+async def debug_media_cache():
+    """Shared stock media cache: size, hit/miss and eviction counters"""
+    return {"success": True, "cache": get_media_cache().get_status()}
+
+
 @app.get("/api/debug/automation-credentials/{user_id}")
 async def debug_automation_credentials(user_id: str):
     """Debug automation credentials for a user"""
@@ -5482,9 +5834,12 @@ async def save_scrape_url_route(request: Request, current_user: dict = Depends(g
         
         else:
             # ✅ CATEGORY/LISTING PAGE
-            logger.info(f"📋 Detected CATEGORY page, scraping product links...")
+            logger.info(f"📋 Detected CATEGORY page, crawling product links...")
             
-            product_links = await scraper.scrape_category_page(url, max_products=200)
+            async def store_batch(batch):
+                await database_manager.add_scraped_products(user_id, batch, database_manager.scrape_source_key(url))
+            
+            product_links = await scraper.crawl_category(url, on_products=store_batch)
             
             if not product_links:
                 return JSONResponse(
@@ -5582,19 +5937,43 @@ async def generate_video_now(request: Request):
             
         else:
             # ✅ CATEGORY - scrape category page and get next product
-            logger.info(f"📋 Scraping category for next product...")
-            product_links = await scraper.scrape_category_page(base_url, max_products=200)
+            search_query = url_doc.get('search_query')
+            crawl_source = database_manager.scrape_source_key(base_url, search_query)
+            next_product = await database_manager.get_next_scraped_product(user_id, crawl_source)
             
-            if not product_links or processed >= len(product_links):
+            if not next_product:
+                logger.info(f"📋 Crawled queue empty - crawling category...")
+                
+                async def store_batch(batch):
+                    await database_manager.add_scraped_products(user_id, batch, crawl_source)
+                
+                await scraper.crawl_category(base_url, search_query=search_query, on_products=store_batch)
+                next_product = await database_manager.get_next_scraped_product(user_id, crawl_source)
+            
+            if not next_product:
                 # Reset to first product if we've gone through all
                 processed = 0
                 await database_manager.update_scrape_progress(user_id, total_products, 0)
+                await database_manager.scraped_products.update_many(
+                    {"user_id": user_id, "source_url": crawl_source},
+                    {"$set": {"processed": False}}
+                )
+                next_product = await database_manager.get_next_scraped_product(user_id, crawl_source)
+            
+            if not next_product:
+                return JSONResponse(
+                    status_code=404,
+                    content={"success": False, "error": "No products available"}
+                )
             
             # Get next product URL
-            next_product_url = product_links[processed]['url']
-            logger.info(f"📦 Scraping product {processed + 1}/{len(product_links)}: {next_product_url}")
+            next_product_url = next_product['url']
+            logger.info(f"📦 Scraping product {processed + 1}/{total_products}: {next_product_url}")
             
             product_data = await scraper.scrape_product(next_product_url)
+            if product_data.get('success'):
+                # Failed scrapes stay queued for the next run
+                await database_manager.mark_scraped_product_processed(user_id, next_product['product_id'], crawl_source)
         
         if not product_data.get('success'):
             return JSONResponse(
@@ -5618,7 +5997,7 @@ async def generate_video_now(request: Request):
         
         # Convert URLs to base64
         base64_images = []
-        async with httpx.AsyncClient(timeout=30) as client:
+        async with pooled_client(timeout=30) as client:
             for img_url in images:
                 try:
                     response = await client.get(img_url)
@@ -5641,15 +6020,17 @@ async def generate_video_now(request: Request):
         logger.info(f"🎥 Generating slideshow video...")
         video_gen = get_video_generator()
         
-        video_result = await video_gen.generate_slideshow(
-            images=base64_images,
-            title=product_data.get('product_name', 'Product'),
-            language='english',
-            duration_per_image=2.0,
-            transition='fade',
-            add_text=True,
-            aspect_ratio="9:16"  # YouTube Shorts
-        )
+        # Interactive job: jumps ahead of scheduled renders in the ffmpeg pool
+        with ffmpeg_job(user_id, PRIORITY_INTERACTIVE):
+            video_result = await video_gen.generate_slideshow(
+                images=base64_images,
+                title=product_data.get('product_name', 'Product'),
+                language='english',
+                duration_per_image=2.0,
+                transition='fade',
+                add_text=True,
+                aspect_ratio="9:16"  # YouTube Shorts
+            )
         
         if not video_result.get('success'):
             return JSONResponse(
@@ -5841,7 +6222,7 @@ async def scrape_single_product_route(request: Request):
         logger.info(f"🔍 Scraping single product: {product_url}")
         
         scraper = get_product_scraper()
-        product_data = await scraper.scrape_product(product_url)
+        product_data = await scraper.scrape_product(product_url, use_cache=not body.get('refresh', False))
         
         if not product_data.get('success'):
             return JSONResponse(
@@ -6198,7 +6579,7 @@ async def test_scraper_route(request: Request):
             })
         else:
             # Test single product scraping
-            product_data = await scraper.scrape_product(url)
+            product_data = await scraper.scrape_product(url, use_cache=not body.get('refresh', False))
             
             return JSONResponse(content={
                 "success": product_data.get('success', False),
@@ -6288,8 +6669,56 @@ async def generate_viral_titles(request: Request):
                 "error": "AI API keys not configured"
             }
         
-        # Build prompt for SHORT titles
-        prompt = f"""Generate 5 SHORT viral YouTube Shorts titles for: "{topic}"
+        prompt = viral_titles_prompt(topic)
+        
+        # Race Mistral and Groq: Groq starts once Mistral runs past its p95 for this endpoint
+        gateway = get_llm_gateway()
+        ai_response, service_used = await gateway.hedged("viral-titles", [
+            (provider, lambda url=url, headers=headers, payload=payload: gateway.complete(url, headers, payload, timeout=30))
+            for provider, url, headers, payload in viral_titles_routes(prompt, mistral_key, groq_key)
+        ], validate=lambda text: '"titles"' in text)
+        if ai_response:
+            logger.info(f"✅ {service_used} API success")
+        
+        return viral_titles_result(ai_response, service_used, topic)
+        
+    except Exception as e:
+        logger.error(f"❌ Generate viral titles error: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+@app.post("/api/youtube/generate-viral-titles/stream")
+async def generate_viral_titles_stream(request: Request):
+    """Streaming variant of generate-viral-titles: each title is sent as soon as the model finishes it"""
+    data = await request.json()
+    topic = data.get("topic", "")
+    
+    if not topic or len(topic.split()) < 2:
+        return {
+            "success": False,
+            "error": "Please provide at least 2-3 words about your video"
+        }
+    
+    routes = viral_titles_routes(viral_titles_prompt(topic), os.getenv("MISTRAL_API_KEY"), os.getenv("GROQ_API_KEY"))
+    
+    async def events():
+        async for event, payload in stream_chat(routes, JsonArrayParser("titles"), timeout=30):
+            if event == "complete":
+                yield "done", viral_titles_result(payload["text"], payload["service"], topic)
+            else:
+                yield event, payload
+    
+    return sse_response(events())
+
+
+def viral_titles_prompt(topic: str) -> str:
+    """Prompt for SHORT (2-5 word) viral Shorts titles"""
+    return f"""Generate 5 SHORT viral YouTube Shorts titles for: "{topic}"
 
 CRITICAL RULES:
 1. MAXIMUM 5 WORDS per title (2-5 words only!)
@@ -6355,188 +6784,136 @@ Topic: {topic}
 Target: Indian audience on YouTube Shorts
 
 REMEMBER: MAX 5 WORDS PER TITLE! Generate NOW in PURE JSON:"""
+
+
+def viral_titles_routes(prompt: str, mistral_key: Optional[str], groq_key: Optional[str]) -> list:
+    """(provider, url, headers, payload) for each configured provider, Mistral first"""
+    system_prompt = "You are a viral YouTube Shorts expert. Generate ONLY SHORT titles (2-5 words max). Output ONLY valid JSON without markdown."
+    routes = []
+    if mistral_key:
+        routes.append(("mistral", "https://api.mistral.ai/v1/chat/completions",
+                       {"Authorization": f"Bearer {mistral_key}", "Content-Type": "application/json"}, {
+            "model": "mistral-large-latest",
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.9,
+            "max_tokens": 1500
+        }))
+    if groq_key:
+        routes.append(("groq", "https://api.groq.com/openai/v1/chat/completions",
+                       {"Authorization": f"Bearer {groq_key}", "Content-Type": "application/json"}, {
+            "model": "llama-3.1-70b-versatile",
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.9,
+            "max_tokens": 1500
+        }))
+    return routes
+
+
+def viral_titles_result(ai_response: Optional[str], service_used: Optional[str], topic: str) -> dict:
+    """Filter AI titles down to 2-5 words, or fall back to proven short templates"""
+    if not ai_response:
+        logger.warning("⚠️ Both AI services failed, using fallback")
+        service_used = "fallback"
+    
+    # Parse JSON response
+    import json
+    import re
+    
+    if ai_response:
+        # Clean response
+        ai_response_clean = re.sub(r'```json\n?|\n?```', '', ai_response).strip()
         
-        # Try Mistral first
-        ai_response = None
-        service_used = None
-        
-        if mistral_key:
-            try:
-                async with httpx.AsyncClient(timeout=30) as client:
-                    response = await client.post(
-                        "https://api.mistral.ai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {mistral_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": "mistral-large-latest",
-                            "messages": [
-                                {
-                                    "role": "system", 
-                                    "content": "You are a viral YouTube Shorts expert. Generate ONLY SHORT titles (2-5 words max). Output ONLY valid JSON without markdown."
-                                },
-                                {"role": "user", "content": prompt}
-                            ],
-                            "temperature": 0.9,
-                            "max_tokens": 1500
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        ai_response = result["choices"][0]["message"]["content"]
-                        service_used = "mistral"
-                        logger.info("✅ Mistral API success")
-                    elif response.status_code == 429:
-                        logger.warning("⚠️ Mistral rate limit, trying Groq...")
-                    else:
-                        logger.error(f"Mistral error: {response.status_code}")
-            except Exception as e:
-                logger.error(f"Mistral error: {e}")
-        
-        # Fallback to Groq
-        if not ai_response and groq_key:
-            try:
-                await asyncio.sleep(1)
+        try:
+            parsed = json.loads(ai_response_clean)
+            titles = parsed.get("titles", [])
+            
+            # FILTER: Remove titles longer than 5 words
+            filtered_titles = []
+            for t in titles:
+                title_text = t.get("title", "")
+                # Count words (exclude emojis)
+                word_count = len(re.sub(r'[^\w\s]', '', title_text).split())
                 
-                async with httpx.AsyncClient(timeout=30) as client:
-                    response = await client.post(
-                        "https://api.groq.com/openai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {groq_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": "llama-3.1-70b-versatile",
-                            "messages": [
-                                {
-                                    "role": "system", 
-                                    "content": "You are a viral YouTube Shorts expert. Generate ONLY SHORT titles (2-5 words max). Output ONLY valid JSON."
-                                },
-                                {"role": "user", "content": prompt}
-                            ],
-                            "temperature": 0.9,
-                            "max_tokens": 1500
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        ai_response = result["choices"][0]["message"]["content"]
-                        service_used = "groq"
-                        logger.info("✅ Groq API success")
-                    else:
-                        logger.error(f"Groq error: {response.status_code}")
-            except Exception as e:
-                logger.error(f"Groq error: {e}")
-        
-        if not ai_response:
-            logger.warning("⚠️ Both AI services failed, using fallback")
-            service_used = "fallback"
-        
-        # Parse JSON response
-        import json
-        import re
-        
-        if ai_response:
-            # Clean response
-            ai_response_clean = re.sub(r'```json\n?|\n?```', '', ai_response).strip()
+                if 2 <= word_count <= 5:
+                    t["word_count"] = word_count
+                    filtered_titles.append(t)
             
-            try:
-                parsed = json.loads(ai_response_clean)
-                titles = parsed.get("titles", [])
+            # If we have enough filtered titles
+            if len(filtered_titles) >= 3:
+                logger.info(f"✅ Generated {len(filtered_titles)} SHORT titles using {service_used}")
                 
-                # FILTER: Remove titles longer than 5 words
-                filtered_titles = []
-                for t in titles:
-                    title_text = t.get("title", "")
-                    # Count words (exclude emojis)
-                    word_count = len(re.sub(r'[^\w\s]', '', title_text).split())
-                    
-                    if 2 <= word_count <= 5:
-                        t["word_count"] = word_count
-                        filtered_titles.append(t)
-                
-                # If we have enough filtered titles
-                if len(filtered_titles) >= 3:
-                    logger.info(f"✅ Generated {len(filtered_titles)} SHORT titles using {service_used}")
-                    
-                    return {
-                        "success": True,
-                        "titles": filtered_titles[:5],  # Max 5
-                        "analysis": parsed.get("analysis", {
-                            "best_length": "2-5 words",
-                            "reason": "Short titles proven to get 10x more views"
-                        }),
-                        "description": parsed.get("description", ""),
-                        "tags": parsed.get("tags", []),
-                        "service": service_used,
-                        "message": f"{len(filtered_titles[:5])} SHORT viral titles generated!"
-                    }
-                
-            except (json.JSONDecodeError, ValueError) as e:
-                logger.error(f"JSON parse error: {e}")
-        
-        # FALLBACK: Short template-based titles
-        logger.info("📝 Using SHORT fallback templates")
-        
-        topic_words = topic.split()
-        first_word = topic_words[0].title()
-        
-        return {
-            "success": True,
-            "titles": [
-                {
-                    "title": f"Rare {first_word} 🦅",
-                    "word_count": 2,
-                    "score": 9.5,
-                    "reason": "Proven winner - mirrors your 1.8k view video"
-                },
-                {
-                    "title": "Wait for it 😱",
-                    "word_count": 3,
-                    "score": 9.3,
-                    "reason": "Universal suspense hook"
-                },
-                {
-                    "title": f"POV: {first_word} life 🎯",
-                    "word_count": 3,
-                    "score": 9.0,
-                    "reason": "Trending POV format"
-                },
-                {
-                    "title": "This is insane 🤯",
-                    "word_count": 3,
-                    "score": 8.8,
-                    "reason": "Shock value + emotion"
-                },
-                {
-                    "title": f"Never ignore {first_word} ⚠️",
-                    "word_count": 3,
-                    "score": 8.5,
-                    "reason": "Warning + urgency"
+                return {
+                    "success": True,
+                    "titles": filtered_titles[:5],  # Max 5
+                    "analysis": parsed.get("analysis", {
+                        "best_length": "2-5 words",
+                        "reason": "Short titles proven to get 10x more views"
+                    }),
+                    "description": parsed.get("description", ""),
+                    "tags": parsed.get("tags", []),
+                    "service": service_used,
+                    "message": f"{len(filtered_titles[:5])} SHORT viral titles generated!"
                 }
-            ],
-            "analysis": {
-                "best_length": "2-5 words",
-                "reason": "Your 'Rare vulture #Shorts' (3 words) got 1,858 views while longer titles got <150 views. SHORT = VIRAL for Shorts.",
-                "proof": "Rare vulture = 1,858 views vs long titles = 42-137 views"
+            
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"JSON parse error: {e}")
+    
+    # FALLBACK: Short template-based titles
+    logger.info("📝 Using SHORT fallback templates")
+    
+    topic_words = topic.split()
+    first_word = topic_words[0].title()
+    
+    return {
+        "success": True,
+        "titles": [
+            {
+                "title": f"Rare {first_word} 🦅",
+                "word_count": 2,
+                "score": 9.5,
+                "reason": "Proven winner - mirrors your 1.8k view video"
             },
-            "description": f"🔥 Check this out!\n\n👇 LIKE if you enjoyed\n🔔 SUBSCRIBE for more\n💬 Comment below\n\n#{topic.replace(' ', '')} #viral #shorts #trending",
-            "tags": ["viral", "shorts", "trending", first_word.lower(), "youtube"],
-            "service": "fallback",
-            "message": "5 SHORT viral titles generated (proven strategy)"
-        }
-        
-    except Exception as e:
-        logger.error(f"❌ Generate viral titles error: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
-        return {
-            "success": False,
-            "error": str(e)
-        }
+            {
+                "title": "Wait for it 😱",
+                "word_count": 3,
+                "score": 9.3,
+                "reason": "Universal suspense hook"
+            },
+            {
+                "title": f"POV: {first_word} life 🎯",
+                "word_count": 3,
+                "score": 9.0,
+                "reason": "Trending POV format"
+            },
+            {
+                "title": "This is insane 🤯",
+                "word_count": 3,
+                "score": 8.8,
+                "reason": "Shock value + emotion"
+            },
+            {
+                "title": f"Never ignore {first_word} ⚠️",
+                "word_count": 3,
+                "score": 8.5,
+                "reason": "Warning + urgency"
+            }
+        ],
+        "analysis": {
+            "best_length": "2-5 words",
+            "reason": "Your 'Rare vulture #Shorts' (3 words) got 1,858 views while longer titles got <150 views. SHORT = VIRAL for Shorts.",
+            "proof": "Rare vulture = 1,858 views vs long titles = 42-137 views"
+        },
+        "description": f"🔥 Check this out!\n\n👇 LIKE if you enjoyed\n🔔 SUBSCRIBE for more\n💬 Comment below\n\n#{topic.replace(' ', '')} #viral #shorts #trending",
+        "tags": ["viral", "shorts", "trending", first_word.lower(), "youtube"],
+        "service": "fallback",
+        "message": "5 SHORT viral titles generated (proven strategy)"
+    }
 
 
 # ============================================================================
@@ -6603,7 +6980,7 @@ async def smart_auto_reply(request: Request):
                 
                 logger.info(f"🌐 Searching web for context: {search_query}")
                 
-                async with httpx.AsyncClient(timeout=15) as client:
+                async with pooled_client(timeout=15) as client:
                     # Use a search API (you can use SerpAPI, Google Custom Search, etc.)
                     # For this example, I'll show the structure
                     search_response = await client.get(
@@ -6747,71 +7124,45 @@ Reply naturally to engage them. Could be:
 
 Match their energy. Be BRIEF:"""
         
-        # Call AI with improved parameters
-        ai_reply = None
-        service_used = None
-        
+        # Call AI with improved parameters, racing Groq against a slow Mistral
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        gateway = get_llm_gateway()
+        attempts = []
         if mistral_key:
-            try:
-                async with httpx.AsyncClient(timeout=25) as client:
-                    response = await client.post(
-                        "https://api.mistral.ai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {mistral_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": "mistral-large-latest",
-                            "messages": [
-                                {"role": "system", "content": system_prompt},
-                                {"role": "user", "content": prompt}
-                            ],
-                            "temperature": 0.85,  # Higher for more natural variation
-                            "max_tokens": 100,  # Shorter for brevity
-                            "top_p": 0.9
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        ai_reply = result["choices"][0]["message"]["content"].strip()
-                        # Clean up any quotes or formatting
-                        ai_reply = ai_reply.strip('"\'')
-                        service_used = "mistral"
-                        logger.info("✅ Mistral reply generated")
-            except Exception as e:
-                logger.error(f"Mistral error: {e}")
-        
-        # Fallback to Groq
-        if not ai_reply and groq_key:
-            try:
-                async with httpx.AsyncClient(timeout=25) as client:
-                    response = await client.post(
-                        "https://api.groq.com/openai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {groq_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": "llama-3.1-70b-versatile",
-                            "messages": [
-                                {"role": "system", "content": system_prompt},
-                                {"role": "user", "content": prompt}
-                            ],
-                            "temperature": 0.85,
-                            "max_tokens": 100,
-                            "top_p": 0.9
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        ai_reply = result["choices"][0]["message"]["content"].strip()
-                        ai_reply = ai_reply.strip('"\'')
-                        service_used = "groq"
-                        logger.info("✅ Groq reply generated")
-            except Exception as e:
-                logger.error(f"Groq error: {e}")
+            attempts.append(("mistral", lambda: gateway.complete(
+                "https://api.mistral.ai/v1/chat/completions",
+                {"Authorization": f"Bearer {mistral_key}", "Content-Type": "application/json"},
+                {
+                    "model": "mistral-large-latest",
+                    "messages": messages,
+                    "temperature": 0.85,  # Higher for more natural variation
+                    "max_tokens": 100,  # Shorter for brevity
+                    "top_p": 0.9
+                },
+                timeout=25
+            )))
+        if groq_key:
+            attempts.append(("groq", lambda: gateway.complete(
+                "https://api.groq.com/openai/v1/chat/completions",
+                {"Authorization": f"Bearer {groq_key}", "Content-Type": "application/json"},
+                {
+                    "model": "llama-3.1-70b-versatile",
+                    "messages": messages,
+                    "temperature": 0.85,
+                    "max_tokens": 100,
+                    "top_p": 0.9
+                },
+                timeout=25
+            )))
+
+        ai_reply, service_used = await gateway.hedged("smart-reply", attempts)
+        if ai_reply:
+            # Clean up any quotes or formatting
+            ai_reply = ai_reply.strip('"\'')
+            logger.info(f"✅ {service_used} reply generated")
         
         # Enhanced fallback replies (more human)
         if not ai_reply:
@@ -6901,6 +7252,43 @@ Match their energy. Be BRIEF:"""
             "reply": random.choice(casual_fallbacks)
         }
 
+
+@app.post("/api/youtube/smart-auto-reply/batch")
+async def smart_auto_reply_batch(request: Request):
+    """Replies for several comments on one video from a single AI call"""
+    try:
+        data = await request.json()
+        
+        comments = data.get("comments", [])
+        if not comments:
+            return {"success": False, "error": "comments required"}
+        
+        # Accept plain strings or {"comment_id", "text"} objects
+        comments = [c if isinstance(c, dict) else {"text": str(c)} for c in comments]
+        
+        from mainY import ai_service as youtube_ai
+        if not youtube_ai or not hasattr(youtube_ai, "generate_comment_replies_batch"):
+            return {"success": False, "error": "AI service not initialized"}
+        
+        logger.info(f"💬 Batch smart reply for {len(comments)} comments")
+        results = await youtube_ai.generate_comment_replies_batch(
+            comments=comments,
+            video_title=data.get("video_title", ""),
+            reply_style=data.get("reply_style", "friendly"),
+            language=data.get("language", "english"),
+            custom_prompt=data.get("custom_prompt", "")
+        )
+        
+        return {
+            "success": True,
+            "replies": results,
+            "fallback_count": sum(1 for r in results if r.get("ai_service") == "mock")
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Batch smart reply error: {e}")
+        return {"success": False, "error": str(e)}
+
 # ============================================================================
 # RUN APPLICATION
 # ============================================================================
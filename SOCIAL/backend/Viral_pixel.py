@@ -2785,18 +2785,21 @@ import logging
 import os
 import traceback
 import uuid
-import httpx
 import json
 import re
 import random
-import subprocess
 from typing import List, Dict, Optional, Tuple
-import tempfile
-import shutil
 import gc
 import base64
 from pathlib import Path
 
+from ffmpeg_pool import run_ffmpeg_async, ffmpeg_job, PRIORITY_INTERACTIVE
+from render_worker import render
+from pipeline import Pipeline, Stage, PipelineError
+from media_cache import get_media_cache
+from http_clients import pooled_client
+from llm_gateway import llm_client
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -2833,6 +2836,15 @@ MAX_IMAGES = 8
 IMAGE_DURATION = 3.75  # 30 seconds / 8 images
 IMAGE_TARGET_WIDTH = 720
 IMAGE_TARGET_HEIGHT = 1280
+SLIDESHOW_FPS = 25
+
+# SLIDESHOW RENDER MODE
+# "single_pass" = one ffmpeg filter graph (scale/zoompan/xfade/drawtext/amix), one encode
+# "multi_pass"  = legacy resize -> clip -> concat -> text -> mix chain
+SLIDESHOW_RENDER_MODE = os.getenv("VIRAL_PIXEL_RENDER_MODE", "single_pass")
+XFADE_DURATION = 0.5
+XFADE_TRANSITIONS = ["fade", "dissolve", "slideup", "slideleft", "circleopen", "smoothleft"]
+SINGLE_PASS_TIMEOUT = 300
 
 # ✅ ENHANCED: DIVERSE IMAGE KEYWORDS (2 images per sub-category)
 NICHE_KEYWORDS = {
@@ -2940,30 +2952,9 @@ def get_size_mb(fp: str) -> float:
     except:
         return 0.0
 
-def run_ffmpeg(cmd: list, timeout: int = FFMPEG_TIMEOUT) -> bool:
-    """Run FFmpeg command with timeout"""
-    try:
-        result = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            timeout=timeout, 
-            check=False, 
-            text=True
-        )
-        
-        if result.returncode != 0:
-            logger.error(f"FFmpeg error (code {result.returncode})")
-            logger.error(f"FFmpeg stderr: {result.stderr[:500]}")
-            return False
-        
-        return True
-        
-    except subprocess.TimeoutExpired:
-        logger.error(f"❌ FFmpeg timeout after {timeout}s")
-        return False
-    except Exception as e:
-        logger.error(f"FFmpeg exception: {e}")
-        return False
+async def run_ffmpeg(cmd: list, timeout: int = FFMPEG_TIMEOUT) -> bool:
+    """Run FFmpeg command through the shared async pool (never blocks the event loop)"""
+    return await run_ffmpeg_async(cmd, timeout)
 
 # ============================================================================
 # BACKGROUND MUSIC DOWNLOAD
@@ -2975,24 +2966,16 @@ async def download_background_music(temp_dir: str) -> Optional[str]:
     
     logger.info("🎵 Downloading background music...")
     
+    cache = get_media_cache()
+    
     for attempt, url in enumerate(BACKGROUND_MUSIC_URLS, 1):
         try:
             logger.info(f"   Attempt {attempt}/{len(BACKGROUND_MUSIC_URLS)}...")
             
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.get(url, follow_redirects=True)
-                
-                if resp.status_code == 200:
-                    with open(music_path, 'wb') as f:
-                        f.write(resp.content)
-                    
-                    size = get_size_mb(music_path)
-                    
-                    if size > 0.05:
-                        logger.info(f"   ✅ Music downloaded: {size:.2f}MB")
-                        return music_path
-                    else:
-                        force_cleanup(music_path)
+            # Music URLs are static - served from the shared asset cache when warm
+            if await cache.fetch(url, music_path, min_bytes=int(0.05 * 1024 * 1024), timeout=30):
+                logger.info(f"   ✅ Music ready: {get_size_mb(music_path):.2f}MB")
+                return music_path
             
             force_cleanup(music_path)
             
@@ -3053,7 +3036,7 @@ Make it VIRAL, MYSTERIOUS and slightly HORROR-THEMED!"""
         if MISTRAL_API_KEY:
             logger.info("Calling Mistral AI for script generation...")
             
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with llm_client(timeout=30) as client:
                 resp = await client.post(
                     "https://api.mistral.ai/v1/chat/completions",
                     headers={
@@ -3145,7 +3128,7 @@ async def generate_voice_elevenlabs(text: str, duration: float, temp_dir: str) -
         
         logger.info(f"   🎙️ ELEVENLABS (PRIORITY): Deep Horror Voice @ {VOICE_SPEED}x")
         
-        async with httpx.AsyncClient(timeout=40) as client:
+        async with pooled_client(timeout=40) as client:
             response = await client.post(
                 f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}",
                 headers={
@@ -3187,7 +3170,7 @@ async def generate_voice_elevenlabs(text: str, duration: float, temp_dir: str) -
                         "-y", output
                     ]
                     
-                    if run_ffmpeg(cmd, 20):
+                    if await run_ffmpeg(cmd, 20):
                         force_cleanup(temp_raw)
                         logger.info(f"   ✅ Voice enhanced (Bass + Speed): {get_size_mb(output):.2f}MB")
                         return output
@@ -3221,7 +3204,7 @@ async def generate_voice_vertex_ai(text: str, duration: float, temp_dir: str) ->
         
         url = f"https://{GOOGLE_LOCATION}-aiplatform.googleapis.com/v1/projects/{GOOGLE_PROJECT_ID}/locations/{GOOGLE_LOCATION}/publishers/google/models/chirp-3-hd-voices:generateContent"
         
-        async with httpx.AsyncClient(timeout=40) as client:
+        async with pooled_client(timeout=40) as client:
             response = await client.post(
                 url,
                 headers={
@@ -3278,7 +3261,7 @@ async def generate_voice_vertex_ai(text: str, duration: float, temp_dir: str) ->
                                         "-y", output
                                     ]
                                     
-                                    if run_ffmpeg(cmd, 20):
+                                    if await run_ffmpeg(cmd, 20):
                                         force_cleanup(temp_raw)
                                         logger.info(f"   ✅ Vertex AI: {get_size_mb(output):.2f}MB")
                                         return output
@@ -3332,7 +3315,7 @@ async def generate_voice_edge(text: str, duration: float, temp_dir: str) -> Opti
                 "-y", output
             ]
             
-            if run_ffmpeg(cmd, 15):
+            if await run_ffmpeg(cmd, 15):
                 force_cleanup(temp)
                 logger.info(f"   ✅ Edge TTS: {get_size_mb(output):.2f}MB")
                 return output
@@ -3393,7 +3376,7 @@ async def search_pexels_images(query: str, count: int = 2) -> List[dict]:
         
         logger.info(f"   Searching Pexels: '{query}'")
         
-        async with httpx.AsyncClient(timeout=25) as client:
+        async with pooled_client(timeout=25) as client:
             resp = await client.get(
                 "https://api.pexels.com/v1/search",
                 headers={"Authorization": PEXELS_API_KEY},
@@ -3444,7 +3427,7 @@ async def search_pixabay_images(query: str, count: int = 2) -> List[dict]:
     try:
         logger.info(f"   Searching Pixabay: '{query}'")
         
-        async with httpx.AsyncClient(timeout=25) as client:
+        async with pooled_client(timeout=25) as client:
             resp = await client.get(
                 "https://pixabay.com/api/",
                 params={
@@ -3548,20 +3531,9 @@ async def download_image_with_retry(image_data: dict, output_path: str, max_retr
         try:
             logger.info(f"      Attempt {attempt}/{max_retries}...")
             
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.get(url, follow_redirects=True)
-                
-                if resp.status_code == 200:
-                    with open(output_path, 'wb') as f:
-                        f.write(resp.content)
-                    
-                    size = get_size_mb(output_path)
-                    
-                    if size > 0.1:  # At least 100KB
-                        return True
-                    else:
-                        force_cleanup(output_path)
-                        logger.warning(f"      Image too small: {size:.2f}MB")
+            # At least 100KB
+            if await get_media_cache().fetch(url, output_path, min_bytes=100 * 1024, timeout=30):
+                return True
             
             # Wait before retry
             if attempt < max_retries:
@@ -3603,7 +3575,7 @@ async def download_images(images: List[dict], temp_dir: str) -> List[str]:
 # ✅ ENHANCED IMAGE PROCESSING (Contrast + Saturation)
 # ============================================================================
 
-def create_slideshow_with_transitions_enhanced(images: List[str], temp_dir: str) -> Optional[str]:
+async def create_slideshow_with_transitions_enhanced(images: List[str], temp_dir: str) -> Optional[str]:
     """Create professional slideshow with ENHANCED image processing"""
     try:
         if len(images) < MIN_IMAGES:
@@ -3638,7 +3610,7 @@ def create_slideshow_with_transitions_enhanced(images: List[str], temp_dir: str)
                 "-y", resized
             ]
             
-            if not run_ffmpeg(cmd_resize, 15):
+            if not await run_ffmpeg(cmd_resize, 15):
                 logger.warning(f"   ⚠️ Failed to resize image {idx+1}")
                 continue
             
@@ -3674,7 +3646,7 @@ def create_slideshow_with_transitions_enhanced(images: List[str], temp_dir: str)
                 "-y", clip_output
             ]
             
-            if run_ffmpeg(cmd_clip, 45):  # Increased timeout
+            if await run_ffmpeg(cmd_clip, 45):  # Increased timeout
                 processed_images.append(clip_output)
                 logger.info(f"   ✅ Clip {idx+1} created")
             else:
@@ -3703,7 +3675,7 @@ def create_slideshow_with_transitions_enhanced(images: List[str], temp_dir: str)
             "-y", output
         ]
         
-        if run_ffmpeg(cmd_concat, 60):
+        if await run_ffmpeg(cmd_concat, 60):
             size = get_size_mb(output)
             logger.info(f"✅ Enhanced slideshow: {size:.1f}MB")
             
@@ -3720,32 +3692,194 @@ def create_slideshow_with_transitions_enhanced(images: List[str], temp_dir: str)
         logger.error(traceback.format_exc())
         return None
 
-def add_text_overlays_to_slideshow(video: str, segments: list, temp_dir: str) -> Optional[str]:
+def build_slideshow_text_filters(segments: list) -> List[str]:
+    """Build timed drawtext filters for slideshow segments"""
+    filters = []
+    current_time = 0
+
+    for seg in segments:
+        text = seg.get("text_overlay", "").replace("'", "").replace('"', '')[:30]
+        if text:
+            filters.append(
+                f"drawtext=text='{text}':"
+                f"fontsize=60:"
+                f"fontcolor=white:"
+                f"x=(w-text_w)/2:"
+                f"y=h-150:"
+                f"borderw=5:"
+                f"bordercolor=black:"
+                f"enable='between(t,{current_time},{current_time + seg['duration']})'"
+            )
+
+        current_time += seg["duration"]
+
+    return filters
+
+def build_single_pass_slideshow_cmd(
+    images: List[str],
+    segments: list,
+    voices: List[str],
+    music: Optional[str],
+    output: str,
+    show_captions: bool = True
+) -> list:
+    """
+    Build ONE ffmpeg command for the whole slideshow:
+    scale/crop/eq -> zoompan -> xfade chain -> drawtext -> voice concat + music amix
+    """
+    fps = SLIDESHOW_FPS
+    size = f"{IMAGE_TARGET_WIDTH}x{IMAGE_TARGET_HEIGHT}"
+
+    # Each clip is held XFADE_DURATION longer so the xfade overlap keeps
+    # every image on screen for IMAGE_DURATION seconds
+    clip_duration = IMAGE_DURATION + XFADE_DURATION
+    clip_frames = int(round(clip_duration * fps))
+
+    cmd = ["ffmpeg", "-y"]
+
+    for img in images:
+        cmd += ["-i", img]
+
+    voice_offset = len(images)
+    for voice in voices:
+        cmd += ["-i", voice]
+
+    music_index = None
+    if music and os.path.exists(music):
+        music_index = voice_offset + len(voices)
+        cmd += ["-i", music]
+
+    graph = []
+
+    # Per-image: Scale + Crop + Enhance (Contrast +20%, Saturation +15%) + motion
+    for idx in range(len(images)):
+        transition = random.choice(TRANSITIONS)
+
+        if "zoompan" in transition["filter"]:
+            motion = transition["filter"].replace("{duration}", str(clip_frames))
+        else:
+            motion = f"zoompan=z=1:d={clip_frames}:s={size}"
+
+        graph.append(
+            f"[{idx}:v]"
+            f"scale={IMAGE_TARGET_WIDTH}:{IMAGE_TARGET_HEIGHT}:force_original_aspect_ratio=increase,"
+            f"crop={IMAGE_TARGET_WIDTH}:{IMAGE_TARGET_HEIGHT},"
+            f"eq=contrast=1.2:saturation=1.15,"
+            f"{motion}:fps={fps},"
+            f"setsar=1,format=yuv420p[v{idx}]"
+        )
+
+    # Chain clips with xfade
+    last = "v0"
+    for idx in range(1, len(images)):
+        out_label = f"x{idx}"
+        transition = random.choice(XFADE_TRANSITIONS)
+        offset = idx * IMAGE_DURATION
+        graph.append(
+            f"[{last}][v{idx}]xfade=transition={transition}:"
+            f"duration={XFADE_DURATION}:offset={offset:.3f}[{out_label}]"
+        )
+        last = out_label
+
+    # Text overlays on the same pass
+    text_filters = build_slideshow_text_filters(segments) if show_captions else []
+    if text_filters:
+        graph.append(f"[{last}]" + ",".join(text_filters) + "[vout]")
+    else:
+        graph.append(f"[{last}]null[vout]")
+
+    # Voices: normalise formats so the concat filter accepts them
+    voice_labels = []
+    for idx in range(len(voices)):
+        graph.append(
+            f"[{voice_offset + idx}:a]aresample=44100,"
+            f"aformat=sample_fmts=fltp:channel_layouts=stereo[a{idx}]"
+        )
+        voice_labels.append(f"[a{idx}]")
+
+    graph.append(f"{''.join(voice_labels)}concat=n={len(voices)}:v=0:a=1[voice]")
+
+    if music_index is not None:
+        graph.append(
+            f"[{music_index}:a]aresample=44100,"
+            f"aformat=sample_fmts=fltp:channel_layouts=stereo,"
+            f"volume=0.25,afade=t=in:d=1,afade=t=out:st=28:d=2[music]"
+        )
+        graph.append("[voice][music]amix=inputs=2:duration=first[aout]")
+        audio_bitrate = "128k"
+    else:
+        graph.append("[voice]anull[aout]")
+        audio_bitrate = "96k"
+
+    cmd += [
+        "-filter_complex", ";".join(graph),
+        "-map", "[vout]",
+        "-map", "[aout]",
+        "-r", str(fps),
+        "-c:v", "libx264",
+        "-crf", "20",
+        "-preset", "medium",
+        "-pix_fmt", "yuv420p",
+        "-c:a", "aac",
+        "-b:a", audio_bitrate,
+        "-movflags", "+faststart",
+        "-shortest",
+        output
+    ]
+
+    return cmd
+
+async def render_slideshow_single_pass(
+    images: List[str],
+    segments: list,
+    voices: List[str],
+    music: Optional[str],
+    temp_dir: str,
+    show_captions: bool = True
+) -> Optional[str]:
+    """✅ Render slideshow + captions + audio with a single ffmpeg encode"""
+    try:
+        if len(images) < MIN_IMAGES:
+            logger.error(f"Not enough images: {len(images)} < {MIN_IMAGES}")
+            return None
+
+        if not voices:
+            logger.error("No voices for single-pass render")
+            return None
+
+        output = os.path.join(temp_dir, "final.mp4")
+
+        logger.info("🎬 Rendering slideshow (SINGLE PASS)...")
+        logger.info(f"   Images: {len(images)} | Voices: {len(voices)} | Music: {bool(music)}")
+
+        cmd = build_single_pass_slideshow_cmd(
+            images, segments, voices, music, output, show_captions
+        )
+
+        if await run_ffmpeg(cmd, SINGLE_PASS_TIMEOUT):
+            size = get_size_mb(output)
+            if size > 0:
+                logger.info(f"✅ Single-pass slideshow: {size:.1f}MB")
+                return output
+
+        logger.warning("⚠️ Single-pass render failed")
+        force_cleanup(output)
+        return None
+
+    except Exception as e:
+        logger.error(f"Single-pass render error: {e}")
+        logger.error(traceback.format_exc())
+        return None
+
+async def add_text_overlays_to_slideshow(video: str, segments: list, temp_dir: str) -> Optional[str]:
     """Add text overlays to slideshow"""
     try:
         output = os.path.join(temp_dir, "slideshow_with_text.mp4")
         
         logger.info("📝 Adding text overlays...")
-        
-        filters = []
-        current_time = 0
-        
-        for idx, seg in enumerate(segments):
-            text = seg.get("text_overlay", "").replace("'", "").replace('"', '')[:30]
-            if text:
-                filters.append(
-                    f"drawtext=text='{text}':"
-                    f"fontsize=60:"
-                    f"fontcolor=white:"
-                    f"x=(w-text_w)/2:"
-                    f"y=h-150:"
-                    f"borderw=5:"
-                    f"bordercolor=black:"
-                    f"enable='between(t,{current_time},{current_time + seg['duration']})'"
-                )
-            
-            current_time += seg["duration"]
-        
+
+        filters = build_slideshow_text_filters(segments)
+
         if not filters:
             return video
         
@@ -3761,7 +3895,7 @@ def add_text_overlays_to_slideshow(video: str, segments: list, temp_dir: str) ->
             "-y", output
         ]
         
-        if run_ffmpeg(cmd, 120):  # Increased timeout
+        if await run_ffmpeg(cmd, 120):  # Increased timeout
             force_cleanup(video)
             logger.info(f"✅ Text added: {get_size_mb(output):.1f}MB")
             return output
@@ -3799,7 +3933,7 @@ async def search_pexels_videos_broad(query: str, count: int = 2) -> List[dict]:
         
         logger.info(f"   Searching Pexels videos: '{query}' (ANY format)")
         
-        async with httpx.AsyncClient(timeout=25) as client:
+        async with pooled_client(timeout=25) as client:
             resp = await client.get(
                 "https://api.pexels.com/videos/search",
                 headers={"Authorization": PEXELS_API_KEY},
@@ -3835,7 +3969,7 @@ async def search_pixabay_videos_broad(query: str, count: int = 2) -> List[dict]:
     try:
         logger.info(f"   Searching Pixabay videos: '{query}' (ANY format)")
         
-        async with httpx.AsyncClient(timeout=25) as client:
+        async with pooled_client(timeout=25) as client:
             resp = await client.get(
                 "https://pixabay.com/api/videos/",
                 params={
@@ -3913,7 +4047,7 @@ async def download_pexels_video(vdata: dict, output: str) -> bool:
         
         logger.info(f"   📥 Downloading Pexels video...")
         
-        async with httpx.AsyncClient(timeout=100) as client:
+        async with pooled_client(timeout=100) as client:
             async with client.stream('GET', url) as resp:
                 if resp.status_code != 200:
                     return False
@@ -3959,7 +4093,7 @@ async def download_pixabay_video(vdata: dict, output: str) -> bool:
         
         logger.info(f"   📥 Downloading Pixabay video...")
         
-        async with httpx.AsyncClient(timeout=100) as client:
+        async with pooled_client(timeout=100) as client:
             async with client.stream('GET', url) as resp:
                 if resp.status_code != 200:
                     return False
@@ -4000,7 +4134,7 @@ async def download_video(video_result: dict, output: str) -> bool:
     
     return False
 
-def process_video_fast(source: str, temp_dir: str) -> Optional[str]:
+async def process_video_fast(source: str, temp_dir: str) -> Optional[str]:
     """Process video to 9:16 format for Shorts"""
     try:
         output = os.path.join(temp_dir, "processed.mp4")
@@ -4021,7 +4155,7 @@ def process_video_fast(source: str, temp_dir: str) -> Optional[str]:
             "-y", output
         ]
         
-        if run_ffmpeg(cmd, 120):
+        if await run_ffmpeg(cmd, 120):
             size = get_size_mb(output)
             logger.info(f"✅ Video processed: {size:.1f}MB")
             return output
@@ -4032,7 +4166,7 @@ def process_video_fast(source: str, temp_dir: str) -> Optional[str]:
         logger.error(f"Processing error: {e}")
         return None
 
-def add_text_overlays(video: str, segments: list, temp_dir: str) -> Optional[str]:
+async def add_text_overlays(video: str, segments: list, temp_dir: str) -> Optional[str]:
     """Add text overlays to video"""
     try:
         output = os.path.join(temp_dir, "with_text.mp4")
@@ -4073,7 +4207,7 @@ def add_text_overlays(video: str, segments: list, temp_dir: str) -> Optional[str
             "-y", output
         ]
         
-        if run_ffmpeg(cmd, 90):
+        if await run_ffmpeg(cmd, 90):
             force_cleanup(video)
             logger.info(f"✅ Text added: {get_size_mb(output):.1f}MB")
             return output
@@ -4109,7 +4243,7 @@ async def mix_audio_with_music(video: str, voices: List[str], music: Optional[st
             "-y", voice_combined
         ]
         
-        if not run_ffmpeg(cmd, 30):
+        if not await run_ffmpeg(cmd, 30):
             return None
         
         logger.info(f"   ✅ Voices: {get_size_mb(voice_combined):.2f}MB")
@@ -4153,7 +4287,7 @@ async def mix_audio_with_music(video: str, voices: List[str], music: Optional[st
                 "-y", final
             ]
         
-        if run_ffmpeg(cmd, 60):
+        if await run_ffmpeg(cmd, 60):
             size = get_size_mb(final)
             logger.info(f"✅ Final: {size:.1f}MB")
             return final
@@ -4241,6 +4375,162 @@ async def upload_to_youtube(video_path: str, title: str, description: str, tags:
 # MAIN GENERATION PIPELINE
 # ============================================================================
 
+# ============================================================================
+# PIPELINE (checkpointed stages - a retry resumes from the last good stage)
+# ============================================================================
+
+async def script_stage(niche: str) -> dict:
+    logger.info("📝 STEP 1: Script...")
+    script = await generate_script(niche)
+    logger.info(f"✅ Title: {script['title']}")
+    return script
+
+async def music_stage(workdir: str) -> Optional[str]:
+    logger.info("🎵 STEP 2: Music...")
+    return await download_background_music(workdir)
+
+async def visuals_stage(niche: str, workdir: str) -> dict:
+    """Stock video (top 2, any format), falling back to a diverse image slideshow"""
+    logger.info("🎥 STEP 3: Searching videos (top 2, any format)...")
+    video_results = await search_videos_broad(niche, count=2)
+    
+    if len(video_results) > 0:
+        logger.info(f"   ✅ Found {len(video_results)} videos, using first one")
+        
+        for vid_result in video_results:
+            source_video = os.path.join(workdir, "source.mp4")
+            
+            if await download_video(vid_result, source_video):
+                logger.info("⚙️ STEP 4: Processing video...")
+                processed_video = await process_video_fast(source_video, workdir)
+                force_cleanup(source_video)
+                gc.collect()
+                
+                if processed_video:
+                    return {"processed_video": processed_video, "image_files": [], "content_type": "video"}
+    
+    # STEP 4: FALLBACK to DIVERSE IMAGES
+    logger.info("📸 STEP 4: Creating DIVERSE IMAGE SLIDESHOW...")
+    
+    images_data = await search_images_diverse(niche, MAX_IMAGES)
+    
+    if len(images_data) < MIN_IMAGES:
+        raise PipelineError(f"Not enough images: {len(images_data)} < {MIN_IMAGES}")
+    
+    image_files = await download_images(images_data, workdir)
+    
+    if len(image_files) < MIN_IMAGES:
+        raise PipelineError(f"Download failed: {len(image_files)} < {MIN_IMAGES}")
+    
+    # Single-pass mode renders after voices are ready (mix stage)
+    if SLIDESHOW_RENDER_MODE == "single_pass":
+        return {"processed_video": None, "image_files": image_files, "content_type": "slideshow"}
+    
+    processed_video = await create_slideshow_with_transitions_enhanced(image_files, workdir)
+    
+    if not processed_video:
+        raise PipelineError("Slideshow failed")
+    
+    for img in image_files:
+        force_cleanup(img)
+    gc.collect()
+    
+    return {"processed_video": processed_video, "image_files": [], "content_type": "slideshow"}
+
+async def text_stage(processed_video: Optional[str], script: dict, content_type: str,
+                     show_captions: bool, workdir: str) -> Optional[str]:
+    if not (show_captions and processed_video):
+        return processed_video
+    
+    logger.info("📝 STEP 5: Text...")
+    if content_type == "slideshow":
+        return await add_text_overlays_to_slideshow(processed_video, script["segments"], workdir)
+    return await add_text_overlays(processed_video, script["segments"], workdir)
+
+async def voices_stage(script: dict, workdir: str) -> List[str]:
+    """ElevenLabs → Vertex AI → Edge TTS, one voice per segment"""
+    logger.info("🎤 STEP 6: Voiceovers (ElevenLabs Priority)...")
+    voices = []
+    
+    for idx, seg in enumerate(script["segments"]):
+        logger.info(f"   Voice {idx+1}/4...")
+        
+        voice = await generate_voice(seg["narration"], seg["duration"], workdir)
+        
+        if voice:
+            voices.append(voice)
+            logger.info(f"   ✅ Voice {idx+1}")
+    
+    if len(voices) < 3:
+        raise PipelineError(f"Voice failed ({len(voices)}/4)")
+    return voices
+
+async def mix_stage(image_files: List[str], captioned_video: Optional[str], script: dict, voices: List[str],
+                    music: Optional[str], show_captions: bool, workdir: str) -> Optional[str]:
+    """STEP 7: Mix audio (single-pass slideshow renders video + text + audio in one encode)"""
+    processed_video = captioned_video
+    final_video = None
+    
+    if image_files and not processed_video:
+        logger.info("🎬 STEP 7: Single-pass render...")
+        final_video = await render_slideshow_single_pass(
+            image_files, script["segments"], voices, music, workdir, show_captions
+        )
+        
+        if not final_video:
+            logger.warning("⚠️ Falling back to multi-pass slideshow")
+            processed_video = await create_slideshow_with_transitions_enhanced(image_files, workdir)
+            
+            if not processed_video:
+                raise PipelineError("Slideshow failed")
+            
+            if show_captions:
+                processed_video = await add_text_overlays_to_slideshow(processed_video, script["segments"], workdir)
+        
+        for img in image_files:
+            force_cleanup(img)
+        gc.collect()
+    
+    if not final_video:
+        if not processed_video:
+            raise PipelineError("Content creation failed")
+        logger.info("🎬 STEP 7: Mixing...")
+        final_video = await mix_audio_with_music(processed_video, voices, music, workdir)
+    
+    if final_video:
+        logger.info(f"✅ Final: {get_size_mb(final_video):.1f}MB")
+    return final_video
+
+async def upload_stage(final_video: str, script: dict, user_id: str, database_manager) -> dict:
+    logger.info("📤 STEP 8: Uploading...")
+    upload_result = await upload_to_youtube(
+        final_video,
+        script["title"],
+        script["description"],
+        script["tags"],
+        user_id,
+        database_manager
+    )
+    if not upload_result.get("success"):
+        raise PipelineError(upload_result.get("error") or "Upload failed")
+    return upload_result
+
+VIRAL_PIXEL_PIPELINE = Pipeline("viral_pixel", [
+    Stage("script", script_stage, inputs=("niche",), outputs=("script",)),
+    Stage("music", music_stage, inputs=("workdir",), outputs=("music",), files=("music",), optional=("music",)),
+    Stage("visuals", visuals_stage, inputs=("niche", "workdir"),
+          outputs=("processed_video", "image_files", "content_type"), files=("processed_video", "image_files"),
+          optional=("processed_video", "image_files")),
+    Stage("text", text_stage, inputs=("processed_video", "script", "content_type", "show_captions", "workdir"),
+          outputs=("captioned_video",), files=("captioned_video",), optional=("captioned_video",)),
+    Stage("voices", voices_stage, inputs=("script", "workdir"), outputs=("voices",), files=("voices",)),
+    Stage("mix", mix_stage,
+          inputs=("image_files", "captioned_video", "script", "voices", "music", "show_captions", "workdir"),
+          outputs=("final_video",), files=("final_video",), error="Audio mix failed"),
+    Stage("upload", upload_stage, inputs=("final_video", "script", "user_id", "database_manager"),
+          outputs=("upload",)),
+])
+
 async def generate_viral_video(
     niche: str,
     duration: int,
@@ -4249,138 +4539,33 @@ async def generate_viral_video(
     show_captions: bool,
     voice_gender: str,
     user_id: str,
-    database_manager
+    database_manager,
+    job_key: Optional[str] = None
 ) -> dict:
-    """✅ COMPLETE FIXED: Video generation with all improvements"""
-    
-    temp_dir = None
+    """
+    ✅ COMPLETE FIXED: Video generation with all improvements
+    Pass job_key (the job / idempotency key) to let a retry of the same job resume it.
+    """
     
+    key = job_key or f"generate:{user_id}:{uuid.uuid4().hex}"
     try:
-        temp_dir = tempfile.mkdtemp(prefix="viral_pixel_")
         logger.info(f"🎬 STARTING: {niche}")
         logger.info("   ✅ ElevenLabs Priority Voice")
         logger.info("   ✅ Diverse Images (2 per category)")
         logger.info("   ✅ Broader Video Search (top 2)")
         logger.info("   ✅ Enhanced Processing")
         
-        # STEP 1: Generate Script
-        logger.info("📝 STEP 1: Script...")
-        script = await generate_script(niche)
-        logger.info(f"✅ Title: {script['title']}")
-        
-        # STEP 2: Music
-        logger.info("🎵 STEP 2: Music...")
-        music = await download_background_music(temp_dir)
-        
-        # STEP 3: Try VIDEOS (top 2, any format)
-        logger.info("🎥 STEP 3: Searching videos (top 2, any format)...")
-        video_results = await search_videos_broad(niche, count=2)
-        
-        processed_video = None
-        content_type = None
-        
-        if len(video_results) > 0:
-            logger.info(f"   ✅ Found {len(video_results)} videos, using first one")
-            
-            for vid_result in video_results:
-                source_video = os.path.join(temp_dir, "source.mp4")
-                
-                if await download_video(vid_result, source_video):
-                    logger.info("⚙️ STEP 4: Processing video...")
-                    processed_video = process_video_fast(source_video, temp_dir)
-                    force_cleanup(source_video)
-                    gc.collect()
-                    
-                    if processed_video:
-                        content_type = "video"
-                        break
-        
-        # STEP 4: FALLBACK to DIVERSE IMAGES
-        if not processed_video:
-            logger.info("📸 STEP 4: Creating DIVERSE IMAGE SLIDESHOW...")
-            content_type = "slideshow"
-            
-            images_data = await search_images_diverse(niche, MAX_IMAGES)
-            
-            if len(images_data) < MIN_IMAGES:
-                return {
-                    "success": False,
-                    "error": f"Not enough images: {len(images_data)} < {MIN_IMAGES}"
-                }
-            
-            image_files = await download_images(images_data, temp_dir)
-            
-            if len(image_files) < MIN_IMAGES:
-                return {
-                    "success": False,
-                    "error": f"Download failed: {len(image_files)} < {MIN_IMAGES}"
-                }
-            
-            processed_video = create_slideshow_with_transitions_enhanced(image_files, temp_dir)
-            
-            if not processed_video:
-                return {"success": False, "error": "Slideshow failed"}
-            
-            for img in image_files:
-                force_cleanup(img)
-            gc.collect()
-        
-        if not processed_video:
-            return {"success": False, "error": "Content creation failed"}
-        
-        # STEP 5: Text Overlays
-        if show_captions:
-            logger.info("📝 STEP 5: Text...")
-            if content_type == "slideshow":
-                processed_video = add_text_overlays_to_slideshow(processed_video, script["segments"], temp_dir)
-            else:
-                processed_video = add_text_overlays(processed_video, script["segments"], temp_dir)
-        
-        # STEP 6: Voices (ElevenLabs → Vertex AI → Edge TTS)
-        logger.info("🎤 STEP 6: Voiceovers (ElevenLabs Priority)...")
-        voices = []
-        
-        for idx, seg in enumerate(script["segments"]):
-            logger.info(f"   Voice {idx+1}/4...")
-            
-            voice = await generate_voice(seg["narration"], seg["duration"], temp_dir)
-            
-            if voice:
-                voices.append(voice)
-                logger.info(f"   ✅ Voice {idx+1}")
-        
-        if len(voices) < 3:
-            return {"success": False, "error": f"Voice failed ({len(voices)}/4)"}
+        params = {"niche": niche, "duration": duration, "language": language, "channel_name": channel_name,
+                  "show_captions": show_captions, "voice_gender": voice_gender, "user_id": user_id}
         
-        # STEP 7: Mix Audio
-        logger.info("🎬 STEP 7: Mixing...")
-        final_video = await mix_audio_with_music(processed_video, voices, music, temp_dir)
-        
-        if not final_video:
-            return {"success": False, "error": "Audio mix failed"}
-        
-        final_size = get_size_mb(final_video)
-        logger.info(f"✅ Final: {final_size:.1f}MB")
-        
-        # STEP 8: Upload
-        logger.info("📤 STEP 8: Uploading...")
-        upload_result = await upload_to_youtube(
-            final_video,
-            script["title"],
-            script["description"],
-            script["tags"],
-            user_id,
-            database_manager
-        )
-        
-        # Cleanup
-        if temp_dir:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        run = await VIRAL_PIXEL_PIPELINE.run(key, ["upload"], params, {"database_manager": database_manager})
+        values = run.values
+        final_size = get_size_mb(values["final_video"])
+        run.discard()
         gc.collect()
         
-        if not upload_result.get("success"):
-            return upload_result
-        
+        upload_result = values["upload"]
+        script = values["script"]
         logger.info("🎉 COMPLETE!")
         
         return {
@@ -4390,18 +4575,19 @@ async def generate_viral_video(
             "title": script["title"],
             "description": script["description"],
             "size_mb": f"{final_size:.1f}MB",
-            "content_type": content_type,
-            "has_music": music is not None,
-            "voice_segments": len(voices),
+            "content_type": values["content_type"],
+            "has_music": values["music"] is not None,
+            "voice_segments": len(values["voices"]),
             "enhancements": "ElevenLabs + Bass + Contrast + Saturation + Diverse Images"
         }
         
     except Exception as e:
         logger.error(f"❌ FAILED: {e}")
-        logger.error(traceback.format_exc())
-        
-        if temp_dir:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        if not isinstance(e, PipelineError):
+            logger.error(traceback.format_exc())
+        if not job_key:
+            # Nobody can resume a one-off run
+            VIRAL_PIXEL_PIPELINE.discard(key)
         gc.collect()
         
         return {"success": False, "error": str(e)}
@@ -4452,21 +4638,28 @@ async def generate_endpoint(request: Request):
         from Supermain import database_manager
         
         logger.info(f"📨 Request: {niche} for user {user_id}")
+        # Only a client retry of the same request (same idempotency_key) resumes its pipeline workspace
+        idempotency_key = data.get("idempotency_key")
+        job_key = f"viral_pixel:{user_id}:{idempotency_key}" if idempotency_key else None
         
         try:
-            result = await asyncio.wait_for(
-                generate_viral_video(
-                    niche=niche,
-                    duration=30,
-                    language=data.get("language", "hindi"),
-                    channel_name=data.get("channel_name", ""),
-                    show_captions=data.get("show_captions", True),
-                    voice_gender=data.get("voice_gender", "male"),
-                    user_id=user_id,
-                    database_manager=database_manager
-                ),
-                timeout=900  # 15 minutes
-            )
+            # Manual requests jump ahead of scheduled renders in the ffmpeg pool
+            with ffmpeg_job(user_id, PRIORITY_INTERACTIVE):
+                result = await asyncio.wait_for(
+                    render(
+                        "viral_pixel",
+                        user_id,
+                        database_manager,
+                        niche=niche,
+                        duration=30,
+                        language=data.get("language", "hindi"),
+                        channel_name=data.get("channel_name", ""),
+                        show_captions=data.get("show_captions", True),
+                        voice_gender=data.get("voice_gender", "male"),
+                        job_key=job_key
+                    ),
+                    timeout=900  # 15 minutes
+                )
             
             return JSONResponse(content=result)
             
@@ -11,10 +11,13 @@ import subprocess
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from PIL import Image, ImageDraw, ImageFont
-import httpx
 import base64
 from io import BytesIO
 
+from ffmpeg_pool import get_ffmpeg_pool, run_process_async, PRIORITY_BACKGROUND
+from http_clients import pooled_client
+from llm_gateway import llm_client
+
 logger = logging.getLogger(__name__)
 
 class YouTubeAIService:
@@ -132,7 +135,7 @@ class YouTubeAIService:
             temp_video = await self._download_video(video_url)
             
             # Get video duration
-            duration = self._get_video_duration_ffmpeg(temp_video)
+            duration = await self._get_video_duration_ffmpeg(temp_video)
             
             # Calculate timestamps (20%, 50%, 80%)
             timestamps = [duration * 0.2, duration * 0.5, duration * 0.8]
@@ -158,7 +161,9 @@ class YouTubeAIService:
                     output_path
                 ]
                 
-                subprocess.run(cmd, capture_output=True, check=True, timeout=30)
+                result = await get_ffmpeg_pool().run(cmd, 30, priority=PRIORITY_BACKGROUND)
+                if not result.success:
+                    raise RuntimeError(f"FFmpeg frame {i} failed: {result.stderr[-300:]}")
                 
                 # Load frame
                 frame = Image.open(output_path)
@@ -176,7 +181,7 @@ class YouTubeAIService:
             logger.error(f"FFmpeg frame extraction failed: {e}")
             raise
     
-    def _get_video_duration_ffmpeg(self, video_path: str) -> float:
+    async def _get_video_duration_ffmpeg(self, video_path: str) -> float:
         """Get video duration using FFprobe"""
         try:
             cmd = [
@@ -186,7 +191,7 @@ class YouTubeAIService:
                 '-of', 'default=noprint_wrappers=1:nokey=1',
                 video_path
             ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            result = await run_process_async(cmd, 10)
             return float(result.stdout.strip())
         except:
             return 30.0  # Default 30 seconds
@@ -195,7 +200,7 @@ class YouTubeAIService:
         """Manual frame extraction fallback (downloads video, extracts via PIL)"""
         try:
             # For videos under 10MB, download and process
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with pooled_client(timeout=30) as client:
                 response = await client.head(video_url)
                 content_length = int(response.headers.get('content-length', 0))
                 
@@ -234,7 +239,7 @@ class YouTubeAIService:
     async def _download_video(self, video_url: str) -> str:
         """Download video to temp file"""
         try:
-            async with httpx.AsyncClient(timeout=60, follow_redirects=True) as client:
+            async with pooled_client(timeout=60, follow_redirects=True) as client:
                 response = await client.get(video_url)
                 
                 if response.status_code == 200:
@@ -296,7 +301,7 @@ Requirements:
 
 Return ONLY 3 texts, one per line, no numbering."""
 
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with llm_client(timeout=30) as client:
                 response = await client.post(
                     "https://api.mistral.ai/v1/chat/completions",
                     headers={
@@ -336,7 +341,7 @@ Requirements:
 
 Return ONLY 3 texts, one per line."""
 
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with llm_client(timeout=30) as client:
                 response = await client.post(
                     "https://api.groq.com/openai/v1/chat/completions",
                     headers={
@@ -15,6 +15,8 @@ import pymongo
 from bson import ObjectId
 from pymongo.errors import DuplicateKeyError, ConnectionFailure
 
+from youtube_client import get_youtube_service_cache
+
 logger = logging.getLogger(__name__)
 
 class YouTubeDatabaseManager:
@@ -38,6 +40,12 @@ class YouTubeDatabaseManager:
         self.comment_replies_collection = None
         self.auto_reply_logs_collection = None
         self.scrape_urls = None
+        self.scraped_products = None
+        self.channel_videos = None
+        self.channel_sync_state = None
+        self.youtube_comments = None
+        self.comment_watermarks = None
+        self.automation_jobs = None
         
         logger.info("YouTube Database Manager initialized")
     
@@ -59,6 +67,12 @@ class YouTubeDatabaseManager:
             self.comment_replies_collection = self.db["comment_replies"]
             self.auto_reply_logs_collection = self.db["auto_reply_logs"]
             self.scrape_urls = self.db["scrape_urls"]
+            self.scraped_products = self.db["scraped_products"]
+            self.channel_videos = self.db["channel_videos"]
+            self.channel_sync_state = self.db["channel_sync_state"]
+            self.youtube_comments = self.db["youtube_comments"]
+            self.comment_watermarks = self.db["comment_watermarks"]
+            self.automation_jobs = self.db["automation_jobs"]
             
             # Test connection
             await self.client.admin.command('ping')
@@ -120,6 +134,33 @@ class YouTubeDatabaseManager:
             await self.auto_reply_logs_collection.create_index("processed_at")
             await self.auto_reply_logs_collection.create_index([("user_id", 1), ("processed_at", -1)])
             
+            # Crawled product seen-set indexes (unique per user and crawl source)
+            try:
+                await self.scraped_products.drop_index("user_id_1_product_id_1")
+            except Exception:
+                pass  # already replaced by the per-source index
+            await self.scraped_products.create_index(
+                [("user_id", 1), ("source_url", 1), ("product_id", 1)], unique=True
+            )
+            await self.scraped_products.create_index([("user_id", 1), ("processed", 1), ("discovered_at", 1)])
+            
+            # Channel video mirror indexes
+            await self.channel_videos.create_index([("user_id", 1), ("video_id", 1)], unique=True)
+            await self.channel_videos.create_index([("user_id", 1), ("published_at", -1)])
+            await self.channel_videos.create_index([("user_id", 1), ("stats_updated_at", 1)])
+            await self.channel_sync_state.create_index("user_id", unique=True)
+            
+            # Comment ingestion indexes
+            await self.youtube_comments.create_index([("user_id", 1), ("comment_id", 1)], unique=True)
+            await self.youtube_comments.create_index([("user_id", 1), ("video_id", 1), ("reply_status", 1), ("published_at", -1)])
+            await self.comment_watermarks.create_index([("user_id", 1), ("video_id", 1)], unique=True)
+            
+            # Automation job queue indexes (finished jobs expire after a week)
+            await self.automation_jobs.create_index("idempotency_key", unique=True)
+            await self.automation_jobs.create_index([("status", 1), ("job_type", 1), ("priority", -1), ("run_at", 1)])
+            await self.automation_jobs.create_index([("status", 1), ("lease_expires_at", 1)])
+            await self.automation_jobs.create_index("finished_at", expireAfterSeconds=7 * 24 * 3600)
+            
             logger.info("YouTube database indexes created")
             
         except Exception as e:
@@ -216,6 +257,7 @@ class YouTubeDatabaseManager:
                 credential_data,
                 upsert=True
             )
+            get_youtube_service_cache().invalidate(user_id)
             
             await self.update_user(user_id, {
                 "youtube_connected": True,
@@ -262,6 +304,7 @@ class YouTubeDatabaseManager:
         """Revoke YouTube access for user"""
         try:
             await self.youtube_credentials_collection.delete_one({"user_id": user_id})
+            get_youtube_service_cache().invalidate(user_id)
             await self.update_user(user_id, {
                 "youtube_connected": False,
                 "automation_enabled": False,
@@ -271,6 +314,10 @@ class YouTubeDatabaseManager:
                 "user_id": user_id,
                 "platform": "youtube"
             })
+            await self.channel_videos.delete_many({"user_id": user_id})
+            await self.channel_sync_state.delete_one({"user_id": user_id})
+            await self.youtube_comments.delete_many({"user_id": user_id})
+            await self.comment_watermarks.delete_many({"user_id": user_id})
             
             logger.info(f"YouTube access revoked for user {user_id}")
             return True
@@ -510,6 +557,108 @@ class YouTubeDatabaseManager:
             logger.error(f"Check comment replied failed: {e}")
             return False
 
+    async def get_replied_comment_ids(self, user_id: str, comment_ids: List[str]) -> set:
+        """Subset of comment_ids we have already replied to (one $in query)"""
+        if not comment_ids:
+            return set()
+        try:
+            docs = await self.comment_replies_collection.find(
+                {"user_id": user_id, "comment_id": {"$in": comment_ids}},
+                {"comment_id": 1}
+            ).to_list(length=None)
+            return {doc["comment_id"] for doc in docs}
+        except Exception as e:
+            logger.error(f"Get replied comment ids failed: {e}")
+            return set()
+
+    # ============================================================================
+    # COMMENT INGESTION
+    # ============================================================================
+
+    async def get_comment_watermark(self, user_id: str, video_id: str) -> Optional[Dict[str, Any]]:
+        """Newest ingested comment timestamp for a video"""
+        try:
+            return await self.comment_watermarks.find_one({"user_id": user_id, "video_id": video_id})
+        except Exception as e:
+            logger.error(f"Get comment watermark failed: {e}")
+            return None
+
+    async def set_comment_watermark(self, user_id: str, video_id: str, last_published_at: str) -> bool:
+        """Advance a video's ingestion watermark"""
+        try:
+            await self.comment_watermarks.update_one(
+                {"user_id": user_id, "video_id": video_id},
+                {"$set": {"last_published_at": last_published_at, "updated_at": datetime.now()}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Set comment watermark failed: {e}")
+            return False
+
+    async def upsert_comments(self, user_id: str, comments: List[Dict[str, Any]]) -> int:
+        """Bulk-insert ingested comments (existing ones keep their reply status); returns how many were new"""
+        if not comments:
+            return 0
+        try:
+            now = datetime.now()
+            operations = [
+                pymongo.UpdateOne(
+                    {"user_id": user_id, "comment_id": comment["comment_id"]},
+                    {
+                        "$set": {**comment, "user_id": user_id},
+                        "$setOnInsert": {"reply_status": "pending", "reply_attempts": 0, "ingested_at": now}
+                    },
+                    upsert=True
+                )
+                for comment in comments
+            ]
+            result = await self.youtube_comments.bulk_write(operations, ordered=False)
+            return result.upserted_count
+        except Exception as e:
+            logger.error(f"Upsert comments failed: {e}")
+            return 0
+
+    async def get_pending_comments(self, user_id: str, video_id: str, since: str, max_attempts: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """Unanswered comments on a video published after `since` (ISO-8601), newest first"""
+        try:
+            return await self.youtube_comments.find({
+                "user_id": user_id,
+                "video_id": video_id,
+                "reply_status": "pending",
+                "published_at": {"$gte": since},
+                "reply_attempts": {"$lt": max_attempts}
+            }).sort("published_at", -1).limit(limit).to_list(length=limit)
+        except Exception as e:
+            logger.error(f"Get pending comments failed: {e}")
+            return []
+
+    async def mark_comments(self, user_id: str, comment_ids: List[str], reply_status: str) -> bool:
+        """Set reply_status (replied / skipped) on ingested comments"""
+        if not comment_ids:
+            return True
+        try:
+            await self.youtube_comments.update_many(
+                {"user_id": user_id, "comment_id": {"$in": comment_ids}},
+                {"$set": {"reply_status": reply_status, "status_updated_at": datetime.now()}}
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Mark comments failed: {e}")
+            return False
+
+    async def record_comment_reply_failure(self, user_id: str, comment_id: str) -> bool:
+        """Count a failed reply attempt so a permanently failing comment is eventually dropped"""
+        try:
+            await self.youtube_comments.update_one(
+                {"user_id": user_id, "comment_id": comment_id},
+                {"$inc": {"reply_attempts": 1}}
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Record comment reply failure failed: {e}")
+            return False
+
     # ============================================================================
     # CONTENT LOGGING
     # ============================================================================
@@ -1217,6 +1366,304 @@ class YouTubeDatabaseManager:
             logger.error(f"❌ Get next product failed: {e}")
             return None
 
+    # ============================================================================
+    # CRAWLED PRODUCT SEEN-SET
+    # ============================================================================
+
+    async def add_scraped_products(self, user_id: str, products: List[Dict[str, Any]], source_url: str = None) -> int:
+        """Insert crawled products not seen before for this user and source; returns how many were new"""
+        if not products:
+            return 0
+        try:
+            now = datetime.now()
+            operations = [
+                pymongo.UpdateOne(
+                    {"user_id": user_id, "source_url": source_url, "product_id": product["product_id"]},
+                    {
+                        "$setOnInsert": {
+                            "user_id": user_id,
+                            "product_id": product["product_id"],
+                            "url": product.get("url"),
+                            "title": product.get("title"),
+                            "image": product.get("image"),
+                            "price": product.get("price"),
+                            "source_url": source_url,
+                            "processed": False,
+                            "discovered_at": now
+                        },
+                        "$set": {"last_seen": now}
+                    },
+                    upsert=True
+                )
+                for product in products if product.get("product_id")
+            ]
+            result = await self.scraped_products.bulk_write(operations, ordered=False)
+            return result.upserted_count
+        except Exception as e:
+            logger.error(f"❌ Add scraped products failed: {e}")
+            return 0
+
+    async def get_next_scraped_product(self, user_id: str, source_url: str = None) -> Optional[Dict[str, Any]]:
+        """Oldest crawled product not yet turned into a video (optionally from one crawl source)"""
+        try:
+            query = {"user_id": user_id, "processed": False}
+            if source_url:
+                query["source_url"] = source_url
+            return await self.scraped_products.find_one(query, sort=[("discovered_at", 1)])
+        except Exception as e:
+            logger.error(f"❌ Get next scraped product failed: {e}")
+            return None
+
+    async def mark_scraped_product_processed(self, user_id: str, product_id: str, source_url: str = None) -> bool:
+        """Mark a crawled product as used (in one crawl source when given)"""
+        try:
+            query = {"user_id": user_id, "product_id": product_id}
+            if source_url:
+                query["source_url"] = source_url
+            await self.scraped_products.update_many(
+                query,
+                {"$set": {"processed": True, "processed_at": datetime.now()}}
+            )
+            return True
+        except Exception as e:
+            logger.error(f"❌ Mark scraped product failed: {e}")
+            return False
+
+    async def count_scraped_products(self, user_id: str, source_url: str = None) -> Dict[str, int]:
+        """Total and unprocessed crawled products for user"""
+        try:
+            query = {"user_id": user_id}
+            if source_url:
+                query["source_url"] = source_url
+            total = await self.scraped_products.count_documents(query)
+            unprocessed = await self.scraped_products.count_documents({**query, "processed": False})
+            return {"total": total, "unprocessed": unprocessed}
+        except Exception as e:
+            logger.error(f"❌ Count scraped products failed: {e}")
+            return {"total": 0, "unprocessed": 0}
+
+    # ============================================================================
+    # CHANNEL VIDEO MIRROR
+    # ============================================================================
+
+    async def get_channel_sync_state(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Uploads playlist id, first-page ETag and sync timestamps for a user's channel"""
+        try:
+            return await self.channel_sync_state.find_one({"user_id": user_id})
+        except Exception as e:
+            logger.error(f"❌ Get channel sync state failed: {e}")
+            return None
+
+    async def update_channel_sync_state(self, user_id: str, updates: Dict[str, Any]) -> bool:
+        """Upsert channel sync state fields"""
+        try:
+            await self.channel_sync_state.update_one(
+                {"user_id": user_id},
+                {"$set": {**updates, "user_id": user_id}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"❌ Update channel sync state failed: {e}")
+            return False
+
+    async def get_all_channel_sync_states(self) -> List[Dict[str, Any]]:
+        """Every mirrored channel (for the scheduled stats refresh)"""
+        try:
+            return await self.channel_sync_state.find({}).to_list(length=None)
+        except Exception as e:
+            logger.error(f"❌ Get channel sync states failed: {e}")
+            return []
+
+    async def upsert_channel_videos(self, user_id: str, videos: List[Dict[str, Any]]) -> int:
+        """Insert/update mirrored uploads (snippet fields only); returns how many were new"""
+        if not videos:
+            return 0
+        try:
+            now = datetime.now()
+            operations = [
+                pymongo.UpdateOne(
+                    {"user_id": user_id, "video_id": video["video_id"]},
+                    {
+                        "$set": {**video, "user_id": user_id, "synced_at": now},
+                        "$setOnInsert": {"stats_updated_at": None}
+                    },
+                    upsert=True
+                )
+                for video in videos
+            ]
+            result = await self.channel_videos.bulk_write(operations, ordered=False)
+            return result.upserted_count
+        except Exception as e:
+            logger.error(f"❌ Upsert channel videos failed: {e}")
+            return 0
+
+    async def update_channel_video_stats(self, user_id: str, stats: Dict[str, Dict[str, Any]]) -> int:
+        """Write statistics/duration for mirrored videos keyed by video_id"""
+        if not stats:
+            return 0
+        try:
+            now = datetime.now()
+            operations = [
+                pymongo.UpdateOne(
+                    {"user_id": user_id, "video_id": video_id},
+                    {"$set": {**video_stats, "stats_updated_at": now}}
+                )
+                for video_id, video_stats in stats.items()
+            ]
+            result = await self.channel_videos.bulk_write(operations, ordered=False)
+            return result.modified_count
+        except Exception as e:
+            logger.error(f"❌ Update channel video stats failed: {e}")
+            return 0
+
+    async def remove_channel_videos(self, user_id: str, video_ids: List[str]) -> int:
+        """Drop mirrored videos that no longer exist on the channel"""
+        if not video_ids:
+            return 0
+        try:
+            result = await self.channel_videos.delete_many({"user_id": user_id, "video_id": {"$in": video_ids}})
+            return result.deleted_count
+        except Exception as e:
+            logger.error(f"❌ Remove channel videos failed: {e}")
+            return 0
+
+    async def get_channel_videos(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Mirrored uploads, newest first"""
+        try:
+            return await self.channel_videos.find(
+                {"user_id": user_id}, {"_id": 0}
+            ).sort("published_at", -1).limit(limit).to_list(length=limit)
+        except Exception as e:
+            logger.error(f"❌ Get channel videos failed: {e}")
+            return []
+
+    async def get_channel_video(self, user_id: str, video_id: str) -> Optional[Dict[str, Any]]:
+        """One mirrored upload, or None when it isn't mirrored"""
+        try:
+            return await self.channel_videos.find_one({"user_id": user_id, "video_id": video_id}, {"_id": 0})
+        except Exception as e:
+            logger.error(f"❌ Get channel video failed: {e}")
+            return None
+
+    async def get_stale_channel_video_ids(self, user_id: str, older_than: datetime, limit: int = 200) -> List[str]:
+        """Mirrored videos whose statistics are missing or older than `older_than`, newest uploads first"""
+        try:
+            docs = await self.channel_videos.find(
+                {"user_id": user_id, "$or": [{"stats_updated_at": None}, {"stats_updated_at": {"$lt": older_than}}]},
+                {"video_id": 1}
+            ).sort("published_at", -1).limit(limit).to_list(length=limit)
+            return [doc["video_id"] for doc in docs]
+        except Exception as e:
+            logger.error(f"❌ Get stale channel videos failed: {e}")
+            return []
+
+    # ============================================================================
+    # AUTOMATION JOB QUEUE
+    # ============================================================================
+    # Lease timestamps are UTC so workers on differently configured hosts agree
+
+    async def enqueue_job(self, job: Dict[str, Any]) -> Optional[str]:
+        """Insert a job unless its idempotency_key already exists; returns the new id or None for a duplicate"""
+        try:
+            result = await self.automation_jobs.update_one(
+                {"idempotency_key": job["idempotency_key"]},
+                {"$setOnInsert": job},
+                upsert=True
+            )
+            return str(result.upserted_id) if result.upserted_id else None
+        except DuplicateKeyError:
+            # Another worker upserted the same key at the same moment
+            return None
+
+    async def claim_job(self, job_types: List[str], worker_id: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        """Atomically lease the highest-priority due job (or one whose lease expired)"""
+        now = datetime.utcnow()
+        return await self.automation_jobs.find_one_and_update(
+            {
+                "job_type": {"$in": job_types},
+                "$or": [
+                    {"status": "queued", "run_at": {"$lte": now}},
+                    {"status": "running", "lease_expires_at": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "started_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("priority", -1), ("run_at", 1)],
+            return_document=pymongo.ReturnDocument.AFTER
+        )
+
+    async def heartbeat_job(self, job_id, worker_id: str, lease_seconds: int) -> bool:
+        """Extend a lease; False means this worker no longer owns the job"""
+        result = await self.automation_jobs.update_one(
+            {"_id": job_id, "status": "running", "lease_owner": worker_id},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=lease_seconds)}}
+        )
+        return result.matched_count == 1
+
+    async def complete_job(self, job_id, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark a leased job done, storing the handler's result"""
+        now = datetime.utcnow()
+        updated = await self.automation_jobs.update_one(
+            {"_id": job_id, "status": "running", "lease_owner": worker_id},
+            {"$set": {"status": "done", "finished_at": now, "result": result,
+                      "lease_owner": None, "lease_expires_at": None}}
+        )
+        return updated.matched_count == 1
+
+    async def get_job(self, job_id) -> Optional[Dict[str, Any]]:
+        """One job by id (ObjectId or its string form)"""
+        return await self.automation_jobs.find_one({"_id": ObjectId(job_id) if isinstance(job_id, str) else job_id})
+
+    async def fail_job(self, job_id, worker_id: str, error: str, retry_at: Optional[datetime] = None) -> bool:
+        """Requeue a leased job for retry_at, or mark it failed when retry_at is None"""
+        update = {"last_error": error, "lease_owner": None, "lease_expires_at": None}
+        if retry_at:
+            update.update({"status": "queued", "run_at": retry_at})
+        else:
+            update.update({"status": "failed", "finished_at": datetime.utcnow()})
+        result = await self.automation_jobs.update_one(
+            {"_id": job_id, "status": "running", "lease_owner": worker_id},
+            {"$set": update}
+        )
+        return result.matched_count == 1
+
+    async def abandon_job(self, job_id, error: str) -> bool:
+        """Fail a job nobody has claimed yet (its producer stopped waiting); False if already claimed"""
+        result = await self.automation_jobs.update_one(
+            {"_id": ObjectId(job_id) if isinstance(job_id, str) else job_id, "status": "queued"},
+            {"$set": {"status": "failed", "last_error": error, "finished_at": datetime.utcnow()}}
+        )
+        return result.matched_count == 1
+
+    async def release_job(self, job_id, worker_id: str) -> bool:
+        """Hand a leased job back to the queue straight away (worker shutting down)"""
+        result = await self.automation_jobs.update_one(
+            {"_id": job_id, "status": "running", "lease_owner": worker_id},
+            {"$set": {"status": "queued", "run_at": datetime.utcnow(), "lease_owner": None, "lease_expires_at": None}}
+        )
+        return result.matched_count == 1
+
+    async def get_job_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Job counts per type and status"""
+        try:
+            stats: Dict[str, Dict[str, int]] = {}
+            async for row in self.automation_jobs.aggregate([
+                {"$group": {"_id": {"job_type": "$job_type", "status": "$status"}, "count": {"$sum": 1}}}
+            ]):
+                stats.setdefault(row["_id"]["job_type"], {})[row["_id"]["status"]] = row["count"]
+            return stats
+        except Exception as e:
+            logger.error(f"❌ Get job queue stats failed: {e}")
+            return {}
+
 
 # ============================================================================
 # UNIFIED DATABASE MANAGER
@@ -1292,6 +1739,27 @@ class UnifiedDatabaseManager:
     async def check_comment_already_replied(self, user_id: str, comment_id: str) -> bool:
         return await self.youtube.check_comment_already_replied(user_id, comment_id)
     
+    async def get_replied_comment_ids(self, user_id: str, comment_ids: List[str]) -> set:
+        return await self.youtube.get_replied_comment_ids(user_id, comment_ids)
+    
+    async def get_comment_watermark(self, user_id: str, video_id: str) -> Optional[Dict[str, Any]]:
+        return await self.youtube.get_comment_watermark(user_id, video_id)
+    
+    async def set_comment_watermark(self, user_id: str, video_id: str, last_published_at: str) -> bool:
+        return await self.youtube.set_comment_watermark(user_id, video_id, last_published_at)
+    
+    async def upsert_comments(self, user_id: str, comments: List[Dict[str, Any]]) -> int:
+        return await self.youtube.upsert_comments(user_id, comments)
+    
+    async def get_pending_comments(self, user_id: str, video_id: str, since: str, max_attempts: int, limit: int = 50) -> List[Dict[str, Any]]:
+        return await self.youtube.get_pending_comments(user_id, video_id, since, max_attempts, limit)
+    
+    async def mark_comments(self, user_id: str, comment_ids: List[str], reply_status: str) -> bool:
+        return await self.youtube.mark_comments(user_id, comment_ids, reply_status)
+    
+    async def record_comment_reply_failure(self, user_id: str, comment_id: str) -> bool:
+        return await self.youtube.record_comment_reply_failure(user_id, comment_id)
+    
     async def log_community_post(self, user_id: str, post_data: Dict[str, Any]) -> bool:
         return await self.youtube.log_community_post(user_id, post_data)
     
@@ -1405,6 +1873,94 @@ class UnifiedDatabaseManager:
         """Get next product that hasn't been processed yet"""
         return await self.youtube.get_next_unprocessed_product(user_id)
 
+    async def add_scraped_products(self, user_id: str, products: List[Dict[str, Any]], source_url: str = None) -> int:
+        """Insert crawled products not seen before for this user"""
+        return await self.youtube.add_scraped_products(user_id, products, source_url)
+
+    async def get_next_scraped_product(self, user_id: str, source_url: str = None) -> Optional[Dict[str, Any]]:
+        """Oldest crawled product not yet turned into a video"""
+        return await self.youtube.get_next_scraped_product(user_id, source_url)
+
+    async def mark_scraped_product_processed(self, user_id: str, product_id: str, source_url: str = None) -> bool:
+        """Mark a crawled product as used"""
+        return await self.youtube.mark_scraped_product_processed(user_id, product_id, source_url)
+
+    async def count_scraped_products(self, user_id: str, source_url: str = None) -> Dict[str, int]:
+        """Total and unprocessed crawled products for user"""
+        return await self.youtube.count_scraped_products(user_id, source_url)
+
+    async def get_channel_sync_state(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Channel mirror sync state"""
+        return await self.youtube.get_channel_sync_state(user_id)
+
+    async def update_channel_sync_state(self, user_id: str, updates: Dict[str, Any]) -> bool:
+        """Upsert channel mirror sync state"""
+        return await self.youtube.update_channel_sync_state(user_id, updates)
+
+    async def get_all_channel_sync_states(self) -> List[Dict[str, Any]]:
+        """Every mirrored channel"""
+        return await self.youtube.get_all_channel_sync_states()
+
+    async def upsert_channel_videos(self, user_id: str, videos: List[Dict[str, Any]]) -> int:
+        """Insert/update mirrored uploads"""
+        return await self.youtube.upsert_channel_videos(user_id, videos)
+
+    async def update_channel_video_stats(self, user_id: str, stats: Dict[str, Dict[str, Any]]) -> int:
+        """Write statistics for mirrored videos"""
+        return await self.youtube.update_channel_video_stats(user_id, stats)
+
+    async def remove_channel_videos(self, user_id: str, video_ids: List[str]) -> int:
+        """Drop mirrored videos no longer on the channel"""
+        return await self.youtube.remove_channel_videos(user_id, video_ids)
+
+    async def get_channel_videos(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Mirrored uploads, newest first"""
+        return await self.youtube.get_channel_videos(user_id, limit)
+
+    async def get_channel_video(self, user_id: str, video_id: str) -> Optional[Dict[str, Any]]:
+        """One mirrored upload"""
+        return await self.youtube.get_channel_video(user_id, video_id)
+
+    async def get_stale_channel_video_ids(self, user_id: str, older_than: datetime, limit: int = 200) -> List[str]:
+        """Mirrored videos with missing or old statistics"""
+        return await self.youtube.get_stale_channel_video_ids(user_id, older_than, limit)
+
+    async def enqueue_job(self, job: Dict[str, Any]) -> Optional[str]:
+        """Insert a job unless its idempotency key exists"""
+        return await self.youtube.enqueue_job(job)
+
+    async def claim_job(self, job_types: List[str], worker_id: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        """Lease the next due job"""
+        return await self.youtube.claim_job(job_types, worker_id, lease_seconds)
+
+    async def heartbeat_job(self, job_id, worker_id: str, lease_seconds: int) -> bool:
+        """Extend a job lease"""
+        return await self.youtube.heartbeat_job(job_id, worker_id, lease_seconds)
+
+    async def complete_job(self, job_id, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark a leased job done"""
+        return await self.youtube.complete_job(job_id, worker_id, result)
+
+    async def get_job(self, job_id) -> Optional[Dict[str, Any]]:
+        """One job by id"""
+        return await self.youtube.get_job(job_id)
+
+    async def fail_job(self, job_id, worker_id: str, error: str, retry_at: Optional[datetime] = None) -> bool:
+        """Requeue or fail a leased job"""
+        return await self.youtube.fail_job(job_id, worker_id, error, retry_at)
+
+    async def abandon_job(self, job_id, error: str) -> bool:
+        """Fail a job nobody has claimed yet"""
+        return await self.youtube.abandon_job(job_id, error)
+
+    async def release_job(self, job_id, worker_id: str) -> bool:
+        """Hand a leased job back to the queue"""
+        return await self.youtube.release_job(job_id, worker_id)
+
+    async def get_job_queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Job counts per type and status"""
+        return await self.youtube.get_job_queue_stats()
+
     async def get_automation_posts_count(self, user_id: str, date) -> int:
         """Get number of automation posts for a specific date"""
         return await self.youtube.get_automation_posts_count(user_id, date)
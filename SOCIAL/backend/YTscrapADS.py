@@ -1347,15 +1347,47 @@ import logging
 import re
 import os
 from typing import Dict, List, Optional, Tuple
-from urllib.parse import urlparse, urljoin, quote
+from urllib.parse import urlparse, urljoin, quote, parse_qsl, urlencode, urlunparse
 
 os.environ['PLAYWRIGHT_BROWSERS_PATH'] = '/opt/render/project/.browsers'
 
-from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 
+from browser_pool import BrowserPool
+from http_clients import pooled_client
+from structured_product import extract_structured_product, has_required_fields
+from scrape_cache import get_scrape_cache, product_id_for
+
 logger = logging.getLogger(__name__)
 
+# Lightweight scrape mode: abort heavy/3rd-party requests, wait on selectors
+SCRAPE_LIGHTWEIGHT_MODE = os.getenv("SCRAPE_LIGHTWEIGHT_MODE", "1") == "1"
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+BLOCKED_URL_RE = re.compile(
+    r'google-analytics|googletagmanager|doubleclick|googlesyndication|facebook\.net|'
+    r'connect\.facebook|hotjar|clarity\.ms|scorecardresearch|criteo|taboola|outbrain|'
+    r'branch\.io|appsflyer|sentry\.io|newrelic|nr-data|segment\.(io|com)|mixpanel'
+)
+LIGHTWEIGHT_SELECTOR_TIMEOUT = 15000
+LIGHTWEIGHT_IMAGE_TIMEOUT = 5000
+
+FLIPKART_READY_SELECTOR = 'span.VU-ZEz, h1.yhB1nd, div.Nx9bqj, div._30jeq3'
+FLIPKART_IMAGE_SELECTOR = 'img[src*="rukminim"]'
+GENERIC_READY_SELECTOR = 'h1, [class*="price"], meta[property="og:title"]'
+GENERIC_IMAGE_SELECTOR = 'img[src^="http"]'
+
+# HTTP-first fast path: parse JSON-LD / embedded state before launching a browser
+SCRAPE_HTTP_FAST_PATH = os.getenv("SCRAPE_HTTP_FAST_PATH", "1") == "1"
+HTTP_FAST_PATH_TIMEOUT = 15
+HTTP_FAST_PATH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-IN,en;q=0.9',
+}
+
+# Category crawl: listing pages 1..K fetched concurrently from the browser pool
+CATEGORY_CRAWL_PAGES = int(os.getenv("CATEGORY_CRAWL_PAGES", "5"))
+
 
 class UniversalProductScraper:
     """
@@ -1382,8 +1414,22 @@ class UniversalProductScraper:
             '--disable-component-update',
             '--window-size=1920,1080'
         ]
+        self.context_options = {
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'viewport': {'width': 1920, 'height': 1080},
+            'locale': 'en-US',
+            'timezone_id': 'Asia/Kolkata',
+            'device_scale_factor': 1,
+            'has_touch': False,
+            'is_mobile': False,
+            'ignore_https_errors': True,
+        }
         self.default_timeout = 50000
         self.scroll_wait = 1500
+        # Warm browsers shared across scrapes (see browser_pool.py)
+        self.browser_pool = BrowserPool(self.browser_args, self.context_options)
+        # dl.flipkart.com short link -> product URL
+        self._resolved_urls: Dict[str, str] = {}
 
     def extract_url(self, input_string: str) -> str:
         """Extract clean URL from any input string"""
@@ -1406,6 +1452,30 @@ class UniversalProductScraper:
         
         raise ValueError(f"Could not extract valid URL from: {input_string[:100]}")
 
+    async def resolve_short_url(self, url: str) -> str:
+        """Follow dl.flipkart.com short links to the product page (memoised, body not downloaded)"""
+        if 'dl.flipkart.com' not in url:
+            return url
+        if url in self._resolved_urls:
+            return self._resolved_urls[url]
+
+        try:
+            async with pooled_client(timeout=HTTP_FAST_PATH_TIMEOUT, follow_redirects=True) as client:
+                async with client.stream("GET", url, headers=HTTP_FAST_PATH_HEADERS) as response:
+                    final_url = str(response.url)
+        except Exception as e:
+            logger.warning(f"Short URL resolution failed: {str(e)[:100]}")
+            return url
+
+        if 'flipkart.com' not in final_url or 'dl.flipkart.com' in final_url:
+            return url
+
+        if len(self._resolved_urls) > 1000:
+            self._resolved_urls.clear()
+        self._resolved_urls[url] = final_url
+        logger.info(f"Resolved short URL: {final_url[:100]}")
+        return final_url
+
     # ============================================================================
     # ✅ CRITICAL METHOD: SCRAPE CATEGORY/SEARCH PAGES WITH SEARCH QUERY
     # ============================================================================
@@ -1428,23 +1498,11 @@ class UniversalProductScraper:
         
         Returns: List of products with URL, title, image, price
         """
-        p, browser, context, page = None, None, None, None
+        lease, page = None, None
         try:
             # ✅ CRITICAL FIX: Build search URL if query provided
             if search_query:
-                domain = urlparse(url).netloc.lower()
-                
-                if 'flipkart.com' in domain:
-                    url = f"{url}/search?q={search_query.replace(' ', '+')}"
-                elif 'amazon.in' in domain:
-                    url = f"{url}/s?k={search_query.replace(' ', '+')}"
-                elif 'myntra.com' in domain:
-                    url = f"{url}/{search_query.replace(' ', '-')}"
-                else:
-                    # Generic search URL pattern
-                    url = f"{url}/search?q={search_query.replace(' ', '+')}"
-                
-                logger.info(f"🔍 Built search URL: {url}")
+                url = self._build_search_url(url, search_query)
             
             logger.info(f"📋 Scraping category page: {url}")
             
@@ -1454,8 +1512,8 @@ class UniversalProductScraper:
             # Site-specific selectors
             selectors = self._get_category_selectors(domain)
             
-            p, browser, context = await self._create_browser_context()
-            page = await context.new_page()
+            lease = await self._create_browser_context()
+            page = await lease.context.new_page()
             
             # Navigate to category page
             try:
@@ -1494,10 +1552,6 @@ class UniversalProductScraper:
                     logger.debug(f"Failed to extract product: {e}")
                     continue
             
-            await context.close()
-            await browser.close()
-            await p.stop()
-            
             logger.info(f"✅ Scraped {len(products)} products from category page")
             return products
             
@@ -1507,7 +1561,136 @@ class UniversalProductScraper:
             logger.error(traceback.format_exc())
             return []
         finally:
-            await self._cleanup(page, context, browser, p)
+            await self._cleanup(page, lease)
+
+    def _build_search_url(self, url: str, search_query: str) -> str:
+        """Site search URL for a base URL + query"""
+        domain = urlparse(url).netloc.lower()
+        
+        if 'flipkart.com' in domain:
+            url = f"{url}/search?q={search_query.replace(' ', '+')}"
+        elif 'amazon.in' in domain:
+            url = f"{url}/s?k={search_query.replace(' ', '+')}"
+        elif 'myntra.com' in domain:
+            url = f"{url}/{search_query.replace(' ', '-')}"
+        else:
+            # Generic search URL pattern
+            url = f"{url}/search?q={search_query.replace(' ', '+')}"
+        
+        logger.info(f"🔍 Built search URL: {url}")
+        return url
+
+    def _page_url(self, url: str, page_number: int) -> str:
+        """Listing URL for page N (Myntra paginates with ?p=, everyone else ?page=)"""
+        if page_number <= 1:
+            return url
+        parsed = urlparse(url)
+        param = 'p' if 'myntra' in parsed.netloc.lower() else 'page'
+        params = [(k, v) for k, v in parse_qsl(parsed.query) if k != param]
+        params.append((param, str(page_number)))
+        return urlunparse(parsed._replace(query=urlencode(params)))
+
+    # ============================================================================
+    # PARALLEL CATEGORY CRAWL - pages 1..K, dedup by product ID, streamed
+    # ============================================================================
+
+    async def crawl_category(
+        self,
+        url: str,
+        max_pages: int = CATEGORY_CRAWL_PAGES,
+        max_products: int = 500,
+        search_query: str = None,
+        on_products=None
+    ) -> List[Dict]:
+        """
+        Fetch listing pages 1..max_pages concurrently (one pooled context each),
+        parse them with lxml and dedup by site product ID.
+        
+        on_products: optional async callback receiving each page's new products as
+        soon as that page is parsed (used to stream into the per-user seen-set).
+        
+        Falls back to scrape_category_page when the crawl finds nothing.
+        """
+        if search_query:
+            url = self._build_search_url(url, search_query)
+        
+        selectors = self._get_category_selectors(urlparse(url).netloc.lower())
+        logger.info(f"📋 Crawling {max_pages} listing pages: {url}")
+        
+        seen = set()
+        products = []
+        
+        async def emit(batch: List[Dict]):
+            if batch and on_products:
+                try:
+                    await on_products(batch)
+                except Exception as e:
+                    logger.warning(f"Crawl stream callback failed: {e}")
+        
+        tasks = [
+            asyncio.create_task(self._crawl_listing_page(self._page_url(url, n), selectors))
+            for n in range(1, max_pages + 1)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                page_products = await next_done
+                batch = []
+                for product in page_products:
+                    if product['product_id'] in seen:
+                        continue
+                    seen.add(product['product_id'])
+                    batch.append(product)
+                
+                batch = batch[:max_products - len(products)]
+                products.extend(batch)
+                await emit(batch)
+                
+                if len(products) >= max_products:
+                    break
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        if not products:
+            logger.info("⚠️ Parallel crawl found nothing - falling back to single page full load")
+            for product in await self.scrape_category_page(url, max_products=max_products):
+                product['product_id'] = product_id_for(product['url'])
+                if product['product_id'] not in seen:
+                    seen.add(product['product_id'])
+                    products.append(product)
+            await emit(products)
+        
+        logger.info(f"✅ Crawled {len(products)} unique products from {max_pages} pages")
+        return products
+
+    async def _crawl_listing_page(self, page_url: str, selectors: dict) -> List[Dict]:
+        """One listing page in lightweight mode; [] on any failure"""
+        lease, page = None, None
+        try:
+            lease = await self._create_browser_context()
+            page = await lease.context.new_page()
+            await self._load_page_lightweight(page, page_url, selectors['product_container'])
+            content = await page.content()
+        except Exception as e:
+            logger.warning(f"Listing page failed: {page_url[:100]} - {str(e)[:100]}")
+            return []
+        finally:
+            await self._cleanup(page, lease)
+        
+        # lxml parse off the event loop - listing pages are large
+        return await asyncio.to_thread(self._parse_listing, content, selectors, page_url)
+
+    def _parse_listing(self, content: str, selectors: dict, page_url: str) -> List[Dict]:
+        soup = BeautifulSoup(content, 'lxml')
+        products = []
+        for container in soup.select(selectors['product_container']):
+            product = self._extract_product_from_listing(container, selectors, page_url)
+            if product and product.get('url'):
+                product['product_id'] = product_id_for(product['url'])
+                products.append(product)
+        logger.info(f"Parsed {len(products)} products from {page_url[:100]}")
+        return products
 
     def _get_category_selectors(self, domain: str) -> dict:
         """Get site-specific selectors for category pages"""
@@ -1614,28 +1797,27 @@ class UniversalProductScraper:
     # SINGLE PRODUCT SCRAPER - For detailed product info
     # ============================================================================
     
-    async def scrape_product(self, url_input: str) -> Dict:
+    async def scrape_product(self, url_input: str, use_cache: bool = True) -> Dict:
         """
         Scrape detailed product information from a single product page
         Returns: Full product data with multiple images, price, brand, etc.
+        use_cache=False forces a fresh scrape (the result still refreshes the cache)
         """
         try:
             url = self.extract_url(url_input)
+            url = await self.resolve_short_url(url)
             logger.info(f"Extracted URL: {url}")
             
-            domain = urlparse(url).netloc.lower()
-            logger.info(f"Starting scrape for domain: {domain}")
-            
-            if 'flipkart' in domain or 'dl.flipkart' in domain:
-                return await self._scrape_flipkart(url)
-            elif 'amazon' in domain:
-                return await self._scrape_amazon(url)
-            elif 'myntra' in domain:
-                return await self._scrape_myntra(url)
-            elif 'ajio' in domain:
-                return await self._scrape_ajio(url)
-            else:
-                return await self._scrape_generic(url)
+            if use_cache:
+                cached = await self._get_cached_product(url)
+                if cached:
+                    return cached
+            
+            result = await self._scrape_uncached(url)
+            validators = result.pop("_validators", None) or {}
+            if result.get("success"):
+                get_scrape_cache().put(url, result, validators.get("etag"), validators.get("last_modified"))
+            return result
                 
         except ValueError as e:
             logger.error(f"URL extraction failed: {e}")
@@ -1644,56 +1826,181 @@ class UniversalProductScraper:
             logger.error(f"Routing failed: {e}")
             return {"success": False, "error": f"Failed to process URL: {str(e)[:200]}"}
 
+    async def _scrape_uncached(self, url: str) -> Dict:
+        """Route to the HTTP fast path, then the site-specific browser scraper"""
+        domain = urlparse(url).netloc.lower()
+        logger.info(f"Starting scrape for domain: {domain}")
+        
+        if SCRAPE_HTTP_FAST_PATH:
+            product = await self._scrape_structured(url)
+            if product:
+                return product
+        
+        if 'flipkart' in domain or 'dl.flipkart' in domain:
+            return await self._scrape_with_fallback(self._scrape_flipkart, url)
+        elif 'amazon' in domain:
+            return await self._scrape_amazon(url)
+        elif 'myntra' in domain:
+            return await self._scrape_myntra(url)
+        elif 'ajio' in domain:
+            return await self._scrape_ajio(url)
+        else:
+            return await self._scrape_with_fallback(self._scrape_generic, url)
+
+    async def _get_cached_product(self, url: str) -> Optional[Dict]:
+        """Fresh cache hit, or a cheap revalidation of a stale entry; None means scrape"""
+        cache = get_scrape_cache()
+        entry = cache.get(url)
+        if not entry:
+            cache.stats["misses"] += 1
+            return None
+
+        stale = cache.stale_groups(entry)
+        if not stale:
+            cache.stats["hits"] += 1
+            logger.info(f"✅ Scrape cache hit: {entry['product'].get('product_name', '')[:50]}")
+            return dict(entry["product"])
+
+        product = await self._revalidate_cached(entry, stale)
+        if product:
+            return product
+
+        cache.stats["misses"] += 1
+        return None
+
+    async def _revalidate_cached(self, entry: dict, stale: set) -> Optional[Dict]:
+        """
+        Conditional GET with the stored ETag / Last-Modified:
+        - 304 -> every field group is fresh again
+        - 200 with only price stale -> refresh price fields, keep cached images
+        - 200 with complete structured data -> replace the entry
+        """
+        cache = get_scrape_cache()
+        headers = dict(HTTP_FAST_PATH_HEADERS)
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            async with pooled_client(timeout=HTTP_FAST_PATH_TIMEOUT, follow_redirects=True) as client:
+                response = await client.get(entry["url"], headers=headers)
+        except Exception as e:
+            logger.info(f"Scrape cache revalidation failed: {str(e)[:100]}")
+            return None
+
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+
+        if response.status_code == 304:
+            cache.stats["revalidated"] += 1
+            cache.mark_fresh(entry, etag=etag, last_modified=last_modified)
+            logger.info("✅ Scrape cache revalidated (304 Not Modified)")
+            return dict(entry["product"])
+
+        if response.status_code != 200:
+            return None
+
+        product = extract_structured_product(response.text, str(response.url))
+        product.pop("_sources", None)
+
+        if "static" not in stale and product.get("price", 0) > 0:
+            cache.update_price(entry, product, etag, last_modified)
+            logger.info(f"✅ Scrape cache price refreshed: Rs.{product['price']}")
+            return dict(entry["product"])
+
+        if has_required_fields(product):
+            cache.put(entry["url"], product, etag, last_modified)
+            return product
+
+        return None
+
+    async def _scrape_structured(self, url: str) -> Optional[Dict]:
+        """
+        Fast path: plain HTTP fetch + JSON-LD / __NEXT_DATA__ / __INITIAL_STATE__ /
+        OpenGraph parsing. Returns None when name, price or images are missing.
+        """
+        try:
+            async with pooled_client(timeout=HTTP_FAST_PATH_TIMEOUT, follow_redirects=True) as client:
+                response = await client.get(url, headers=HTTP_FAST_PATH_HEADERS)
+            if response.status_code != 200 or 'html' not in response.headers.get('content-type', 'text/html'):
+                logger.info(f"HTTP fast path skipped (HTTP {response.status_code})")
+                return None
+
+            final_url = str(response.url)
+            product = extract_structured_product(response.text, final_url)
+            sources = product.pop("_sources", [])
+
+            if not has_required_fields(product):
+                logger.info(f"HTTP fast path incomplete (sources: {sources or 'none'}) - using browser")
+                return None
+
+            logger.info(f"✅ HTTP fast path success via {'+'.join(sources)}: {product['brand']} | {len(product['images'])} images | Rs.{product['price']}")
+            product["_validators"] = {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+            }
+            return product
+
+        except Exception as e:
+            logger.info(f"HTTP fast path failed: {str(e)[:100]} - using browser")
+            return None
+
+    async def _scrape_with_fallback(self, scrape_fn, url: str) -> Dict:
+        """Lightweight scrape first; full page load only when extraction comes back empty"""
+        if not SCRAPE_LIGHTWEIGHT_MODE:
+            return await scrape_fn(url)
+
+        result = await scrape_fn(url, lightweight=True)
+        if self._has_product_data(result):
+            return result
+
+        logger.info("⚠️ Lightweight scrape came back empty - retrying with full page load")
+        return await scrape_fn(url, lightweight=False)
+
+    @staticmethod
+    def _has_product_data(result: Dict) -> bool:
+        if not result.get("success") or not result.get("images"):
+            return False
+        return result.get("price", 0) > 0 or result.get("product_name") not in (None, "", "Product")
+
     # ============================================================================
     # BROWSER SETUP
     # ============================================================================
 
     async def _create_browser_context(self):
-        """Create browser with realistic settings - RENDER COMPATIBLE"""
-        p = await async_playwright().start()
-        
-        browser_executable = None
-        
-        # Check if running on Render
-        if os.path.exists('/opt/render/project/.browsers'):
-            chromium_path = '/opt/render/project/.browsers/chromium-1148/chrome-linux/chrome'
-            if os.path.exists(chromium_path):
-                browser_executable = chromium_path
-                logger.info(f"✅ Using Render Chromium: {chromium_path}")
+        """Check out an isolated context from the warm browser pool"""
+        return await self.browser_pool.acquire()
+
+    async def _block_heavy_resources(self, page):
+        """Abort image/media/font and analytics requests - we only read src attributes"""
+        async def handle(route):
+            request = route.request
+            if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_RE.search(request.url):
+                await route.abort()
             else:
-                logger.warning(f"⚠️ Chromium not found at {chromium_path}")
-        
-        launch_options = {
-            'headless': True,
-            'args': self.browser_args
-        }
-        
-        if browser_executable:
-            launch_options['executable_path'] = browser_executable
-        
+                await route.continue_()
+
+        await page.route("**/*", handle)
+
+    async def _load_page_lightweight(self, page, url: str, ready_selector: str, image_selector: str = None):
+        """DOM-only navigation that waits on product selectors instead of fixed sleeps"""
+        await self._block_heavy_resources(page)
+        await page.goto(url, wait_until='domcontentloaded', timeout=self.default_timeout)
+
         try:
-            browser = await p.chromium.launch(**launch_options)
+            await page.wait_for_selector(ready_selector, state='attached', timeout=LIGHTWEIGHT_SELECTOR_TIMEOUT)
+        except Exception:
+            logger.warning(f"Ready selector not found: {ready_selector[:60]}")
+
+        # One scroll to trigger lazy <img> src assignment, then wait for it
+        try:
+            await page.evaluate('window.scrollTo(0, document.body.scrollHeight / 2)')
+            if image_selector:
+                await page.wait_for_selector(image_selector, state='attached', timeout=LIGHTWEIGHT_IMAGE_TIMEOUT)
+            await page.evaluate('window.scrollTo(0, 0)')
         except Exception as e:
-            logger.error(f"Browser launch failed: {e}")
-            if 'executable_path' in launch_options:
-                del launch_options['executable_path']
-                logger.info("Retrying without executable_path...")
-                browser = await p.chromium.launch(**launch_options)
-            else:
-                raise
-        
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080},
-            locale='en-US',
-            timezone_id='Asia/Kolkata',
-            device_scale_factor=1,
-            has_touch=False,
-            is_mobile=False,
-            ignore_https_errors=True,
-        )
-        
-        return p, browser, context
+            logger.debug(f"Lightweight image wait: {e}")
 
     async def _wait_and_scroll(self, page, times: int = 3):
         """Progressive scrolling to trigger lazy loading"""
@@ -1712,19 +2019,23 @@ class UniversalProductScraper:
     # FLIPKART SCRAPER - Full product details
     # ============================================================================
 
-    async def _scrape_flipkart(self, url: str) -> Dict:
+    async def _scrape_flipkart(self, url: str, lightweight: bool = False) -> Dict:
         """
         Flipkart scraper - handles both regular and short URLs
         EXTRACTS: Product name, brand, price, images, URL
+        lightweight=True blocks images/fonts/trackers and waits on selectors
         """
-        p, browser, context, page = None, None, None, None
+        lease, page = None, None
         try:
-            logger.info("Flipkart scraper initiated")
-            p, browser, context = await self._create_browser_context()
-            page = await context.new_page()
+            logger.info(f"Flipkart scraper initiated ({'lightweight' if lightweight else 'full'} mode)")
+            lease = await self._create_browser_context()
+            page = await lease.context.new_page()
             
+            if lightweight:
+                # Short URLs redirect during goto as well
+                await self._load_page_lightweight(page, url, FLIPKART_READY_SELECTOR, FLIPKART_IMAGE_SELECTOR)
             # Handle short URLs
-            if 'dl.flipkart.com' in url:
+            elif 'dl.flipkart.com' in url:
                 logger.info("Detected Flipkart short URL, following redirect...")
                 try:
                     await page.goto(url, wait_until='networkidle', timeout=self.default_timeout)
@@ -1741,7 +2052,8 @@ class UniversalProductScraper:
                 except:
                     await page.goto(url, wait_until='domcontentloaded', timeout=self.default_timeout)
             
-            await self._wait_and_scroll(page, times=4)
+            if not lightweight:
+                await self._wait_and_scroll(page, times=4)
             content = await page.content()
             soup = BeautifulSoup(content, 'html.parser')
             
@@ -1755,10 +2067,6 @@ class UniversalProductScraper:
             colors = await self._extract_flipkart_colors(soup)
             rating, rating_count = await self._extract_flipkart_ratings(soup)
             
-            await context.close()
-            await browser.close()
-            await p.stop()
-            
             discount = ""
             if original_price > price > 0:
                 discount_pct = int(((original_price - price) / original_price) * 100)
@@ -1790,7 +2098,7 @@ class UniversalProductScraper:
             logger.error(traceback.format_exc())
             return {"success": False, "error": f"Flipkart: {str(e)[:150]}"}
         finally:
-            await self._cleanup(page, context, browser, p)
+            await self._cleanup(page, lease)
 
     async def _extract_flipkart_brand(self, soup, page) -> str:
         """Extract brand with multiple fallback methods"""
@@ -1963,20 +2271,23 @@ class UniversalProductScraper:
         """Ajio scraper - implement if needed"""
         return {"success": False, "error": "Ajio scraper not implemented"}
 
-    async def _scrape_generic(self, url: str) -> Dict:
+    async def _scrape_generic(self, url: str, lightweight: bool = False) -> Dict:
         """Generic scraper for any website"""
-        p, browser, context, page = None, None, None, None
+        lease, page = None, None
         try:
             logger.info(f"Generic scraper for: {urlparse(url).netloc}")
-            p, browser, context = await self._create_browser_context()
-            page = await context.new_page()
+            lease = await self._create_browser_context()
+            page = await lease.context.new_page()
             
-            try:
-                await page.goto(url, wait_until='load', timeout=self.default_timeout)
-            except:
-                await page.goto(url, wait_until='domcontentloaded', timeout=self.default_timeout)
-            
-            await self._wait_and_scroll(page, times=3)
+            if lightweight:
+                await self._load_page_lightweight(page, url, GENERIC_READY_SELECTOR, GENERIC_IMAGE_SELECTOR)
+            else:
+                try:
+                    await page.goto(url, wait_until='load', timeout=self.default_timeout)
+                except:
+                    await page.goto(url, wait_until='domcontentloaded', timeout=self.default_timeout)
+                
+                await self._wait_and_scroll(page, times=3)
             content = await page.content()
             soup = BeautifulSoup(content, 'html.parser')
             
@@ -2014,10 +2325,6 @@ class UniversalProductScraper:
                 if price > 0:
                     break
             
-            await context.close()
-            await browser.close()
-            await p.stop()
-            
             logger.info(f"✅ Generic success: {brand} | {len(images)} images")
             
             return {
@@ -2042,21 +2349,16 @@ class UniversalProductScraper:
             logger.error(f"Generic scraper failed: {e}")
             return {"success": False, "error": f"Failed: {str(e)[:150]}"}
         finally:
-            await self._cleanup(page, context, browser, p)
+            await self._cleanup(page, lease)
 
-    async def _cleanup(self, page, context, browser, p):
-        """Cleanup browser resources"""
+    async def _cleanup(self, page, lease):
+        """Close the page and hand the context back to the pool"""
         try:
             if page:
                 await page.close()
-            if context:
-                await context.close()
-            if browser:
-                await browser.close()
-            if p:
-                await p.stop()
         except Exception as e:
             logger.warning(f"Cleanup error: {e}")
+        await self.browser_pool.release(lease)
 
 
 # ============================================================================
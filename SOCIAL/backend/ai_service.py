@@ -12,7 +12,9 @@ import random
 import httpx
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-import time
+
+from llm_gateway import llm_client
+from llm_router import get_llm_router
 
 logger = logging.getLogger(__name__)
 
@@ -51,12 +53,9 @@ class AIService:
         self.mistral_available = bool(self.mistral_key and len(self.mistral_key) > 20)
         self.groq_available = bool(self.groq_key and len(self.groq_key) > 20)
         
-        # Rate limiting and request management
+        # Concurrency caps; RPM limiting is shared per key in llm_gateway
         self.mistral_semaphore = asyncio.Semaphore(3)
         self.groq_semaphore = asyncio.Semaphore(2)
-        self.mistral_last_request = 0
-        self.groq_last_request = 0
-        self.min_request_interval = 3.0
         
         # Enhanced model configurations
         self.mistral_models = [
@@ -178,35 +177,19 @@ class AIService:
             }
         }
     
-    async def _wait_for_rate_limit(self, service: str) -> None:
-        """Implement intelligent rate limiting"""
-        current_time = time.time()
-        
-        if service == "mistral":
-            time_since_last = current_time - self.mistral_last_request
-            if time_since_last < self.min_request_interval:
-                wait_time = self.min_request_interval - time_since_last
-                logger.info(f"Rate limiting Mistral: waiting {wait_time:.1f}s")
-                await asyncio.sleep(wait_time)
-            self.mistral_last_request = time.time()
-        
-        elif service == "groq":
-            time_since_last = current_time - self.groq_last_request
-            if time_since_last < self.min_request_interval:
-                wait_time = self.min_request_interval - time_since_last
-                logger.info(f"Rate limiting Groq: waiting {wait_time:.1f}s")
-                await asyncio.sleep(wait_time)
-            self.groq_last_request = time.time()
-    
     async def _call_mistral_api(self, messages: List[Dict], **kwargs) -> Optional[str]:
         """Enhanced Mistral API call with concurrent handling and model fallbacks"""
         if not self.mistral_available:
             return None
         
+        # Fastest healthy models first; models with an open circuit are skipped
+        models = [model for _, model in get_llm_router().rank([("mistral", m) for m in self.mistral_models])]
+        if not models:
+            logger.warning("🔌 All Mistral models are circuit-open, skipping")
+            return None
+        
         async with self.mistral_semaphore:
-            await self._wait_for_rate_limit("mistral")
-            
-            for model_idx, model in enumerate(self.mistral_models):
+            for model_idx, model in enumerate(models):
                 try:
                     payload = {
                         "model": model,
@@ -219,9 +202,8 @@ class AIService:
                     
                     timeout_duration = 45.0 + (model_idx * 15.0)
                     
-                    async with httpx.AsyncClient(
-                        timeout=httpx.Timeout(timeout_duration, connect=10.0),
-                        limits=httpx.Limits(max_connections=5, max_keepalive_connections=2)
+                    async with llm_client(
+                        timeout=httpx.Timeout(timeout_duration, connect=10.0)
                     ) as client:
                         logger.info(f"Trying Mistral model: {model}")
                         response = await client.post(
@@ -237,9 +219,9 @@ class AIService:
                             return content
                         
                         elif response.status_code == 429:
+                            # Gateway already paused this key for the Retry-After hint
                             logger.warning(f"⚠️ Mistral rate limit hit with {model}")
-                            if model_idx < len(self.mistral_models) - 1:
-                                await asyncio.sleep(5.0)
+                            if model_idx < len(models) - 1:
                                 continue
                             else:
                                 logger.error("All Mistral models hit rate limit")
@@ -247,20 +229,20 @@ class AIService:
                         
                         else:
                             logger.error(f"❌ Mistral API error with {model}: {response.status_code}")
-                            if model_idx < len(self.mistral_models) - 1:
+                            if model_idx < len(models) - 1:
                                 continue
                             else:
                                 return None
                             
                 except asyncio.TimeoutError:
                     logger.error(f"⏰ Mistral API timeout with {model}")
-                    if model_idx < len(self.mistral_models) - 1:
+                    if model_idx < len(models) - 1:
                         continue
                     else:
                         return None
                 except Exception as e:
                     logger.error(f"💥 Mistral API call failed with {model}: {e}")
-                    if model_idx < len(self.mistral_models) - 1:
+                    if model_idx < len(models) - 1:
                         continue
                     else:
                         return None
@@ -273,10 +255,14 @@ class AIService:
         if not self.groq_available:
             return None
         
+        # Fastest healthy models first; models with an open circuit are skipped
+        models = [model for _, model in get_llm_router().rank([("groq", m) for m in self.groq_models])]
+        if not models:
+            logger.warning("🔌 All Groq models are circuit-open, skipping")
+            return None
+        
         async with self.groq_semaphore:
-            await self._wait_for_rate_limit("groq")
-            
-            for model_idx, model in enumerate(self.groq_models):
+            for model_idx, model in enumerate(models):
                 try:
                     payload = {
                         "model": model,
@@ -289,9 +275,8 @@ class AIService:
                     
                     timeout_duration = 45.0 + (model_idx * 15.0)
                     
-                    async with httpx.AsyncClient(
-                        timeout=httpx.Timeout(timeout_duration, connect=10.0),
-                        limits=httpx.Limits(max_connections=5, max_keepalive_connections=2)
+                    async with llm_client(
+                        timeout=httpx.Timeout(timeout_duration, connect=10.0)
                     ) as client:
                         logger.info(f"Trying Groq model: {model}")
                         response = await client.post(
@@ -307,26 +292,9 @@ class AIService:
                             return content
                         
                         elif response.status_code == 429:
+                            # Gateway already paused this key for Groq's "try again in" hint
                             logger.warning(f"⚠️ Groq rate limit hit with {model}")
-                            try:
-                                error_data = response.json()
-                                error_msg = error_data.get("error", {}).get("message", "")
-                                if "Please try again in" in error_msg:
-                                    import re
-                                    match = re.search(r'(\d+(?:\.\d+)?)ms', error_msg)
-                                    if match:
-                                        wait_ms = float(match.group(1))
-                                        wait_time = (wait_ms / 1000.0) + 2.0
-                                        logger.info(f"Groq suggested wait: {wait_time:.1f}s")
-                                        await asyncio.sleep(min(wait_time, 10.0))
-                                    else:
-                                        await asyncio.sleep(8.0)
-                                else:
-                                    await asyncio.sleep(6.0)
-                            except:
-                                await asyncio.sleep(6.0)
-                            
-                            if model_idx < len(self.groq_models) - 1:
+                            if model_idx < len(models) - 1:
                                 continue
                             else:
                                 logger.error("All Groq models hit rate limit")
@@ -334,20 +302,20 @@ class AIService:
                         
                         else:
                             logger.error(f"❌ Groq API error with {model}: {response.status_code}")
-                            if model_idx < len(self.groq_models) - 1:
+                            if model_idx < len(models) - 1:
                                 continue
                             else:
                                 return None
                             
                 except asyncio.TimeoutError:
                     logger.error(f"⏰ Groq API timeout with {model}")
-                    if model_idx < len(self.groq_models) - 1:
+                    if model_idx < len(models) - 1:
                         continue
                     else:
                         return None
                 except Exception as e:
                     logger.error(f"💥 Groq API call failed with {model}: {e}")
-                    if model_idx < len(self.groq_models) - 1:
+                    if model_idx < len(models) - 1:
                         continue
                     else:
                         return None
@@ -553,7 +521,7 @@ Current context: Regular person sharing on Reddit in {datetime.now().strftime('%
             
             messages = [{"role": "user", "content": prompt}]
             
-            # Try Mistral first
+            # Background automation: nobody is waiting, so no hedging - Mistral first, then Groq
             if self.mistral_available:
                 try:
                     logger.info("🎯 Using Mistral AI for natural content generation")
@@ -7,13 +7,28 @@ import os
 import asyncio
 import logging
 import json
-import httpx
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple, Union
 import random
 
+from llm_gateway import llm_client
+from llm_router import get_llm_router
+from llm_stream import LabeledFieldParser, stream_chat
+
 logger = logging.getLogger(__name__)
 
+# Batched comment replies: one structured call answers up to this many comments
+COMMENT_BATCH_MAX_ITEMS = int(os.getenv("COMMENT_BATCH_MAX_ITEMS", "20"))
+COMMENT_BATCH_TOKEN_BUDGET = int(os.getenv("COMMENT_BATCH_TOKEN_BUDGET", "2500"))   # prompt tokens per call
+COMMENT_REPLY_MAX_TOKENS = 80                                                        # output tokens per reply
+
+CONTENT_SYSTEM_PROMPT = (
+    "You are an expert multilingual content creator specializing in social media and digital marketing. "
+    "You can create engaging, authentic, and platform-optimized content in multiple Indian languages "
+    "including Hindi, Tamil, Telugu, Bengali, Marathi, and Hinglish. Always maintain cultural sensitivity "
+    "and use appropriate regional context."
+)
+
 class AIService2:
     """Enhanced AI service for YouTube and WhatsApp content generation with multilingual support"""
     
@@ -28,6 +43,10 @@ class AIService2:
             "groq": bool(self.groq_api_key),
             "mistral": bool(self.mistral_api_key)
         }
+        self.service_models = {
+            "groq": "llama-3.3-70b-versatile",
+            "mistral": "mistral-medium"
+        }
         
         # Set primary service
         if self.groq_api_key:
@@ -170,7 +189,7 @@ class AIService2:
     async def _test_groq(self) -> bool:
         """Test Groq API connection"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with llm_client() as client:
                 response = await client.post(
                     "https://api.groq.com/openai/v1/chat/completions",
                     headers={
@@ -191,7 +210,7 @@ class AIService2:
     async def _test_mistral(self) -> bool:
         """Test Mistral API connection"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with llm_client() as client:
                 response = await client.post(
                     "https://api.mistral.ai/v1/chat/completions",
                     headers={
@@ -232,23 +251,10 @@ class AIService2:
             result = await self._generate_with_primary_service(prompt)
             
             if result.get("success"):
-                content = result.get("content", "")
-                parsed_content = self._parse_youtube_content(content, content_type)
-                
-                return {
-                    "success": True,
-                    "title": parsed_content.get("title"),
-                    "description": parsed_content.get("description"),
-                    "script": parsed_content.get("script"),
-                    "tags": parsed_content.get("tags", []),
-                    "content_type": content_type,
-                    "language": language,
-                    "region": region,
-                    "ai_service": self.primary_service,
-                    "word_count": len(content.split()),
-                    "estimated_duration": duration_seconds,
-                    "cultural_context": self._get_cultural_context(language, region)
-                }
+                return self._youtube_content_result(
+                    result.get("content", ""), result.get("ai_service", self.primary_service),
+                    content_type, language, region, duration_seconds
+                )
             
             return result
             
@@ -256,6 +262,55 @@ class AIService2:
             logger.error(f"YouTube content generation failed: {e}")
             return {"success": False, "error": str(e)}
     
+    async def stream_youtube_content(
+        self,
+        content_type: str = "shorts",
+        topic: str = "general",
+        target_audience: str = "general",
+        duration_seconds: int = 30,
+        style: str = "engaging",
+        language: str = "english",
+        region: str = "india",
+        trending_context: dict = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Streaming generate_youtube_content: SSE (event, data) pairs ending with `done`"""
+        if self.is_mock:
+            yield "done", self._get_mock_youtube_content(content_type, topic, language)
+            return
+        
+        prompt = self._create_multilingual_youtube_prompt(
+            content_type, topic, target_audience, duration_seconds, style, language, region, trending_context
+        )
+        parser = LabeledFieldParser(["TITLE", "DESCRIPTION", "SCRIPT", "TAGS"])
+        
+        async for event, data in stream_chat(self._stream_routes(prompt), parser, timeout=60):
+            if event != "complete":
+                yield event, data
+            elif data["text"]:
+                yield "done", self._youtube_content_result(
+                    data["text"], data["service"], content_type, language, region, duration_seconds
+                )
+            else:
+                yield "done", {"success": False, "error": "All AI services failed"}
+    
+    def _youtube_content_result(self, content: str, service: str, content_type: str,
+                                language: str, region: str, duration_seconds: int) -> Dict[str, Any]:
+        parsed_content = self._parse_youtube_content(content, content_type)
+        return {
+            "success": True,
+            "title": parsed_content.get("title"),
+            "description": parsed_content.get("description"),
+            "script": parsed_content.get("script"),
+            "tags": parsed_content.get("tags", []),
+            "content_type": content_type,
+            "language": language,
+            "region": region,
+            "ai_service": service,
+            "word_count": len(content.split()),
+            "estimated_duration": duration_seconds,
+            "cultural_context": self._get_cultural_context(language, region)
+        }
+    
     async def generate_product_promo_content(
         self,
         product_data: Dict,
@@ -563,10 +618,52 @@ CULTURAL NOTES: Include appropriate cultural references, festivals, or regional
             if self.is_mock:
                 return self._generate_mock_community_post(post_type, topic, target_audience, language)
             
-            lang_info = self.supported_languages.get(language, self.supported_languages["english"])
-            cultural_context = self._get_cultural_context(language, region)
+            prompt = self._create_community_post_prompt(post_type, topic, target_audience, language, region)
             
-            prompt = f"""Create a {post_type} community post about {topic} for {target_audience} in {lang_info["native_name"]} language.
+            result = await self._generate_with_primary_service(prompt)
+            
+            if result.get("success"):
+                return self._community_post_result(
+                    result.get("content", ""), result.get("ai_service", self.primary_service), post_type, language
+                )
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"Community post generation failed: {e}")
+            return {"success": False, "error": str(e)}
+    
+    async def stream_community_post(
+        self,
+        post_type: str = "text",
+        topic: str = "general",
+        target_audience: str = "general",
+        language: str = "english",
+        region: str = "india"
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Streaming generate_community_post: SSE (event, data) pairs ending with `done`"""
+        if self.is_mock:
+            yield "done", self._generate_mock_community_post(post_type, topic, target_audience, language)
+            return
+        
+        prompt = self._create_community_post_prompt(post_type, topic, target_audience, language, region)
+        parser = LabeledFieldParser(["CONTENT", "OPTION1", "OPTION2", "OPTION3", "OPTION4"])
+        
+        async for event, data in stream_chat(self._stream_routes(prompt), parser, timeout=60):
+            if event != "complete":
+                yield event, data
+            elif data["text"]:
+                yield "done", self._community_post_result(data["text"], data["service"], post_type, language)
+            else:
+                yield "done", {"success": False, "error": "All AI services failed"}
+    
+    def _create_community_post_prompt(self, post_type: str, topic: str, target_audience: str,
+                                      language: str, region: str) -> str:
+        """Prompt shared by generate_community_post and stream_community_post"""
+        lang_info = self.supported_languages.get(language, self.supported_languages["english"])
+        cultural_context = self._get_cultural_context(language, region)
+        
+        return f"""Create a {post_type} community post about {topic} for {target_audience} in {lang_info["native_name"]} language.
             
             Requirements:
             - Language: {lang_info["native_name"]} ({lang_info["name"]})
@@ -587,27 +684,17 @@ CULTURAL NOTES: Include appropriate cultural references, festivals, or regional
             OPTION3: [third option if poll/quiz in {lang_info["native_name"]}]
             OPTION4: [fourth option if poll/quiz in {lang_info["native_name"]}]
             """
-            
-            result = await self._generate_with_primary_service(prompt)
-            
-            if result.get("success"):
-                content = result.get("content", "")
-                parsed = self._parse_community_post_content(content, post_type)
-                
-                return {
-                    "success": True,
-                    "content": parsed.get("content"),
-                    "options": parsed.get("options", []),
-                    "post_type": post_type,
-                    "language": language,
-                    "ai_service": self.primary_service
-                }
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Community post generation failed: {e}")
-            return {"success": False, "error": str(e)}
+    
+    def _community_post_result(self, content: str, service: str, post_type: str, language: str) -> Dict[str, Any]:
+        parsed = self._parse_community_post_content(content, post_type)
+        return {
+            "success": True,
+            "content": parsed.get("content"),
+            "options": parsed.get("options", []),
+            "post_type": post_type,
+            "language": language,
+            "ai_service": service
+        }
     
     def _parse_community_post_content(self, content: str, post_type: str) -> Dict[str, Any]:
         """Parse AI-generated community post content"""
@@ -870,6 +957,164 @@ Generate only the reply text:"""
             emotion = self._detect_comment_emotion(comment_text)
             return self._generate_mock_comment_reply(comment_text, language, emotion)
 
+    async def generate_comment_replies_batch(
+        self,
+        comments: List[Dict[str, Any]],
+        video_title: str = "",
+        reply_style: str = "friendly",
+        language: str = "english",
+        custom_prompt: str = "",
+        video_description: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate replies for several comments on one video with one LLM call per batch.
+        comments: [{"comment_id": ..., "text": ..., "language": optional}]
+        Returns one result per comment (same shape as generate_comment_reply, plus comment_id),
+        in input order. Items the model skipped or garbled get the mock reply.
+        """
+        items = []
+        for index, comment in enumerate(comments):
+            text = comment.get("text") or comment.get("comment_text") or ""
+            items.append({
+                "key": f"c{index + 1}",
+                "comment_id": comment.get("comment_id"),
+                "text": text,
+                "language": comment.get("language") or language,
+                "emotion": self._detect_comment_emotion(text)
+            })
+        
+        replies: Dict[str, str] = {}
+        if not self.is_mock:
+            for batch in self._split_comment_batches(items):
+                try:
+                    replies.update(await self._generate_reply_batch(
+                        batch, video_title, reply_style, custom_prompt, video_description
+                    ))
+                except Exception as e:
+                    logger.error(f"Batch comment reply generation failed: {e}")
+        
+        results = []
+        fallbacks = 0
+        for item in items:
+            reply_text = replies.get(item["key"])
+            if reply_text:
+                result = {
+                    "success": True,
+                    "reply": reply_text,
+                    "language": item["language"],
+                    "emotion": item["emotion"],
+                    "ai_service": self.primary_service
+                }
+            else:
+                fallbacks += 1
+                result = self._generate_mock_comment_reply(item["text"], item["language"], item["emotion"])
+            result["comment_id"] = item["comment_id"]
+            results.append(result)
+        
+        logger.info(f"💬 Batch replies: {len(items) - fallbacks}/{len(items)} from AI, {fallbacks} fallback")
+        return results
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # ~3 chars per token keeps Devanagari/Hinglish comments on the safe side
+        return len(text) // 3 + 1
+
+    def _split_comment_batches(self, items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group comments so each call stays under COMMENT_BATCH_TOKEN_BUDGET prompt tokens"""
+        batches, current, used = [], [], 0
+        for item in items:
+            cost = self._estimate_tokens(item["text"]) + 15
+            if current and (used + cost > COMMENT_BATCH_TOKEN_BUDGET or len(current) >= COMMENT_BATCH_MAX_ITEMS):
+                batches.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _generate_reply_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        video_title: str,
+        reply_style: str,
+        custom_prompt: str,
+        video_description: str = ""
+    ) -> Dict[str, str]:
+        """One structured call for a batch; returns {key: validated reply} for the items that passed"""
+        comment_lines = []
+        for item in batch:
+            lang_info = self.supported_languages.get(item["language"], self.supported_languages["english"])
+            text = item["text"].replace("\n", " ").replace('"', "'")
+            comment_lines.append(
+                f'[{item["key"]}] (reply in {lang_info["native_name"]}, emotion: {item["emotion"]}) "{text}"'
+            )
+        
+        video_context = f' on the video "{video_title}"' if video_title else ""
+        about = video_description.strip().replace("\n", " ")[:300]
+        prompt = f"""You are the creator replying to YouTube comments{video_context}.
+"""
+        if about:
+            prompt += f"Video description: {about}\n"
+        prompt += f"""
+Style: {reply_style}
+Rules for EVERY reply:
+- Use the language given for that comment
+- Maximum 30 words
+- Use 1-2 appropriate emojis
+- Match the emotion: love=❤️😊, funny=😂🤣, angry=😇🙏, question=👍
+- Each reply answers only its own comment
+
+Comments:
+{chr(10).join(comment_lines)}
+"""
+        if custom_prompt:
+            prompt += f"\nExtra: {custom_prompt}\n"
+        prompt += (
+            f"\nReturn ONLY a JSON object whose keys are the comment ids "
+            f"({', '.join(item['key'] for item in batch)}) and whose values are the reply texts."
+        )
+        
+        result = await self._generate_with_primary_service(
+            prompt, max_tokens=COMMENT_REPLY_MAX_TOKENS * len(batch) + 50
+        )
+        if not result.get("success"):
+            logger.warning(f"Batch reply call failed: {result.get('error')}")
+            return {}
+        
+        parsed = self._parse_json_reply_map(result.get("content", ""))
+        replies = {}
+        for item in batch:
+            reply_text = self._validate_batch_reply(parsed.get(item["key"]), item["text"])
+            if reply_text:
+                replies[item["key"]] = reply_text
+        return replies
+
+    def _parse_json_reply_map(self, content: str) -> Dict[str, Any]:
+        """Extract the {id: reply} object from a model response (tolerates code fences / chatter)"""
+        start, end = content.find("{"), content.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            data = json.loads(content[start:end + 1])
+            return data if isinstance(data, dict) else {}
+        except json.JSONDecodeError:
+            return {}
+
+    def _validate_batch_reply(self, reply: Any, comment_text: str) -> Optional[str]:
+        """Per-item check on a batched reply; None means use the fallback"""
+        if not isinstance(reply, str):
+            return None
+        reply_text = self._clean_reply_text(reply.strip())
+        if not reply_text or len(reply_text.split()) > 40:
+            return None
+        if reply_text.strip().lower() == comment_text.strip().lower():
+            return None
+        # Leaked structure from a malformed batch answer
+        if any(marker in reply_text for marker in ("{", "}", "[c", '":')):
+            return None
+        return reply_text
+
     def _detect_comment_emotion(self, text: str) -> str:
         """Detect emotion from comment text"""
         text_lower = text.lower()
@@ -943,23 +1188,61 @@ Generate only the reply text:"""
             "ai_service": "mock"
         }
     
-    async def _generate_with_primary_service(self, prompt: str) -> Dict[str, Any]:
+    async def _generate_with_primary_service(self, prompt: str, max_tokens: int = 2000) -> Dict[str, Any]:
         """Generate content with primary AI service"""
         try:
-            if self.primary_service == "groq":
-                return await self._generate_with_groq(prompt)
-            elif self.primary_service == "mistral":
-                return await self._generate_with_mistral(prompt)
-            else:
+            # primary_service is only the preference; the router skips open
+            # circuits and puts the currently faster provider first
+            preferred = sorted(
+                (name for name, available in self.services.items() if available),
+                key=lambda name: name != self.primary_service
+            )
+            routes = get_llm_router().rank([(name, self.service_models[name]) for name in preferred])
+            if not routes:
                 return {"success": False, "error": "No AI service available"}
+            
+            result = {"success": False, "error": "No AI service available"}
+            for service, _ in routes:
+                generate = self._generate_with_groq if service == "groq" else self._generate_with_mistral
+                result = await generate(prompt, max_tokens)
+                if result.get("success"):
+                    return result
+                logger.warning(f"{service} generation failed, trying next provider: {result.get('error')}")
+            return result
         except Exception as e:
             logger.error(f"AI generation failed: {e}")
             return {"success": False, "error": str(e)}
     
-    async def _generate_with_groq(self, prompt: str) -> Dict[str, Any]:
+    def _stream_routes(self, prompt: str, max_tokens: int = 2000) -> List[Tuple[str, str, dict, dict]]:
+        """Same requests as _generate_with_groq/_generate_with_mistral, as stream_chat routes (primary first)"""
+        endpoints = {
+            "groq": ("https://api.groq.com/openai/v1/chat/completions", self.groq_api_key),
+            "mistral": ("https://api.mistral.ai/v1/chat/completions", self.mistral_api_key),
+        }
+        routes = []
+        for service in sorted(endpoints, key=lambda name: name != self.primary_service):
+            url, api_key = endpoints[service]
+            if not api_key:
+                continue
+            routes.append((service, url, {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            }, {
+                "model": self.service_models[service],
+                "messages": [
+                    {"role": "system", "content": CONTENT_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                "max_tokens": max_tokens,
+                "temperature": 0.8,
+                "top_p": 0.9
+            }))
+        return routes
+    
+    async def _generate_with_groq(self, prompt: str, max_tokens: int = 2000) -> Dict[str, Any]:
         """Generate content using Groq API"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with llm_client() as client:
                 response = await client.post(
                     "https://api.groq.com/openai/v1/chat/completions",
                     headers={
@@ -970,15 +1253,15 @@ Generate only the reply text:"""
                         "messages": [
                             {
                                 "role": "system",
-                                "content": "You are an expert multilingual content creator specializing in social media and digital marketing. You can create engaging, authentic, and platform-optimized content in multiple Indian languages including Hindi, Tamil, Telugu, Bengali, Marathi, and Hinglish. Always maintain cultural sensitivity and use appropriate regional context."
+                                "content": CONTENT_SYSTEM_PROMPT
                             },
                             {
                                 "role": "user",
                                 "content": prompt
                             }
                         ],
-                        "model": "llama-3.3-70b-versatile",
-                        "max_tokens": 2000,
+                        "model": self.service_models["groq"],
+                        "max_tokens": max_tokens,
                         "temperature": 0.8,
                         "top_p": 0.9
                     },
@@ -993,7 +1276,7 @@ Generate only the reply text:"""
                         "success": True,
                         "content": content.strip(),
                         "ai_service": "groq",
-                        "model": "llama-3.3-70b-versatile",
+                        "model": self.service_models["groq"],
                         "tokens_used": data.get("usage", {}).get("total_tokens", 0)
                     }
                 else:
@@ -1008,10 +1291,10 @@ Generate only the reply text:"""
             logger.error(f"Groq generation failed: {e}")
             return {"success": False, "error": str(e)}
     
-    async def _generate_with_mistral(self, prompt: str) -> Dict[str, Any]:
+    async def _generate_with_mistral(self, prompt: str, max_tokens: int = 2000) -> Dict[str, Any]:
         """Generate content using Mistral API"""
         try:
-            async with httpx.AsyncClient() as client:
+            async with llm_client() as client:
                 response = await client.post(
                     "https://api.mistral.ai/v1/chat/completions",
                     headers={
@@ -1019,18 +1302,18 @@ Generate only the reply text:"""
                         "Content-Type": "application/json"
                     },
                     json={
-                        "model": "mistral-medium",
+                        "model": self.service_models["mistral"],
                         "messages": [
                             {
                                 "role": "system",
-                                "content": "You are an expert multilingual content creator specializing in social media and digital marketing. You can create engaging, authentic, and platform-optimized content in multiple Indian languages including Hindi, Tamil, Telugu, Bengali, Marathi, and Hinglish. Always maintain cultural sensitivity and use appropriate regional context."
+                                "content": CONTENT_SYSTEM_PROMPT
                             },
                             {
                                 "role": "user",
                                 "content": prompt
                             }
                         ],
-                        "max_tokens": 2000,
+                        "max_tokens": max_tokens,
                         "temperature": 0.8,
                         "top_p": 0.9
                     },
@@ -1045,7 +1328,7 @@ Generate only the reply text:"""
                         "success": True,
                         "content": content.strip(),
                         "ai_service": "mistral",
-                        "model": "mistral-medium",
+                        "model": self.service_models["mistral"],
                         "tokens_used": data.get("usage", {}).get("total_tokens", 0)
                     }
                 else:
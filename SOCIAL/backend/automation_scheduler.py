@@ -0,0 +1,292 @@
+"""
+automation_scheduler.py - Timer-Heap Scheduler for Upload-Time Automations
+==================================================
+Fires product / Pixabay automation jobs at each config's `upload_times`
+(HH:MM, IST). Replaces the once-a-minute loop that re-read every config and
+compared `current_time in upload_times`, which silently lost a slot whenever
+an iteration drifted past its minute.
+
+FEATURES:
+- One min-heap of next-fire instants for every (kind, user, HH:MM) slot;
+  the loop sleeps until the earliest deadline (or an earlier replan)
+- Catch-up: a slot noticed up to AUTOMATION_CATCHUP_GRACE seconds late still
+  fires; later than that it's recorded as missed. Several overdue slots of
+  one user collapse into a single run
+- replan(kind, user_id) re-reads and re-plans just that user (start/stop
+  endpoints); a full resync every AUTOMATION_RESYNC_INTERVAL picks up changes
+  made elsewhere and only re-plans users whose upload_times changed
+- Heap entries carry a per-user generation; replanned users' old entries are
+  dropped lazily when they reach the top
+
+USAGE:
+    scheduler = get_automation_scheduler()
+    scheduler.register("product", load_all, load_user, fire)
+    scheduler.start()
+    await scheduler.replan("product", user_id)      # after a config change
+==================================================
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+AUTOMATION_CATCHUP_GRACE = int(os.getenv("AUTOMATION_CATCHUP_GRACE", "600"))       # seconds late a slot may still fire
+AUTOMATION_RESYNC_INTERVAL = int(os.getenv("AUTOMATION_RESYNC_INTERVAL", "900"))   # full config re-read
+AUTOMATION_RETRY_DELAY = 60                                                        # resync retry when the DB is down
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# load_all() -> [(user_id, config_data)], load_user(user_id) -> config_data | None,
+# fire(user_id, config_data, slot) runs one scheduled job
+ConfigSource = Callable[[], Awaitable[List[Tuple[str, dict]]]]
+UserConfigSource = Callable[[str], Awaitable[Optional[dict]]]
+SlotHandler = Callable[[str, dict, datetime], Awaitable[None]]
+
+
+def parse_upload_time(value) -> Optional[Tuple[int, int]]:
+    try:
+        hour, minute = (int(part) for part in str(value).split(":")[:2])
+    except ValueError:
+        return None
+    if 0 <= hour < 24 and 0 <= minute < 60:
+        return hour, minute
+    return None
+
+
+def next_fire_time(hour: int, minute: int, after: datetime) -> datetime:
+    """First IST instant at hour:minute strictly after `after`"""
+    slot = after.astimezone(IST).replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if slot <= after:
+        slot += timedelta(days=1)
+    return slot
+
+
+@dataclass
+class AutomationKind:
+    load_all: ConfigSource
+    load_user: UserConfigSource
+    fire: SlotHandler
+
+
+@dataclass
+class UserPlan:
+    config: dict
+    times: Tuple[Tuple[int, int], ...]
+    generation: int
+    last_fired: Optional[datetime] = None
+
+
+@dataclass(order=True)
+class ScheduledSlot:
+    fire_at: float
+    seq: int
+    kind: str = field(compare=False)
+    user_id: str = field(compare=False)
+    generation: int = field(compare=False)
+    hour: int = field(compare=False)
+    minute: int = field(compare=False)
+
+
+class AutomationScheduler:
+    """Min-heap of upcoming upload slots across every registered automation kind"""
+
+    def __init__(self):
+        self._kinds: Dict[str, AutomationKind] = {}
+        self._plans: Dict[Tuple[str, str], UserPlan] = {}
+        self._heap: List[ScheduledSlot] = []
+        self._seq = 0
+        self._generation = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._next_resync = 0.0
+        self.stats = {"fired": 0, "fired_late": 0, "missed": 0, "coalesced": 0,
+                      "replans": 0, "resyncs": 0, "stale_entries": 0, "errors": 0}
+
+    def register(self, kind: str, load_all: ConfigSource, load_user: UserConfigSource, fire: SlotHandler):
+        self._kinds[kind] = AutomationKind(load_all, load_user, fire)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"⏰ Automation scheduler started ({', '.join(self._kinds)})")
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def _plan(self, kind: str, user_id: str, config: Optional[dict], now: datetime):
+        """(Re)plan one user's slots; config None or disabled removes the user"""
+        key = (kind, user_id)
+        times = ()
+        if config and config.get("enabled", False):
+            times = tuple(sorted({t for t in map(parse_upload_time, config.get("upload_times", [])) if t}))
+
+        previous = self._plans.get(key)
+        if previous and previous.times == times:
+            previous.config = config
+            return
+        if not times:
+            self._plans.pop(key, None)
+            return
+
+        self._generation += 1
+        self._plans[key] = UserPlan(config, times, self._generation,
+                                    previous.last_fired if previous else None)
+        earliest = self._heap[0].fire_at if self._heap else None
+        for hour, minute in times:
+            self._push(kind, user_id, self._generation, hour, minute, next_fire_time(hour, minute, now))
+        if earliest is None or self._heap[0].fire_at < earliest:
+            self._wakeup.set()
+
+    def _push(self, kind: str, user_id: str, generation: int, hour: int, minute: int, fire_at: datetime):
+        self._seq += 1
+        heapq.heappush(self._heap, ScheduledSlot(fire_at.timestamp(), self._seq, kind, user_id, generation, hour, minute))
+
+    async def replan(self, kind: str, user_id: str):
+        """Re-read one user's config and re-plan only that user"""
+        registered = self._kinds.get(kind)
+        if not registered:
+            return
+        try:
+            config = await registered.load_user(user_id)
+        except Exception as e:
+            logger.error(f"❌ Scheduler replan failed for {kind}/{user_id}: {e}")
+            return
+        self._plan(kind, user_id, config, datetime.now(IST))
+        self.stats["replans"] += 1
+
+    async def resync(self):
+        """Full re-read; only users whose upload_times changed are re-planned"""
+        now = datetime.now(IST)
+        for kind, registered in self._kinds.items():
+            configs = dict(await registered.load_all())
+            for user_id in [uid for (k, uid) in self._plans if k == kind and uid not in configs]:
+                self._plan(kind, user_id, None, now)
+            for user_id, config in configs.items():
+                self._plan(kind, user_id, config, now)
+        self.stats["resyncs"] += 1
+        self._next_resync = time.time() + AUTOMATION_RESYNC_INTERVAL
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+
+    async def _run(self):
+        while True:
+            try:
+                if time.time() >= self._next_resync:
+                    await self.resync()
+                await self._fire_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                self._next_resync = time.time() + AUTOMATION_RETRY_DELAY
+                logger.error(f"❌ Automation scheduler error: {e}")
+
+            deadline = min(self._heap[0].fire_at, self._next_resync) if self._heap else self._next_resync
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, deadline - time.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire_due(self):
+        now_ts = time.time()
+        due: Dict[Tuple[str, str], List[ScheduledSlot]] = {}
+
+        while self._heap and self._heap[0].fire_at <= now_ts:
+            entry = heapq.heappop(self._heap)
+            plan = self._plans.get((entry.kind, entry.user_id))
+            if not plan or plan.generation != entry.generation:
+                self.stats["stale_entries"] += 1
+                continue
+            # Next occurrence of this HH:MM goes back on the heap straight away
+            slot = datetime.fromtimestamp(entry.fire_at, IST)
+            self._push(entry.kind, entry.user_id, entry.generation, entry.hour, entry.minute,
+                       next_fire_time(entry.hour, entry.minute, slot))
+            due.setdefault((entry.kind, entry.user_id), []).append(entry)
+
+        for (kind, user_id), entries in due.items():
+            plan = self._plans[(kind, user_id)]
+            on_time = [e for e in entries if now_ts - e.fire_at <= AUTOMATION_CATCHUP_GRACE]
+            missed = len(entries) - len(on_time)
+            if missed:
+                self.stats["missed"] += missed
+                logger.warning(f"⚠️ {kind}/{user_id}: {missed} slot(s) more than {AUTOMATION_CATCHUP_GRACE}s overdue, skipped")
+            if not on_time:
+                continue
+            if len(on_time) > 1:
+                self.stats["coalesced"] += len(on_time) - 1
+
+            latest = on_time[-1]
+            slot = datetime.fromtimestamp(latest.fire_at, IST)
+            lateness = now_ts - latest.fire_at
+            if lateness > 60:
+                self.stats["fired_late"] += 1
+                logger.info(f"⏰ {kind}/{user_id}: catching up {slot.strftime('%H:%M')} slot ({lateness:.0f}s late)")
+
+            plan.last_fired = slot
+            self.stats["fired"] += 1
+            try:
+                await self._kinds[kind].fire(user_id, plan.config, slot)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"❌ {kind} automation fire failed for {user_id}: {e}")
+
+    def get_status(self) -> dict:
+        live = sorted(
+            entry for entry in self._heap
+            if (plan := self._plans.get((entry.kind, entry.user_id))) and plan.generation == entry.generation
+        )
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "kinds": list(self._kinds),
+            "planned_users": len(self._plans),
+            "heap_size": len(self._heap),
+            "next_slots": [
+                {
+                    "kind": entry.kind,
+                    "user_id": entry.user_id,
+                    "fire_at": datetime.fromtimestamp(entry.fire_at, IST).isoformat(),
+                }
+                for entry in live[:10]
+            ],
+            "catchup_grace_seconds": AUTOMATION_CATCHUP_GRACE,
+            "resync_interval_seconds": AUTOMATION_RESYNC_INTERVAL,
+            **self.stats,
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+automation_scheduler = None
+
+def get_automation_scheduler() -> AutomationScheduler:
+    """Get global automation scheduler instance"""
+    global automation_scheduler
+    if not automation_scheduler:
+        automation_scheduler = AutomationScheduler()
+    return automation_scheduler
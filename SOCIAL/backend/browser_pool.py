@@ -0,0 +1,404 @@
+"""
+browser_pool.py - Persistent Playwright Browser Pool
+==================================================
+Warm Chromium instances shared by UniversalProductScraper so product and
+category scrapes no longer pay a 1-3s / ~150MB cold start per call.
+
+FEATURES:
+- N long-lived browsers, each handing out isolated BrowserContexts
+- Health check on checkout (disconnected browsers are relaunched)
+- Recycling after K contexts served or when browser RSS crosses a threshold
+- Bounded wait queue: callers beyond BROWSER_MAX_QUEUE fail fast
+
+USAGE:
+    lease = await pool.acquire()
+    try:
+        page = await lease.context.new_page()
+        ...
+    finally:
+        await pool.release(lease)
+
+    # or
+    async with pool.context() as context:
+        ...
+==================================================
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_CONTEXTS_PER_BROWSER = int(os.getenv("BROWSER_CONTEXTS_PER_BROWSER", "2"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "50"))          # recycle after K contexts
+BROWSER_MAX_MEMORY_MB = int(os.getenv("BROWSER_MAX_MEMORY_MB", "700"))  # recycle above this RSS
+BROWSER_MAX_QUEUE = int(os.getenv("BROWSER_MAX_QUEUE", "20"))
+BROWSER_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "90"))
+
+RENDER_BROWSERS_PATH = '/opt/render/project/.browsers'
+RENDER_CHROMIUM_PATH = '/opt/render/project/.browsers/chromium-1148/chrome-linux/chrome'
+
+
+class BrowserPoolFull(Exception):
+    """Raised when the wait queue is full or a context could not be acquired in time"""
+
+
+@dataclass
+class PooledBrowser:
+    """One warm Chromium instance"""
+    slot_id: int
+    browser: object
+    pids: Set[int]
+    launched_at: float
+    contexts_served: int = 0
+    active: int = 0
+    retiring: bool = False
+
+
+@dataclass
+class BrowserLease:
+    """An isolated context checked out of the pool"""
+    context: object
+    entry: PooledBrowser
+    acquired_at: float
+    released: bool = False
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+class BrowserPool:
+    """Fixed set of warm browsers handing out isolated contexts"""
+
+    def __init__(
+        self,
+        browser_args: List[str],
+        context_options: dict,
+        size: int = BROWSER_POOL_SIZE,
+        contexts_per_browser: int = BROWSER_CONTEXTS_PER_BROWSER,
+        max_pages: int = BROWSER_MAX_PAGES,
+        max_memory_mb: int = BROWSER_MAX_MEMORY_MB,
+        max_queue: int = BROWSER_MAX_QUEUE,
+        acquire_timeout: float = BROWSER_ACQUIRE_TIMEOUT,
+    ):
+        self.browser_args = browser_args
+        self.context_options = context_options
+        self.size = max(1, size)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.max_queue = max_queue
+        self.acquire_timeout = acquire_timeout
+
+        self._playwright = None
+        self._slots: List[Optional[PooledBrowser]] = [None] * self.size
+        self._draining: List[PooledBrowser] = []
+        self._capacity: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._waiting = 0
+        self.stats = {
+            "launched": 0, "recycled": 0, "crashed": 0,
+            "contexts_served": 0, "rejected": 0, "timeouts": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Launch / close
+    # ------------------------------------------------------------------
+
+    def _ensure_primitives(self):
+        if self._capacity is None:
+            self._capacity = asyncio.Semaphore(self.size * self.contexts_per_browser)
+            self._lock = asyncio.Lock()
+
+    async def _ensure_playwright(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+            logger.info("🎭 Playwright driver started for browser pool")
+
+    async def _launch(self, slot_id: int) -> PooledBrowser:
+        """Launch one Chromium - RENDER COMPATIBLE"""
+        await self._ensure_playwright()
+
+        launch_options = {
+            'headless': True,
+            'args': self.browser_args
+        }
+
+        if os.path.exists(RENDER_BROWSERS_PATH):
+            if os.path.exists(RENDER_CHROMIUM_PATH):
+                launch_options['executable_path'] = RENDER_CHROMIUM_PATH
+                logger.info(f"✅ Using Render Chromium: {RENDER_CHROMIUM_PATH}")
+            else:
+                logger.warning(f"⚠️ Chromium not found at {RENDER_CHROMIUM_PATH}")
+
+        try:
+            browser = await self._playwright.chromium.launch(**launch_options)
+        except Exception as e:
+            logger.error(f"Browser launch failed: {e}")
+            if 'executable_path' in launch_options:
+                del launch_options['executable_path']
+                logger.info("Retrying without executable_path...")
+                browser = await self._playwright.chromium.launch(**launch_options)
+            else:
+                raise
+
+        pids = await self._browser_pids(browser)
+        self.stats["launched"] += 1
+        logger.info(f"🌐 Browser slot {slot_id} launched (pid {', '.join(map(str, pids)) or 'unknown'})")
+        return PooledBrowser(slot_id=slot_id, browser=browser, pids=pids, launched_at=time.monotonic())
+
+    async def _close_browser(self, entry: PooledBrowser):
+        try:
+            await entry.browser.close()
+        except Exception as e:
+            logger.warning(f"Browser close warning (slot {entry.slot_id}): {e}")
+
+    def _retire(self, entry: PooledBrowser, reason: str):
+        """Take a browser out of rotation; it closes once its last context is released"""
+        if entry.retiring:
+            return
+        entry.retiring = True
+        if self._slots[entry.slot_id] is entry:
+            self._slots[entry.slot_id] = None
+        self._draining.append(entry)
+        logger.info(f"♻️ Recycling browser slot {entry.slot_id} ({reason}, {entry.contexts_served} contexts served)")
+
+    async def _reap_draining(self):
+        for entry in [e for e in self._draining if e.active == 0]:
+            self._draining.remove(entry)
+            await self._close_browser(entry)
+
+    # ------------------------------------------------------------------
+    # Health
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def _browser_pids(browser) -> Set[int]:
+        """PID of the Chromium browser process, asked from the browser itself over CDP"""
+        if not PSUTIL_AVAILABLE:
+            return set()
+        try:
+            session = await browser.new_browser_cdp_session()
+            try:
+                info = await session.send("SystemInfo.getProcessInfo")
+            finally:
+                await session.detach()
+            return {p["id"] for p in info.get("processInfo", []) if p.get("type") == "browser"}
+        except Exception as e:
+            logger.debug(f"Browser PID lookup failed: {e}")
+            return set()
+
+    @staticmethod
+    def _memory_mb(entry: PooledBrowser) -> float:
+        """RSS of the browser's process tree (0 when psutil is unavailable)"""
+        if not PSUTIL_AVAILABLE or not entry.pids:
+            return 0.0
+        total = 0
+        seen = set()
+        for pid in entry.pids:
+            try:
+                proc = psutil.Process(pid)
+                for p in [proc] + proc.children(recursive=True):
+                    if p.pid not in seen:
+                        seen.add(p.pid)
+                        total += p.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def _is_healthy(self, entry: PooledBrowser) -> bool:
+        try:
+            return entry.browser.is_connected()
+        except Exception:
+            return False
+
+    def _recycle_reason(self, entry: PooledBrowser) -> Optional[str]:
+        if not self._is_healthy(entry):
+            return "disconnected"
+        if self.max_pages and entry.contexts_served >= self.max_pages:
+            return "page limit"
+        if self.max_memory_mb and self._memory_mb(entry) > self.max_memory_mb:
+            return "memory limit"
+        return None
+
+    # ------------------------------------------------------------------
+    # Checkout
+    # ------------------------------------------------------------------
+
+    async def _checkout(self) -> PooledBrowser:
+        """Pick the least-loaded healthy browser, launching into empty slots"""
+        async with self._lock:
+            for entry in [e for e in self._slots if e is not None]:
+                if not self._is_healthy(entry):
+                    self.stats["crashed"] += 1
+                    self._retire(entry, "disconnected")
+
+            candidates = [
+                e for e in self._slots
+                if e is not None and e.active < self.contexts_per_browser
+            ]
+            empty = [i for i, e in enumerate(self._slots) if e is None]
+
+            # Prefer warming another slot over stacking contexts on one browser
+            if empty and (not candidates or min(e.active for e in candidates) > 0):
+                entry = await self._launch(empty[0])
+                self._slots[empty[0]] = entry
+            elif candidates:
+                entry = min(candidates, key=lambda e: e.active)
+            else:
+                raise BrowserPoolFull("No browser capacity available")
+
+            entry.active += 1
+            return entry
+
+    async def acquire(self) -> BrowserLease:
+        """Check out an isolated context; waits in a bounded queue when all are busy"""
+        self._ensure_primitives()
+
+        if not self._capacity.locked():
+            await self._capacity.acquire()
+        else:
+            if self._waiting >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise BrowserPoolFull(f"Browser pool queue full ({self._waiting} waiting)")
+
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._capacity.acquire(), timeout=self.acquire_timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise BrowserPoolFull(f"Timed out after {self.acquire_timeout}s waiting for a browser")
+            finally:
+                self._waiting -= 1
+
+        entry = None
+        try:
+            entry = await self._checkout()
+            try:
+                context = await entry.browser.new_context(**self.context_options)
+            except Exception as e:
+                # Browser died between health check and use - replace it once
+                logger.warning(f"Context creation failed on slot {entry.slot_id}: {e}")
+                failed, entry = entry, None
+                failed.active -= 1
+                self.stats["crashed"] += 1
+                async with self._lock:
+                    self._retire(failed, "context failure")
+                    await self._reap_draining()
+                entry = await self._checkout()
+                context = await entry.browser.new_context(**self.context_options)
+        except BaseException:
+            if entry is not None and entry.active > 0:
+                entry.active -= 1
+            self._capacity.release()
+            raise
+
+        return BrowserLease(context=context, entry=entry, acquired_at=time.monotonic())
+
+    async def release(self, lease: Optional[BrowserLease]):
+        """Close the lease's context and recycle its browser if it is due"""
+        if lease is None or lease.released:
+            return
+        lease.released = True
+        entry = lease.entry
+
+        try:
+            await lease.context.close()
+        except Exception as e:
+            logger.warning(f"Context close warning: {e}")
+
+        try:
+            async with self._lock:
+                entry.active -= 1
+                entry.contexts_served += 1
+                self.stats["contexts_served"] += 1
+
+                if not entry.retiring:
+                    reason = self._recycle_reason(entry)
+                    if reason:
+                        if reason == "disconnected":
+                            self.stats["crashed"] += 1
+                        else:
+                            self.stats["recycled"] += 1
+                        self._retire(entry, reason)
+
+                await self._reap_draining()
+        finally:
+            self._capacity.release()
+
+    @asynccontextmanager
+    async def context(self):
+        """async with pool.context() as context: ..."""
+        lease = await self.acquire()
+        try:
+            yield lease.context
+        finally:
+            await self.release(lease)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def warm(self, count: int = 1):
+        """Pre-launch browsers so the first scrape skips the cold start"""
+        self._ensure_primitives()
+        async with self._lock:
+            for i in range(min(count, self.size)):
+                if self._slots[i] is None:
+                    self._slots[i] = await self._launch(i)
+
+    async def shutdown(self):
+        for entry in [e for e in self._slots if e is not None] + self._draining:
+            await self._close_browser(entry)
+        self._slots = [None] * self.size
+        self._draining = []
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"Playwright stop warning: {e}")
+            self._playwright = None
+        logger.info("Browser pool closed")
+
+    def get_status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "size": self.size,
+            "contexts_per_browser": self.contexts_per_browser,
+            "max_pages": self.max_pages,
+            "max_memory_mb": self.max_memory_mb,
+            "psutil_available": PSUTIL_AVAILABLE,
+            "waiting": self._waiting,
+            "browsers": [
+                {
+                    "slot": e.slot_id,
+                    "active": e.active,
+                    "contexts_served": e.contexts_served,
+                    "age_seconds": round(now - e.launched_at),
+                    "memory_mb": round(self._memory_mb(e), 1),
+                    "connected": self._is_healthy(e),
+                }
+                for e in self._slots if e is not None
+            ],
+            "draining": len(self._draining),
+            **self.stats,
+        }
@@ -28,11 +28,9 @@ import logging
 import os
 import traceback
 import uuid
-import httpx
 import json
 import re
 import random
-import subprocess
 from typing import List, Dict, Optional
 import tempfile
 import shutil
@@ -47,6 +45,11 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import time
 from bs4 import BeautifulSoup
 
+from ffmpeg_pool import run_ffmpeg_async, ffmpeg_job, PRIORITY_INTERACTIVE
+from render_worker import render
+from http_clients import pooled_client
+from llm_gateway import llm_client, get_llm_gateway
+
 # ============================================================================
 # ENHANCED LOGGING CONFIGURATION
 # ============================================================================
@@ -220,33 +223,10 @@ def get_random_user_agent():
     ]
     return random.choice(agents)
 
-def run_ffmpeg(cmd: list, timeout: int = FFMPEG_TIMEOUT) -> bool:
-    """Run FFmpeg command with timeout and error handling"""
-    try:
-        logger.debug(f"FFmpeg: {' '.join(cmd[:5])}...")
-        
-        result = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            timeout=timeout, 
-            check=False, 
-            text=True
-        )
-        
-        if result.returncode != 0:
-            logger.error(f"❌ FFmpeg error (code {result.returncode})")
-            logger.debug(f"stderr: {result.stderr[:300]}")
-            return False
-        
-        logger.debug(f"✅ FFmpeg completed")
-        return True
-        
-    except subprocess.TimeoutExpired:
-        logger.error(f"❌ FFmpeg timeout after {timeout}s")
-        return False
-    except Exception as e:
-        logger.error(f"❌ FFmpeg exception: {e}")
-        return False
+async def run_ffmpeg(cmd: list, timeout: int = FFMPEG_TIMEOUT) -> bool:
+    """Run FFmpeg command through the shared async pool"""
+    logger.debug(f"FFmpeg: {' '.join(cmd[:5])}...")
+    return await run_ffmpeg_async(cmd, timeout)
 
 # ============================================================================
 # ENHANCED DOUYIN SCRAPER WITH MULTIPLE METHODS
@@ -455,7 +435,7 @@ class EnhancedDouyinScraper:
             metrics.scraping_attempts += 1
             
             logger.info("   Sending HTTP request...")
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with pooled_client(timeout=30) as client:
                 response = await client.get(
                     profile_url,
                     headers={
@@ -659,7 +639,7 @@ async def download_video_enhanced(video_url: str, video_id: str, temp_dir: str)
     metrics.download_attempts += 1
     
     # METHOD 1: Direct page scraping
-    async with httpx.AsyncClient(timeout=90) as client:
+    async with pooled_client(timeout=90) as client:
         
         logger.info("🔹 Method 1: Direct Page Scraping")
         try:
@@ -870,7 +850,7 @@ async def extract_audio(video_path: str, temp_dir: str) -> Optional[str]:
             "-y", audio_path
         ]
         
-        if run_ffmpeg(cmd, 30):
+        if await run_ffmpeg(cmd, 30):
             if os.path.exists(audio_path) and get_size_mb(audio_path) > 0.01:
                 logger.info(f"✅ Audio extracted: {get_size_mb(audio_path):.2f}MB")
                 return audio_path
@@ -894,7 +874,7 @@ async def transcribe_audio(audio_path: str) -> str:
         if openai_key:
             logger.info("   Using OpenAI Whisper API...")
             
-            async with httpx.AsyncClient(timeout=120) as client:
+            async with pooled_client(timeout=120) as client:
                 with open(audio_path, 'rb') as audio_file:
                     files = {'file': ('audio.mp3', audio_file, 'audio/mpeg')}
                     data = {'model': 'whisper-1', 'language': 'zh'}
@@ -936,31 +916,26 @@ async def translate_to_hindi(chinese_text: str) -> str:
         
         logger.info("   Using Mistral AI...")
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(
-                "https://api.mistral.ai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {MISTRAL_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "mistral-large-latest",
-                    "messages": [{
-                        "role": "user",
-                        "content": f"Translate to natural Hindi. ONLY output the Hindi translation:\n\n{chinese_text}"
-                    }],
-                    "temperature": 0.3,
-                    "max_tokens": 300
-                }
-            )
-            
-            if response.status_code == 200:
-                hindi_text = response.json()["choices"][0]["message"]["content"].strip()
-                logger.info(f"✅ Translated")
-                logger.info(f"   Output: {hindi_text[:100]}...")
-                return hindi_text
-            else:
-                logger.warning(f"   Translation failed: {response.status_code}")
+        # Short translation: may be folded into one call with concurrent requests
+        hindi_text = await get_llm_gateway().complete_small(
+            "https://api.mistral.ai/v1/chat/completions",
+            {
+                "Authorization": f"Bearer {MISTRAL_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            "mistral-large-latest",
+            f"Translate to natural Hindi. ONLY output the Hindi translation:\n\n{chinese_text}",
+            max_tokens=300,
+            temperature=0.3,
+            timeout=30,
+        )
+        
+        if hindi_text:
+            logger.info(f"✅ Translated")
+            logger.info(f"   Output: {hindi_text[:100]}...")
+            return hindi_text
+        else:
+            logger.warning("   Translation failed")
         
         return chinese_text
         
@@ -1007,7 +982,7 @@ JSON only:
 }}"""
     
     try:
-        async with httpx.AsyncClient(timeout=40) as client:
+        async with llm_client(timeout=40) as client:
             response = await client.post(
                 "https://api.mistral.ai/v1/chat/completions",
                 headers={
@@ -1082,7 +1057,7 @@ async def download_background_music(temp_dir: str) -> Optional[str]:
         try:
             logger.info(f"   Source {idx}/{len(BACKGROUND_MUSIC_URLS)}...")
             
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with pooled_client(timeout=30) as client:
                 resp = await client.get(url, follow_redirects=True)
                 
                 if resp.status_code == 200:
@@ -1118,7 +1093,7 @@ async def generate_hindi_voice(text: str, duration: float, temp_dir: str) -> Opt
         
         logger.info(f"   🎤 {text_clean[:40]}...")
         
-        async with httpx.AsyncClient(timeout=40) as client:
+        async with pooled_client(timeout=40) as client:
             response = await client.post(
                 f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}",
                 headers={
@@ -1152,7 +1127,7 @@ async def generate_hindi_voice(text: str, duration: float, temp_dir: str) -> Opt
                         "-y", output
                     ]
                     
-                    if run_ffmpeg(cmd, 20):
+                    if await run_ffmpeg(cmd, 20):
                         force_cleanup(temp_audio)
                         logger.info(f"      ✅ {get_size_mb(output):.2f}MB")
                         return output
@@ -1184,7 +1159,7 @@ async def remove_original_audio(video_path: str, temp_dir: str) -> Optional[str]
             "-y", output
         ]
         
-        if run_ffmpeg(cmd, 30):
+        if await run_ffmpeg(cmd, 30):
             logger.info(f"✅ Removed: {get_size_mb(output):.1f}MB")
             return output
         
@@ -1216,7 +1191,7 @@ async def process_video_for_shorts(video_path: str, target_duration: int, temp_d
             "-y", output
         ]
         
-        if run_ffmpeg(cmd, 90):
+        if await run_ffmpeg(cmd, 90):
             logger.info(f"✅ Processed: {get_size_mb(output):.1f}MB")
             metrics.processing_success += 1
             return output
@@ -1267,7 +1242,7 @@ async def add_text_overlays(video: str, segments: list, temp_dir: str) -> Option
             "-y", output
         ]
         
-        if run_ffmpeg(cmd, 60):
+        if await run_ffmpeg(cmd, 60):
             force_cleanup(video)
             logger.info(f"✅ Added: {get_size_mb(output):.1f}MB")
             return output
@@ -1301,7 +1276,7 @@ async def mix_audio_with_music(video: str, voices: List[str], music: Optional[st
             "-y", voice_combined
         ]
         
-        if not run_ffmpeg(cmd, 30):
+        if not await run_ffmpeg(cmd, 30):
             logger.error("❌ Concat failed")
             return None
         
@@ -1330,7 +1305,7 @@ async def mix_audio_with_music(video: str, voices: List[str], music: Optional[st
                 "-shortest", "-y", final
             ]
         
-        if run_ffmpeg(cmd, 60):
+        if await run_ffmpeg(cmd, 60):
             logger.info(f"✅ Final: {get_size_mb(final):.1f}MB")
             return final
         
@@ -1754,17 +1729,19 @@ async def generate_endpoint(request: Request):
         logger.info(f"   Videos: {num_videos}")
         
         try:
-            result = await asyncio.wait_for(
-                process_niche_videos(
-                    niche=niche,
-                    num_videos=num_videos,
-                    user_id=user_id,
-                    show_captions=show_captions,
-                    database_manager=database_manager,
-                    custom_profile_urls=custom_profile_urls
-                ),
-                timeout=1800
-            )
+            with ffmpeg_job(user_id, PRIORITY_INTERACTIVE):
+                result = await asyncio.wait_for(
+                    render(
+                        "china",
+                        user_id,
+                        database_manager,
+                        niche=niche,
+                        num_videos=num_videos,
+                        show_captions=show_captions,
+                        custom_profile_urls=custom_profile_urls
+                    ),
+                    timeout=1800
+                )
             
             return JSONResponse(content=result)
             
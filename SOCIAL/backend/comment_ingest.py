@@ -0,0 +1,175 @@
+"""
+comment_ingest.py - Incremental Comment Ingestion for Auto-Reply
+==================================================
+Pulls only comments newer than each video's watermark into the
+`youtube_comments` collection, so AutoReplyScheduler works from a local
+queue of pending comments instead of re-reading the newest 5 threads every
+poll and doing one Mongo lookup per comment.
+
+FEATURES:
+- Per-video publishedAt watermark (comment_watermarks)
+- commentThreads.list(order="time", maxResults=100) paged until the
+  watermark (or the lookback window on first ingest) is reached
+- Bulk upsert; comments keep their reply_status across polls
+- "Already replied" resolved with one $in query per pending batch
+- Failed replies retried up to COMMENT_MAX_REPLY_ATTEMPTS times
+
+LAYOUT:
+    comment_watermarks: user_id, video_id, last_published_at
+    youtube_comments:   user_id, comment_id, video_id, text, author, published_at,
+                        reply_status (pending|replied|skipped), reply_attempts
+
+USAGE:
+    ingestor = get_comment_ingestor()
+    await ingestor.ingest_video(youtube_async(service, user_id), user_id, video_id)
+    for comment in await ingestor.pending_comments(user_id, video_id):
+        ...
+==================================================
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+COMMENT_PAGE_SIZE = 100
+COMMENT_MAX_PAGES = int(os.getenv("COMMENT_INGEST_MAX_PAGES", "5"))          # per video per poll
+COMMENT_LOOKBACK_HOURS = int(os.getenv("COMMENT_LOOKBACK_HOURS", "24"))
+COMMENT_PENDING_BATCH = 50
+COMMENT_MAX_REPLY_ATTEMPTS = 3
+
+
+def _iso_hours_ago(hours: int) -> str:
+    # Same format as YouTube's publishedAt so string comparison orders correctly
+    return (datetime.now(timezone.utc) - timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _comment_from_thread(item: Dict[str, Any], video_id: str) -> Dict[str, Any]:
+    snippet = item["snippet"]["topLevelComment"]["snippet"]
+    return {
+        "comment_id": item["id"],
+        "video_id": video_id,
+        "text": snippet.get("textDisplay", ""),
+        "author": snippet.get("authorDisplayName", ""),
+        "author_channel_id": snippet.get("authorChannelId", {}).get("value", ""),
+        "published_at": snippet["publishedAt"],
+        "like_count": snippet.get("likeCount", 0),
+        "total_reply_count": item["snippet"].get("totalReplyCount", 0),
+    }
+
+
+class CommentIngestor:
+    """Watermarked commentThreads ingestion and the pending-reply queue built on it"""
+
+    def __init__(self):
+        self.stats = {"polls": 0, "pages": 0, "ingested": 0, "already_replied": 0,
+                      "replied": 0, "skipped": 0, "failures": 0}
+
+    @staticmethod
+    def _database():
+        from YTdatabase import get_youtube_database
+        return get_youtube_database()
+
+    async def ingest_video(self, client, user_id: str, video_id: str) -> int:
+        """Fetch comments newer than the video's watermark; returns how many were new"""
+        database = self._database()
+        watermark = await database.get_comment_watermark(user_id, video_id)
+        stop_at = watermark["last_published_at"] if watermark else _iso_hours_ago(COMMENT_LOOKBACK_HOURS)
+
+        newest: Optional[str] = None
+        new_total = 0
+        page_token = None
+        self.stats["polls"] += 1
+
+        for _ in range(COMMENT_MAX_PAGES):
+            try:
+                response = await client.execute(client.service.commentThreads().list(
+                    part="snippet",
+                    videoId=video_id,
+                    order="time",
+                    maxResults=COMMENT_PAGE_SIZE,
+                    pageToken=page_token,
+                    textFormat="plainText"
+                ))
+            except HttpError as e:
+                # 403 commentsDisabled / 404 deleted video: nothing to ingest
+                if e.resp.status in (403, 404):
+                    logger.info(f"Comments unavailable for video {video_id}: {e.resp.status}")
+                    return 0
+                raise
+            self.stats["pages"] += 1
+
+            comments = [_comment_from_thread(item, video_id) for item in response.get("items", [])]
+            fresh = [c for c in comments if c["published_at"] >= stop_at]
+            if fresh:
+                newest = max(newest or "", fresh[0]["published_at"])
+                new_total += await database.upsert_comments(user_id, fresh)
+
+            page_token = response.get("nextPageToken")
+            # order=time is newest-first: an older comment on this page means we've caught up
+            if len(fresh) < len(comments) or not page_token:
+                break
+        else:
+            logger.warning(f"⚠️ Comment ingest for {video_id} capped at {COMMENT_MAX_PAGES} pages; older new comments skipped")
+
+        if newest and newest > (watermark or {}).get("last_published_at", ""):
+            await database.set_comment_watermark(user_id, video_id, newest)
+
+        self.stats["ingested"] += new_total
+        if new_total:
+            logger.info(f"💬 Ingested {new_total} new comments for video {video_id}")
+        return new_total
+
+    async def pending_comments(self, user_id: str, video_id: str, limit: int = COMMENT_PENDING_BATCH) -> List[Dict[str, Any]]:
+        """Unanswered recent comments on a video, newest first, minus any already replied to"""
+        database = self._database()
+        pending = await database.get_pending_comments(
+            user_id, video_id, _iso_hours_ago(COMMENT_LOOKBACK_HOURS), COMMENT_MAX_REPLY_ATTEMPTS, limit
+        )
+        replied = await database.get_replied_comment_ids(user_id, [c["comment_id"] for c in pending])
+        if replied:
+            # Replied manually or by an earlier run - settle them so they stop showing up
+            await database.mark_comments(user_id, list(replied), "replied")
+            self.stats["already_replied"] += len(replied)
+        return [c for c in pending if c["comment_id"] not in replied]
+
+    async def mark_replied(self, user_id: str, comment_id: str):
+        await self._database().mark_comments(user_id, [comment_id], "replied")
+        self.stats["replied"] += 1
+
+    async def mark_skipped(self, user_id: str, comment_id: str):
+        await self._database().mark_comments(user_id, [comment_id], "skipped")
+        self.stats["skipped"] += 1
+
+    async def record_failure(self, user_id: str, comment_id: str):
+        await self._database().record_comment_reply_failure(user_id, comment_id)
+        self.stats["failures"] += 1
+
+    def get_status(self) -> dict:
+        return {
+            "max_pages": COMMENT_MAX_PAGES,
+            "lookback_hours": COMMENT_LOOKBACK_HOURS,
+            **self.stats,
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+comment_ingestor = None
+
+def get_comment_ingestor() -> CommentIngestor:
+    """Get global comment ingestor instance"""
+    global comment_ingestor
+    if not comment_ingestor:
+        comment_ingestor = CommentIngestor()
+    return comment_ingestor
@@ -0,0 +1,336 @@
+"""
+ffmpeg_pool.py - Shared Async FFmpeg Executor
+==================================================
+One process pool for every video pipeline (Viral_pixel, Pixabay, MrBeast,
+china, YT_ai_services) so encodes never block the uvicorn event loop.
+
+FEATURES:
+- asyncio.create_subprocess_exec (no blocking subprocess.run)
+- Global concurrency cap (sized to CPU count) + per-user cap
+- Priority queue: interactive jobs jump ahead of scheduled ones
+- Timeout with kill
+- Per-job stderr tail + progress (time=) capture
+==================================================
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import re
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PRIORITY_INTERACTIVE = 0    # /api/automation/generate-video-now, manual "generate" buttons
+PRIORITY_SCHEDULED = 10     # run_product_automation_tasks / schedulers
+PRIORITY_BACKGROUND = 20    # analysis, frame extraction
+
+FFMPEG_MAX_CONCURRENCY = int(os.getenv("FFMPEG_MAX_CONCURRENCY", "0")) or max(1, os.cpu_count() or 1)
+FFMPEG_MAX_PER_USER = int(os.getenv("FFMPEG_MAX_PER_USER", "0")) or max(1, FFMPEG_MAX_CONCURRENCY // 2)
+DEFAULT_TIMEOUT = 180
+STDERR_TAIL_LINES = 40
+
+_TIME_RE = re.compile(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+# Job context: pipelines set this once at entry so deep run_ffmpeg() calls
+# inherit user + priority without threading arguments through every helper
+_job_context: contextvars.ContextVar = contextvars.ContextVar(
+    "ffmpeg_job_context", default={"user_id": None, "priority": PRIORITY_SCHEDULED}
+)
+
+
+@contextmanager
+def ffmpeg_job(user_id: Optional[str] = None, priority: Optional[int] = None):
+    """Tag every ffmpeg call made inside this block with a user and priority"""
+    current = _job_context.get()
+    token = _job_context.set({
+        "user_id": user_id if user_id is not None else current.get("user_id"),
+        "priority": priority if priority is not None else current.get("priority", PRIORITY_SCHEDULED),
+    })
+    try:
+        yield
+    finally:
+        _job_context.reset(token)
+
+
+def current_ffmpeg_job() -> dict:
+    """User + priority the surrounding ffmpeg_job() block set (defaults outside one)"""
+    return dict(_job_context.get())
+
+
+# ============================================================================
+# RESULT
+# ============================================================================
+
+@dataclass
+class FFmpegResult:
+    """Outcome of one pooled process run"""
+    job_id: int
+    returncode: Optional[int] = None
+    stdout: str = ""
+    stderr_tail: List[str] = field(default_factory=list)
+    progress_seconds: float = 0.0
+    queued_seconds: float = 0.0
+    run_seconds: float = 0.0
+    timed_out: bool = False
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.returncode == 0 and not self.timed_out and not self.error
+
+    @property
+    def stderr(self) -> str:
+        return "\n".join(self.stderr_tail)
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+class FFmpegPool:
+    """Priority-ordered, per-user-capped async process pool"""
+
+    def __init__(self, max_concurrency: int = FFMPEG_MAX_CONCURRENCY,
+                 max_per_user: int = FFMPEG_MAX_PER_USER):
+        self.max_concurrency = max_concurrency
+        self.max_per_user = max_per_user
+        self._running = 0
+        self._running_per_user: Dict[str, int] = defaultdict(int)
+        self._waiters: list = []  # heap of (priority, seq, user_id, future)
+        self._seq = itertools.count()
+        self._job_ids = itertools.count(1)
+        self.active_jobs: Dict[int, dict] = {}
+        self.stats = {"completed": 0, "failed": 0, "timed_out": 0}
+
+    # ------------------------------------------------------------------
+    # Slot management
+    # ------------------------------------------------------------------
+
+    def _can_run(self, user_id: Optional[str]) -> bool:
+        if self._running >= self.max_concurrency:
+            return False
+        if user_id and self._running_per_user[user_id] >= self.max_per_user:
+            return False
+        return True
+
+    def _take_slot(self, user_id: Optional[str]):
+        self._running += 1
+        if user_id:
+            self._running_per_user[user_id] += 1
+
+    def _release_slot(self, user_id: Optional[str]):
+        self._running -= 1
+        if user_id:
+            self._running_per_user[user_id] -= 1
+            if self._running_per_user[user_id] <= 0:
+                del self._running_per_user[user_id]
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        """Grant free slots to the highest-priority waiters whose user is under cap"""
+        skipped = []
+        while self._waiters and self._running < self.max_concurrency:
+            entry = heapq.heappop(self._waiters)
+            _, _, user_id, fut = entry
+            if fut.done():
+                continue
+            if not self._can_run(user_id):
+                skipped.append(entry)
+                continue
+            self._take_slot(user_id)
+            fut.set_result(True)
+        for entry in skipped:
+            heapq.heappush(self._waiters, entry)
+
+    async def _acquire(self, user_id: Optional[str], priority: int):
+        if not self._waiters and self._can_run(user_id):
+            self._take_slot(user_id)
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), user_id, fut))
+        # Waiters ahead of us may be blocked only by their per-user cap
+        self._wake_waiters()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was granted right before cancellation - give it back
+                self._release_slot(user_id)
+            raise
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    async def run(self, cmd: list, timeout: float = DEFAULT_TIMEOUT,
+                  user_id: Optional[str] = None, priority: Optional[int] = None,
+                  capture_stdout: bool = False) -> FFmpegResult:
+        """Queue a command, run it when a slot is free, kill it on timeout"""
+        ctx = _job_context.get()
+        user_id = user_id if user_id is not None else ctx.get("user_id")
+        priority = priority if priority is not None else ctx.get("priority", PRIORITY_SCHEDULED)
+
+        result = FFmpegResult(job_id=next(self._job_ids))
+        queued_at = time.monotonic()
+
+        await self._acquire(user_id, priority)
+
+        started_at = time.monotonic()
+        result.queued_seconds = started_at - queued_at
+        self.active_jobs[result.job_id] = {
+            "cmd": cmd[0] if cmd else "",
+            "user_id": user_id,
+            "priority": priority,
+            "started_at": started_at,
+            "result": result,
+        }
+
+        proc = None
+        stdout_task = None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE if capture_stdout else asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+
+            stdout_task = asyncio.create_task(proc.stdout.read()) if capture_stdout else None
+            await asyncio.wait_for(
+                asyncio.gather(self._pump_stderr(proc, result), proc.wait()),
+                timeout=timeout
+            )
+            result.returncode = proc.returncode
+            if stdout_task:
+                result.stdout = (await stdout_task).decode("utf-8", errors="replace")
+
+        except asyncio.TimeoutError:
+            result.timed_out = True
+            logger.error(f"❌ FFmpeg job {result.job_id} timeout after {timeout}s - killing")
+            await self._kill(proc)
+        except asyncio.CancelledError:
+            await self._kill(proc)
+            raise
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"FFmpeg job {result.job_id} exception: {e}")
+            await self._kill(proc)
+        finally:
+            if stdout_task and not stdout_task.done():
+                stdout_task.cancel()
+            result.run_seconds = time.monotonic() - started_at
+            self.active_jobs.pop(result.job_id, None)
+            self._release_slot(user_id)
+
+        if result.success:
+            self.stats["completed"] += 1
+        elif result.timed_out:
+            self.stats["timed_out"] += 1
+        else:
+            self.stats["failed"] += 1
+
+        return result
+
+    async def _pump_stderr(self, proc, result: FFmpegResult):
+        """Keep a bounded stderr tail and track encode progress from time="""
+        tail = deque(maxlen=STDERR_TAIL_LINES)
+        buf = b""
+        while True:
+            chunk = await proc.stderr.read(4096)
+            if not chunk:
+                break
+            # ffmpeg rewrites its status line with \r
+            buf += chunk.replace(b"\r", b"\n")
+            *lines, buf = buf.split(b"\n")
+            for raw in lines:
+                line = raw.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                match = _TIME_RE.search(line)
+                if match:
+                    h, m, s = match.groups()
+                    result.progress_seconds = int(h) * 3600 + int(m) * 60 + float(s)
+                tail.append(line)
+                result.stderr_tail = list(tail)
+        if buf.strip():
+            tail.append(buf.decode("utf-8", errors="replace").strip())
+            result.stderr_tail = list(tail)
+
+    async def _kill(self, proc):
+        if proc is None or proc.returncode is not None:
+            return
+        try:
+            proc.kill()
+            await asyncio.wait_for(proc.wait(), timeout=5)
+        except Exception as e:
+            logger.warning(f"FFmpeg kill warning: {e}")
+
+    def get_status(self) -> dict:
+        """Snapshot for debug endpoints"""
+        now = time.monotonic()
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_per_user": self.max_per_user,
+            "running": self._running,
+            "queued": sum(1 for w in self._waiters if not w[3].done()),
+            "running_per_user": dict(self._running_per_user),
+            "jobs": [
+                {
+                    "job_id": job_id,
+                    "cmd": job["cmd"],
+                    "user_id": job["user_id"],
+                    "priority": job["priority"],
+                    "elapsed": round(now - job["started_at"], 1),
+                    "progress_seconds": job["result"].progress_seconds,
+                }
+                for job_id, job in self.active_jobs.items()
+            ],
+            **self.stats,
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+ffmpeg_pool = None
+
+def get_ffmpeg_pool() -> FFmpegPool:
+    """Get global FFmpeg pool instance"""
+    global ffmpeg_pool
+    if not ffmpeg_pool:
+        ffmpeg_pool = FFmpegPool()
+    return ffmpeg_pool
+
+
+async def run_ffmpeg_async(cmd: list, timeout: float = DEFAULT_TIMEOUT) -> bool:
+    """Drop-in async replacement for the per-pipeline run_ffmpeg() helpers"""
+    result = await get_ffmpeg_pool().run(cmd, timeout)
+
+    if result.timed_out:
+        return False
+
+    if result.returncode != 0:
+        logger.error(f"FFmpeg error (code {result.returncode})")
+        logger.error(f"FFmpeg stderr: {result.stderr[-500:]}")
+        return False
+
+    return True
+
+
+async def run_process_async(cmd: list, timeout: float = 30) -> FFmpegResult:
+    """Run ffprobe/ffmpeg through the pool and capture stdout"""
+    return await get_ffmpeg_pool().run(cmd, timeout, capture_stdout=True)
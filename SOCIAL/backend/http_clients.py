@@ -0,0 +1,270 @@
+"""
+http_clients.py - Shared Pooled HTTP Client Registry
+==================================================
+App-lifetime httpx.AsyncClient instances, one per upstream service, so
+outbound calls reuse warm TCP/TLS connections instead of paying a fresh
+handshake on every `async with httpx.AsyncClient(...)`.
+
+FEATURES:
+- Per-service connection pools (Mistral, Groq, Pixabay, Pexels, ElevenLabs,
+  Google, media CDNs, default)
+- HTTP/2 where the host supports it (needs the `h2` package)
+- Keepalive tuning + per-service timeouts/limits
+- No cookie persistence: pools are shared by every user/request, so a
+  Set-Cookie from one call is never replayed on another
+- Worker threads running their own event loop get private pools
+  (private_http_registry) instead of clients bound to the main loop
+- Opened/closed from the FastAPI lifespan in Supermain.py / mainY.py
+
+USAGE (drop-in for the old per-call clients):
+    async with pooled_client(timeout=30) as client:
+        resp = await client.get(url)
+==================================================
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# ============================================================================
+# SERVICE CONFIGURATION
+# ============================================================================
+
+SERVICE_CONFIGS = {
+    "mistral": {
+        "hosts": ["api.mistral.ai"],
+        "timeout": 45.0, "connect": 10.0,
+        "max_connections": 20, "max_keepalive": 10, "keepalive_expiry": 60.0,
+        "http2": True,
+    },
+    "groq": {
+        "hosts": ["api.groq.com"],
+        "timeout": 45.0, "connect": 10.0,
+        "max_connections": 20, "max_keepalive": 10, "keepalive_expiry": 60.0,
+        "http2": True,
+    },
+    "pixabay": {
+        "hosts": ["pixabay.com"],
+        "timeout": 25.0, "connect": 10.0,
+        "max_connections": 20, "max_keepalive": 10, "keepalive_expiry": 30.0,
+        "http2": True,
+    },
+    "pexels": {
+        "hosts": ["api.pexels.com"],
+        "timeout": 25.0, "connect": 10.0,
+        "max_connections": 20, "max_keepalive": 10, "keepalive_expiry": 30.0,
+        "http2": True,
+    },
+    "elevenlabs": {
+        "hosts": ["api.elevenlabs.io"],
+        "timeout": 60.0, "connect": 10.0,
+        "max_connections": 10, "max_keepalive": 5, "keepalive_expiry": 60.0,
+        "http2": True,
+    },
+    "google": {
+        "hosts": ["googleapis.com"],
+        "timeout": 60.0, "connect": 10.0,
+        "max_connections": 20, "max_keepalive": 10, "keepalive_expiry": 60.0,
+        "http2": True,
+    },
+    # Large binary downloads: stock images/videos/music
+    "media": {
+        "hosts": [
+            "cdn.pixabay.com", "images.pexels.com", "videos.pexels.com",
+            "player.vimeo.com", "freesound.org", "raw.githubusercontent.com",
+        ],
+        "timeout": 100.0, "connect": 15.0,
+        "max_connections": 50, "max_keepalive": 20, "keepalive_expiry": 30.0,
+        "http2": False,
+    },
+    "default": {
+        "hosts": [],
+        "timeout": 30.0, "connect": 10.0,
+        "max_connections": 50, "max_keepalive": 20, "keepalive_expiry": 15.0,
+        "http2": False,
+    },
+}
+
+
+def _no_cookie_jar() -> CookieJar:
+    """Jar that refuses every Set-Cookie (an empty allow-list blocks all domains)"""
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+class HTTPClientRegistry:
+    """Lazily-created, app-lifetime httpx clients keyed by service"""
+
+    def __init__(self, configs: Dict[str, dict] = SERVICE_CONFIGS):
+        self.configs = configs
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._host_cache: Dict[str, str] = {}
+
+    def service_for_url(self, url) -> str:
+        host = urlparse(str(url)).hostname or ""
+        if host in self._host_cache:
+            return self._host_cache[host]
+
+        # Most specific host wins (cdn.pixabay.com -> media, not pixabay)
+        service = "default"
+        best = -1
+        for name, cfg in self.configs.items():
+            for h in cfg["hosts"]:
+                if (host == h or host.endswith("." + h)) and len(h) > best:
+                    service, best = name, len(h)
+
+        self._host_cache[host] = service
+        return service
+
+    def get_client(self, service: str = "default") -> httpx.AsyncClient:
+        client = self._clients.get(service)
+        if client is None or client.is_closed:
+            cfg = self.configs.get(service, self.configs["default"])
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(cfg["timeout"], connect=cfg["connect"]),
+                limits=httpx.Limits(
+                    max_connections=cfg["max_connections"],
+                    max_keepalive_connections=cfg["max_keepalive"],
+                    keepalive_expiry=cfg["keepalive_expiry"],
+                ),
+                http2=cfg["http2"] and HTTP2_AVAILABLE,
+                follow_redirects=service in ("media", "default"),
+                cookies=_no_cookie_jar(),
+            )
+            self._clients[service] = client
+            logger.info(f"🌐 HTTP pool ready: {service} (http2={cfg['http2'] and HTTP2_AVAILABLE})")
+        return client
+
+    def client_for_url(self, url) -> httpx.AsyncClient:
+        return self.get_client(self.service_for_url(url))
+
+    async def startup(self):
+        """Warm the pools for the hot AI/media services"""
+        for service in ("mistral", "groq", "pixabay", "pexels", "elevenlabs", "media"):
+            self.get_client(service)
+        logger.info(f"✅ HTTP client registry started ({len(self._clients)} pools)")
+
+    async def shutdown(self):
+        for service, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"HTTP pool close warning ({service}): {e}")
+        self._clients.clear()
+        logger.info("HTTP client registry closed")
+
+    def get_status(self) -> dict:
+        return {
+            "http2_available": HTTP2_AVAILABLE,
+            "pools": {
+                name: {"open": not client.is_closed}
+                for name, client in self._clients.items()
+            },
+        }
+
+
+class PooledClient:
+    """
+    Per-call view over the registry. Each request is routed to the pool for
+    its host; the call-site timeout/follow_redirects become request defaults.
+    Leaving the `async with` block does NOT close the shared pools.
+    """
+
+    def __init__(self, registry: HTTPClientRegistry, timeout=None,
+                 follow_redirects: Optional[bool] = None, headers: Optional[dict] = None):
+        self._registry = registry
+        self._timeout = timeout
+        self._follow_redirects = follow_redirects
+        self._headers = headers
+
+    def _prepare(self, kwargs: dict) -> dict:
+        if self._timeout is not None and "timeout" not in kwargs:
+            kwargs["timeout"] = self._timeout
+        if self._follow_redirects is not None and "follow_redirects" not in kwargs:
+            kwargs["follow_redirects"] = self._follow_redirects
+        if self._headers:
+            kwargs["headers"] = {**self._headers, **(kwargs.get("headers") or {})}
+        return kwargs
+
+    async def request(self, method: str, url, **kwargs) -> httpx.Response:
+        client = self._registry.client_for_url(url)
+        return await client.request(method, url, **self._prepare(kwargs))
+
+    async def get(self, url, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def head(self, url, **kwargs) -> httpx.Response:
+        return await self.request("HEAD", url, **kwargs)
+
+    def stream(self, method: str, url, **kwargs):
+        client = self._registry.client_for_url(url)
+        return client.stream(method, url, **self._prepare(kwargs))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+http_registry = None
+_private_registry: ContextVar[Optional[HTTPClientRegistry]] = ContextVar("private_http_registry", default=None)
+
+def get_http_registry() -> HTTPClientRegistry:
+    """Get global HTTP client registry"""
+    private = _private_registry.get()
+    if private is not None:
+        return private
+    global http_registry
+    if not http_registry:
+        http_registry = HTTPClientRegistry()
+    return http_registry
+
+
+@asynccontextmanager
+async def private_http_registry():
+    """
+    Separate pools for code running on a short-lived event loop (e.g. a worker
+    thread's new_event_loop()); the app pools belong to the main loop.
+    """
+    registry = HTTPClientRegistry()
+    token = _private_registry.set(registry)
+    try:
+        yield registry
+    finally:
+        _private_registry.reset(token)
+        await registry.shutdown()
+
+
+def pooled_client(timeout=None, follow_redirects: Optional[bool] = None,
+                  headers: Optional[dict] = None) -> PooledClient:
+    """Drop-in replacement for `httpx.AsyncClient(...)` in `async with` blocks"""
+    return PooledClient(get_http_registry(), timeout, follow_redirects, headers)
@@ -0,0 +1,298 @@
+"""
+job_queue.py - Mongo-Leased Automation Job Queue
+==================================================
+Durable queue (`automation_jobs` collection) shared by every uvicorn worker
+and instance, so scheduled automations run exactly once no matter how many
+processes are up. Schedulers on every instance enqueue the same slot; only
+the first insert wins, and only the worker holding the lease executes it.
+
+FEATURES:
+- Idempotency key per (job type, user, slot): duplicate enqueues are no-ops
+- Atomic claim with find_one_and_update, highest priority first, then
+  oldest run_at
+- Leases renewed by a heartbeat every JOB_QUEUE_LEASE / 3 seconds; a crashed
+  worker's job becomes claimable again once its lease expires, and a worker
+  that loses its lease cancels its own copy of the job
+- Failed jobs retry with exponential backoff up to max_attempts; jobs held
+  on shutdown are handed straight back to the queue
+- A handler's dict return value is stored on the job, so producers in
+  another process can wait() for it (render workers); wait() gives up after
+  a deadline, failing the job if no worker has claimed it yet
+
+JOB STATES:
+    queued   waiting for run_at
+    running  leased by lease_owner until lease_expires_at
+    done     handler returned (its dict result, if any, in `result`)
+    failed   handler raised on its last attempt (or lease expired too often)
+
+USAGE:
+    queue = get_job_queue()
+    queue.register("product_automation", handler)        # handler(job) -> awaitable
+    queue.start()
+    await queue.enqueue("product_automation", user_id, payload,
+                        job_key("product_automation", user_id, slot))
+==================================================
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+JOB_QUEUE_CONCURRENCY = int(os.getenv("JOB_QUEUE_CONCURRENCY", "4"))        # jobs run at once per process
+JOB_QUEUE_LEASE = int(os.getenv("JOB_QUEUE_LEASE_SECONDS", "120"))
+JOB_QUEUE_POLL_INTERVAL = float(os.getenv("JOB_QUEUE_POLL_INTERVAL", "5"))
+JOB_QUEUE_MAX_ATTEMPTS = 3
+JOB_QUEUE_RETRY_BACKOFF = 60                                                  # seconds, doubled per attempt
+JOB_QUEUE_WAIT_TIMEOUT = float(os.getenv("JOB_QUEUE_WAIT_TIMEOUT", "1800"))    # wait() deadline
+
+# Higher runs first
+JOB_PRIORITY_INTERACTIVE = 20       # someone is waiting on the response
+JOB_PRIORITY_SCHEDULED_POST = 10    # user picked the exact time
+JOB_PRIORITY_AUTOMATION = 5
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def job_key(job_type: str, user_id: str, slot) -> str:
+    """Idempotency key for one (user, slot) of a job type"""
+    slot = slot.isoformat() if isinstance(slot, datetime) else str(slot)
+    return f"{job_type}:{user_id}:{slot}"
+
+
+class JobQueue:
+    """Workers, heartbeats and enqueueing on top of the automation_jobs collection"""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._active: Dict[Any, Tuple[dict, asyncio.Task]] = {}
+        self._lost: Set[Any] = set()
+        self._wakeup = asyncio.Event()
+        self.stats = {"enqueued": 0, "duplicates": 0, "claimed": 0, "completed": 0, "retried": 0,
+                      "failed": 0, "leases_lost": 0, "released": 0, "timed_out": 0, "errors": 0}
+
+    @staticmethod
+    def _database():
+        from YTdatabase import get_youtube_database
+        return get_youtube_database()
+
+    def register(self, job_type: str, handler: JobHandler):
+        self._handlers[job_type] = handler
+
+    # ------------------------------------------------------------------
+    # Producing
+    # ------------------------------------------------------------------
+
+    async def enqueue(self, job_type: str, user_id: str, payload: dict, idempotency_key: str,
+                      priority: int = JOB_PRIORITY_AUTOMATION, run_at: Optional[datetime] = None,
+                      max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS) -> Optional[str]:
+        """Queue a job; returns its id, or None when the key was already enqueued (here or elsewhere)"""
+        now = datetime.utcnow()
+        job_id = await self._database().enqueue_job({
+            "job_type": job_type,
+            "user_id": user_id,
+            "payload": payload,
+            "idempotency_key": idempotency_key,
+            "priority": priority,
+            "status": "queued",
+            "run_at": run_at or now,
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "enqueued_by": self.worker_id,
+            "created_at": now,
+        })
+        if job_id is None:
+            self.stats["duplicates"] += 1
+            logger.info(f"🔁 Job {idempotency_key} already queued - skipping duplicate")
+            return None
+        self.stats["enqueued"] += 1
+        if job_type in self._handlers:
+            self._wakeup.set()
+        return job_id
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self, concurrency: int = JOB_QUEUE_CONCURRENCY):
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(concurrency)]
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        logger.info(f"📋 Job queue started as {self.worker_id} ({concurrency} workers: {', '.join(self._handlers)})")
+
+    async def stop(self):
+        tasks = self._workers + ([self._heartbeat_task] if self._heartbeat_task else [])
+        for task in tasks:
+            task.cancel()
+        # Workers release their leased jobs while unwinding
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._heartbeat_task = None
+
+    # ------------------------------------------------------------------
+    # Consuming
+    # ------------------------------------------------------------------
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self._database().claim_job(list(self._handlers), self.worker_id, JOB_QUEUE_LEASE)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"❌ Job claim failed: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_QUEUE_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.stats["claimed"] += 1
+            await self._execute(job)
+
+    async def _execute(self, job: dict):
+        database = self._database()
+        job_id, key = job["_id"], job["idempotency_key"]
+
+        if job["attempts"] > job.get("max_attempts", JOB_QUEUE_MAX_ATTEMPTS):
+            # Lease expired on its last attempt (worker crashed mid-job)
+            self.stats["failed"] += 1
+            logger.error(f"❌ Job {key} abandoned after {job['attempts'] - 1} attempts")
+            await database.fail_job(job_id, self.worker_id, "lease expired on final attempt")
+            return
+
+        logger.info(f"▶️ Job {key} (attempt {job['attempts']}) on {self.worker_id}")
+        task = asyncio.create_task(self._handlers[job["job_type"]](job))
+        self._active[job_id] = (job, task)
+        try:
+            await task
+        except asyncio.CancelledError:
+            if job_id in self._lost:
+                return
+            # Shutting down: let another worker pick it up now rather than after the lease
+            task.cancel()
+            if await database.release_job(job_id, self.worker_id):
+                self.stats["released"] += 1
+            raise
+        except Exception as e:
+            await self._failed(job, e)
+        else:
+            result = task.result()
+            if isinstance(result, dict):
+                # Round-trip through JSON so paths, numpy scalars etc. are storable
+                result = json.loads(json.dumps(result, default=str))
+            else:
+                result = None
+            await database.complete_job(job_id, self.worker_id, result)
+            self.stats["completed"] += 1
+        finally:
+            self._active.pop(job_id, None)
+            self._lost.discard(job_id)
+
+    async def wait(self, job_id: str, poll_interval: float = 1.0, timeout: float = JOB_QUEUE_WAIT_TIMEOUT) -> dict:
+        """
+        Poll until a job (possibly run by another process) is done or failed; returns the job document.
+        Past the deadline the job comes back as failed - a still-queued job is failed in the
+        collection too, so no worker starts it after the producer gave up.
+        """
+        database = self._database()
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            job = await database.get_job(job_id)
+            if job is None:
+                raise KeyError(f"Job {job_id} not found")
+            if job["status"] in ("done", "failed"):
+                return job
+            if asyncio.get_running_loop().time() >= deadline:
+                error = f"Timed out after {timeout:.0f}s waiting for job ({job['status']})"
+                await database.abandon_job(job_id, error)
+                self.stats["timed_out"] += 1
+                logger.error(f"❌ Job {job['idempotency_key']}: {error}")
+                return {**job, "status": "failed", "last_error": error}
+            await asyncio.sleep(poll_interval)
+
+    async def _failed(self, job: dict, error: Exception):
+        attempts = job["attempts"]
+        retry_at = None
+        if attempts < job.get("max_attempts", JOB_QUEUE_MAX_ATTEMPTS):
+            retry_at = datetime.utcnow() + timedelta(seconds=JOB_QUEUE_RETRY_BACKOFF * 2 ** (attempts - 1))
+        await self._database().fail_job(job["_id"], self.worker_id, str(error), retry_at)
+        if retry_at:
+            self.stats["retried"] += 1
+            logger.warning(f"⚠️ Job {job['idempotency_key']} failed (attempt {attempts}), retrying at {retry_at:%H:%M:%S} UTC: {error}")
+        else:
+            self.stats["failed"] += 1
+            logger.error(f"❌ Job {job['idempotency_key']} failed permanently after {attempts} attempts: {error}")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(JOB_QUEUE_LEASE / 3)
+            for job_id, (job, task) in list(self._active.items()):
+                try:
+                    owned = await self._database().heartbeat_job(job_id, self.worker_id, JOB_QUEUE_LEASE)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Keep running; the lease still has two heartbeats of slack
+                    logger.error(f"❌ Heartbeat for job {job['idempotency_key']} failed: {e}")
+                    continue
+                if not owned and not task.done():
+                    self.stats["leases_lost"] += 1
+                    self._lost.add(job_id)
+                    task.cancel()
+                    logger.warning(f"⚠️ Lost lease on job {job['idempotency_key']} - another worker owns it now")
+
+    async def get_status(self) -> dict:
+        try:
+            jobs = await self._database().get_job_queue_stats()
+        except Exception as e:
+            jobs = {"error": str(e)}
+        return {
+            "worker_id": self.worker_id,
+            "running": bool(self._workers),
+            "handlers": list(self._handlers),
+            "active_jobs": [job["idempotency_key"] for job, _ in self._active.values()],
+            "jobs": jobs,
+            "config": {
+                "concurrency": JOB_QUEUE_CONCURRENCY,
+                "lease_seconds": JOB_QUEUE_LEASE,
+                "poll_interval": JOB_QUEUE_POLL_INTERVAL,
+                "max_attempts": JOB_QUEUE_MAX_ATTEMPTS,
+            },
+            **self.stats,
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+job_queue = None
+
+def get_job_queue() -> JobQueue:
+    """Get global job queue instance"""
+    global job_queue
+    if not job_queue:
+        job_queue = JobQueue()
+    return job_queue
@@ -0,0 +1,707 @@
+"""
+llm_gateway.py - Central Mistral / Groq Chat Completion Gateway
+==================================================
+Every chat completion call (AIService, AIService2, Pixabay, Viral_pixel,
+MrBeast, china, thumbnail, Supermain endpoints) goes through one gateway so
+the provider RPM limits are enforced in one place instead of per instance.
+
+FEATURES:
+- One token bucket per provider + API key (shared by every caller)
+- 429 responses drain the bucket for the provider's Retry-After hint
+- Request coalescing: identical in-flight requests are sent once and the
+  response is shared by every waiter; a waiter that's cancelled (e.g. the
+  losing side of a hedge) only stops the upstream call if it was the last one
+- Micro-batching: small independent prompts (keywords, translations, titles)
+  are folded into one JSON-structured call, with per-prompt fallback
+- Circuit breaking: every response is reported to the provider router
+  (llm_router.py); calls to a provider/model whose circuit is open get an
+  immediate synthetic 503 instead of waiting out a timeout
+- Streaming: stream=true completions with the same rate limits and circuit
+  accounting, yielding content deltas (see llm_stream.py for SSE)
+- Hedging: latency-critical endpoints race a secondary provider once the
+  primary has run past its observed p95 for that endpoint; the first valid
+  answer wins and the loser is cancelled
+
+USAGE (drop-in for pooled_client at chat completion call sites):
+    async with llm_client(timeout=30) as client:
+        resp = await client.post(MISTRAL_URL, headers=..., json=payload)
+
+    text = await get_llm_gateway().complete_small(url, headers, model, prompt)
+
+    result, provider = await get_llm_gateway().hedged("viral-titles", [
+        ("mistral", lambda: call_mistral()),
+        ("groq", lambda: call_groq()),
+    ])
+==================================================
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from http_clients import pooled_client
+from llm_router import get_llm_router
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PROVIDERS = {
+    "mistral": {
+        "hosts": ["api.mistral.ai"],
+        "rpm": int(os.getenv("LLM_MISTRAL_RPM", "30")),
+        "burst": int(os.getenv("LLM_MISTRAL_BURST", "3")),
+    },
+    "groq": {
+        "hosts": ["api.groq.com"],
+        "rpm": int(os.getenv("LLM_GROQ_RPM", "30")),
+        "burst": int(os.getenv("LLM_GROQ_BURST", "2")),
+    },
+}
+
+LLM_BATCH_WINDOW_MS = int(os.getenv("LLM_BATCH_WINDOW_MS", "50"))
+LLM_BATCH_MAX = int(os.getenv("LLM_BATCH_MAX", "4"))
+LLM_BATCH_MAX_TOKENS = 400          # prompts above this are never folded
+DEFAULT_RETRY_AFTER = 6.0
+MAX_RETRY_AFTER = 60.0
+
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "2.5"))   # until enough samples exist
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.75"))
+LLM_HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", "4.0"))
+LLM_HEDGE_MIN_SAMPLES = 20
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 20.0, 30.0, 60.0)
+LATENCY_WINDOW = 200                # recent samples kept for the quantile estimate
+
+
+class TokenBucket:
+    """Async token bucket - rate_per_minute refill, burst capacity, FIFO waiters"""
+
+    def __init__(self, rate_per_minute: int, burst: int):
+        self.rate = max(rate_per_minute, 1) / 60.0
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self.stats = {"acquired": 0, "waited_seconds": 0.0, "penalties": 0}
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+        waited = time.monotonic() - started
+        self.stats["acquired"] += 1
+        self.stats["waited_seconds"] += waited
+        return waited
+
+    def penalize(self, seconds: float):
+        """Provider said slow down: nobody on this key sends for `seconds`"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+        self.stats["penalties"] += 1
+
+    def get_status(self) -> dict:
+        self._refill(time.monotonic())
+        return {
+            "rpm": round(self.rate * 60),
+            "burst": self.capacity,
+            "tokens": round(self.tokens, 2),
+            "blocked_for": round(max(0.0, self.blocked_until - time.monotonic()), 1),
+            "acquired": self.stats["acquired"],
+            "waited_seconds": round(self.stats["waited_seconds"], 1),
+            "penalties": self.stats["penalties"],
+        }
+
+
+class LatencyHistogram:
+    """Per endpoint + provider latency: cumulative buckets plus a sliding window for quantiles"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.recent: deque = deque(maxlen=LATENCY_WINDOW)
+        self.total = 0
+        self.failures = 0
+        self.wins = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.recent.append(seconds)
+        self.total += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self.recent) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def get_status(self) -> dict:
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        labels = [f"le_{bound:g}s" for bound in LATENCY_BUCKETS] + ["inf"]
+        return {
+            "samples": self.total,
+            "failures": self.failures,
+            "wins": self.wins,
+            "p50": round(p50, 2) if p50 is not None else None,
+            "p95": round(p95, 2) if p95 is not None else None,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class LLMStreamError(Exception):
+    """A streamed completion was refused (circuit open, non-200) before any content"""
+
+
+def _retry_after(response: httpx.Response) -> float:
+    """Seconds to back off after a 429 (Retry-After header or Groq's message hint)"""
+    header = response.headers.get("retry-after")
+    if header:
+        try:
+            return min(float(header), MAX_RETRY_AFTER)
+        except ValueError:
+            pass
+    try:
+        message = response.json().get("error", {}).get("message", "")
+    except Exception:
+        message = ""
+    match = re.search(r'try again in (?:(\d+)m)?(\d+(?:\.\d+)?)(ms|s)', message)
+    if match:
+        minutes = int(match.group(1) or 0)
+        value = float(match.group(2))
+        seconds = value / 1000.0 if match.group(3) == "ms" else value
+        return min(minutes * 60 + seconds + 0.5, MAX_RETRY_AFTER)
+    return DEFAULT_RETRY_AFTER
+
+
+def _parse_json_object(text: str) -> Optional[dict]:
+    text = re.sub(r'```(?:json)?\n?|\n?```', '', text or '').strip()
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _json_dumps(payload) -> str:
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _json_list(names) -> str:
+    return ", ".join(f'"{name}"' for name in names)
+
+
+# ============================================================================
+# GATEWAY
+# ============================================================================
+
+class LLMGateway:
+    """Rate-limited, coalescing front door for chat completion requests"""
+
+    def __init__(self, providers: Dict[str, dict] = PROVIDERS):
+        self.providers = providers
+        self._host_map = {host: name for name, cfg in providers.items() for host in cfg["hosts"]}
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._batches: Dict[tuple, List[Tuple[str, int, asyncio.Future]]] = {}
+        self._latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.stats = {
+            "requests": 0, "sent": 0, "coalesced": 0, "rate_limited": 0,
+            "batched_calls": 0, "batched_prompts": 0, "batch_fallbacks": 0,
+            "hedged_calls": 0, "hedges_fired": 0, "hedge_wins": 0, "short_circuited": 0,
+            "streams": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Rate limiting
+    # ------------------------------------------------------------------
+
+    def provider_for(self, url) -> Optional[str]:
+        return self._host_map.get(urlparse(str(url)).hostname or "")
+
+    @staticmethod
+    def _key_id(headers: Optional[dict]) -> str:
+        auth = ""
+        for name, value in (headers or {}).items():
+            if name.lower() == "authorization":
+                auth = value
+                break
+        return hashlib.sha256(auth.encode("utf-8")).hexdigest()[:12]
+
+    def bucket_for(self, provider: str, headers: Optional[dict]) -> TokenBucket:
+        key = (provider, self._key_id(headers))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            cfg = self.providers[provider]
+            bucket = self._buckets[key] = TokenBucket(cfg["rpm"], cfg["burst"])
+        return bucket
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    async def post(self, url, headers: Optional[dict] = None, json: Optional[dict] = None,
+                   timeout=None, **kwargs) -> httpx.Response:
+        """
+        POST a chat completion. Same signature/return as httpx client.post;
+        identical requests already in flight share one upstream call.
+        """
+        self.stats["requests"] += 1
+        if json is None or kwargs:
+            return await self._send(url, headers, json, timeout, **kwargs)
+
+        fingerprint = hashlib.sha256(
+            f"{url}|{self._key_id(headers)}|".encode("utf-8")
+            + _json_dumps(json).encode("utf-8")
+        ).hexdigest()
+
+        task = self._inflight.get(fingerprint)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            # The upstream call belongs to no single caller, so cancelling one waiter can't fail the others
+            task = asyncio.create_task(self._send(url, headers, json, timeout))
+            self._inflight[fingerprint] = task
+            self._waiters[fingerprint] = 0
+            task.add_done_callback(lambda _: self._forget(fingerprint, task))
+
+        self._waiters[fingerprint] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._inflight.get(fingerprint) is task:
+                self._waiters[fingerprint] -= 1
+                if not self._waiters[fingerprint] and not task.done():
+                    # Every waiter gave up - stop the upstream call
+                    task.cancel()
+
+    def _forget(self, fingerprint: str, task: asyncio.Task):
+        if self._inflight.get(fingerprint) is task:
+            del self._inflight[fingerprint]
+            del self._waiters[fingerprint]
+
+    async def _send(self, url, headers, payload, timeout, **kwargs) -> httpx.Response:
+        provider = self.provider_for(url)
+        model = (payload or {}).get("model", "") if isinstance(payload, dict) else ""
+        router = get_llm_router() if provider else None
+        if router and not router.allow(provider, model):
+            self.stats["short_circuited"] += 1
+            return httpx.Response(
+                503,
+                json={"error": {"message": f"{provider}/{model} circuit open"}},
+                request=httpx.Request("POST", url),
+            )
+
+        bucket = self.bucket_for(provider, headers) if provider else None
+        try:
+            if bucket:
+                waited = await bucket.acquire()
+                if waited > 1:
+                    logger.info(f"⏳ {provider} rate limit: waited {waited:.1f}s")
+
+            self.stats["sent"] += 1
+            started = time.monotonic()
+            async with pooled_client(timeout=timeout) as client:
+                response = await client.post(url, headers=headers, json=payload, **kwargs)
+        except asyncio.CancelledError:
+            if router:
+                router.release(provider, model)
+            raise
+        except Exception:
+            if router:
+                router.record(provider, model, "error", 0.0)
+            raise
+
+        if router:
+            if response.status_code == 429:
+                router.record(provider, model, "429", 0.0)
+            elif response.status_code >= 500 or response.status_code in (408, 401, 403):
+                router.record(provider, model, "error", 0.0)
+            elif response.status_code < 300:
+                router.record(provider, model, "ok", time.monotonic() - started)
+            else:
+                # Other 4xx are caused by the request itself, not provider health
+                router.release(provider, model)
+
+        if response.status_code == 429 and bucket:
+            backoff = _retry_after(response)
+            bucket.penalize(backoff)
+            self.stats["rate_limited"] += 1
+            logger.warning(f"⚠️ {provider} 429 - pausing key for {backoff:.1f}s")
+        return response
+
+    async def stream(self, url, headers: dict, payload: dict, timeout=None) -> AsyncIterator[str]:
+        """
+        Chat completion with stream=true, yielding content deltas as they
+        arrive. Rate limits and circuit accounting match post(); streams are
+        never coalesced. Raises LLMStreamError if refused before any content.
+        """
+        provider = self.provider_for(url)
+        model = payload.get("model", "")
+        router = get_llm_router() if provider else None
+        self.stats["requests"] += 1
+        if router and not router.allow(provider, model):
+            self.stats["short_circuited"] += 1
+            raise LLMStreamError(f"{provider}/{model} circuit open")
+
+        bucket = self.bucket_for(provider, headers) if provider else None
+        outcome = "error"
+        started = time.monotonic()
+        try:
+            if bucket:
+                await bucket.acquire()
+            self.stats["sent"] += 1
+            self.stats["streams"] += 1
+            async with pooled_client(timeout=timeout) as client:
+                async with client.stream("POST", url, headers=headers, json={**payload, "stream": True}) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        if response.status_code == 429:
+                            outcome = "429"
+                            if bucket:
+                                bucket.penalize(_retry_after(response))
+                                self.stats["rate_limited"] += 1
+                        elif response.status_code < 500 and response.status_code not in (408, 401, 403):
+                            outcome = None
+                        raise LLMStreamError(f"{provider} stream HTTP {response.status_code}")
+
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            choices = json.loads(data).get("choices") or []
+                        except ValueError:
+                            continue
+                        delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                        if delta:
+                            yield delta
+            outcome = "ok"
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away mid-stream - says nothing about the provider
+            outcome = None
+            raise
+        finally:
+            if router:
+                if outcome is None:
+                    router.release(provider, model)
+                else:
+                    router.record(provider, model, outcome, time.monotonic() - started if outcome == "ok" else 0.0)
+
+    async def complete(self, url, headers: dict, payload: dict, timeout=None) -> Optional[str]:
+        """Message content of a chat completion, or None on any failure"""
+        try:
+            response = await self.post(url, headers=headers, json=payload, timeout=timeout)
+            if response.status_code == 200:
+                return response.json()["choices"][0]["message"]["content"].strip()
+            logger.warning(f"LLM call failed: HTTP {response.status_code}")
+        except Exception as e:
+            logger.warning(f"LLM call failed: {e}")
+        return None
+
+    # ------------------------------------------------------------------
+    # Micro-batching
+    # ------------------------------------------------------------------
+
+    async def complete_batch(
+        self,
+        url,
+        headers: dict,
+        model: str,
+        prompts: Dict[str, str],
+        max_tokens: int = 200,
+        temperature: float = 0.7,
+        timeout=None,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Answer several small independent prompts with one structured call.
+        max_tokens is per prompt. Prompts the model skipped or garbled are
+        retried individually.
+        """
+        if len(prompts) == 1:
+            name, prompt = next(iter(prompts.items()))
+            return {name: await self._complete_single(url, headers, model, prompt, max_tokens, temperature, timeout)}
+
+        tasks = "\n\n".join(f"### TASK {name}\n{prompt}" for name, prompt in prompts.items())
+        payload = {
+            "model": model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You answer several independent tasks at once. Treat each task "
+                               "separately and follow its own instructions. Output ONLY valid JSON.",
+                },
+                {
+                    "role": "user",
+                    "content": f"{tasks}\n\nReturn a JSON object whose keys are the task names "
+                               f"{_json_list(prompts)} and whose values are each task's answer as a string.",
+                },
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens * len(prompts) + 50,
+        }
+
+        self.stats["batched_calls"] += 1
+        self.stats["batched_prompts"] += len(prompts)
+        data = _parse_json_object(await self.complete(url, headers, payload, timeout) or "") or {}
+
+        results: Dict[str, Optional[str]] = {}
+        missing = []
+        for name in prompts:
+            value = data.get(name)
+            if isinstance(value, list):
+                value = ", ".join(str(v) for v in value)
+            if isinstance(value, (str, int, float)) and str(value).strip():
+                results[name] = str(value).strip()
+            else:
+                missing.append(name)
+
+        if missing:
+            self.stats["batch_fallbacks"] += len(missing)
+            answers = await asyncio.gather(*[
+                self._complete_single(url, headers, model, prompts[name], max_tokens, temperature, timeout)
+                for name in missing
+            ])
+            results.update(zip(missing, answers))
+        return results
+
+    async def _complete_single(self, url, headers, model, prompt, max_tokens, temperature, timeout):
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        return await self.complete(url, headers, payload, timeout)
+
+    async def complete_small(
+        self,
+        url,
+        headers: dict,
+        model: str,
+        prompt: str,
+        max_tokens: int = 200,
+        temperature: float = 0.7,
+        timeout=None,
+    ) -> Optional[str]:
+        """
+        Single small prompt that may be folded together with other callers'
+        prompts (same provider key, model and temperature) arriving within
+        LLM_BATCH_WINDOW_MS.
+        """
+        if max_tokens > LLM_BATCH_MAX_TOKENS or LLM_BATCH_MAX <= 1:
+            return await self._complete_single(url, headers, model, prompt, max_tokens, temperature, timeout)
+
+        key = (str(url), self._key_id(headers), model, temperature)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._batches.setdefault(key, [])
+        queue.append((prompt, max_tokens, future))
+
+        def flush():
+            # Only flush the batch this timer/overflow belongs to
+            if self._batches.get(key) is queue:
+                self._batches.pop(key)
+                loop.create_task(self._run_batch(queue, url, headers, model, temperature, timeout))
+
+        if len(queue) >= LLM_BATCH_MAX:
+            flush()
+        elif len(queue) == 1:
+            loop.call_later(LLM_BATCH_WINDOW_MS / 1000.0, flush)
+        return await future
+
+    # ------------------------------------------------------------------
+    # Hedging
+    # ------------------------------------------------------------------
+
+    def latency_for(self, endpoint: str, provider: str) -> LatencyHistogram:
+        key = (endpoint, provider)
+        histogram = self._latency.get(key)
+        if histogram is None:
+            histogram = self._latency[key] = LatencyHistogram()
+        return histogram
+
+    def hedge_delay(self, endpoint: str, provider: str) -> float:
+        """Seconds to give `provider` on `endpoint` before racing the next one (clamped p95)"""
+        observed = self.latency_for(endpoint, provider).quantile(LLM_HEDGE_QUANTILE)
+        if observed is None:
+            return LLM_HEDGE_DEFAULT_DELAY
+        return min(max(observed, LLM_HEDGE_MIN_DELAY), LLM_HEDGE_MAX_DELAY)
+
+    async def _timed(self, endpoint: str, provider: str, attempt: Callable[[], Awaitable[Any]],
+                     validate: Optional[Callable[[Any], bool]]):
+        histogram = self.latency_for(endpoint, provider)
+        started = time.monotonic()
+        try:
+            result = await attempt()
+            if result is not None and validate is not None and not validate(result):
+                result = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"{provider} attempt for {endpoint} failed: {e}")
+            result = None
+        if result is None:
+            histogram.failures += 1
+            return None
+        histogram.observe(time.monotonic() - started)
+        return result
+
+    async def hedged(
+        self,
+        endpoint: str,
+        attempts: List[Tuple[str, Callable[[], Awaitable[Any]]]],
+        validate: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[Any, Optional[str]]:
+        """
+        Run (provider, coroutine factory) attempts in preference order. The next
+        attempt starts when the running one exceeds its hedge delay or fails;
+        the first valid result wins and everything still in flight is
+        cancelled. Returns (result, provider) or (None, None).
+        """
+        self.stats["hedged_calls"] += 1
+        # Fastest healthy provider first; providers with open circuits last
+        preferred = {provider: index for index, provider in
+                     enumerate(get_llm_router().rank_providers([p for p, _ in attempts]))}
+        attempts = sorted(attempts, key=lambda attempt: preferred[attempt[0]])
+        running: Dict[asyncio.Task, str] = {}
+        next_index = 0
+
+        def launch():
+            nonlocal next_index
+            provider, attempt = attempts[next_index]
+            next_index += 1
+            task = asyncio.create_task(self._timed(endpoint, provider, attempt, validate))
+            running[task] = provider
+            return provider
+
+        last_started = launch()
+        try:
+            while running:
+                delay = self.hedge_delay(endpoint, last_started) if next_index < len(attempts) else None
+                done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.stats["hedges_fired"] += 1
+                    logger.info(f"🏁 {endpoint}: {last_started} past {delay:.1f}s, hedging")
+                    last_started = launch()
+                    continue
+
+                for task in done:
+                    provider = running.pop(task)
+                    result = task.result()
+                    if result is not None:
+                        self.latency_for(endpoint, provider).wins += 1
+                        if provider != attempts[0][0]:
+                            self.stats["hedge_wins"] += 1
+                        return result, provider
+
+                # A failed attempt frees its slot - don't wait out the delay for the next one
+                if next_index < len(attempts):
+                    last_started = launch()
+            return None, None
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def _run_batch(self, items, url, headers, model, temperature, timeout):
+        prompts = {str(i + 1): prompt for i, (prompt, _, _) in enumerate(items)}
+        max_tokens = max(tokens for _, tokens, _ in items)
+        try:
+            results = await self.complete_batch(url, headers, model, prompts, max_tokens, temperature, timeout)
+        except Exception as e:
+            logger.warning(f"LLM batch failed: {e}")
+            results = {}
+        for i, (_, _, future) in enumerate(items):
+            if not future.done():
+                future.set_result(results.get(str(i + 1)))
+
+    def get_status(self) -> dict:
+        return {
+            "providers": {
+                f"{provider}:{key_id}": bucket.get_status()
+                for (provider, key_id), bucket in self._buckets.items()
+            },
+            "inflight": len(self._inflight),
+            "pending_batches": sum(len(q) for q in self._batches.values()),
+            "batch_window_ms": LLM_BATCH_WINDOW_MS,
+            "batch_max": LLM_BATCH_MAX,
+            "hedge_delays": {
+                f"{endpoint}:{provider}": round(self.hedge_delay(endpoint, provider), 2)
+                for endpoint, provider in self._latency
+            },
+            "latency": {
+                f"{endpoint}:{provider}": histogram.get_status()
+                for (endpoint, provider), histogram in self._latency.items()
+            },
+            **self.stats,
+        }
+
+
+class LLMClient:
+    """pooled_client-compatible wrapper whose post() goes through the gateway"""
+
+    def __init__(self, gateway: LLMGateway, timeout=None):
+        self.gateway = gateway
+        self.timeout = timeout
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return await self.gateway.post(url, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Connections belong to the shared registry; nothing to close
+        return False
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+llm_gateway = None
+
+def get_llm_gateway() -> LLMGateway:
+    """Get global LLM gateway instance"""
+    global llm_gateway
+    if not llm_gateway:
+        llm_gateway = LLMGateway()
+    return llm_gateway
+
+
+def llm_client(timeout=None) -> LLMClient:
+    """Drop-in for pooled_client() at Mistral/Groq chat completion call sites"""
+    return LLMClient(get_llm_gateway(), timeout=timeout)
@@ -0,0 +1,273 @@
+"""
+llm_router.py - Mistral / Groq Provider Health & Latency-Aware Routing
+==================================================
+Shared view of how each provider + model is behaving right now. The LLM
+gateway feeds it every response; AIService, AIService2 and hedged calls ask
+it which option to try first, and open circuits are short-circuited in the
+gateway so a brownout costs milliseconds instead of a full timeout.
+
+FEATURES:
+- Per provider + model: success rate and 429 rate over the last
+  LLM_CIRCUIT_WINDOW calls, EWMA latency of successful calls
+- Circuit opens after LLM_CIRCUIT_CONSECUTIVE failures in a row, or when the
+  failure rate over a full window passes LLM_CIRCUIT_FAILURE_RATE
+- Open -> half-open after a cooldown (doubled on every failed probe); one
+  probe call at a time decides whether it closes again
+- Ranking: EWMA latency / success rate, with a small penalty per position
+  so the caller's preferred (usually higher-quality) model wins ties
+
+STATES:
+    closed     normal traffic
+    open       calls rejected until the cooldown expires
+    half_open  a single probe call is let through
+
+USAGE:
+    router = get_llm_router()
+    for provider, model in router.rank([("mistral", "mistral-small-latest"), ("groq", "llama-3.1-8b-instant")]):
+        ...
+==================================================
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+LLM_CIRCUIT_WINDOW = int(os.getenv("LLM_CIRCUIT_WINDOW", "20"))
+LLM_CIRCUIT_MIN_CALLS = 8                   # failure rate only judged after this many calls
+LLM_CIRCUIT_FAILURE_RATE = float(os.getenv("LLM_CIRCUIT_FAILURE_RATE", "0.5"))
+LLM_CIRCUIT_CONSECUTIVE = int(os.getenv("LLM_CIRCUIT_CONSECUTIVE", "5"))
+LLM_CIRCUIT_COOLDOWN = float(os.getenv("LLM_CIRCUIT_COOLDOWN", "30"))
+LLM_CIRCUIT_MAX_COOLDOWN = 300.0
+LLM_EWMA_ALPHA = 0.2
+LLM_DEFAULT_LATENCY = 3.0                   # prior for options with no successful call yet
+LLM_PREFERENCE_PENALTY = 0.15               # score multiplier per position in the caller's order
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Rolling outcome window, EWMA latency and circuit state for one provider + model"""
+
+    def __init__(self):
+        self.outcomes: deque = deque(maxlen=LLM_CIRCUIT_WINDOW)    # "ok" | "429" | "error"
+        self.ewma_latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = LLM_CIRCUIT_COOLDOWN
+        self.probe_inflight = False
+        self.stats = {"calls": 0, "successes": 0, "rate_limited": 0, "errors": 0,
+                      "rejected": 0, "opened": 0, "probes": 0}
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def _current_state(self, now: float) -> str:
+        if self.state == OPEN and now - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+        return self.state
+
+    def available(self, now: float) -> bool:
+        """Would a call be admitted right now (without claiming the probe slot)"""
+        state = self._current_state(now)
+        return state == CLOSED or (state == HALF_OPEN and not self.probe_inflight)
+
+    def allow(self, now: float) -> bool:
+        """Admit a call; in half-open this claims the single probe slot"""
+        state = self._current_state(now)
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self.probe_inflight:
+            self.probe_inflight = True
+            self.stats["probes"] += 1
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    # ------------------------------------------------------------------
+    # Outcomes
+    # ------------------------------------------------------------------
+
+    def record(self, outcome: str, latency: float, now: float) -> Optional[str]:
+        """Record a finished call; returns the new state if it changed"""
+        self.stats["calls"] += 1
+        self.outcomes.append(outcome)
+        was_probe = self.probe_inflight
+        self.probe_inflight = False
+
+        if outcome == "ok":
+            self.stats["successes"] += 1
+            self.consecutive_failures = 0
+            self.ewma_latency = latency if self.ewma_latency is None else (
+                LLM_EWMA_ALPHA * latency + (1 - LLM_EWMA_ALPHA) * self.ewma_latency
+            )
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self.cooldown = LLM_CIRCUIT_COOLDOWN
+                self.outcomes.clear()
+                return CLOSED
+            return None
+
+        self.stats["rate_limited" if outcome == "429" else "errors"] += 1
+        self.consecutive_failures += 1
+
+        if was_probe or self.state == HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, LLM_CIRCUIT_MAX_COOLDOWN)
+            return self._open(now)
+        if self.state == CLOSED and (
+            self.consecutive_failures >= LLM_CIRCUIT_CONSECUTIVE
+            or (len(self.outcomes) >= LLM_CIRCUIT_MIN_CALLS and self.failure_rate() >= LLM_CIRCUIT_FAILURE_RATE)
+        ):
+            return self._open(now)
+        return None
+
+    def release(self):
+        """A call was abandoned (e.g. cancelled hedge loser) - free the probe slot"""
+        self.probe_inflight = False
+
+    def _open(self, now: float) -> str:
+        self.state = OPEN
+        self.opened_at = now
+        self.stats["opened"] += 1
+        return OPEN
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def failure_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for o in self.outcomes if o != "ok") / len(self.outcomes)
+
+    def rate_limit_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for o in self.outcomes if o == "429") / len(self.outcomes)
+
+    def score(self) -> float:
+        """Expected seconds per useful answer - lower is better"""
+        latency = self.ewma_latency if self.ewma_latency is not None else LLM_DEFAULT_LATENCY
+        return latency / max(1.0 - self.failure_rate(), 0.1)
+
+    def get_status(self, now: float) -> dict:
+        return {
+            "state": self._current_state(now),
+            "success_rate": round(1.0 - self.failure_rate(), 3),
+            "rate_limit_rate": round(self.rate_limit_rate(), 3),
+            "ewma_latency": round(self.ewma_latency, 2) if self.ewma_latency is not None else None,
+            "score": round(self.score(), 2),
+            "consecutive_failures": self.consecutive_failures,
+            "reopens_in": round(max(0.0, self.opened_at + self.cooldown - now), 1) if self.state == OPEN else 0,
+            **self.stats,
+        }
+
+
+class LLMRouter:
+    """Health registry for every provider + model, and the ranking built on it"""
+
+    def __init__(self):
+        self._health: Dict[Tuple[str, str], ProviderHealth] = {}
+
+    def health(self, provider: str, model: str) -> ProviderHealth:
+        key = (provider, model or "")
+        health = self._health.get(key)
+        if health is None:
+            health = self._health[key] = ProviderHealth()
+        return health
+
+    # ------------------------------------------------------------------
+    # Gateway hooks
+    # ------------------------------------------------------------------
+
+    def allow(self, provider: str, model: str) -> bool:
+        return self.health(provider, model).allow(time.monotonic())
+
+    def record(self, provider: str, model: str, outcome: str, latency: float):
+        changed = self.health(provider, model).record(outcome, latency, time.monotonic())
+        if changed == OPEN:
+            logger.warning(f"🔌 Circuit OPEN for {provider}/{model} - routing around it")
+        elif changed == CLOSED:
+            logger.info(f"✅ Circuit closed for {provider}/{model}")
+
+    def release(self, provider: str, model: str):
+        self.health(provider, model).release()
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def rank(self, candidates: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Healthy (provider, model) options, best first. Options whose circuit
+        is open are dropped; an empty list means every option is down.
+        """
+        now = time.monotonic()
+        scored = []
+        for index, (provider, model) in enumerate(candidates):
+            health = self.health(provider, model)
+            if health.available(now):
+                scored.append((health.score() * (1 + LLM_PREFERENCE_PENALTY * index), index, (provider, model)))
+        return [candidate for _, _, candidate in sorted(scored)]
+
+    def rank_providers(self, providers: Sequence[str]) -> List[str]:
+        """
+        Provider-level ordering for callers that don't pick the model
+        (hedged calls). A provider scores as its best known model; providers
+        with every known model's circuit open go last rather than vanishing,
+        since the gateway rejects those calls instantly anyway.
+        """
+        now = time.monotonic()
+
+        def key(item):
+            index, provider = item
+            models = [h for (p, _), h in self._health.items() if p == provider]
+            healthy = [h.score() for h in models if h.available(now)]
+            if not models:
+                return (0, LLM_DEFAULT_LATENCY * (1 + LLM_PREFERENCE_PENALTY * index), index)
+            if not healthy:
+                return (1, 0.0, index)
+            return (0, min(healthy) * (1 + LLM_PREFERENCE_PENALTY * index), index)
+
+        return [provider for _, provider in sorted(enumerate(providers), key=key)]
+
+    def get_status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "options": {
+                f"{provider}/{model}": health.get_status(now)
+                for (provider, model), health in sorted(self._health.items())
+            },
+            "open_circuits": sum(1 for h in self._health.values() if h._current_state(now) == OPEN),
+            "config": {
+                "window": LLM_CIRCUIT_WINDOW,
+                "failure_rate": LLM_CIRCUIT_FAILURE_RATE,
+                "consecutive": LLM_CIRCUIT_CONSECUTIVE,
+                "cooldown_seconds": LLM_CIRCUIT_COOLDOWN,
+            },
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+llm_router = None
+
+def get_llm_router() -> LLMRouter:
+    """Get global LLM router instance"""
+    global llm_router
+    if not llm_router:
+        llm_router = LLMRouter()
+    return llm_router
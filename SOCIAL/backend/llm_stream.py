@@ -0,0 +1,213 @@
+"""
+llm_stream.py - Server-Sent Event Streaming for AI Content Endpoints
+==================================================
+Streams Mistral / Groq completions (stream=true through the LLM gateway) to
+the browser as Server-Sent Events, so users see the first words after a few
+hundred milliseconds instead of waiting for the whole completion.
+
+FEATURES:
+- First provider to start answering wins; a provider that fails before its
+  first token falls through to the next (router order)
+- Structured fields parsed incrementally while tokens arrive:
+  "LABEL: value" sections (TITLE/DESCRIPTION/CONTENT/...) and objects of a
+  JSON array (viral titles)
+- Final `done` event carries the same JSON the non-streaming endpoint returns
+
+EVENTS:
+    start  {"service"}                         first token received
+    token  {"text"}                            raw content delta
+    field  {"field", "value"[, "index"]}       a structured field completed
+    error  {"error"}                           stream broke after it started
+    done   {...}                               final parsed result
+
+USAGE:
+    async def events():
+        async for event, data in stream_chat(routes, LabeledFieldParser(["TITLE", "CONTENT"])):
+            if event == "complete":
+                yield "done", parse(data["text"])
+            else:
+                yield event, data
+    return sse_response(events())
+==================================================
+"""
+
+import json
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from llm_gateway import get_llm_gateway
+from llm_router import get_llm_router
+
+logger = logging.getLogger(__name__)
+
+# (provider, url, headers, payload)
+ChatRoute = Tuple[str, str, dict, dict]
+
+
+# ============================================================================
+# INCREMENTAL PARSERS
+# ============================================================================
+
+class LabeledFieldParser:
+    """'LABEL: value' sections at line starts; a field completes when the next label begins"""
+
+    def __init__(self, labels: Sequence[str]):
+        self._pattern = re.compile(
+            r'^[ \t*#]*(' + '|'.join(re.escape(label) for label in labels) + r')[ \t*]*:[ \t*]*',
+            re.IGNORECASE | re.MULTILINE,
+        )
+        self.text = ""
+        self.fields: Dict[str, str] = {}
+        self._current: Optional[Tuple[str, int]] = None     # (field, value start offset)
+        self._scanned = 0
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        self.text += delta
+        # Labels are only matched on complete lines
+        end = self.text.rfind("\n") + 1
+        if end <= self._scanned:
+            return []
+        completed = []
+        for match in self._pattern.finditer(self.text, self._scanned, end):
+            completed += self._close(match.start())
+            self._current = (match.group(1).lower(), match.end())
+        self._scanned = end
+        return completed
+
+    def finish(self) -> List[Dict[str, Any]]:
+        completed = self.feed("\n")
+        return completed + self._close(len(self.text))
+
+    def _close(self, position: int) -> List[Dict[str, Any]]:
+        if not self._current:
+            return []
+        field, start = self._current
+        self._current = None
+        value = self.text[start:position].strip()
+        self.fields[field] = value
+        return [{"field": field, "value": value}]
+
+
+class JsonArrayParser:
+    """Emits each object of a JSON array (e.g. "titles": [...]) as soon as its closing brace arrives"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.text = ""
+        self.items: List[Any] = []
+        self._position = 0
+        self._array_start: Optional[int] = None
+        self._object_start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._done = False
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        self.text += delta
+        if self._array_start is None:
+            match = re.search(r'"' + re.escape(self.key) + r'"\s*:\s*\[', self.text)
+            if not match:
+                return []
+            self._array_start = self._position = match.end()
+
+        completed = []
+        while self._position < len(self.text) and not self._done:
+            char = self.text[self._position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._object_start = self._position
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._object_start is not None:
+                    completed += self._emit(self.text[self._object_start:self._position + 1])
+            elif char == "]" and self._depth == 0:
+                self._done = True
+            self._position += 1
+        return completed
+
+    def finish(self) -> List[Dict[str, Any]]:
+        return []
+
+    def _emit(self, raw: str) -> List[Dict[str, Any]]:
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return []
+        self.items.append(value)
+        return [{"field": self.key, "index": len(self.items) - 1, "value": value}]
+
+
+# ============================================================================
+# STREAMING
+# ============================================================================
+
+async def stream_chat(routes: List[ChatRoute], parser=None, timeout=None) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Stream the first route that starts answering (routes re-ranked by the
+    provider router). Yields (event, data) pairs and always ends with
+    ("complete", {"text", "service"}) - text is None when every route failed.
+    """
+    gateway = get_llm_gateway()
+    order = get_llm_router().rank_providers([route[0] for route in routes])
+    routes = sorted(routes, key=lambda route: order.index(route[0]))
+
+    for provider, url, headers, payload in routes:
+        chunks: List[str] = []
+        try:
+            async for delta in gateway.stream(url, headers, payload, timeout):
+                if not chunks:
+                    yield "start", {"service": provider}
+                chunks.append(delta)
+                yield "token", {"text": delta}
+                for field in (parser.feed(delta) if parser else []):
+                    yield "field", field
+        except Exception as e:
+            if not chunks:
+                logger.warning(f"⚠️ {provider} stream failed before first token: {e}")
+                continue
+            logger.error(f"❌ {provider} stream broke after {len(chunks)} chunks: {e}")
+            yield "error", {"service": provider, "error": str(e)}
+
+        if not chunks:
+            continue
+        for field in (parser.finish() if parser else []):
+            yield "field", field
+        yield "complete", {"text": "".join(chunks), "service": provider}
+        return
+
+    yield "complete", {"text": None, "service": None}
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """Wrap (event, data) pairs as a text/event-stream response"""
+    async def body():
+        try:
+            async for event, data in events:
+                yield sse_event(event, data)
+        except Exception as e:
+            logger.error(f"❌ SSE stream failed: {e}")
+            yield sse_event("error", {"error": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
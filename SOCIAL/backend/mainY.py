@@ -27,7 +27,6 @@ import random
 from pydantic import BaseModel, EmailStr
 import sys
 import traceback
-import httpx
 import uuid
 import os
 from fastapi import Form
@@ -49,6 +48,12 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.encoders import jsonable_encoder
 from enum import Enum
 from pathlib import Path
+from http_clients import pooled_client, get_http_registry
+from youtube_client import get_youtube_executor, get_youtube_service_cache
+from youtube_mirror import get_video_mirror
+from llm_stream import sse_response
+from job_queue import get_job_queue
+from render_worker import render
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
@@ -649,8 +654,8 @@ async def download_youtube_video_for_thumbnails(video_url: str, user_id: str) ->
         raise Exception(f"Failed to download YouTube video: {str(e)}")
 
 
-async def initialize_services():
-    """Initialize all services with robust error handling"""
+async def initialize_services(background: bool = True):
+    """Initialize all services with robust error handling (background=False: render workers)"""
     global database_manager, ai_service, youtube_connector, youtube_scheduler, youtube_background_scheduler, youtube_ai_service, youtube_feature_extractor
     
     try:
@@ -703,7 +708,8 @@ async def initialize_services():
                 # Pass both database_manager and ai_service to YouTube initialization
                 success = await initialize_youtube_service(
                     database_manager=database_manager,
-                    ai_service=ai_service
+                    ai_service=ai_service,
+                    background=background
                 )
                 
                 if success:
@@ -761,6 +767,7 @@ async def cleanup_services():
         if youtube_background_scheduler:
             await youtube_background_scheduler.stop()
             logger.info("Background scheduler stopped")
+        await get_job_queue().stop()
         
         if database_manager:
             await database_manager.close()
@@ -770,7 +777,6 @@ async def cleanup_services():
 
 
 
-import httpx
 import re
 from urllib.parse import urlparse, parse_qs
 
@@ -1191,8 +1197,7 @@ This video contains affiliate/sponsored product links. When you purchase through
 async def shorten_url_async(long_url: str) -> str:
     """Shorten URL using TinyURL (async)"""
     try:
-        import httpx
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with pooled_client(timeout=10) as client:
             response = await client.get(
                 f"http://tinyurl.com/api-create.php?url={long_url}"
             )
@@ -1206,12 +1211,19 @@ async def shorten_url_async(long_url: str) -> str:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    await get_http_registry().startup()
     initialization_success = await initialize_services()
     if not initialization_success:
         logger.error("Service initialization failed - app may not work correctly")
     yield
     # Shutdown
     await cleanup_services()
+    await get_product_scraper().browser_pool.shutdown()
+    await get_video_mirror().stop()
+    await get_youtube_service_cache().stop()
+    get_youtube_executor().shutdown()
+    # Last: everything above may still finish requests on the shared pools
+    await get_http_registry().shutdown()
 
 app = FastAPI(
     title="Multi-Platform Social Media Automation",
@@ -1790,10 +1802,10 @@ async def get_youtube_status(user_id: str):
         try:
             youtube_service = await youtube_connector.get_authenticated_service(user_id)
             if youtube_service:
-                channels_response = youtube_service.channels().list(
+                channels_response = await get_youtube_executor().execute(youtube_service.channels().list(
                     part="statistics,snippet",
                     mine=True
-                ).execute()
+                ), user_id)
                 
                 if channels_response.get("items"):
                     channel = channels_response["items"][0]
@@ -1972,10 +1984,10 @@ async def get_youtube_analytics(user_id: str, days: int = 30):
         
         # Get channel statistics
         try:
-            channels_response = youtube_service.channels().list(
+            channels_response = await get_youtube_executor().execute(youtube_service.channels().list(
                 part="statistics,snippet",
                 mine=True
-            ).execute()
+            ), user_id)
             
             if not channels_response.get("items"):
                 raise HTTPException(status_code=404, detail="No channel found")
@@ -1993,39 +2005,18 @@ async def get_youtube_analytics(user_id: str, days: int = 30):
         # Get recent videos
         recent_videos = []
         try:
-            # Search for recent videos from this channel
-            search_response = youtube_service.search().list(
-                part="id",
-                channelId=channel["id"],
-                type="video",
-                order="date",
-                maxResults=10
-            ).execute()
+            for video in await get_video_mirror().get_videos(user_id, limit=10):
+                recent_videos.append({
+                    "video_id": video["video_id"],
+                    "title": video["title"],
+                    "published_at": video["published_at"],
+                    "view_count": video.get("view_count", 0),
+                    "like_count": video.get("like_count", 0),
+                    "comment_count": video.get("comment_count", 0),
+                    "thumbnail_url": video.get("thumbnail_default_url") or video.get("thumbnail_url")
+                })
             
-            if search_response.get("items"):
-                video_ids = [item["id"]["videoId"] for item in search_response["items"]]
-                
-                # Get detailed video statistics
-                videos_response = youtube_service.videos().list(
-                    part="statistics,snippet",
-                    id=",".join(video_ids)
-                ).execute()
-                
-                for video in videos_response.get("items", []):
-                    video_stats = video["statistics"]
-                    video_snippet = video["snippet"]
-                    
-                    recent_videos.append({
-                        "video_id": video["id"],
-                        "title": video_snippet["title"],
-                        "published_at": video_snippet["publishedAt"],
-                        "view_count": int(video_stats.get("viewCount", 0)),
-                        "like_count": int(video_stats.get("likeCount", 0)),
-                        "comment_count": int(video_stats.get("commentCount", 0)),
-                        "thumbnail_url": video_snippet["thumbnails"]["default"]["url"]
-                    })
-                
-                logger.info(f"Retrieved {len(recent_videos)} recent videos")
+            logger.info(f"Retrieved {len(recent_videos)} recent videos")
             
         except Exception as e:
             logger.error(f"Failed to get recent videos: {e}")
@@ -2533,10 +2524,10 @@ async def fetch_youtube_video_info(request: dict):
         
         # Fetch video details
         try:
-            video_response = youtube_service.videos().list(
+            video_response = await get_youtube_executor().execute(youtube_service.videos().list(
                 part="snippet,status",
                 id=video_id
-            ).execute()
+            ), user_id)
         except Exception as api_error:
             logger.error(f"YouTube API error: {api_error}")
             raise HTTPException(status_code=400, detail=f"YouTube API error: {str(api_error)}")
@@ -2794,6 +2785,44 @@ async def generate_youtube_content(request: dict):
             "message": "Content generation failed"
         }
 
+@app.post("/api/ai/generate-youtube-content/stream")
+async def generate_youtube_content_stream(request: dict):
+    """Streaming variant of /api/ai/generate-youtube-content (Server-Sent Events; `done` carries the full result)"""
+    content_type = request.get("content_type", "shorts")
+    topic = request.get("topic", "general")
+    target_audience = request.get("target_audience", "general")
+    style = request.get("style", "engaging")
+    language = request.get("language", "english")
+    region = request.get("region", "india")
+    duration_seconds = request.get("duration_seconds", 30)
+    
+    trending_context = await get_trending_context(topic, language, region)
+    
+    async def events():
+        if ai_service and hasattr(ai_service, 'stream_youtube_content'):
+            async for event, data in ai_service.stream_youtube_content(
+                content_type=content_type,
+                topic=topic,
+                target_audience=target_audience,
+                duration_seconds=duration_seconds,
+                style=style,
+                language=language,
+                region=region,
+                trending_context=trending_context
+            ):
+                if event == "done" and not data.get("success"):
+                    logger.warning(f"AI stream failed: {data.get('error')}")
+                    break
+                yield event, data
+                if event == "done":
+                    return
+        
+        yield "done", await generate_fallback_content(
+            content_type, topic, target_audience, style, language, trending_context
+        )
+    
+    return sse_response(events())
+
 async def get_trending_context(topic: str, language: str, region: str) -> dict:
     """Get trending hashtags and context for content generation"""
     try:
@@ -3281,7 +3310,7 @@ async def generate_video_thumbnails(request: dict):
                 timestamp = int(datetime.now().timestamp())
                 local_video_path = str(temp_dir / f"temp_{timestamp}.mp4")
                 
-                async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
+                async with pooled_client(timeout=120.0, follow_redirects=True) as client:
                     response = await client.get(video_url)
                     
                     if response.status_code != 200:
@@ -3697,49 +3726,7 @@ async def generate_community_post(request: dict):
                 logger.warning(f"AI service failed: {ai_error}")
         
         # Enhanced fallback content
-        mock_content = {
-            "text": {
-                "content": f"Just discovered something amazing about {topic}! 🚀\n\nWhat's your experience with {topic}? Share in the comments below! 👇",
-                "options": []
-            },
-            "text_poll": {
-                "content": f"Quick question about {topic} for our {target_audience} community! 🤔\n\nWhich aspect interests you most?",
-                "options": [
-                    f"Getting started with {topic}",
-                    f"Advanced {topic} techniques", 
-                    f"Best {topic} tools",
-                    f"Future of {topic}"
-                ]
-            },
-            "image_poll": {
-                "content": f"Visual poll time! 📊\n\nWhich {topic} approach resonates with you?",
-                "options": [
-                    f"Traditional {topic} methods",
-                    f"Modern {topic} approaches",
-                    f"Hybrid {topic} strategies",
-                    f"Innovative {topic} solutions"
-                ]
-            },
-            "quiz": {
-                "content": f"Test your {topic} knowledge! 🧠\n\nWhat's the most important factor for {topic} success?",
-                "options": [
-                    "Consistent practice and patience",
-                    "Having the right tools and resources", 
-                    "Learning from experts and mentors",
-                    "Understanding your target audience"
-                ]
-            }
-        }
-        
-        template = mock_content.get(post_type, mock_content["text"])
-        
-        return {
-            "success": True,
-            "content": template["content"],
-            "options": template["options"],
-            "post_type": post_type,
-            "ai_service": "enhanced_mock"
-        }
+        return community_post_fallback(post_type, topic, target_audience)
         
     except Exception as e:
         logger.error(f"Community post generation failed: {e}")
@@ -3748,6 +3735,77 @@ async def generate_community_post(request: dict):
             "error": str(e)
         }
 
+def community_post_fallback(post_type: str, topic: str, target_audience: str) -> dict:
+    """Enhanced template community post used when the AI service is unavailable"""
+    mock_content = {
+        "text": {
+            "content": f"Just discovered something amazing about {topic}! 🚀\n\nWhat's your experience with {topic}? Share in the comments below! 👇",
+            "options": []
+        },
+        "text_poll": {
+            "content": f"Quick question about {topic} for our {target_audience} community! 🤔\n\nWhich aspect interests you most?",
+            "options": [
+                f"Getting started with {topic}",
+                f"Advanced {topic} techniques", 
+                f"Best {topic} tools",
+                f"Future of {topic}"
+            ]
+        },
+        "image_poll": {
+            "content": f"Visual poll time! 📊\n\nWhich {topic} approach resonates with you?",
+            "options": [
+                f"Traditional {topic} methods",
+                f"Modern {topic} approaches",
+                f"Hybrid {topic} strategies",
+                f"Innovative {topic} solutions"
+            ]
+        },
+        "quiz": {
+            "content": f"Test your {topic} knowledge! 🧠\n\nWhat's the most important factor for {topic} success?",
+            "options": [
+                "Consistent practice and patience",
+                "Having the right tools and resources", 
+                "Learning from experts and mentors",
+                "Understanding your target audience"
+            ]
+        }
+    }
+    
+    template = mock_content.get(post_type, mock_content["text"])
+    
+    return {
+        "success": True,
+        "content": template["content"],
+        "options": template["options"],
+        "post_type": post_type,
+        "ai_service": "enhanced_mock"
+    }
+
+@app.post("/api/ai/generate-community-post/stream")
+async def generate_community_post_stream(request: dict):
+    """Streaming variant of /api/ai/generate-community-post (Server-Sent Events; `done` carries the full result)"""
+    post_type = request.get("post_type", "text")
+    topic = request.get("topic", "general")
+    target_audience = request.get("target_audience", "general")
+    
+    async def events():
+        if ai_service and hasattr(ai_service, 'stream_community_post'):
+            async for event, data in ai_service.stream_community_post(
+                post_type=post_type,
+                topic=topic,
+                target_audience=target_audience
+            ):
+                if event == "done" and not data.get("success"):
+                    logger.warning(f"AI stream failed: {data.get('error')}")
+                    break
+                yield event, data
+                if event == "done":
+                    return
+        
+        yield "done", community_post_fallback(post_type, topic, target_audience)
+    
+    return sse_response(events())
+
 @app.post("/api/youtube/community-post")
 async def youtube_community_post(request: dict):
     """Publish or schedule YouTube community post"""
@@ -3852,68 +3910,28 @@ async def get_user_videos(user_id: str):
         if not youtube_service:
             raise HTTPException(status_code=400, detail="Failed to authenticate with YouTube")
         
-        # Get user's channel
-        credentials = await database_manager.get_youtube_credentials(user_id)
-        channel_id = credentials["channel_info"]["channel_id"]
-        
-        # Get recent videos (increased limit for better selection)
-        search_response = youtube_service.search().list(
-            part="id,snippet",
-            channelId=channel_id,
-            type="video",
-            order="date",
-            maxResults=50
-        ).execute()
+        # Recent videos from the local channel mirror (synced from the uploads playlist)
+        mirrored_videos = await get_video_mirror().get_videos(user_id, limit=50)
         
         videos = []
-        video_ids = []
-        
-        for item in search_response.get("items", []):
-            video_id = item["id"]["videoId"]
-            video_ids.append(video_id)
-            
-            # Parse publish date for IST conversion
-            published_at = item["snippet"]["publishedAt"]
+        for video in mirrored_videos:
+            description = video.get("description") or ""
+            duration = video.get("duration", "PT0S")
             
             videos.append({
-                "video_id": video_id,
-                "title": item["snippet"]["title"],
-                "description": item["snippet"]["description"][:150] + "..." if len(item["snippet"]["description"]) > 150 else item["snippet"]["description"],
-                "published_at": published_at,
-                "thumbnail_url": item["snippet"]["thumbnails"]["medium"]["url"] if "medium" in item["snippet"]["thumbnails"] else item["snippet"]["thumbnails"]["default"]["url"],
-                "channel_title": item["snippet"]["channelTitle"]
+                "video_id": video["video_id"],
+                "title": video["title"],
+                "description": description[:150] + "..." if len(description) > 150 else description,
+                "published_at": video["published_at"],
+                "thumbnail_url": video.get("thumbnail_url"),
+                "channel_title": video.get("channel_title", ""),
+                "view_count": video.get("view_count", 0),
+                "like_count": video.get("like_count", 0),
+                "comment_count": video.get("comment_count", 0),
+                "duration": duration,
+                "is_short": _is_youtube_short_duration(duration)
             })
         
-        # Get video statistics in batches (YouTube API limit is 50 per request)
-        if video_ids:
-            stats_response = youtube_service.videos().list(
-                part="statistics,contentDetails",
-                id=",".join(video_ids)
-            ).execute()
-            
-            # Create stats mapping
-            stats_map = {}
-            for video_stats in stats_response.get("items", []):
-                vid_id = video_stats["id"]
-                stats = video_stats["statistics"]
-                content_details = video_stats.get("contentDetails", {})
-                
-                stats_map[vid_id] = {
-                    "view_count": int(stats.get("viewCount", 0)),
-                    "like_count": int(stats.get("likeCount", 0)),
-                    "comment_count": int(stats.get("commentCount", 0)),
-                    "duration": content_details.get("duration", "PT0S")
-                }
-            
-            # Apply statistics to videos
-            for video in videos:
-                vid_stats = stats_map.get(video["video_id"], {})
-                video.update(vid_stats)
-                
-                # Determine if it's a Short (under 60 seconds)
-                duration = video.get("duration", "PT0S")
-                video["is_short"] = _is_youtube_short_duration(duration)
-        
         # Sort by publish date (newest first)
         videos.sort(key=lambda x: x["published_at"], reverse=True)
         
@@ -3967,12 +3985,12 @@ async def get_youtube_comments(user_id: str, video_id: str = None, max_results:
         if video_id:
             # Get comments for specific video
             try:
-                response = youtube_service.commentThreads().list(
+                response = await get_youtube_executor().execute(youtube_service.commentThreads().list(
                     part="snippet,replies",
                     videoId=video_id,
                     maxResults=max_results,
                     order="time"
-                ).execute()
+                ), user_id)
                 
                 for item in response.get("items", []):
                     comment_data = item["snippet"]["topLevelComment"]["snippet"]
@@ -4008,29 +4026,20 @@ async def get_youtube_comments(user_id: str, video_id: str = None, max_results:
         else:
             # Get comments for all user's recent videos (fallback)
             try:
-                credentials = await database_manager.get_youtube_credentials(user_id)
-                channel_id = credentials["channel_info"]["channel_id"]
-                
                 # Get recent videos
-                search_response = youtube_service.search().list(
-                    part="id",
-                    channelId=channel_id,
-                    type="video",
-                    order="date",
-                    maxResults=10
-                ).execute()
+                recent_videos = await get_video_mirror().get_videos(user_id, limit=10)
                 
-                for video in search_response.get("items", []):
-                    vid_id = video["id"]["videoId"]
+                for video in recent_videos:
+                    vid_id = video["video_id"]
                     
                     # Get comments for each video
                     try:
-                        comments_response = youtube_service.commentThreads().list(
+                        comments_response = await get_youtube_executor().execute(youtube_service.commentThreads().list(
                             part="snippet",
                             videoId=vid_id,
                             maxResults=5,  # Reduced for overview
                             order="time"
-                        ).execute()
+                        ), user_id)
                         
                         for item in comments_response.get("items", []):
                             comment_data = item["snippet"]["topLevelComment"]["snippet"]
@@ -4167,7 +4176,7 @@ async def reply_to_comment(request: dict):
             raise HTTPException(status_code=400, detail="Failed to authenticate with YouTube")
         
         # Post reply
-        response = youtube_service.comments().insert(
+        response = await get_youtube_executor().execute(youtube_service.comments().insert(
             part="snippet",
             body={
                 "snippet": {
@@ -4175,7 +4184,7 @@ async def reply_to_comment(request: dict):
                     "textOriginal": reply_text
                 }
             }
-        ).execute()
+        ), user_id)
         
         return {
             "success": True,
@@ -4208,7 +4217,7 @@ async def edit_reply(request: dict):
             raise HTTPException(status_code=400, detail="Failed to authenticate with YouTube")
         
         # Update MY reply (not original comment)
-        youtube_service.comments().update(
+        await get_youtube_executor().execute(youtube_service.comments().update(
             part="snippet",
             body={
                 "id": reply_id,
@@ -4216,7 +4225,7 @@ async def edit_reply(request: dict):
                     "textOriginal": new_text
                 }
             }
-        ).execute()
+        ), user_id)
         
         return {
             "success": True,
@@ -4239,7 +4248,7 @@ async def delete_reply(reply_id: str, user_id: str):
             raise HTTPException(status_code=400, detail="Failed to authenticate with YouTube")
         
         # Delete MY reply
-        youtube_service.comments().delete(id=reply_id).execute()
+        await get_youtube_executor().execute(youtube_service.comments().delete(id=reply_id), user_id)
         
         return {
             "success": True,
@@ -4264,7 +4273,7 @@ async def delete_comment(comment_id: str, user_id: str):
             raise HTTPException(status_code=400, detail="Failed to authenticate with YouTube")
         
         # Delete comment
-        youtube_service.comments().delete(id=comment_id).execute()
+        await get_youtube_executor().execute(youtube_service.comments().delete(id=comment_id), user_id)
         
         return {
             "success": True,
@@ -4414,8 +4423,6 @@ def detect_comment_language(text: str) -> str:
 
 
 
-# Add after line 50 in mainY.py (after other imports)
-from slideshow_generator import get_slideshow_generator
 
 # Add this endpoint after line 1200 (after youtube upload endpoints)
 
@@ -4494,8 +4501,9 @@ async def generate_slideshow_background(
         logger.info(f"🎬 Background generation started for user: {user_id}")
         
         # Generate slideshow
-        slideshow_gen = get_slideshow_generator()
-        result = await slideshow_gen.generate_slideshow(
+        result = await render(
+            "slideshow",
+            user_id,
             images=images,
             title=title,
             language=language,
@@ -4679,10 +4687,9 @@ async def generate_youtube_slideshow(request: dict):
             }
         
         # ✅ GENERATE SLIDESHOW WITH PRODUCT OVERLAYS
-        from slideshow_generator import get_slideshow_generator
-        slideshow_gen = get_slideshow_generator()
-        
-        result = await slideshow_gen.generate_slideshow(
+        result = await render(
+            "slideshow",
+            user_id,
             images=images,
             title=title,
             language='english',
@@ -4919,12 +4926,10 @@ async def generate_slideshow_preview(request: dict):
         
         logger.info("✅ Validation passed, generating video...")
         
-        # Get slideshow generator
-        from slideshow_generator import get_slideshow_generator
-        slideshow_gen = get_slideshow_generator()
-        
-        # ✅ Generate video with overlays
-        result = await slideshow_gen.generate_slideshow(
+        # ✅ Generate video with overlays (render worker when RENDER_WORKERS=external)
+        result = await render(
+            "slideshow",
+            user_id,
             images=images,
             title=title,
             language='english',
@@ -5125,7 +5130,7 @@ from YTscrapADS import get_product_scraper
 async def shorten_url(long_url: str) -> str:
     """Shorten URL using TinyURL (free, no API needed)"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with pooled_client() as client:
             response = await client.get(
                 f"http://tinyurl.com/api-create.php?url={long_url}",
                 timeout=10
@@ -5760,7 +5765,7 @@ async def execute_product_automation(user_id: str, config: dict):
             
             # Convert URLs to base64
             base64_images = []
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with pooled_client(timeout=30) as client:
                 for img_url in images:
                     try:
                         response = await client.get(img_url)
@@ -5774,8 +5779,9 @@ async def execute_product_automation(user_id: str, config: dict):
                 return
             
             # Generate slideshow
-            slideshow_gen = get_slideshow_generator()
-            video_result = await slideshow_gen.generate_slideshow(
+            video_result = await render(
+                "slideshow",
+                user_id,
                 images=base64_images,
                 title=product_data.get("product_name"),
                 language='english',
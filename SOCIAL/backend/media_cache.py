@@ -0,0 +1,302 @@
+"""
+media_cache.py - Content-Addressed Media Asset Cache
+==================================================
+Disk-backed cache for stock images, videos and music (freesound, Pixabay,
+Pexels, GitHub audio collections) shared by every video pipeline.
+
+LAYOUT:
+    <root>/objects/<sha256(content)><ext>   - immutable blobs (deduplicated)
+    <root>/keys/<sha256(url|transform)>     - symlink -> ../objects/<blob>
+
+FEATURES:
+- Keyed by URL + transform ("" = raw bytes, "1080x1080 square", "mp3", ...)
+- Size cap with LRU eviction (blob mtime is bumped on every hit)
+- Atomic writes (temp file + os.replace) - safe across workers
+- Reflink / hardlink into job dirs, copy only as last resort
+==================================================
+"""
+
+import asyncio
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Optional
+
+from http_clients import pooled_client
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MEDIA_CACHE_DIR = os.getenv(
+    "MEDIA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "velocity_media_cache")
+)
+MEDIA_CACHE_MAX_MB = int(os.getenv("MEDIA_CACHE_MAX_MB", "2048"))
+EVICTION_CHECK_INTERVAL = 60  # seconds between size scans
+
+FICLONE = 0x40049409  # Linux ioctl for reflink copies (btrfs/xfs)
+
+
+class MediaAssetCache:
+    """URL + transform -> content-addressed blob on disk"""
+
+    def __init__(self, root: str = MEDIA_CACHE_DIR, max_bytes: int = MEDIA_CACHE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.keys_dir = os.path.join(root, "keys")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.keys_dir, exist_ok=True)
+        self._locks = {}
+        self._last_eviction = 0.0
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def key_for(url: str, transform: str = "") -> str:
+        return hashlib.sha256(f"{url}|{transform}".encode("utf-8")).hexdigest()
+
+    def _key_path(self, key: str) -> str:
+        return os.path.join(self.keys_dir, key)
+
+    def lookup(self, url: str, transform: str = "") -> Optional[str]:
+        """Return cached blob path (and mark it recently used) or None"""
+        key_path = self._key_path(self.key_for(url, transform))
+        try:
+            blob = os.path.realpath(key_path)
+            if not os.path.islink(key_path) or not os.path.exists(blob):
+                return None
+            os.utime(blob, None)
+            return blob
+        except OSError:
+            return None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put_bytes(self, url: str, data: bytes, transform: str = "", ext: str = "") -> str:
+        """Store bytes atomically under their content hash and point the key at them"""
+        digest = hashlib.sha256(data).hexdigest()
+        blob = os.path.join(self.objects_dir, digest + ext)
+
+        if not os.path.exists(blob):
+            fd, tmp = tempfile.mkstemp(dir=self.objects_dir, prefix=".tmp_")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.chmod(tmp, 0o444)
+                os.replace(tmp, blob)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+
+        self._point_key(self.key_for(url, transform), os.path.basename(blob))
+        self._maybe_evict()
+        return blob
+
+    def put_file(self, url: str, src_path: str, transform: str = "") -> str:
+        """Store an existing file (e.g. ffmpeg output) in the cache"""
+        with open(src_path, "rb") as f:
+            data = f.read()
+        return self.put_bytes(url, data, transform, os.path.splitext(src_path)[1])
+
+    def _point_key(self, key: str, blob_name: str):
+        tmp_link = os.path.join(self.keys_dir, f".tmp_{key}_{os.getpid()}")
+        try:
+            os.symlink(os.path.join("..", "objects", blob_name), tmp_link)
+            os.replace(tmp_link, self._key_path(key))
+        finally:
+            if os.path.lexists(tmp_link):
+                os.remove(tmp_link)
+
+    # ------------------------------------------------------------------
+    # Materialise into job dirs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def link_into(blob: str, dest_path: str) -> str:
+        """Reflink -> hardlink -> copy the blob to dest_path"""
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+
+        try:
+            import fcntl
+            with open(blob, "rb") as src, open(dest_path, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return dest_path
+        except (ImportError, OSError):
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+
+        try:
+            os.link(blob, dest_path)
+            return dest_path
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+
+        shutil.copyfile(blob, dest_path)
+        return dest_path
+
+    # ------------------------------------------------------------------
+    # Fetch
+    # ------------------------------------------------------------------
+
+    async def fetch(
+        self,
+        url: str,
+        dest_path: str,
+        transform: str = "",
+        process: Optional[Callable[[bytes], bytes]] = None,
+        min_bytes: int = 0,
+        timeout: float = 30,
+        headers: Optional[dict] = None,
+    ) -> bool:
+        """
+        Materialise url (+ transform) at dest_path.
+        On a miss the URL is downloaded, optionally transformed by process(),
+        stored, then linked. Concurrent misses for the same key download once.
+        """
+        blob = self.lookup(url, transform)
+        if blob:
+            self.stats["hits"] += 1
+            self.link_into(blob, dest_path)
+            return True
+
+        key = self.key_for(url, transform)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        try:
+            async with lock:
+                blob = self.lookup(url, transform)
+                if not blob:
+                    self.stats["misses"] += 1
+                    data = await self._download(url, timeout, headers)
+                    if data is None:
+                        return False
+
+                    if process:
+                        data = process(data)
+                        if data is None:
+                            return False
+
+                    if len(data) < min_bytes:
+                        logger.warning(f"   ⚠️ Asset too small ({len(data)} bytes): {url[:80]}")
+                        return False
+
+                    ext = os.path.splitext(dest_path)[1]
+                    blob = self.put_bytes(url, data, transform, ext)
+                else:
+                    self.stats["hits"] += 1
+        finally:
+            if not lock.locked():
+                self._locks.pop(key, None)
+
+        self.link_into(blob, dest_path)
+        return True
+
+    async def _download(self, url: str, timeout: float, headers: Optional[dict]) -> Optional[bytes]:
+        try:
+            async with pooled_client(timeout=timeout, follow_redirects=True) as client:
+                resp = await client.get(url, headers=headers)
+                if resp.status_code == 200:
+                    return resp.content
+                logger.warning(f"   ⚠️ Asset HTTP {resp.status_code}: {url[:80]}")
+        except Exception as e:
+            logger.warning(f"   ⚠️ Asset download failed: {str(e)[:100]}")
+        return None
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _maybe_evict(self):
+        now = time.monotonic()
+        if now - self._last_eviction < EVICTION_CHECK_INTERVAL:
+            return
+        self._last_eviction = now
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least-recently-used blobs until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.objects_dir):
+            if name.startswith(".tmp_"):
+                continue
+            path = os.path.join(self.objects_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+
+        # Drop keys whose blob is gone
+        for name in os.listdir(self.keys_dir):
+            key_path = os.path.join(self.keys_dir, name)
+            if os.path.islink(key_path) and not os.path.exists(key_path):
+                try:
+                    os.remove(key_path)
+                except OSError:
+                    pass
+
+        self.stats["evicted"] += removed
+        logger.info(f"🧹 Media cache evicted {removed} blobs ({total / (1024 * 1024):.0f}MB kept)")
+        return removed
+
+    def get_status(self) -> dict:
+        total = 0
+        count = 0
+        for name in os.listdir(self.objects_dir):
+            try:
+                total += os.path.getsize(os.path.join(self.objects_dir, name))
+                count += 1
+            except OSError:
+                continue
+        return {
+            "root": self.root,
+            "objects": count,
+            "size_mb": round(total / (1024 * 1024), 1),
+            "max_mb": round(self.max_bytes / (1024 * 1024)),
+            **self.stats,
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+media_cache = None
+
+def get_media_cache() -> MediaAssetCache:
+    """Get global media cache instance"""
+    global media_cache
+    if not media_cache:
+        media_cache = MediaAssetCache()
+    return media_cache
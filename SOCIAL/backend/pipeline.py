@@ -0,0 +1,425 @@
+"""
+pipeline.py - Stage-Checkpointed Video Pipelines
+==================================================
+Video generators (MrBeast, Pixabay, Viral Pixel) are declared as stages with
+named inputs and outputs. Every finished stage is checkpointed in a job
+workspace, so a retry of the same job (same key) resumes from the last good
+stage instead of re-downloading, re-transcribing and paying for TTS again.
+Keys identify one job attempt (job-queue / idempotency key), never the
+request parameters - a new request must not pick up an old job's work.
+
+LAYOUT:
+    <root>/<pipeline>/<sha1(key)[:20]>/manifest.json
+                                       .lock
+                                       <files written by stages>
+
+FEATURES:
+- Stage(name, run, inputs, outputs, files, optional, error): inputs are
+  pipeline params, resources (not checkpointed, e.g. database_manager),
+  `workdir`, or outputs of earlier stages
+- Manifest entry per stage: outputs (JSON), output file sizes, a run id,
+  a fingerprint of its params and the run ids of the stages it read from
+- Demand-driven resume: starting from the requested targets, a stage is
+  reused when its lineage is unchanged and its files are still on disk;
+  otherwise it re-runs, and so does everything downstream that's needed.
+  Intermediates deleted after their consumer finished don't force re-runs
+- Stages form a DAG through their inputs: every stage starts as soon as its
+  upstreams finish, so independent branches (TTS, music, image fetch) run
+  concurrently and the wall time follows the critical path. Stages share
+  the workspace, so each must write its own file names
+- PipelineError carries the user-facing message; the workspace is kept on
+  any failure and discarded by the caller on success (or on failure, via
+  Pipeline.discard(key), when nothing will retry that key)
+- One run per workspace at a time (flock); stale workspaces are swept after
+  PIPELINE_WORKSPACE_TTL
+
+USAGE:
+    MY_PIPELINE = Pipeline("mrbeast", [
+        Stage("download", download, inputs=("youtube_url", "workdir"), outputs=("video_path",),
+              files=("video_path",), error="Download failed"),
+        ...
+    ])
+    run = await MY_PIPELINE.run(key, ["upload"], {"youtube_url": url}, {"database_manager": db})
+    run.values["upload"]
+    run.discard()
+==================================================
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PIPELINE_WORKSPACE_ROOT = os.getenv(
+    "PIPELINE_WORKSPACE_ROOT", os.path.join(tempfile.gettempdir(), "velocity_pipelines")
+)
+PIPELINE_WORKSPACE_TTL = int(os.getenv("PIPELINE_WORKSPACE_TTL", str(24 * 3600)))
+PIPELINE_SWEEP_INTERVAL = 3600
+MANIFEST_NAME = "manifest.json"
+WORKDIR = "workdir"
+
+_last_sweep = 0.0
+
+
+class PipelineError(Exception):
+    """A stage failed in an expected way; the message is returned to the user"""
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    files: Tuple[str, ...] = ()         # outputs holding workspace file paths (str or list of str)
+    optional: Tuple[str, ...] = ()      # outputs allowed to come back None / empty
+    error: Optional[str] = None         # message when a required output is missing
+
+
+@dataclass
+class PipelineRun:
+    values: Dict[str, Any]
+    workdir: str
+    executed: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+
+    def discard(self):
+        """Delete the workspace (call once the job's result is safely delivered)"""
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+# ============================================================================
+# WORKSPACE
+# ============================================================================
+
+def _fingerprint(values: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _file_sizes(value) -> Optional[Dict[str, int]]:
+    """{path: size} for a file output, None if any file is missing"""
+    paths = value if isinstance(value, (list, tuple)) else [value]
+    sizes = {}
+    for path in paths:
+        if not path:
+            continue
+        try:
+            sizes[path] = os.path.getsize(path)
+        except OSError:
+            return None
+    return sizes
+
+
+def workspace_path(pipeline: str, key: str) -> str:
+    return os.path.join(PIPELINE_WORKSPACE_ROOT, pipeline, hashlib.sha1(key.encode()).hexdigest()[:20])
+
+
+class Workspace:
+    """Job directory + manifest; holds an exclusive lock while open"""
+
+    def __init__(self, pipeline: str, key: str):
+        self.path = workspace_path(pipeline, key)
+        os.makedirs(self.path, exist_ok=True)
+        self._lock_file = None
+        self.manifest = {"pipeline": pipeline, "key": key, "created_at": datetime.now().isoformat(), "stages": {}}
+        try:
+            with open(os.path.join(self.path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def stages(self) -> Dict[str, dict]:
+        return self.manifest["stages"]
+
+    def lock(self):
+        if not FCNTL_AVAILABLE:
+            return
+        self._lock_file = open(os.path.join(self.path, ".lock"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise PipelineError("This video is already being generated - try again when it finishes")
+
+    def unlock(self):
+        if self._lock_file:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def files_present(self, name: str) -> bool:
+        entry = self.stages[name]
+        for output, sizes in entry.get("files", {}).items():
+            if _file_sizes(list(sizes)) != sizes:
+                return False
+        return True
+
+    def record(self, name: str, entry: dict):
+        self.stages[name] = entry
+        self.manifest["updated_at"] = datetime.now().isoformat()
+        temp_path = os.path.join(self.path, MANIFEST_NAME + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(temp_path, os.path.join(self.path, MANIFEST_NAME))
+
+
+def sweep_workspaces(max_age: int = PIPELINE_WORKSPACE_TTL) -> int:
+    """Delete workspaces untouched for max_age seconds (abandoned failed jobs)"""
+    removed = 0
+    cutoff = time.time() - max_age
+    try:
+        pipelines = os.listdir(PIPELINE_WORKSPACE_ROOT)
+    except OSError:
+        return 0
+    for pipeline in pipelines:
+        pipeline_dir = os.path.join(PIPELINE_WORKSPACE_ROOT, pipeline)
+        try:
+            names = os.listdir(pipeline_dir)
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(pipeline_dir, name)
+            manifest = os.path.join(path, MANIFEST_NAME)
+            try:
+                touched = os.path.getmtime(manifest if os.path.exists(manifest) else path)
+            except OSError:
+                continue
+            if touched < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+    if removed:
+        logger.info(f"🧹 Swept {removed} stale pipeline workspace(s)")
+    return removed
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+class Pipeline:
+    """Stage DAG; run() executes what the targets need, concurrently, and reuses valid checkpoints"""
+
+    registry: Dict[str, "Pipeline"] = {}
+
+    def __init__(self, name: str, stages: Sequence[Stage]):
+        self.name = name
+        self.stages = list(stages)
+        self.producer: Dict[str, Stage] = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in self.producer:
+                    raise ValueError(f"{name}: output {output} produced by {self.producer[output].name} and {stage.name}")
+                self.producer[output] = stage
+        for stage in self.stages:
+            for value in stage.inputs:
+                producer = self.producer.get(value)
+                if producer and self.stages.index(producer) >= self.stages.index(stage):
+                    raise ValueError(f"{name}: {stage.name} reads {value} before {producer.name} produces it")
+        self.stats = {"runs": 0, "resumed_runs": 0, "stages_run": 0, "stages_reused": 0,
+                      "seconds_saved": 0.0, "stage_seconds": 0.0, "wall_seconds": 0.0,
+                      "failures": 0}
+        Pipeline.registry[name] = self
+
+    def _upstream(self, stage: Stage) -> Set[str]:
+        return {self.producer[value].name for value in stage.inputs if value in self.producer}
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def _plan(self, workspace: Workspace, targets: Sequence[str], params: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+        """(needed, rerun) stage names for the requested targets"""
+        by_name = {stage.name: stage for stage in self.stages}
+        entries = workspace.stages
+
+        # Checkpoint lineage still matches (params + the exact upstream runs it read)
+        consistent: Dict[str, bool] = {}
+        for stage in self.stages:
+            entry = entries.get(stage.name)
+            consistent[stage.name] = bool(entry) and entry.get("params") == self._params_fingerprint(stage, params) and all(
+                consistent[upstream] and entry.get("upstream", {}).get(upstream) == entries[upstream]["run_id"]
+                for upstream in self._upstream(stage)
+            )
+        reusable = {name: ok and workspace.files_present(name) for name, ok in consistent.items()}
+
+        needed: Set[str] = set()
+        rerun: Set[str] = set()
+
+        def require(name: str):
+            if name in needed:
+                return
+            needed.add(name)
+            if not reusable[name]:
+                rerun.add(name)
+                for upstream in self._upstream(by_name[name]):
+                    require(upstream)
+
+        for target in targets:
+            if target in self.producer:
+                require(self.producer[target].name)
+
+        # A re-run stage invalidates every needed stage downstream of it
+        changed = True
+        while changed:
+            changed = False
+            for stage in self.stages:
+                if stage.name in needed and stage.name not in rerun and self._upstream(stage) & rerun:
+                    rerun.add(stage.name)
+                    for upstream in self._upstream(stage):
+                        require(upstream)
+                    changed = True
+        return needed, rerun
+
+    @staticmethod
+    def _params_fingerprint(stage: Stage, params: Dict[str, Any]) -> str:
+        return _fingerprint({name: params[name] for name in stage.inputs if name in params})
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    async def run(self, key: str, targets: Sequence[str], params: Dict[str, Any],
+                  resources: Optional[Dict[str, Any]] = None) -> PipelineRun:
+        """
+        Run (or resume) the job identified by key up to `targets`. Raises
+        PipelineError for expected failures; the workspace survives every
+        failure so the next run with the same key resumes.
+        """
+        global _last_sweep
+        if time.time() - _last_sweep > PIPELINE_SWEEP_INTERVAL:
+            _last_sweep = time.time()
+            sweep_workspaces()
+
+        workspace = Workspace(self.name, key)
+        workspace.lock()
+        try:
+            return await self._execute(workspace, targets, params, resources or {})
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        finally:
+            workspace.unlock()
+
+    async def _execute(self, workspace: Workspace, targets: Sequence[str], params: Dict[str, Any],
+                       resources: Dict[str, Any]) -> PipelineRun:
+        needed, rerun = self._plan(workspace, targets, params)
+        values: Dict[str, Any] = {**params, **resources, WORKDIR: workspace.path}
+        run = PipelineRun(values, workspace.path)
+        started = time.time()
+
+        # Checkpoints first; their outputs feed the stages that re-run
+        for stage in self.stages:
+            if stage.name in needed and stage.name not in rerun:
+                entry = workspace.stages[stage.name]
+                values.update(entry["outputs"])
+                run.reused.append(stage.name)
+                self.stats["seconds_saved"] += entry.get("seconds", 0.0)
+
+        # Every stage whose re-run upstreams are done starts at once
+        waiting = [stage for stage in self.stages if stage.name in rerun]
+        running: Dict[asyncio.Task, Stage] = {}
+        done: Set[str] = set()
+        try:
+            while waiting or running:
+                for stage in [s for s in waiting if (self._upstream(s) & rerun) <= done]:
+                    waiting.remove(stage)
+                    running[asyncio.create_task(self._run_stage(workspace, stage, values, params))] = stage
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    stage = running.pop(task)
+                    self.stats["stage_seconds"] += task.result()
+                    done.add(stage.name)
+                    run.executed.append(stage.name)
+        except BaseException:
+            # Siblings that already finished stay checkpointed; the rest are abandoned
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            raise
+
+        self.stats["runs"] += 1
+        self.stats["stages_run"] += len(run.executed)
+        self.stats["stages_reused"] += len(run.reused)
+        self.stats["wall_seconds"] += time.time() - started
+        if run.reused:
+            self.stats["resumed_runs"] += 1
+            logger.info(f"♻️ {self.name}: reused {', '.join(run.reused)}; ran {', '.join(run.executed) or 'nothing'}")
+        return run
+
+    async def _run_stage(self, workspace: Workspace, stage: Stage, values: Dict[str, Any],
+                         params: Dict[str, Any]) -> float:
+        """Run one stage, publish its outputs and checkpoint it; returns its duration"""
+        started = time.time()
+        logger.info(f"▶️ {self.name}: {stage.name}")
+        outputs = self._collect(stage, await stage.run(**{name: values[name] for name in stage.inputs}))
+        values.update(outputs)
+        seconds = time.time() - started
+
+        workspace.record(stage.name, {
+            "run_id": uuid.uuid4().hex,
+            "outputs": outputs,
+            "files": {name: _file_sizes(outputs[name]) or {} for name in stage.files if outputs.get(name)},
+            "params": self._params_fingerprint(stage, params),
+            "upstream": {upstream: workspace.stages[upstream]["run_id"] for upstream in self._upstream(stage)},
+            "seconds": round(seconds, 2),
+            "completed_at": datetime.now().isoformat(),
+        })
+        return seconds
+
+    def _collect(self, stage: Stage, result: Any) -> Dict[str, Any]:
+        """Map a stage's return value onto its declared outputs and check the required ones"""
+        if len(stage.outputs) == 1:
+            outputs = {stage.outputs[0]: result}
+        else:
+            result = result or {}
+            outputs = {name: result.get(name) for name in stage.outputs}
+        for name, value in outputs.items():
+            if name not in stage.optional and (value is None or value == [] or value == ""):
+                raise PipelineError(stage.error or f"{stage.name} failed: no {name}")
+            if name in stage.files and value and _file_sizes(value) is None:
+                raise PipelineError(stage.error or f"{stage.name} failed: {name} missing on disk")
+        return outputs
+
+    def workspace_path(self, key: str) -> str:
+        return workspace_path(self.name, key)
+
+    def discard(self, key: str):
+        """Delete a job's workspace without running it (failed one-off runs nobody will resume)"""
+        shutil.rmtree(self.workspace_path(key), ignore_errors=True)
+
+    def get_status(self) -> dict:
+        stats = {name: round(value, 1) if isinstance(value, float) else value for name, value in self.stats.items()}
+        # > 1 means independent stages overlapped
+        stats["parallelism"] = round(self.stats["stage_seconds"] / self.stats["wall_seconds"], 2) if self.stats["wall_seconds"] else None
+        return {"stages": [stage.name for stage in self.stages], **stats}
+
+
+def get_pipelines_status() -> dict:
+    """Stats for every declared pipeline"""
+    return {
+        "workspace_root": PIPELINE_WORKSPACE_ROOT,
+        "workspace_ttl_seconds": PIPELINE_WORKSPACE_TTL,
+        "pipelines": {name: pipeline.get_status() for name, pipeline in Pipeline.registry.items()},
+    }
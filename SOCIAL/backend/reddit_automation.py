@@ -12,13 +12,16 @@ import random
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict, is_dataclass
 import json
 import threading
 import sys
 import os
 from concurrent.futures import ThreadPoolExecutor
 
+from http_clients import private_http_registry
+from job_queue import get_job_queue, job_key
+
 # Fix Windows console encoding
 if sys.platform == "win32":
     os.environ["PYTHONIOENCODING"] = "utf-8"
@@ -34,6 +37,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+REDDIT_POST_JOB = "reddit_auto_post"
+
 @dataclass
 class AutoPostConfig:
     """Configuration for automatic posting with enhanced features"""
@@ -76,6 +81,7 @@ class RedditAutomationScheduler:
         self.activity_logs = {}
         self.daily_post_counts = {}
         self.last_check_time = None
+        self.main_loop = None
         
         # CRITICAL FIX: Use ThreadPoolExecutor for async operations in deployment
         self.executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="reddit_auto")
@@ -99,6 +105,16 @@ class RedditAutomationScheduler:
         schedule.every().hour.do(self._reset_reply_counters)
         schedule.every().day.at("00:00").do(self._reset_daily_counters)
         
+        # Scheduled posts execute on the shared job queue (main event loop), so with
+        # several workers/instances each slot is posted exactly once
+        try:
+            self.main_loop = asyncio.get_running_loop()
+            get_job_queue().register(REDDIT_POST_JOB, self._run_post_job)
+            get_job_queue().start()
+        except RuntimeError:
+            self.main_loop = None
+            logger.warning("No running event loop - scheduled posts will run in the scheduler thread with private HTTP pools")
+        
         logger.info("Enhanced Reddit automation scheduler started - DEPLOYMENT READY")
         
         # Start background scheduler thread
@@ -148,20 +164,24 @@ class RedditAutomationScheduler:
         except Exception as e:
             logger.error(f"Sync question monitoring error: {e}")
     
-    def _run_async_posting_check(self):
-        """CRITICAL FIX: Run async posting check in separate thread with new loop"""
+    def _run_async(self, coro_fn):
+        """
+        Run an async check from the executor thread. The shared HTTP pools (and the
+        LLM gateway on top of them) are bound to the main loop, so run there when
+        we have one; otherwise use a new loop with its own private pools.
+        """
+        if self.main_loop and not self.main_loop.is_closed():
+            return asyncio.run_coroutine_threadsafe(coro_fn(), self.main_loop).result()
+        
+        async def run_private():
+            async with private_http_registry():
+                return await coro_fn()
+        
+        # Create new event loop for this thread
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
         try:
-            # Create new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # Run the async posting check
-            result = loop.run_until_complete(self._async_posting_check())
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Async posting check error: {e}")
+            return loop.run_until_complete(run_private())
         finally:
             # Always clean up the loop
             try:
@@ -169,23 +189,19 @@ class RedditAutomationScheduler:
             except:
                 pass
     
+    def _run_async_posting_check(self):
+        """CRITICAL FIX: Run async posting check off the scheduler thread"""
+        try:
+            return self._run_async(self._async_posting_check)
+        except Exception as e:
+            logger.error(f"Async posting check error: {e}")
+    
     def _run_async_question_monitoring(self):
-        """Run async question monitoring in separate thread"""
+        """Run async question monitoring off the scheduler thread"""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            result = loop.run_until_complete(self._async_question_monitoring())
-            
-            return result
-            
+            return self._run_async(self._async_question_monitoring)
         except Exception as e:
             logger.error(f"Async question monitoring error: {e}")
-        finally:
-            try:
-                loop.close()
-            except:
-                pass
     
     async def setup_auto_posting(self, config: Union[AutoPostConfig, Dict]) -> Dict[str, Any]:
         """Enhanced auto-posting setup with comprehensive validation"""
@@ -572,24 +588,16 @@ class RedditAutomationScheduler:
                         logger.info(f"DEBUG: User {user_id} - Already posted at {current_time} today (last_post_key: {last_post_key})")
                         continue
                     
-                    logger.info(f"EXECUTING SCHEDULED POST: {current_time} for user {user_id} (u/{reddit_username})")
-                    
-                    # Generate and post content - REAL POSTING
-                    success = await self._generate_and_post_content(user_id, config, current_time)
-                    
-                    if success:
-                        # Update counters and tracking
-                        daily_count["count"] += 1
-                        self.daily_post_counts[user_id] = daily_count
+                    if self.main_loop:
+                        # Every instance reaches this for the same slot; the job key lets one of them post
+                        logger.info(f"QUEUEING SCHEDULED POST: {current_time} for user {user_id} (u/{reddit_username})")
                         auto_posting["last_post_key"] = last_post_key
-                        auto_posting["successful_posts"] = auto_posting.get("successful_posts", 0) + 1
-                        auto_posting["last_post_time"] = datetime.now().isoformat()
-                        logger.info(f"DEPLOYMENT: Automated post SUCCESS for user {user_id}")
-                    else:
-                        auto_posting["failed_posts"] = auto_posting.get("failed_posts", 0) + 1
-                        logger.error(f"DEPLOYMENT: Automated post FAILED for user {user_id}")
+                        await self._enqueue_post_job(user_id, config, current_time, current_date)
+                        continue
                     
-                    auto_posting["total_posts"] = auto_posting.get("total_posts", 0) + 1
+                    logger.info(f"EXECUTING SCHEDULED POST: {current_time} for user {user_id} (u/{reddit_username})")
+                    if await self._post_scheduled(user_id, config, current_time):
+                        auto_posting["last_post_key"] = last_post_key
                     
                 except Exception as user_error:
                     logger.error(f"Error processing user {user_id}: {user_error}")
@@ -606,6 +614,45 @@ class RedditAutomationScheduler:
         except Exception as e:
             logger.error(f"DEPLOYMENT: Posting check failed: {e}")
     
+    async def _enqueue_post_job(self, user_id: str, config, time_slot: str, date: str):
+        """Queue one posting slot on the job queue (the posting check runs on the main loop)"""
+        payload = {
+            "config": asdict(config) if is_dataclass(config) else dict(config),
+            "time_slot": time_slot
+        }
+        await get_job_queue().enqueue(
+            REDDIT_POST_JOB, user_id, payload, job_key(REDDIT_POST_JOB, user_id, f"{date}_{time_slot}"),
+            max_attempts=1                  # posts to Reddit; a retry after a crash could post twice
+        )
+    
+    async def _run_post_job(self, job: Dict[str, Any]):
+        """Job handler for a queued posting slot"""
+        payload = job["payload"]
+        await self._post_scheduled(job["user_id"], payload["config"], payload["time_slot"])
+    
+    async def _post_scheduled(self, user_id: str, config, time_slot: str) -> bool:
+        """Generate and post one scheduled slot, then update counters and tracking"""
+        # Generate and post content - REAL POSTING
+        success = await self._generate_and_post_content(user_id, config, time_slot)
+        
+        auto_posting = self.active_configs.get(user_id, {}).get("auto_posting") or {}
+        if success:
+            current_date = datetime.now().date().isoformat()
+            daily_count = self.daily_post_counts.get(user_id, {"date": current_date, "count": 0})
+            if daily_count.get("date") != current_date:
+                daily_count = {"date": current_date, "count": 0}
+            daily_count["count"] += 1
+            self.daily_post_counts[user_id] = daily_count
+            auto_posting["successful_posts"] = auto_posting.get("successful_posts", 0) + 1
+            auto_posting["last_post_time"] = datetime.now().isoformat()
+            logger.info(f"DEPLOYMENT: Automated post SUCCESS for user {user_id}")
+        else:
+            auto_posting["failed_posts"] = auto_posting.get("failed_posts", 0) + 1
+            logger.error(f"DEPLOYMENT: Automated post FAILED for user {user_id}")
+        
+        auto_posting["total_posts"] = auto_posting.get("total_posts", 0) + 1
+        return success
+    
     async def _generate_and_post_content(self, user_id: str, config, time_slot: str) -> bool:
         """Generate and post content - DEPLOYMENT OPTIMIZED"""
         try:
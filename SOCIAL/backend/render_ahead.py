@@ -0,0 +1,393 @@
+"""
+render_ahead.py - Render-Ahead Inventory for Scheduled Uploads
+==================================================
+Pre-builds ready-to-upload bundles (video + thumbnail + metadata) for the
+upcoming upload_times slots of every enabled automation, so when a slot fires
+in the automation scheduler only the YouTube upload runs.
+
+LAYOUT:
+    <root>/<user_id>/<kind>/<bundle_id>/bundle.json
+                                        video.mp4
+                                        thumbnail.jpg   (optional)
+
+FEATURES:
+- Bounded per-user inventory (RENDER_AHEAD_MAX_PER_USER per automation kind)
+- Bundles expire (RENDER_AHEAD_TTL) - discard hooks release reserved inputs
+- Planner only builds while the ffmpeg pool is idle and CPU is below
+  RENDER_AHEAD_MAX_CPU, one bundle at a time, at PRIORITY_BACKGROUND
+- Claims are atomic renames - two workers never upload the same bundle
+- Builders/config sources are registered by Supermain (no import cycle)
+==================================================
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ffmpeg_pool import get_ffmpeg_pool, ffmpeg_job, PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+RENDER_AHEAD_ENABLED = os.getenv("RENDER_AHEAD_ENABLED", "true").lower() == "true"
+RENDER_AHEAD_DIR = os.getenv(
+    "RENDER_AHEAD_DIR", os.path.join(tempfile.gettempdir(), "velocity_render_ahead")
+)
+RENDER_AHEAD_MAX_PER_USER = int(os.getenv("RENDER_AHEAD_MAX_PER_USER", "2"))
+RENDER_AHEAD_TTL = int(os.getenv("RENDER_AHEAD_TTL", str(12 * 3600)))
+RENDER_AHEAD_HORIZON = int(os.getenv("RENDER_AHEAD_HORIZON", str(4 * 3600)))   # look-ahead window
+RENDER_AHEAD_INTERVAL = int(os.getenv("RENDER_AHEAD_INTERVAL", "120"))          # planner tick
+RENDER_AHEAD_MAX_CPU = float(os.getenv("RENDER_AHEAD_MAX_CPU", "60"))
+SLOT_GUARD_SECONDS = 90     # don't start a build this close to a slot - the slot renders inline
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Builder contract: (user_id, config_data) -> {"video_path", "thumbnail_path"?, "metadata", "cleanup_dir"?}
+BundleBuilder = Callable[[str, dict], Awaitable[Optional[dict]]]
+ConfigSource = Callable[[], Awaitable[List[Tuple[str, dict]]]]
+DiscardHook = Callable[[dict], Awaitable[None]]
+
+
+def upcoming_slots(upload_times: List[str], horizon: int = RENDER_AHEAD_HORIZON, now: datetime = None) -> List[datetime]:
+    """IST datetimes of the HH:MM upload_times falling within the next `horizon` seconds"""
+    now = now or datetime.now(IST)
+    slots = []
+    for value in upload_times or []:
+        try:
+            hour, minute = (int(part) for part in str(value).split(":")[:2])
+        except ValueError:
+            continue
+        slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if slot <= now:
+            slot += timedelta(days=1)
+        if (slot - now).total_seconds() <= horizon:
+            slots.append(slot)
+    return sorted(slots)
+
+
+# ============================================================================
+# INVENTORY
+# ============================================================================
+
+class RenderAheadInventory:
+    """Disk-backed, bounded, expiring store of ready-to-upload bundles"""
+
+    def __init__(self, root: str = RENDER_AHEAD_DIR, max_per_user: int = RENDER_AHEAD_MAX_PER_USER,
+                 ttl: int = RENDER_AHEAD_TTL):
+        self.root = root
+        self.max_per_user = max_per_user
+        self.ttl = ttl
+        os.makedirs(root, exist_ok=True)
+        self.stats = {"stored": 0, "claimed": 0, "expired": 0, "rejected_full": 0}
+
+    def _kind_dir(self, user_id: str, kind: str) -> str:
+        return os.path.join(self.root, user_id, kind)
+
+    def list(self, user_id: str, kind: str) -> List[dict]:
+        """Unexpired bundles, oldest first"""
+        kind_dir = self._kind_dir(user_id, kind)
+        bundles = []
+        try:
+            names = os.listdir(kind_dir)
+        except OSError:
+            return []
+        for name in names:
+            if name.startswith("."):
+                continue
+            try:
+                with open(os.path.join(kind_dir, name, "bundle.json"), "r", encoding="utf-8") as f:
+                    bundle = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if bundle.get("expires_at", 0) > time.time():
+                bundles.append(bundle)
+        return sorted(bundles, key=lambda b: b.get("created_at", 0))
+
+    def count(self, user_id: str, kind: str) -> int:
+        return len(self.list(user_id, kind))
+
+    def put(self, user_id: str, kind: str, built: dict) -> Optional[dict]:
+        """Move a builder's output into the inventory; None if the user's slot budget is full"""
+        if self.count(user_id, kind) >= self.max_per_user:
+            self.stats["rejected_full"] += 1
+            return None
+
+        bundle_id = uuid.uuid4().hex[:12]
+        kind_dir = self._kind_dir(user_id, kind)
+        os.makedirs(kind_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=kind_dir, prefix=".tmp_")
+        try:
+            video_path = os.path.join(staging, "video" + (os.path.splitext(built["video_path"])[1] or ".mp4"))
+            shutil.move(built["video_path"], video_path)
+            thumbnail_path = None
+            if built.get("thumbnail_path") and os.path.exists(built["thumbnail_path"]):
+                thumbnail_path = os.path.join(staging, "thumbnail" + os.path.splitext(built["thumbnail_path"])[1])
+                shutil.move(built["thumbnail_path"], thumbnail_path)
+
+            final_dir = os.path.join(kind_dir, bundle_id)
+            now = time.time()
+            bundle = {
+                "bundle_id": bundle_id,
+                "user_id": user_id,
+                "kind": kind,
+                "dir": final_dir,
+                "video_path": os.path.join(final_dir, os.path.basename(video_path)),
+                "thumbnail_path": os.path.join(final_dir, os.path.basename(thumbnail_path)) if thumbnail_path else None,
+                "metadata": built.get("metadata", {}),
+                "created_at": now,
+                "expires_at": now + self.ttl,
+            }
+            with open(os.path.join(staging, "bundle.json"), "w", encoding="utf-8") as f:
+                json.dump(bundle, f, ensure_ascii=False, default=str)
+            os.replace(staging, final_dir)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        finally:
+            if built.get("cleanup_dir"):
+                shutil.rmtree(built["cleanup_dir"], ignore_errors=True)
+
+        self.stats["stored"] += 1
+        logger.info(f"📦 Render-ahead bundle stored: {kind} {bundle_id} for {user_id}")
+        return bundle
+
+    def take(self, user_id: str, kind: str) -> Optional[dict]:
+        """
+        Claim the oldest unexpired bundle. The caller owns its directory and
+        must call discard(bundle) once the upload is done (or failed).
+        """
+        for bundle in self.list(user_id, kind):
+            claimed_dir = os.path.join(self._kind_dir(user_id, kind), f".claimed_{bundle['bundle_id']}")
+            try:
+                os.rename(bundle["dir"], claimed_dir)
+            except OSError:
+                continue  # another worker got it first
+            for key in ("video_path", "thumbnail_path"):
+                if bundle.get(key):
+                    bundle[key] = os.path.join(claimed_dir, os.path.basename(bundle[key]))
+            bundle["dir"] = claimed_dir
+            self.stats["claimed"] += 1
+            return bundle
+        return None
+
+    @staticmethod
+    def discard(bundle: dict):
+        shutil.rmtree(bundle["dir"], ignore_errors=True)
+
+    def purge_expired(self) -> List[dict]:
+        """Delete expired bundles (and stale claims/staging dirs); returns the expired bundles"""
+        expired = []
+        now = time.time()
+        for user_id in os.listdir(self.root):
+            user_dir = os.path.join(self.root, user_id)
+            if not os.path.isdir(user_dir):
+                continue
+            for kind in os.listdir(user_dir):
+                kind_dir = os.path.join(user_dir, kind)
+                if not os.path.isdir(kind_dir):
+                    continue
+                for name in os.listdir(kind_dir):
+                    path = os.path.join(kind_dir, name)
+                    if name.startswith("."):
+                        # Crashed mid-build or mid-upload
+                        if now - os.path.getmtime(path) > self.ttl:
+                            shutil.rmtree(path, ignore_errors=True)
+                        continue
+                    try:
+                        with open(os.path.join(path, "bundle.json"), "r", encoding="utf-8") as f:
+                            bundle = json.load(f)
+                    except (OSError, ValueError):
+                        shutil.rmtree(path, ignore_errors=True)
+                        continue
+                    if bundle.get("expires_at", 0) <= now:
+                        shutil.rmtree(path, ignore_errors=True)
+                        expired.append(bundle)
+        self.stats["expired"] += len(expired)
+        return expired
+
+    def get_status(self) -> dict:
+        per_user = {}
+        try:
+            users = os.listdir(self.root)
+        except OSError:
+            users = []
+        for user_id in users:
+            user_dir = os.path.join(self.root, user_id)
+            if os.path.isdir(user_dir):
+                per_user[user_id] = {kind: self.count(user_id, kind) for kind in os.listdir(user_dir)}
+        return {
+            "root": self.root,
+            "max_per_user": self.max_per_user,
+            "ttl_seconds": self.ttl,
+            "inventory": per_user,
+            **self.stats,
+        }
+
+
+# ============================================================================
+# PLANNER
+# ============================================================================
+
+@dataclass
+class _Registration:
+    load_configs: ConfigSource
+    build: BundleBuilder
+    on_discard: Optional[DiscardHook] = None
+
+
+class RenderAheadPlanner:
+    """Background loop that keeps each user's inventory filled for upcoming slots"""
+
+    def __init__(self, inventory: RenderAheadInventory):
+        self.inventory = inventory
+        self._kinds: Dict[str, _Registration] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.building: Optional[str] = None
+        self.stats = {"built": 0, "build_failures": 0, "skipped_busy": 0}
+
+    def register(self, kind: str, load_configs: ConfigSource, build: BundleBuilder,
+                 on_discard: Optional[DiscardHook] = None):
+        self._kinds[kind] = _Registration(load_configs, build, on_discard)
+
+    def start(self):
+        if RENDER_AHEAD_ENABLED and not self._task:
+            self._task = asyncio.create_task(self._run())
+            logger.info("✅ Render-ahead planner started")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @staticmethod
+    def system_idle() -> bool:
+        pool = get_ffmpeg_pool().get_status()
+        if pool.get("running", 0) or pool.get("queued", 0):
+            return False
+        if PSUTIL_AVAILABLE and psutil.cpu_percent(interval=None) > RENDER_AHEAD_MAX_CPU:
+            return False
+        return True
+
+    async def _run(self):
+        if PSUTIL_AVAILABLE:
+            psutil.cpu_percent(interval=None)  # prime the counter
+        while True:
+            try:
+                await self._release_expired()
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Render-ahead tick failed: {e}")
+            await asyncio.sleep(RENDER_AHEAD_INTERVAL)
+
+    async def _release_expired(self):
+        for bundle in self.inventory.purge_expired():
+            registration = self._kinds.get(bundle.get("kind"))
+            if registration and registration.on_discard:
+                try:
+                    await registration.on_discard(bundle)
+                except Exception as e:
+                    logger.warning(f"Render-ahead discard hook failed: {e}")
+
+    async def _next_job(self) -> Optional[Tuple[str, str, dict, datetime]]:
+        """(kind, user_id, config, slot) with the soonest unfilled slot"""
+        best = None
+        now = datetime.now(IST)
+        for kind, registration in self._kinds.items():
+            for user_id, config_data in await registration.load_configs():
+                slots = upcoming_slots(config_data.get("upload_times", []), now=now)
+                slots = [s for s in slots if (s - now).total_seconds() > SLOT_GUARD_SECONDS]
+                wanted = min(len(slots), self.inventory.max_per_user)
+                have = self.inventory.count(user_id, kind)
+                if have >= wanted:
+                    continue
+                slot = slots[have]
+                if best is None or slot < best[3]:
+                    best = (kind, user_id, config_data, slot)
+        return best
+
+    async def tick(self) -> bool:
+        """Build at most one bundle if the machine is idle; True when one was stored"""
+        job = await self._next_job()
+        if not job:
+            return False
+        if not self.system_idle():
+            self.stats["skipped_busy"] += 1
+            return False
+
+        kind, user_id, config_data, slot = job
+        self.building = f"{kind}:{user_id}"
+        logger.info(f"🏗️ Render-ahead: building {kind} bundle for {user_id} (slot {slot.strftime('%H:%M')} IST)")
+        try:
+            with ffmpeg_job(user_id, PRIORITY_BACKGROUND):
+                built = await self._kinds[kind].build(user_id, config_data)
+            if not built or not built.get("video_path"):
+                self.stats["build_failures"] += 1
+                return False
+            built.setdefault("metadata", {})["slot"] = slot.isoformat()
+            bundle = self.inventory.put(user_id, kind, built)
+            if bundle is None:
+                await self._discard_built(kind, user_id, built)
+                return False
+            self.stats["built"] += 1
+            return True
+        except Exception as e:
+            self.stats["build_failures"] += 1
+            logger.error(f"❌ Render-ahead build failed for {user_id}: {e}")
+            return False
+        finally:
+            self.building = None
+
+    async def _discard_built(self, kind: str, user_id: str, built: dict):
+        if built.get("cleanup_dir"):
+            shutil.rmtree(built["cleanup_dir"], ignore_errors=True)
+        registration = self._kinds.get(kind)
+        if registration and registration.on_discard:
+            await registration.on_discard({"user_id": user_id, "kind": kind, "metadata": built.get("metadata", {})})
+
+    def get_status(self) -> dict:
+        return {
+            "enabled": RENDER_AHEAD_ENABLED,
+            "running": bool(self._task and not self._task.done()),
+            "kinds": list(self._kinds),
+            "building": self.building,
+            "horizon_seconds": RENDER_AHEAD_HORIZON,
+            **self.stats,
+            "inventory": self.inventory.get_status(),
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+render_ahead = None
+
+def get_render_ahead() -> RenderAheadPlanner:
+    """Get global render-ahead planner instance"""
+    global render_ahead
+    if not render_ahead:
+        render_ahead = RenderAheadPlanner(RenderAheadInventory())
+    return render_ahead
@@ -0,0 +1,237 @@
+"""
+render_worker.py - Dedicated Render Worker Processes
+==================================================
+Moves video generation (Viral Pixel, Pixabay, MrBeast, Douyin, slideshow)
+out of the FastAPI process. With RENDER_WORKERS=external the API only
+enqueues a `render` job on the shared job queue and waits for its result in
+Mongo; `python -m render_worker` processes claim and run them, so PIL /
+OpenCV / ffmpeg work and its GC pauses never touch API latency.
+
+FEATURES:
+- render(renderer, user_id, database_manager, **kwargs) is a drop-in for
+  awaiting the generator directly: same result dict (a worker-side crash
+  comes back as {"success": False, "error": ...})
+- RENDER_WORKERS=inline (default) keeps rendering in-process, for
+  single-process deployments that don't run workers
+- N worker processes (--processes), each with its own event loop, DB
+  connections, YouTube services and ffmpeg pool; one render per process
+  at a time by default (--concurrency)
+- The caller's ffmpeg_job() priority travels with the job, and interactive
+  renders are claimed ahead of scheduled ones
+- Status / result / error live on the job document (automation_jobs)
+- The API stops waiting after RENDER_RESULT_TIMEOUT (no worker running,
+  stuck lease) and returns a failure result instead of hanging
+
+Workers share the API host's filesystem: slideshow and render-ahead results
+are local file paths the API process picks up, and inline base64 `images`
+are spooled to RENDER_SPOOL_DIR so the job document only carries paths.
+
+USAGE:
+    python -m render_worker --processes 4        # worker host / sidecar
+    RENDER_WORKERS=external uvicorn Supermain:app # API only enqueues
+
+    result = await render("mrbeast", user_id, database_manager,
+                          youtube_url=url, target_duration=30)
+==================================================
+"""
+
+import argparse
+import asyncio
+import base64
+import inspect
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import uuid
+from importlib import import_module
+from typing import Any, Callable, Dict
+
+from ffmpeg_pool import ffmpeg_job, current_ffmpeg_job, PRIORITY_INTERACTIVE
+from job_queue import get_job_queue, JOB_PRIORITY_INTERACTIVE, JOB_PRIORITY_AUTOMATION
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+RENDER_WORKERS = os.getenv("RENDER_WORKERS", "inline").lower()              # inline | external
+RENDER_WORKER_PROCESSES = int(os.getenv("RENDER_WORKER_PROCESSES", "2"))
+RENDER_WORKER_CONCURRENCY = int(os.getenv("RENDER_WORKER_CONCURRENCY", "1"))   # renders per process
+RENDER_RESULT_POLL_INTERVAL = 1.0
+RENDER_RESULT_TIMEOUT = float(os.getenv("RENDER_RESULT_TIMEOUT", "1800"))   # no worker / stuck job -> fail
+RENDER_JOB = "render"
+RENDER_SPOOL_DIR = os.getenv("RENDER_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "velocity_render_spool"))
+
+# Renderer name -> generator (resolved lazily; the API never imports the heavy modules for this)
+RENDERERS: Dict[str, Callable[[], Callable]] = {
+    "viral_pixel": lambda: import_module("Viral_pixel").generate_viral_video,
+    "pixabay": lambda: import_module("Pixabay").generate_pixabay_video,
+    "pixabay_render": lambda: import_module("Pixabay").render_pixabay_video,
+    "mrbeast": lambda: import_module("MrBeast").generate_mrbeast_short,
+    "china": lambda: import_module("china").process_niche_videos,
+    "slideshow": lambda: import_module("slideshow_generator").get_slideshow_generator().generate_slideshow,
+}
+
+
+async def _invoke(renderer: str, user_id: str, database_manager, kwargs: dict) -> Any:
+    """Call a renderer, supplying user_id / database_manager where its signature takes them"""
+    generator = RENDERERS[renderer]()
+    parameters = inspect.signature(generator).parameters
+    if "user_id" in parameters:
+        kwargs.setdefault("user_id", user_id)
+    if "database_manager" in parameters:
+        kwargs["database_manager"] = database_manager
+    return await generator(**kwargs)
+
+
+# ============================================================================
+# API SIDE
+# ============================================================================
+
+def _spool_images(images: list) -> tuple:
+    """Write base64 images to the shared spool dir; returns (spool_dir, paths)"""
+    spool_dir = os.path.join(RENDER_SPOOL_DIR, uuid.uuid4().hex)
+    os.makedirs(spool_dir, exist_ok=True)
+    paths = []
+    for idx, img_b64 in enumerate(images):
+        if 'base64,' in img_b64:
+            img_b64 = img_b64.split('base64,', 1)[1]
+        path = os.path.join(spool_dir, f"image_{idx:03d}")
+        with open(path, "wb") as f:
+            f.write(base64.b64decode(img_b64.strip()))
+        paths.append(path)
+    return spool_dir, paths
+
+
+async def render(renderer: str, user_id: str, database_manager=None, **kwargs) -> Any:
+    """
+    Run one render and return the generator's result. Inline mode calls it
+    here; external mode enqueues it for a render worker and waits.
+    """
+    if RENDER_WORKERS != "external":
+        return await _invoke(renderer, user_id, database_manager, kwargs)
+
+    # Base64 images would bloat the Mongo job document; hand the worker file paths instead
+    spool_dir = None
+    if isinstance(kwargs.get("images"), list):
+        spool_dir, kwargs["images"] = await asyncio.to_thread(_spool_images, kwargs["images"])
+
+    try:
+        ffmpeg_priority = current_ffmpeg_job()["priority"]
+        queue = get_job_queue()
+        job_id = await queue.enqueue(
+            RENDER_JOB,
+            user_id,
+            {"renderer": renderer, "kwargs": kwargs, "ffmpeg_priority": ffmpeg_priority},
+            f"{RENDER_JOB}:{renderer}:{user_id}:{uuid.uuid4().hex}",
+            priority=JOB_PRIORITY_INTERACTIVE if ffmpeg_priority <= PRIORITY_INTERACTIVE else JOB_PRIORITY_AUTOMATION,
+            max_attempts=1                      # renders upload; never run one twice
+        )
+        logger.info(f"🎞️ Render {renderer} for {user_id} queued as job {job_id}")
+
+        job = await queue.wait(job_id, RENDER_RESULT_POLL_INTERVAL, RENDER_RESULT_TIMEOUT)
+    finally:
+        if spool_dir:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+    if job["status"] == "failed":
+        return {"success": False, "error": job.get("last_error") or "Render worker failed"}
+    return job.get("result")
+
+
+# ============================================================================
+# WORKER SIDE
+# ============================================================================
+
+async def run_render_job(job: dict) -> Any:
+    """Job handler: run the renderer in this worker under the caller's ffmpeg priority"""
+    import Supermain
+
+    payload = job["payload"]
+    with ffmpeg_job(job["user_id"], payload.get("ffmpeg_priority")):
+        return await _invoke(payload["renderer"], job["user_id"], Supermain.database_manager, payload["kwargs"])
+
+
+async def _initialize_worker() -> bool:
+    """DB connections and YouTube upload services, without any API-side schedulers"""
+    import Supermain
+    from mainY import initialize_services
+
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        logger.error("❌ MONGODB_URI not found in environment")
+        return False
+
+    # Generators take Supermain's unified manager (same as the API endpoints pass)
+    Supermain.database_manager = Supermain.UnifiedDatabaseManager(mongodb_uri)
+    if not await Supermain.database_manager.connect():
+        return False
+
+    # YouTube database (job queue) + connector/scheduler used for uploads
+    return await initialize_services(background=False)
+
+
+async def _serve(concurrency: int):
+    if not await _initialize_worker():
+        logger.error("❌ Render worker initialization failed")
+        return
+
+    queue = get_job_queue()
+    queue.register(RENDER_JOB, run_render_job)
+    queue.start(concurrency)
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stopping.set)
+
+    logger.info(f"🎞️ Render worker {queue.worker_id} ready ({concurrency} concurrent renders)")
+    await stopping.wait()
+
+    logger.info(f"🛑 Render worker {queue.worker_id} stopping - cancelling in-flight renders")
+    await queue.stop()
+
+
+def _run_process(concurrency: int):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(processName)s - %(levelname)s - %(message)s")
+    asyncio.run(_serve(concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VelocityPost render worker")
+    parser.add_argument("--processes", type=int, default=RENDER_WORKER_PROCESSES,
+                        help="worker processes to run (default: RENDER_WORKER_PROCESSES)")
+    parser.add_argument("--concurrency", type=int, default=RENDER_WORKER_CONCURRENCY,
+                        help="renders per process at a time (default: RENDER_WORKER_CONCURRENCY)")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _run_process(args.concurrency)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_run_process, args=(args.concurrency,), name=f"render-{index}")
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum, _frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()     # SIGTERM: each worker releases its leases and exits
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for process in processes:
+        process.join()
+    sys.exit(max((process.exitcode or 0) for process in processes))
+
+
+if __name__ == "__main__":
+    main()
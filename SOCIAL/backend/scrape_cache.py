@@ -0,0 +1,249 @@
+"""
+scrape_cache.py - Product Scrape Result Cache
+==================================================
+Disk-backed cache for UniversalProductScraper.scrape_product results so the
+UI preview, the product automation and its retries don't re-scrape the same
+product page minutes apart.
+
+LAYOUT:
+    <root>/<sha256(canonical url)>.json
+
+FEATURES:
+- Keyed by canonical product URL (tracking params stripped, Flipkart/Amazon
+  reduced to their product identifiers; short links resolved by the scraper)
+- Per-field-group freshness: price fields expire faster than name/images
+- ETag / Last-Modified stored for conditional revalidation
+- Atomic writes (temp file + os.replace) - safe across workers
+- Small in-process LRU in front of the disk
+==================================================
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SCRAPE_CACHE_DIR = os.getenv(
+    "SCRAPE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "velocity_scrape_cache")
+)
+SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", str(24 * 3600)))      # name, images, brand...
+SCRAPE_PRICE_TTL = int(os.getenv("SCRAPE_PRICE_TTL", str(3600)))           # price, discount
+SCRAPE_CACHE_MAX_AGE = int(os.getenv("SCRAPE_CACHE_MAX_AGE", str(7 * 24 * 3600)))  # kept for revalidation
+MEMORY_ENTRIES = 512
+
+# Field groups with their own freshness clocks
+PRICE_FIELDS = ("price", "original_price", "discount")
+FIELD_GROUP_TTLS = {
+    "price": SCRAPE_PRICE_TTL,
+    "static": SCRAPE_CACHE_TTL,
+}
+
+TRACKING_PARAMS = re.compile(
+    r'^(utm_.*|fbclid|gclid|dclid|msclkid|ref|ref_|tag|affid|affExtParam\d*|'
+    r'_refId|_appId|cmpid|srsltid|otracker|otracker1|fm|iid|ssid|qH|ppt|ppn|spm)$'
+)
+
+
+def canonicalize_product_url(url: str) -> str:
+    """Stable cache key form of a product URL"""
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith("m."):
+        host = "www." + host[2:]
+    path = re.sub(r'/+$', '', parsed.path) or '/'
+
+    if 'flipkart.com' in host:
+        # Product identity is the /p/<itm...> path + pid; lid/marketplace are seller noise
+        params = [(k, v) for k, v in parse_qsl(parsed.query) if k == 'pid']
+    elif 'amazon.' in host:
+        match = re.search(r'/(?:dp|gp/product)/([A-Z0-9]{10})', path)
+        if match:
+            return f"https://{host}/dp/{match.group(1)}"
+        params = [(k, v) for k, v in parse_qsl(parsed.query) if not TRACKING_PARAMS.match(k)]
+    else:
+        params = [(k, v) for k, v in parse_qsl(parsed.query) if not TRACKING_PARAMS.match(k)]
+
+    return urlunparse(("https", host, path, "", urlencode(sorted(params)), ""))
+
+
+def product_id_for(url: str) -> str:
+    """Site product identifier used to dedup crawled listings"""
+    canonical = canonicalize_product_url(url)
+    parsed = urlparse(canonical)
+    host = parsed.netloc
+
+    if 'flipkart.com' in host:
+        pid = dict(parse_qsl(parsed.query)).get('pid')
+        if pid:
+            return f"flipkart:{pid}"
+        match = re.search(r'/p/(itm[0-9a-zA-Z]+)', parsed.path)
+        if match:
+            return f"flipkart:{match.group(1)}"
+    elif 'amazon.' in host:
+        match = re.search(r'/dp/([A-Z0-9]{10})', parsed.path)
+        if match:
+            return f"amazon:{match.group(1)}"
+    elif 'myntra.com' in host:
+        match = re.search(r'/(\d{5,})(?:/buy)?$', parsed.path)
+        if match:
+            return f"myntra:{match.group(1)}"
+
+    return canonical
+
+
+class ScrapeResultCache:
+    """Product URL (keyed by its canonical form) -> last scrape result + freshness metadata"""
+
+    def __init__(self, root: str = SCRAPE_CACHE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "price_refreshed": 0, "stores": 0}
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        # Canonical form is only the key - entries keep the URL that was actually fetched
+        return hashlib.sha256(canonicalize_product_url(url).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key + ".json")
+
+    def _remember(self, key: str, entry: dict):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def get(self, url: str) -> Optional[dict]:
+        """Entry for url (possibly stale) or None if absent / past max age"""
+        key = self.key_for(url)
+        entry = self._memory.get(key)
+        if entry is None:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+
+        if time.time() - entry.get("stored_at", 0) > SCRAPE_CACHE_MAX_AGE:
+            self.delete(url)
+            return None
+
+        self._remember(key, entry)
+        return entry
+
+    def _write(self, url: str, entry: dict):
+        key = self.key_for(url)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, default=str)
+            os.replace(tmp, self._path(key))
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._remember(key, entry)
+
+    def put(self, url: str, product: Dict, etag: str = None, last_modified: str = None) -> dict:
+        """Store a full scrape result; every field group becomes fresh"""
+        now = time.time()
+        entry = {
+            "url": url,
+            "product": product,
+            "fetched_at": {group: now for group in FIELD_GROUP_TTLS},
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": now,
+        }
+        try:
+            self._write(url, entry)
+            self.stats["stores"] += 1
+        except Exception as e:
+            logger.warning(f"Scrape cache write failed: {e}")
+        return entry
+
+    def mark_fresh(self, entry: dict, groups=None, etag: str = None, last_modified: str = None):
+        """Revalidated (304 or matching content): restart the clocks without re-scraping"""
+        now = time.time()
+        for group in groups or FIELD_GROUP_TTLS:
+            entry["fetched_at"][group] = now
+        if etag:
+            entry["etag"] = etag
+        if last_modified:
+            entry["last_modified"] = last_modified
+        try:
+            self._write(entry["url"], entry)
+        except Exception as e:
+            logger.warning(f"Scrape cache write failed: {e}")
+
+    def update_price(self, entry: dict, product: Dict, etag: str = None, last_modified: str = None):
+        """Refresh only the price group, keeping cached name/images"""
+        for field in PRICE_FIELDS:
+            entry["product"][field] = product.get(field, entry["product"].get(field))
+        self.stats["price_refreshed"] += 1
+        self.mark_fresh(entry, ["price"], etag, last_modified)
+
+    def delete(self, url: str):
+        key = self.key_for(url)
+        self._memory.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Freshness
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def stale_groups(entry: dict) -> Set[str]:
+        now = time.time()
+        return {
+            group for group, ttl in FIELD_GROUP_TTLS.items()
+            if now - entry.get("fetched_at", {}).get(group, 0) > ttl
+        }
+
+    def get_status(self) -> dict:
+        try:
+            files = [n for n in os.listdir(self.root) if n.endswith(".json")]
+        except OSError:
+            files = []
+        return {
+            "root": self.root,
+            "entries": len(files),
+            "memory_entries": len(self._memory),
+            "ttl_seconds": SCRAPE_CACHE_TTL,
+            "price_ttl_seconds": SCRAPE_PRICE_TTL,
+            **self.stats,
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+scrape_cache = None
+
+def get_scrape_cache() -> ScrapeResultCache:
+    """Get global scrape cache instance"""
+    global scrape_cache
+    if not scrape_cache:
+        scrape_cache = ScrapeResultCache()
+    return scrape_cache
@@ -0,0 +1,244 @@
+"""
+script_dedup.py - Near-Duplicate Script Index (MinHash + LSH)
+==================================================
+Per-user, per-niche similarity index over every script stored in
+`pixabay_scripts`, so generate_unique_script can reject paraphrased repeats
+locally instead of only catching exact story_id / SHA-256 matches in the
+last few documents.
+
+FEATURES:
+- Word 3-gram shingles (Devanagari-safe normalisation, CTA stripped)
+- 128-permutation MinHash signatures, 32x4 LSH bands
+- Lazy load from Mongo on first use per (user, niche); signatures missing on
+  old documents are computed once and written back
+- Incremental add on insert - no reload after each new script
+- Query = LSH candidate lookup + signature compare (microseconds)
+==================================================
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+NUM_PERM = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERM // LSH_BANDS
+MINHASH_VERSION = 1                 # bump if shingling / permutations change
+SHINGLE_SIZE = 3
+SCRIPT_SIMILARITY_THRESHOLD = float(os.getenv("SCRIPT_SIMILARITY_THRESHOLD", "0.5"))
+MAX_LOADED_INDEXES = int(os.getenv("SCRIPT_INDEX_MAX_LOADED", "200"))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Fixed seed: signatures are persisted in Mongo and must stay comparable
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+
+# ============================================================================
+# SIGNATURES
+# ============================================================================
+
+def _normalize(text: str, ignore: Iterable[str] = ()) -> List[str]:
+    text = (text or "").lower()
+    for phrase in ignore:
+        if phrase:
+            text = text.replace(phrase.lower(), " ")
+    # Keep Devanagari vowel signs - \w alone splits Hindi words apart
+    text = re.sub(r'[^\w\s\u0900-\u097F]', ' ', text)
+    return text.split()
+
+
+def shingles(text: str, ignore: Iterable[str] = ()) -> Set[str]:
+    words = _normalize(text, ignore)
+    if len(words) >= SHINGLE_SIZE:
+        return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    joined = " ".join(words)
+    return {joined[i:i + 5] for i in range(max(len(joined) - 4, 1))} if joined else set()
+
+
+def script_signature(text: str, ignore: Iterable[str] = ()) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint64 values) of a script"""
+    tokens = shingles(text, ignore)
+    if not tokens:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    base = np.array(
+        [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=4).digest(), "little") for t in tokens],
+        dtype=np.uint64,
+    )
+    # (a * x + b) mod p, truncated to 32 bits; a, x < 2^32 so no uint64 overflow
+    hashed = ((base[:, None] * _PERM_A + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return hashed.min(axis=0)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+# ============================================================================
+# PER-NICHE INDEX
+# ============================================================================
+
+class NicheScriptIndex:
+    """LSH index over one user's scripts in one niche"""
+
+    def __init__(self):
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.bands: List[Dict[bytes, Set[str]]] = [{} for _ in range(LSH_BANDS)]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, story_id: str):
+        return story_id in self.signatures
+
+    def recent(self, count: int) -> List[str]:
+        """Newest story_ids first (signatures are kept in insertion order)"""
+        return list(self.signatures)[::-1][:count]
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray):
+        for band in range(LSH_BANDS):
+            yield band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()
+
+    def add(self, story_id: str, signature: np.ndarray):
+        self.signatures[story_id] = signature
+        for band, key in self._band_keys(signature):
+            self.bands[band].setdefault(key, set()).add(story_id)
+
+    def query(self, signature: np.ndarray) -> Tuple[float, Optional[str]]:
+        """(best similarity, story_id) among LSH candidates; (0.0, None) if none collide"""
+        candidates: Set[str] = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self.bands[band].get(key, ()))
+
+        best_score, best_id = 0.0, None
+        for story_id in candidates:
+            score = similarity(signature, self.signatures[story_id])
+            if score > best_score:
+                best_score, best_id = score, story_id
+        return best_score, best_id
+
+
+# ============================================================================
+# REGISTRY (lazy Mongo load)
+# ============================================================================
+
+class ScriptDedupIndex:
+    """(user_id, niche) -> NicheScriptIndex, loaded from pixabay_scripts on first use"""
+
+    def __init__(self, max_loaded: int = MAX_LOADED_INDEXES):
+        self.max_loaded = max_loaded
+        self._indexes: "OrderedDict[Tuple[str, str], NicheScriptIndex]" = OrderedDict()
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._collection_indexed = False
+        self.stats = {"loads": 0, "backfilled": 0, "queries": 0, "near_duplicates": 0}
+
+    async def get(self, database_manager, user_id: str, niche: str, ignore: Iterable[str] = ()) -> NicheScriptIndex:
+        """Index for (user, niche); ignore = boilerplate (CTA) left out of backfilled signatures"""
+        key = (user_id, niche)
+        index = self._indexes.get(key)
+        if index is not None:
+            self._indexes.move_to_end(key)
+            return index
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = await self._load(database_manager, user_id, niche, tuple(ignore))
+                self._indexes[key] = index
+                while len(self._indexes) > self.max_loaded:
+                    evicted, _ = self._indexes.popitem(last=False)
+                    self._locks.pop(evicted, None)
+        return index
+
+    async def _load(self, database_manager, user_id: str, niche: str, ignore: Tuple[str, ...]) -> NicheScriptIndex:
+        collection = database_manager.db.pixabay_scripts
+        if not self._collection_indexed:
+            try:
+                await collection.create_index([("user_id", 1), ("niche", 1)])
+                self._collection_indexed = True
+            except Exception as e:
+                logger.warning(f"pixabay_scripts index creation failed: {e}")
+
+        docs = await collection.find(
+            {"user_id": user_id, "niche": niche},
+            {"story_id": 1, "script_text": 1, "minhash": 1, "minhash_version": 1},
+        ).sort("created_at", 1).to_list(length=None)
+
+        def build():
+            index = NicheScriptIndex()
+            backfill = []
+            for doc in docs:
+                story_id = doc.get("story_id") or str(doc["_id"])
+                stored = doc.get("minhash")
+                if stored and doc.get("minhash_version") == MINHASH_VERSION and len(stored) == NUM_PERM:
+                    signature = np.array(stored, dtype=np.uint64)
+                else:
+                    signature = script_signature(doc.get("script_text", ""), ignore)
+                    backfill.append(UpdateOne(
+                        {"_id": doc["_id"]},
+                        {"$set": {"minhash": signature.tolist(), "minhash_version": MINHASH_VERSION}},
+                    ))
+                index.add(story_id, signature)
+            return index, backfill
+
+        index, backfill = await asyncio.to_thread(build)
+        self.stats["loads"] += 1
+
+        if backfill:
+            try:
+                await collection.bulk_write(backfill, ordered=False)
+                self.stats["backfilled"] += len(backfill)
+            except Exception as e:
+                logger.warning(f"MinHash backfill failed: {e}")
+
+        logger.info(f"📚 Script index loaded: {len(index)} scripts for {user_id}/{niche} ({len(backfill)} backfilled)")
+        return index
+
+    def check(self, index: NicheScriptIndex, signature: np.ndarray) -> Tuple[float, Optional[str]]:
+        """Best match for a candidate script; counts near-duplicates for the debug status"""
+        self.stats["queries"] += 1
+        score, story_id = index.query(signature)
+        if score >= SCRIPT_SIMILARITY_THRESHOLD:
+            self.stats["near_duplicates"] += 1
+        return score, story_id
+
+    def get_status(self) -> dict:
+        return {
+            "loaded_indexes": len(self._indexes),
+            "indexed_scripts": sum(len(i) for i in self._indexes.values()),
+            "threshold": SCRIPT_SIMILARITY_THRESHOLD,
+            **self.stats,
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+script_index = None
+
+def get_script_index() -> ScriptDedupIndex:
+    """Get global script dedup index instance"""
+    global script_index
+    if not script_index:
+        script_index = ScriptDedupIndex()
+    return script_index
@@ -20,12 +20,14 @@ import tempfile
 import base64
 import io
 import gc
-import urllib.request
 import random
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 from PIL import Image, ImageDraw, ImageFont
 
+from ffmpeg_pool import get_ffmpeg_pool
+from media_cache import get_media_cache
+
 logger = logging.getLogger(__name__)
 
 class SlideshowGenerator:
@@ -284,19 +286,24 @@ class SlideshowGenerator:
         work_dir: Path,
         target_size: Tuple[int, int]
     ) -> List[Path]:
-        """Decode base64 images and save as JPG files"""
+        """Decode base64 images (or read spooled image files) and save as JPG files"""
         saved_paths = []
         
         for idx, img_b64 in enumerate(images):
             try:
                 logger.info(f"   Processing image {idx+1}/{len(images)}...")
                 
-                # Remove data URI prefix if present
-                if 'base64,' in img_b64:
-                    img_b64 = img_b64.split('base64,', 1)[1]
-                
-                # Decode base64
-                img_data = base64.b64decode(img_b64.strip())
+                if len(img_b64) < 1024 and os.path.isfile(img_b64):
+                    # Spooled by render_worker for an external render
+                    with open(img_b64, "rb") as f:
+                        img_data = f.read()
+                else:
+                    # Remove data URI prefix if present
+                    if 'base64,' in img_b64:
+                        img_b64 = img_b64.split('base64,', 1)[1]
+                    
+                    # Decode base64
+                    img_data = base64.b64decode(img_b64.strip())
                 logger.info(f"      Decoded: {len(img_data)} bytes")
                 
                 # Open image
@@ -476,8 +483,8 @@ class SlideshowGenerator:
             logger.info(f"   🎵 Random track: {music_url}")
             logger.info(f"   🎵 Downloading to: {music_path}")
             
-            # Download with timeout (30 seconds)
-            urllib.request.urlretrieve(music_url, music_path)
+            # Served from the shared asset cache when warm (30 second timeout on miss)
+            await get_media_cache().fetch(music_url, str(music_path), timeout=30)
             
             if music_path.exists() and music_path.stat().st_size > 0:
                 logger.info(f"   ✅ Music downloaded: {music_path.stat().st_size / 1024:.1f} KB")
@@ -557,22 +564,17 @@ class SlideshowGenerator:
         logger.info(f"   Command preview: {' '.join(cmd[:10])}...")
         
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            result = await get_ffmpeg_pool().run(cmd, 120)  # 2 minute timeout
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=120  # 2 minute timeout
-            )
+            if result.timed_out:
+                logger.error(f"   ❌ FFmpeg timeout after 120 seconds")
+                raise Exception("FFmpeg timeout")
             
-            if process.returncode != 0:
-                logger.error(f"   ❌ FFmpeg failed (exit code {process.returncode})")
-                stderr_text = stderr.decode()[:500]
+            if result.returncode != 0:
+                logger.error(f"   ❌ FFmpeg failed (exit code {result.returncode})")
+                stderr_text = result.stderr[-500:]
                 logger.error(f"   FFmpeg stderr: {stderr_text}")
-                raise Exception(f"FFmpeg failed with code {process.returncode}")
+                raise Exception(f"FFmpeg failed with code {result.returncode}")
             
             if not output_path.exists():
                 raise Exception("Output video not found after FFmpeg completed")
@@ -581,9 +583,6 @@ class SlideshowGenerator:
             logger.info(f"   Output: {output_path.name} ({output_path.stat().st_size / 1024:.1f} KB)")
             return output_path
             
-        except asyncio.TimeoutError:
-            logger.error(f"   ❌ FFmpeg timeout after 120 seconds")
-            raise Exception("FFmpeg timeout")
         except Exception as e:
             logger.error(f"   ❌ FFmpeg error: {e}")
             raise
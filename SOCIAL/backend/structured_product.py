@@ -0,0 +1,354 @@
+"""
+structured_product.py - Embedded Structured Data Extractor
+==================================================
+Parses product data that e-commerce pages already embed in their HTML so
+UniversalProductScraper can skip the headless browser for most products.
+
+SOURCES (highest priority first):
+- JSON-LD <script type="application/ld+json"> Product nodes
+- Framework state: __NEXT_DATA__, window.__INITIAL_STATE__,
+  window.__PRELOADED_STATE__, window.__myx (Myntra)
+- OpenGraph / product:* meta tags
+
+Returns the same dict shape as UniversalProductScraper.scrape_product.
+==================================================
+"""
+
+import json
+import logging
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+STATE_VARIABLES = ('__INITIAL_STATE__', '__PRELOADED_STATE__', '__myx', '__APOLLO_STATE__')
+MAX_STATE_DEPTH = 12
+MAX_IMAGES = 6
+
+_NAME_KEYS = ('name', 'title', 'productName', 'product_name')
+_PRICE_KEYS = ('price', 'sellingPrice', 'finalPrice', 'discountedPrice', 'salePrice', 'specialPrice', 'mrp')
+_ORIGINAL_PRICE_KEYS = ('mrp', 'originalPrice', 'listPrice', 'strikeOffPrice', 'compare_at_price')
+_IMAGE_KEYS = ('images', 'image', 'imageUrls', 'imageUrl', 'media', 'searchImage')
+
+
+def detect_platform(url: str) -> str:
+    domain = urlparse(url).netloc.lower()
+    for platform in ('flipkart', 'amazon', 'myntra', 'ajio'):
+        if platform in domain:
+            return platform
+    return 'generic'
+
+
+# ============================================================================
+# VALUE HELPERS
+# ============================================================================
+
+def _to_price(value) -> float:
+    if isinstance(value, dict):
+        for key in ('value', 'amount', 'price', 'decimalValue'):
+            if key in value:
+                return _to_price(value[key])
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = re.search(r'\d[\d,]*\.?\d*', value.replace('₹', ''))
+        if match:
+            try:
+                return float(match.group(0).replace(',', ''))
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+def _to_text(value) -> str:
+    if isinstance(value, dict):
+        return _to_text(value.get('name') or value.get('value') or '')
+    if isinstance(value, list):
+        return _to_text(value[0]) if value else ''
+    return str(value).strip() if value is not None else ''
+
+
+def _to_images(value, base_url: str) -> List[str]:
+    images = []
+    if isinstance(value, str):
+        images.append(value)
+    elif isinstance(value, dict):
+        src = value.get('url') or value.get('contentUrl') or value.get('src') or value.get('secureSrc')
+        if src:
+            images.append(src)
+    elif isinstance(value, list):
+        for item in value:
+            images.extend(_to_images(item, base_url))
+
+    cleaned = []
+    for src in images:
+        if not isinstance(src, str) or not src.strip():
+            continue
+        src = src.strip()
+        if src.startswith('//'):
+            src = 'https:' + src
+        src = urljoin(base_url, src)
+        if 'rukminim' in src:
+            # Flipkart CDN: request the high-resolution rendition
+            src = re.sub(r'/image/\d+/\d+/', '/image/832/832/', src)
+            src = src.replace('{@width}', '832').replace('{@height}', '832').replace('{@quality}', '70')
+        if src.startswith('http') and src not in cleaned:
+            cleaned.append(src)
+    return cleaned
+
+
+def _load_json(text: str):
+    text = (text or '').strip().rstrip(';')
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        # Some sites emit raw control characters inside JSON-LD strings
+        try:
+            return json.loads(re.sub(r'[\x00-\x1f]', ' ', text))
+        except ValueError:
+            return None
+
+
+# ============================================================================
+# SOURCE PARSERS
+# ============================================================================
+
+def _iter_jsonld_nodes(data):
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_jsonld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _iter_jsonld_nodes(data['@graph'])
+
+
+def _is_product_type(node: dict) -> bool:
+    types = node.get('@type')
+    types = types if isinstance(types, list) else [types]
+    return any(str(t).lower() in ('product', 'productgroup', 'individualproduct') for t in types)
+
+
+def parse_jsonld(soup, base_url: str) -> Dict:
+    """Product node from JSON-LD blocks"""
+    for script in soup.find_all('script', attrs={'type': 'application/ld+json'}):
+        data = _load_json(script.string or script.get_text())
+        for node in _iter_jsonld_nodes(data):
+            if not _is_product_type(node):
+                continue
+
+            offers = node.get('offers') or {}
+            if isinstance(offers, list):
+                offers = offers[0] if offers else {}
+            if isinstance(offers, dict) and offers.get('@type') == 'AggregateOffer':
+                price = _to_price(offers.get('lowPrice') or offers.get('price'))
+                original_price = _to_price(offers.get('highPrice'))
+            else:
+                price = _to_price(offers.get('price') or offers.get('priceSpecification')) if isinstance(offers, dict) else 0.0
+                original_price = 0.0
+
+            rating = node.get('aggregateRating') or {}
+            return {
+                'product_name': _to_text(node.get('name')),
+                'brand': _to_text(node.get('brand') or node.get('manufacturer')),
+                'price': price,
+                'original_price': original_price,
+                'images': _to_images(node.get('image'), base_url),
+                'description': _to_text(node.get('description')),
+                'colors': [c for c in [_to_text(node.get('color'))] if c],
+                'sizes': [s for s in [_to_text(node.get('size'))] if s],
+                'rating': _to_price(rating.get('ratingValue')) if isinstance(rating, dict) else 0.0,
+                'rating_count': int(_to_price(rating.get('ratingCount'))) if isinstance(rating, dict) else 0,
+                'review_count': int(_to_price(rating.get('reviewCount'))) if isinstance(rating, dict) else 0,
+            }
+    return {}
+
+
+def _looks_like_product(node: dict) -> bool:
+    has_name = any(isinstance(node.get(k), str) and len(node.get(k)) > 3 for k in _NAME_KEYS)
+    has_price = any(_to_price(node.get(k)) > 0 for k in _PRICE_KEYS if k in node)
+    has_image = any(k in node for k in _IMAGE_KEYS)
+    return has_name and has_price and has_image
+
+
+def _find_product_node(data, depth: int = 0) -> Optional[dict]:
+    """Depth-limited walk for the first dict that carries name + price + images"""
+    if depth > MAX_STATE_DEPTH:
+        return None
+    if isinstance(data, dict):
+        if _looks_like_product(data):
+            return data
+        children = data.values()
+    elif isinstance(data, list):
+        children = data[:50]
+    else:
+        return None
+    for child in children:
+        if isinstance(child, (dict, list)):
+            found = _find_product_node(child, depth + 1)
+            if found:
+                return found
+    return None
+
+
+def _extract_state_blobs(soup) -> List:
+    blobs = []
+    next_data = soup.find('script', id='__NEXT_DATA__')
+    if next_data:
+        data = _load_json(next_data.string or next_data.get_text())
+        if data is not None:
+            blobs.append(data)
+
+    for script in soup.find_all('script'):
+        text = script.string or ''
+        if 'window.' not in text:
+            continue
+        for var in STATE_VARIABLES:
+            match = re.search(r'window\.' + re.escape(var) + r'\s*=\s*', text)
+            if not match:
+                continue
+            data = _load_json(text[match.end():].split('</script>')[0].strip().rstrip(';'))
+            if data is None:
+                # Trailing statements after the object literal
+                end = text.rfind('}', match.end())
+                data = _load_json(text[match.end():end + 1]) if end > 0 else None
+            if data is not None:
+                blobs.append(data)
+    return blobs
+
+
+def parse_state(soup, base_url: str) -> Dict:
+    """Product dict out of __NEXT_DATA__ / window.__*_STATE__ blobs"""
+    for blob in _extract_state_blobs(soup):
+        node = _find_product_node(blob)
+        if not node:
+            continue
+
+        name = next((node[k] for k in _NAME_KEYS if isinstance(node.get(k), str)), '')
+        price = next((_to_price(node[k]) for k in _PRICE_KEYS if k in node and _to_price(node[k]) > 0), 0.0)
+        original_price = next(
+            (_to_price(node[k]) for k in _ORIGINAL_PRICE_KEYS if k in node and _to_price(node[k]) > price), 0.0
+        )
+        images = []
+        for key in _IMAGE_KEYS:
+            if key in node:
+                images.extend(i for i in _to_images(node[key], base_url) if i not in images)
+
+        return {
+            'product_name': name.strip(),
+            'brand': _to_text(node.get('brand') or node.get('brandName')),
+            'price': price,
+            'original_price': original_price,
+            'images': images,
+            'description': _to_text(node.get('description')),
+        }
+    return {}
+
+
+def parse_opengraph(soup, base_url: str) -> Dict:
+    """OpenGraph + product:* meta tags"""
+    meta = {}
+    images = []
+    for tag in soup.find_all('meta'):
+        key = (tag.get('property') or tag.get('name') or '').strip().lower()
+        content = (tag.get('content') or '').strip()
+        if not key or not content:
+            continue
+        if key in ('og:image', 'og:image:secure_url', 'twitter:image'):
+            images.append(content)
+        else:
+            meta.setdefault(key, content)
+
+    price = _to_price(meta.get('product:price:amount') or meta.get('og:price:amount') or '')
+    return {
+        'product_name': meta.get('og:title') or meta.get('twitter:title', ''),
+        'brand': meta.get('product:brand') or meta.get('og:brand', ''),
+        'price': price,
+        'original_price': 0.0,
+        'images': _to_images(images, base_url),
+        'description': meta.get('og:description') or meta.get('description', ''),
+    }
+
+
+# ============================================================================
+# MERGE
+# ============================================================================
+
+_EMPTY = (None, '', 0, 0.0, [])
+
+
+def extract_structured_product(html: str, url: str) -> Dict:
+    """
+    Merge JSON-LD > framework state > OpenGraph into the scrape_product shape.
+    Fields a higher-priority source left empty are filled from the next one.
+    """
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(['script', 'meta', 'title']))
+
+    merged: Dict = {}
+    sources = []
+    for source, parser in (('jsonld', parse_jsonld), ('state', parse_state), ('opengraph', parse_opengraph)):
+        try:
+            data = parser(soup, url)
+        except Exception as e:
+            logger.debug(f"Structured {source} parse failed: {e}")
+            continue
+        if not data:
+            continue
+        used = False
+        for key, value in data.items():
+            if merged.get(key) in _EMPTY and value not in _EMPTY:
+                merged[key] = value
+                used = True
+        if used:
+            sources.append(source)
+
+    if not merged.get('product_name') and soup.title and soup.title.string:
+        merged['product_name'] = soup.title.string.strip()
+
+    price = float(merged.get('price') or 0)
+    original_price = float(merged.get('original_price') or 0)
+    if original_price < price:
+        original_price = price
+
+    discount = ""
+    if original_price > price > 0:
+        discount = f"{int(((original_price - price) / original_price) * 100)}% OFF"
+
+    brand = merged.get('brand') or ''
+    if not brand:
+        domain = urlparse(url).netloc
+        brand = domain.split('.')[0].replace('www', '').replace('-', ' ').title() if detect_platform(url) == 'generic' else ''
+
+    return {
+        "success": True,
+        "brand": brand or "Brand",
+        "product_name": merged.get('product_name') or "Product",
+        "price": price,
+        "original_price": original_price,
+        "discount": discount,
+        "images": (merged.get('images') or [])[:MAX_IMAGES],
+        "colors": merged.get('colors') or [],
+        "sizes": merged.get('sizes') or [],
+        "rating": float(merged.get('rating') or 0),
+        "rating_count": int(merged.get('rating_count') or 0),
+        "review_count": int(merged.get('review_count') or 0),
+        "description": (merged.get('description') or '')[:1000],
+        "product_url": url,
+        "platform": detect_platform(url),
+        "_sources": sources,
+    }
+
+
+def has_required_fields(product: Dict) -> bool:
+    """name, price and at least one image - otherwise escalate to the browser"""
+    return bool(
+        product.get("product_name") not in (None, "", "Product")
+        and product.get("price", 0) > 0
+        and product.get("images")
+    )
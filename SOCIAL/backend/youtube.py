@@ -21,18 +21,20 @@ import subprocess
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
-import httpx
 import requests
-from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 import tempfile
 import motor.motor_asyncio
 from pymongo.errors import DuplicateKeyError, ConnectionFailure
 
+from http_clients import pooled_client
+from youtube_client import get_youtube_executor, get_youtube_service_cache, youtube_async, RETRYABLE_STATUSES
+from comment_ingest import get_comment_ingestor
+from job_queue import get_job_queue, JOB_PRIORITY_SCHEDULED_POST
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -151,6 +153,7 @@ class YouTubeDatabase:
                 cred_doc,
                 upsert=True
             )
+            get_youtube_service_cache().invalidate(user_id)
             
             # Update user's connected platforms
             await self.users_collection.update_one(
@@ -216,7 +219,7 @@ class YouTubeDatabase:
             )
             
             # Refresh the token
-            creds.refresh(Request())
+            await get_youtube_executor().refresh(creds, user_id)
             
             # Update database with new token
             await self.credentials_collection.update_one(
@@ -397,17 +400,17 @@ class YouTubeOAuthConnector:
             flow.redirect_uri = final_redirect_uri
             
             # Exchange code for token
-            flow.fetch_token(code=code)
+            await get_youtube_executor().fetch_token(flow, code)
             
             # Get user info and channel information
             credentials = flow.credentials
-            youtube = build('youtube', 'v3', credentials=credentials)
+            youtube = await get_youtube_executor().build_service(credentials)
             
             # Get channel information
-            channels_response = youtube.channels().list(
+            channels_response = await get_youtube_executor().execute(youtube.channels().list(
                 part='snippet,statistics',
                 mine=True
-            ).execute()
+            ))
             
             if not channels_response.get('items'):
                 return {
@@ -480,9 +483,9 @@ class YouTubeOAuthConnector:
             
             if credentials.expired:
                 logger.info("Refreshing expired credentials")
-                credentials.refresh(Request())
+                await get_youtube_executor().refresh(credentials)
             
-            youtube = build('youtube', 'v3', credentials=credentials)
+            youtube = await get_youtube_executor().build_service(credentials)
             
             # ===== CHECK IF YOUTUBE SHORT & ADD TAG BEFORE TRUNCATING =====
             is_short = self._is_youtube_short(video_file_path)
@@ -525,62 +528,52 @@ class YouTubeOAuthConnector:
                 media_body=media
             )
             
-            response = None
-            retry = 0
+            try:
+                response = await youtube_async(youtube).resumable_upload(insert_request)
+            except HttpError as e:
+                if e.resp.status in RETRYABLE_STATUSES:
+                    return {
+                        "success": False,
+                        "error": f"Upload failed after retries: {e}"
+                    }
+                return {
+                    "success": False,
+                    "error": f"HTTP error: {e}"
+                }
             
-            while response is None:
-                try:
-                    status, response = insert_request.next_chunk()
-                    
-                    if response is not None:
-                        if 'id' in response:
-                            video_id = response['id']
-                            video_url = f"https://www.youtube.com/watch?v={video_id}"
-                            
-                            logger.info(f"✅ Video uploaded successfully: {video_url}")
-                            
-                            # ===== UPLOAD THUMBNAIL IF PROVIDED =====
-                            thumbnail_success = False
-                            
-                            if thumbnail_data:
-                                logger.info(f"🔍 THUMBNAIL DEBUG - Data length: {len(thumbnail_data)}")
-                                thumbnail_success = await self._upload_thumbnail(
-                                    youtube,
-                                    video_id,
-                                    thumbnail_data
-                                )
-                                logger.info(f"📊 Thumbnail upload result: {thumbnail_success}")
-                            else:
-                                logger.warning("⚠️ No thumbnail data provided")
-                            
-                            return {
-                                "success": True,
-                                "video_id": video_id,
-                                "video_url": video_url,
-                                "title": title,
-                                "privacy_status": privacy_status,
-                                "thumbnail_uploaded": thumbnail_success
-                            }
-                        else:
-                            return {
-                                "success": False,
-                                "error": f"Upload failed: {response}"
-                            }
-                
-                except HttpError as e:
-                    if e.resp.status in [500, 502, 503, 504]:
-                        retry += 1
-                        if retry > 5:
-                            return {
-                                "success": False,
-                                "error": f"Upload failed after retries: {e}"
-                            }
-                        await asyncio.sleep(2 ** retry)
-                    else:
-                        return {
-                            "success": False,
-                            "error": f"HTTP error: {e}"
-                        }
+            if 'id' not in response:
+                return {
+                    "success": False,
+                    "error": f"Upload failed: {response}"
+                }
+            
+            video_id = response['id']
+            video_url = f"https://www.youtube.com/watch?v={video_id}"
+            
+            logger.info(f"✅ Video uploaded successfully: {video_url}")
+            
+            # ===== UPLOAD THUMBNAIL IF PROVIDED =====
+            thumbnail_success = False
+            
+            if thumbnail_data:
+                logger.info(f"🔍 THUMBNAIL DEBUG - Data length: {len(thumbnail_data)}")
+                thumbnail_success = await self._upload_thumbnail(
+                    youtube,
+                    video_id,
+                    thumbnail_data
+                )
+                logger.info(f"📊 Thumbnail upload result: {thumbnail_success}")
+            else:
+                logger.warning("⚠️ No thumbnail data provided")
+            
+            return {
+                "success": True,
+                "video_id": video_id,
+                "video_url": video_url,
+                "title": title,
+                "privacy_status": privacy_status,
+                "thumbnail_uploaded": thumbnail_success
+            }
             
         except Exception as e:
             logger.error(f"YouTube upload failed: {e}")
@@ -655,10 +648,10 @@ class YouTubeOAuthConnector:
             
             # Upload thumbnail to YouTube API
             try:
-                response = youtube.thumbnails().set(
+                response = await get_youtube_executor().execute(youtube.thumbnails().set(
                     videoId=video_id,
                     media_body=temp_thumb_path
-                ).execute()
+                ))
                 
                 logger.info(f"✅ Thumbnail API response: {response}")
                 logger.info(f"✅ Custom thumbnail set successfully for video: {video_id}")
@@ -765,28 +758,28 @@ class YouTubeOAuthConnector:
             )
             
             if credentials.expired:
-                credentials.refresh(Request())
+                await get_youtube_executor().refresh(credentials)
             
-            youtube = build('youtube', 'v3', credentials=credentials)
+            youtube = await get_youtube_executor().build_service(credentials)
             
             # Get recent videos
-            videos_response = youtube.search().list(
+            videos_response = await get_youtube_executor().execute(youtube.search().list(
                 part='snippet',
                 forMine=True,
                 type='video',
                 order='date',
                 maxResults=10
-            ).execute()
+            ))
             
             videos = []
             for item in videos_response.get('items', []):
                 video_id = item['id']['videoId']
                 
                 # Get video statistics
-                stats_response = youtube.videos().list(
+                stats_response = await get_youtube_executor().execute(youtube.videos().list(
                     part='statistics',
                     id=video_id
-                ).execute()
+                ))
                 
                 stats = stats_response['items'][0]['statistics'] if stats_response.get('items') else {}
                 
@@ -800,10 +793,10 @@ class YouTubeOAuthConnector:
                 })
             
             # Get channel statistics
-            channels_response = youtube.channels().list(
+            channels_response = await get_youtube_executor().execute(youtube.channels().list(
                 part='statistics',
                 mine=True
-            ).execute()
+            ))
             
             channel_stats = {}
             if channels_response.get('items'):
@@ -822,49 +815,9 @@ class YouTubeOAuthConnector:
         
 
     async def get_authenticated_service(self, user_id: str):
-        """Get authenticated YouTube service for API calls"""
+        """Get authenticated YouTube service for API calls (cached per user, token kept fresh)"""
         try:
-            # This method should be in YTdatabase, not here
-            # But we'll create a bridge method
-            from YTdatabase import get_youtube_database
-            
-            database_manager = get_youtube_database()
-            credentials = await database_manager.get_youtube_credentials(user_id)
-            
-            if not credentials:
-                logger.error(f"No credentials found for user {user_id}")
-                return None
-            
-            # Build credentials object
-            from google.oauth2.credentials import Credentials
-            from google.auth.transport.requests import Request
-            
-            creds = Credentials(
-                token=credentials["access_token"],
-                refresh_token=credentials["refresh_token"],
-                token_uri=credentials["token_uri"],
-                client_id=credentials["client_id"],
-                client_secret=credentials["client_secret"],
-                scopes=credentials["scopes"]
-            )
-            
-            # Check if token needs refresh
-            if creds.expired:
-                logger.info(f"Refreshing token for user {user_id}")
-                creds.refresh(Request())
-                
-                # Update token in database
-                await database_manager.refresh_youtube_token(
-                    user_id, 
-                    creds.token, 
-                    creds.expiry
-                )
-            
-            # Build YouTube service
-            youtube_service = build('youtube', 'v3', credentials=creds)
-            logger.info(f"YouTube service authenticated for user {user_id}")
-            return youtube_service
-            
+            return await get_youtube_service_cache().get(user_id)
         except Exception as e:
             logger.error(f"Failed to authenticate YouTube service: {e}")
             return None
@@ -906,9 +859,9 @@ class YouTubeOAuthConnector:
             )
             
             if credentials.expired:
-                credentials.refresh(Request())
+                await get_youtube_executor().refresh(credentials)
             
-            youtube = build('youtube', 'v3', credentials=credentials)
+            youtube = await get_youtube_executor().build_service(credentials)
             
             # Prepare community post body
             body = {
@@ -938,10 +891,10 @@ class YouTubeOAuthConnector:
                 }]
             
             # Create the community post
-            response = youtube.communityPosts().insert(
+            response = await get_youtube_executor().execute(youtube.communityPosts().insert(
                 part='snippet',
                 body=body
-            ).execute()
+            ))
             
             if response.get('id'):
                 return {
@@ -1146,7 +1099,7 @@ class YouTubeAutomationScheduler:
             # Original download logic for URLs
             logger.info(f"Downloading video from: {video_url}")
             
-            async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
+            async with pooled_client(timeout=60.0, follow_redirects=True) as client:
                 response = await client.get(video_url)
                 
                 if response.status_code == 200:
@@ -1231,7 +1184,9 @@ class YouTubeAutomationScheduler:
 # ============================================================================
 
 class YouTubeBackgroundScheduler:
-    """Background scheduler that checks and executes scheduled posts"""
+    """Background scheduler that queues due scheduled posts on the shared job queue"""
+    
+    JOB_TYPE = "youtube_scheduled_post"
     
     def __init__(self, database_manager, youtube_scheduler):
         self.database = database_manager
@@ -1239,6 +1194,7 @@ class YouTubeBackgroundScheduler:
         self.running = False
         self.check_interval = 60  # Check every 60 seconds
         self.task = None
+        get_job_queue().register(self.JOB_TYPE, self.run_scheduled_post_job)
         logger.info("YouTubeBackgroundScheduler initialized")
     
     async def start(self):
@@ -1283,8 +1239,17 @@ class YouTubeBackgroundScheduler:
             
             if due_posts:
                 logger.info(f"📤 Found {len(due_posts)} posts ready for execution")
+                # Every instance sees the same due posts; keyed by post id, each is queued once
+                queue = get_job_queue()
                 for post in due_posts:
-                    await self.execute_scheduled_post(post)
+                    await queue.enqueue(
+                        self.JOB_TYPE,
+                        post["user_id"],
+                        {"post_id": post["_id"]},
+                        f"{self.JOB_TYPE}:{post['_id']}",
+                        priority=JOB_PRIORITY_SCHEDULED_POST,
+                        max_attempts=1
+                    )
             else:
                 logger.debug("No posts due at this time")
                 
@@ -1293,6 +1258,16 @@ class YouTubeBackgroundScheduler:
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
     
+    async def run_scheduled_post_job(self, job):
+        """Job handler: execute the post unless it already left the scheduled state"""
+        post = await self.database.scheduled_posts_collection.find_one({"_id": job["payload"]["post_id"]})
+        if not post or post.get("status") != "scheduled":
+            # Already processing/published (e.g. a crashed worker got as far as
+            # uploading) or deleted - never risk a second upload
+            logger.info(f"⏭️ Scheduled post {job['payload']['post_id']} is {post.get('status') if post else 'gone'}, skipping")
+            return
+        await self.execute_scheduled_post(post)
+    
     async def execute_scheduled_post(self, post):
         """Execute a single scheduled post"""
         try:
@@ -1361,6 +1336,7 @@ class AutoReplyScheduler:
         self.running = False
         self.check_interval = 300  # Check every 5 minutes
         self.rate_limit_tracker = {}  # Track rate limits per user
+        self.video_context_cache = {}  # video_id -> {"title", "description"} for reply prompts
         logger.info("AutoReplyScheduler initialized with video selection support")
     
     async def start(self):
@@ -1441,18 +1417,20 @@ class AutoReplyScheduler:
             comments_processed = 0
             replies_sent = 0
             
+            max_replies = config.get("max_replies_per_hour", 10)
+            
             # Process each selected video
             for video_id in selected_videos[:10]:  # Limit to 10 videos per check
                 try:
                     video_result = await self._process_video_comments(
-                        youtube_service, user_id, video_id, config, reply_delay
+                        youtube_service, user_id, video_id, config, reply_delay,
+                        max_replies=max_replies - replies_sent
                     )
                     
                     comments_processed += video_result.get("comments_checked", 0)
                     replies_sent += video_result.get("replies_sent", 0)
                     
                     # Stop if we've sent enough replies
-                    max_replies = config.get("max_replies_per_hour", 10)
                     if replies_sent >= max_replies:
                         logger.info(f"Reached reply limit ({max_replies}) for user {user_id}")
                         break
@@ -1474,49 +1452,47 @@ class AutoReplyScheduler:
         except Exception as e:
             logger.error(f"Auto-reply for user {user_id} failed: {e}")
     
-    async def _process_video_comments(self, youtube_service, user_id: str, video_id: str, config: dict, reply_delay: int):
-        """Process comments for a single video"""
+    async def _process_video_comments(self, youtube_service, user_id: str, video_id: str, config: dict, reply_delay: int, max_replies: int = 1):
+        """Ingest new comments for a single video, then answer pending ones with one batched AI call"""
         try:
-            # Get comments for this video
-            comments_response = youtube_service.commentThreads().list(
-                part="snippet,replies",
-                videoId=video_id,
-                order="time",
-                maxResults=5
-            ).execute()
-            
-            comments_checked = 0
+            ingestor = get_comment_ingestor()
+            await ingestor.ingest_video(youtube_async(youtube_service, user_id), user_id, video_id)
+            pending_comments = await ingestor.pending_comments(user_id, video_id)
+            
+            comments_checked = len(pending_comments)
             replies_sent = 0
             
-            for comment_item in comments_response.get("items", []):
-                comment = comment_item["snippet"]["topLevelComment"]["snippet"]
-                comment_id = comment_item["id"]
-                comment_text = comment["textDisplay"]
-                
-                comments_checked += 1
+            to_answer = []
+            for comment in pending_comments:
+                if self._is_spam_comment(comment["text"]):
+                    await ingestor.mark_skipped(user_id, comment["comment_id"])
+                else:
+                    to_answer.append(comment)
+            
+            # One reply per video per pass unless the config asks for more
+            to_answer = to_answer[:max(0, min(max_replies, config.get("max_replies_per_video", 1)))]
+            if not to_answer:
+                return {"comments_checked": comments_checked, "replies_sent": 0}
+            
+            logger.info(f"💬 {len(to_answer)} new comments to answer on video {video_id}")
+            video_context = await self._video_context(youtube_service, user_id, video_id)
+            generated = await self._generate_replies(to_answer, config, video_context)
+            
+            # Wait for configured delay (convert to IST awareness)
+            await asyncio.sleep(reply_delay)
+            
+            for comment, (reply_text, ai_service_used) in zip(to_answer, generated):
+                reply_success = await self._post_reply(
+                    user_id, comment["comment_id"], comment["text"], reply_text, ai_service_used, video_id
+                )
                 
-                # Check if comment is recent and needs reply
-                if (self._is_recent_comment(comment["publishedAt"]) and 
-                    not await self._already_replied_to_comment(user_id, comment_id) and
-                    not self._is_spam_comment(comment_text)):
-                    
-                    logger.info(f"💬 New comment found: {comment_text[:50]}...")
-                    
-                    # Wait for configured delay (convert to IST awareness)
-                    await asyncio.sleep(reply_delay)
-                    
-                    # Generate and post reply
-                    reply_success = await self._generate_and_post_reply(
-                        user_id, comment_id, comment_text, config, video_id
-                    )
-                    
-                    if reply_success:
-                        replies_sent += 1
-                        # Rate limiting gap between replies
-                        await asyncio.sleep(10)
-                    
-                    # Only one reply per video per check to avoid spam
-                    break
+                if reply_success:
+                    await ingestor.mark_replied(user_id, comment["comment_id"])
+                    replies_sent += 1
+                    # Rate limiting gap between replies
+                    await asyncio.sleep(10)
+                else:
+                    await ingestor.record_failure(user_id, comment["comment_id"])
             
             return {
                 "comments_checked": comments_checked,
@@ -1527,37 +1503,47 @@ class AutoReplyScheduler:
             logger.error(f"Failed to process video {video_id}: {e}")
             return {"comments_checked": 0, "replies_sent": 0}
     
-    def _is_recent_comment(self, published_at: str, hours_back: int = 24) -> bool:
-        """Check if comment is recent (within specified hours)"""
+    async def _video_context(self, youtube_service, user_id: str, video_id: str) -> dict:
+        """Title/description for reply prompts: the channel mirror first, else one videos.list call"""
+        if video_id in self.video_context_cache:
+            return self.video_context_cache[video_id]
+        
+        context = {"title": "", "description": ""}
         try:
-            from datetime import datetime, timedelta
-            
-            # Parse UTC time from YouTube API
-            comment_time = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-            now = datetime.now(comment_time.tzinfo)
-            
-            # Check if within time window
-            is_recent = (now - comment_time) < timedelta(hours=hours_back)
-            
-            if is_recent:
-                # Convert to IST for logging
-                ist_time = comment_time + timedelta(hours=5, minutes=30)
-                logger.debug(f"Recent comment from {ist_time.strftime('%Y-%m-%d %H:%M:%S IST')}")
-            
-            return is_recent
+            from YTdatabase import get_youtube_database
+            video = await get_youtube_database().get_channel_video(user_id, video_id)
+            if not video:
+                response = await youtube_async(youtube_service, user_id).execute(
+                    youtube_service.videos().list(part="snippet", id=video_id)
+                )
+                items = response.get("items") or []
+                video = items[0]["snippet"] if items else {}
+            context = {"title": video.get("title", ""), "description": video.get("description", "")}
         except Exception as e:
-            logger.warning(f"Failed to parse comment time: {e}")
-            return True  # Default to processing if can't parse
+            logger.warning(f"Video context lookup failed for {video_id}: {e}")
+            return context
+        
+        self.video_context_cache[video_id] = context
+        return context
     
-    async def _already_replied_to_comment(self, user_id: str, comment_id: str) -> bool:
-        """Check if we already replied to this specific comment"""
-        try:
-            # Check database for existing reply
-            replied = await self.database.check_comment_already_replied(user_id, comment_id)
-            return replied
-        except Exception as e:
-            logger.warning(f"Failed to check reply status: {e}")
-            return False
+    async def _generate_replies(self, comments: List[dict], config: dict, video_context: Optional[dict] = None) -> List[tuple]:
+        """(reply_text, ai_service_used) per comment - one LLM round trip when the AI service supports batching"""
+        video_context = video_context or {}
+        if self.ai_service and hasattr(self.ai_service, 'generate_comment_replies_batch'):
+            try:
+                results = await self.ai_service.generate_comment_replies_batch(
+                    comments=[{"comment_id": c["comment_id"], "text": c["text"]} for c in comments],
+                    video_title=video_context.get("title", ""),
+                    reply_style=config.get("reply_style", "friendly"),
+                    language="english",
+                    custom_prompt=config.get("custom_prompt", ""),
+                    video_description=video_context.get("description", "")
+                )
+                return [(r["reply"], r.get("ai_service", "ai")) for r in results]
+            except Exception as ai_error:
+                logger.error(f"Batch reply generation failed: {ai_error}")
+        
+        return [await self._generate_reply(c["text"], config) for c in comments]
     
     def _is_spam_comment(self, comment_text: str) -> bool:
         """Basic spam detection for comments"""
@@ -1592,48 +1578,52 @@ class AutoReplyScheduler:
         except Exception:
             return False  # Default to not spam if check fails
     
-    async def _generate_and_post_reply(self, user_id: str, comment_id: str, comment_text: str, config: dict, video_id: str = None):
-        """Generate and post auto-reply with enhanced error handling"""
-        try:
-            logger.info(f"🤖 Generating reply for: {comment_text[:30]}...")
-            
-            reply_text = None
-            ai_service_used = "fallback"
-            
-            # Try AI generation first
-            if self.ai_service and hasattr(self.ai_service, 'generate_comment_reply'):
-                try:
-                    reply_result = await self.ai_service.generate_comment_reply(
-                        comment_text=comment_text,
-                        reply_style=config.get("reply_style", "friendly"),
-                        language="english",  # Auto-detect within the method
-                        custom_prompt=config.get("custom_prompt", "")
-                    )
+    async def _generate_reply(self, comment_text: str, config: dict) -> tuple:
+        """(reply_text, ai_service_used) for a single comment, falling back to a canned reply"""
+        logger.info(f"🤖 Generating reply for: {comment_text[:30]}...")
+        
+        reply_text = None
+        ai_service_used = "fallback"
+        
+        # Try AI generation first
+        if self.ai_service and hasattr(self.ai_service, 'generate_comment_reply'):
+            try:
+                reply_result = await self.ai_service.generate_comment_reply(
+                    comment_text=comment_text,
+                    reply_style=config.get("reply_style", "friendly"),
+                    language="english",  # Auto-detect within the method
+                    custom_prompt=config.get("custom_prompt", "")
+                )
+                
+                if reply_result.get("success"):
+                    reply_text = reply_result["reply"]
+                    ai_service_used = reply_result.get("ai_service", "ai")
+                    logger.info(f"AI generated reply: {reply_text}")
+                else:
+                    logger.warning(f"AI reply generation failed: {reply_result.get('error')}")
                     
-                    if reply_result.get("success"):
-                        reply_text = reply_result["reply"]
-                        ai_service_used = reply_result.get("ai_service", "ai")
-                        logger.info(f"AI generated reply: {reply_text}")
-                    else:
-                        logger.warning(f"AI reply generation failed: {reply_result.get('error')}")
-                        
-                except Exception as ai_error:
-                    logger.error(f"AI service error: {ai_error}")
-            
-            # Fallback to simple reply if AI fails
-            if not reply_text:
-                language = self._detect_comment_language(comment_text)
-                reply_text = self._get_fallback_reply(language, config.get("reply_style", "friendly"))
-                ai_service_used = "fallback"
-                logger.info(f"Using fallback reply: {reply_text}")
-            
+            except Exception as ai_error:
+                logger.error(f"AI service error: {ai_error}")
+        
+        # Fallback to simple reply if AI fails
+        if not reply_text:
+            language = self._detect_comment_language(comment_text)
+            reply_text = self._get_fallback_reply(language, config.get("reply_style", "friendly"))
+            ai_service_used = "fallback"
+            logger.info(f"Using fallback reply: {reply_text}")
+        
+        return reply_text, ai_service_used
+    
+    async def _post_reply(self, user_id: str, comment_id: str, comment_text: str, reply_text: str, ai_service_used: str, video_id: str = None):
+        """Post a reply to YouTube and log it"""
+        try:
             # Post reply to YouTube
             youtube_service = await self.youtube_connector.get_authenticated_service(user_id)
             if not youtube_service:
                 logger.error("No YouTube service available")
                 return False
             
-            response = youtube_service.comments().insert(
+            response = await get_youtube_executor().execute(youtube_service.comments().insert(
                 part="snippet",
                 body={
                     "snippet": {
@@ -1641,7 +1631,7 @@ class AutoReplyScheduler:
                         "textOriginal": reply_text
                     }
                 }
-            ).execute()
+            ), user_id)
             
             reply_id = response.get("id")
             logger.info(f"✅ Auto-replied successfully: {reply_text}")
@@ -1661,7 +1651,7 @@ class AutoReplyScheduler:
             return True
                     
         except Exception as e:
-            logger.error(f"Generate and post reply failed: {e}")
+            logger.error(f"Post reply failed: {e}")
             return False
     
     def _detect_comment_language(self, text: str) -> str:
@@ -1758,10 +1748,13 @@ def get_youtube_database() -> YouTubeDatabase:
 
 async def initialize_youtube_service(
     database_manager=None,
-    ai_service=None
+    ai_service=None,
+    background: bool = True
 ) -> bool:
     """
-    Initialize YouTube service with required dependencies
+    Initialize YouTube service with required dependencies.
+    background=False (render workers) skips the post/auto-reply schedulers
+    and the job queue, which only the API process runs.
     """
     global youtube_connector, youtube_scheduler, youtube_database, youtube_background_scheduler, auto_reply_scheduler
     
@@ -1803,6 +1796,10 @@ async def initialize_youtube_service(
             database_manager
         )
         
+        if not background:
+            logger.info("YouTube service initialized (no background schedulers)")
+            return True
+        
         # Initialize background scheduler for video uploads
         logger.info("Initializing background scheduler...")
         youtube_background_scheduler = YouTubeBackgroundScheduler(
@@ -1810,8 +1807,9 @@ async def initialize_youtube_service(
             youtube_scheduler
         )
         
-        # Start video upload scheduler in background task
+        # Start video upload scheduler in background task; due posts run on the job queue
         asyncio.create_task(youtube_background_scheduler.start())
+        get_job_queue().start()
         logger.info("✅ Background scheduler initialized and task created")
         
         # Initialize auto-reply scheduler for comments
@@ -0,0 +1,417 @@
+"""
+youtube_client.py - Non-blocking YouTube Data API Layer
+==================================================
+googleapiclient is synchronous: every `.execute()`, `next_chunk()` and
+`credentials.refresh(Request())` blocks the event loop for the whole HTTP
+round trip. This module runs them on a dedicated, bounded thread pool so one
+user's slow API call no longer stalls every other request on the worker.
+
+FEATURES:
+- Dedicated executor (YOUTUBE_API_WORKERS threads, separate from to_thread)
+- Per-user concurrency cap so one channel can't occupy every thread
+- One in-flight call per service object (httplib2.Http is not thread-safe)
+- Resumable upload loop with 5xx retry/backoff, off the event loop
+- Async credential refresh, service build and OAuth code exchange
+- Per-user service cache: credentials + built service reused across requests,
+  access tokens renewed in the background before they expire
+
+USAGE:
+    executor = get_youtube_executor()
+    response = await executor.execute(service.channels().list(part="snippet", mine=True), user_id)
+    service = await executor.build_service(credentials, user_id)
+
+    # resumable media upload
+    response = await youtube_async(service, user_id).resumable_upload(insert_request)
+
+    # cached, auto-refreshed service for a connected user
+    service = await get_youtube_service_cache().get(user_id)
+==================================================
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+YOUTUBE_API_WORKERS = int(os.getenv("YOUTUBE_API_WORKERS", "16"))
+YOUTUBE_API_PER_USER = int(os.getenv("YOUTUBE_API_PER_USER", "4"))
+UPLOAD_MAX_RETRIES = 5
+RETRYABLE_STATUSES = (500, 502, 503, 504)
+
+YOUTUBE_TOKEN_REFRESH_AHEAD = int(os.getenv("YOUTUBE_TOKEN_REFRESH_AHEAD", "300"))     # seconds before expiry
+YOUTUBE_SERVICE_IDLE_TTL = int(os.getenv("YOUTUBE_SERVICE_IDLE_TTL", "3600"))          # drop unused services
+YOUTUBE_REFRESH_INTERVAL = int(os.getenv("YOUTUBE_REFRESH_INTERVAL", "60"))
+
+
+class YouTubeAPIExecutor:
+    """Bounded thread pool for blocking googleapiclient / google-auth calls"""
+
+    def __init__(self, workers: int = YOUTUBE_API_WORKERS, per_user: int = YOUTUBE_API_PER_USER):
+        self.workers = workers
+        self.per_user = per_user
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="youtube-api")
+        self._user_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._http_locks: "weakref.WeakKeyDictionary[Any, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        self.in_flight = 0
+        self.stats = {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+
+    # ------------------------------------------------------------------
+    # Core
+    # ------------------------------------------------------------------
+
+    def _user_semaphore(self, user_id: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if not user_id:
+            return None
+        semaphore = self._user_semaphores.get(user_id)
+        if semaphore is None:
+            semaphore = self._user_semaphores[user_id] = asyncio.Semaphore(self.per_user)
+        return semaphore
+
+    def _http_lock(self, http) -> Optional[asyncio.Lock]:
+        if http is None:
+            return None
+        try:
+            lock = self._http_locks.get(http)
+            if lock is None:
+                lock = self._http_locks[http] = asyncio.Lock()
+            return lock
+        except TypeError:
+            return None  # not weak-referenceable
+
+    async def run(self, fn: Callable, *args, user_id: Optional[str] = None, http=None, **kwargs):
+        """Run a blocking callable on the YouTube pool"""
+        semaphore = self._user_semaphore(user_id)
+        lock = self._http_lock(http)
+        loop = asyncio.get_running_loop()
+
+        if semaphore:
+            await semaphore.acquire()
+        try:
+            if lock:
+                await lock.acquire()
+            try:
+                self.in_flight += 1
+                started = time.monotonic()
+                try:
+                    return await loop.run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+                except Exception:
+                    self.stats["errors"] += 1
+                    raise
+                finally:
+                    elapsed = time.monotonic() - started
+                    self.in_flight -= 1
+                    self.stats["calls"] += 1
+                    self.stats["total_seconds"] += elapsed
+                    self.stats["max_seconds"] = max(self.stats["max_seconds"], elapsed)
+            finally:
+                if lock:
+                    lock.release()
+        finally:
+            if semaphore:
+                semaphore.release()
+
+    async def execute(self, request, user_id: Optional[str] = None, **kwargs) -> Any:
+        """Awaitable request.execute()"""
+        return await self.run(request.execute, user_id=user_id, http=getattr(request, "http", None), **kwargs)
+
+    async def next_chunk(self, request, user_id: Optional[str] = None):
+        """Awaitable request.next_chunk() for resumable media uploads"""
+        return await self.run(request.next_chunk, user_id=user_id, http=getattr(request, "http", None))
+
+    # ------------------------------------------------------------------
+    # Auth helpers
+    # ------------------------------------------------------------------
+
+    async def refresh(self, credentials, user_id: Optional[str] = None, http=None):
+        """Awaitable credentials.refresh(Request()); pass the service http to serialise with its calls"""
+        await self.run(credentials.refresh, Request(), user_id=user_id, http=http)
+        return credentials
+
+    async def build_service(self, credentials, user_id: Optional[str] = None):
+        """build('youtube', 'v3') off the event loop (discovery parsing is CPU-heavy)"""
+        return await self.run(build, 'youtube', 'v3', credentials=credentials, cache_discovery=False, user_id=user_id)
+
+    async def fetch_token(self, flow, code: str):
+        """OAuth code exchange for a google_auth_oauthlib Flow"""
+        return await self.run(flow.fetch_token, code=code)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_status(self) -> dict:
+        calls = self.stats["calls"]
+        return {
+            "workers": self.workers,
+            "per_user": self.per_user,
+            "in_flight": self.in_flight,
+            "users_tracked": len(self._user_semaphores),
+            "calls": calls,
+            "errors": self.stats["errors"],
+            "avg_seconds": round(self.stats["total_seconds"] / calls, 3) if calls else 0.0,
+            "max_seconds": round(self.stats["max_seconds"], 3),
+        }
+
+
+# ============================================================================
+# ASYNC FACADE
+# ============================================================================
+
+class AsyncYouTubeClient:
+    """Service bound to a user; executes its requests on the shared YouTube pool"""
+
+    def __init__(self, service, user_id: Optional[str] = None, executor: "YouTubeAPIExecutor" = None):
+        self.service = service
+        self.user_id = user_id
+        self.executor = executor or get_youtube_executor()
+
+    async def execute(self, request, **kwargs):
+        return await self.executor.execute(request, self.user_id, **kwargs)
+
+    async def resumable_upload(self, insert_request, on_progress: Optional[Callable[[float], None]] = None) -> dict:
+        """
+        Drive a resumable videos().insert request to completion.
+        Retries 5xx responses with exponential backoff; other HttpErrors propagate.
+        """
+        response = None
+        retry = 0
+        while response is None:
+            try:
+                status, response = await self.executor.next_chunk(insert_request, self.user_id)
+                if status and on_progress:
+                    on_progress(status.progress())
+            except HttpError as e:
+                if e.resp.status not in RETRYABLE_STATUSES:
+                    raise
+                retry += 1
+                if retry > UPLOAD_MAX_RETRIES:
+                    raise
+                logger.warning(f"⚠️ Upload chunk failed ({e.resp.status}), retry {retry}/{UPLOAD_MAX_RETRIES}")
+                await asyncio.sleep(2 ** retry)
+        return response
+
+
+# ============================================================================
+# PER-USER SERVICE CACHE
+# ============================================================================
+
+def _utcnow() -> datetime:
+    # google-auth keeps Credentials.expiry as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class CachedService:
+    credentials: Credentials
+    service: Any
+    last_used: float
+
+
+class YouTubeServiceCache:
+    """
+    user_id -> authenticated YouTube service.
+    A background task renews access tokens YOUTUBE_TOKEN_REFRESH_AHEAD seconds
+    before expiry and persists them via refresh_youtube_token, so request paths
+    never pay for the Mongo lookup, discovery build or an inline refresh.
+    """
+
+    def __init__(self, executor: YouTubeAPIExecutor = None):
+        self.executor = executor or get_youtube_executor()
+        self._entries: Dict[str, CachedService] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._generations: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "refresh_failures": 0,
+                      "invalidations": 0, "evictions": 0}
+
+    @staticmethod
+    def _database():
+        from YTdatabase import get_youtube_database
+        return get_youtube_database()
+
+    @staticmethod
+    def _expiring(credentials: Credentials, ahead: int = YOUTUBE_TOKEN_REFRESH_AHEAD) -> bool:
+        if not credentials.token:
+            return True
+        if credentials.expiry is None:
+            return False
+        return credentials.expiry - _utcnow() < timedelta(seconds=ahead)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    async def get(self, user_id: str):
+        """Authenticated service for user_id, or None if YouTube isn't connected"""
+        self._ensure_refresher()
+
+        entry = self._entries.get(user_id)
+        if entry and not self._expiring(entry.credentials, ahead=0):
+            entry.last_used = time.monotonic()
+            self.stats["hits"] += 1
+            return entry.service
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.stats["misses"] += 1
+                entry = await self._load(user_id)
+                if entry is None:
+                    return None
+            elif self._expiring(entry.credentials, ahead=0):
+                if not await self._refresh(user_id, entry):
+                    return None
+            entry.last_used = time.monotonic()
+            return entry.service
+
+    async def _load(self, user_id: str) -> Optional[CachedService]:
+        generation = self._generations.get(user_id, 0)
+        stored = await self._database().get_youtube_credentials(user_id)
+        if not stored:
+            logger.error(f"No credentials found for user {user_id}")
+            return None
+
+        expires_at = stored.get("expires_at")
+        credentials = Credentials(
+            token=stored["access_token"],
+            refresh_token=stored["refresh_token"],
+            token_uri=stored["token_uri"],
+            client_id=stored["client_id"],
+            client_secret=stored["client_secret"],
+            scopes=stored["scopes"],
+            expiry=expires_at.replace(tzinfo=None) if isinstance(expires_at, datetime) else None,
+        )
+        service = await self.executor.build_service(credentials, user_id)
+        entry = CachedService(credentials=credentials, service=service, last_used=time.monotonic())
+
+        if self._expiring(entry.credentials) and not await self._refresh(user_id, entry):
+            return None
+
+        # Credentials were replaced or revoked while we were loading - don't cache stale ones
+        if self._generations.get(user_id, 0) == generation:
+            self._entries[user_id] = entry
+        logger.info(f"YouTube service authenticated for user {user_id}")
+        return entry
+
+    async def _refresh(self, user_id: str, entry: CachedService) -> bool:
+        try:
+            logger.info(f"🔄 Refreshing YouTube token for user {user_id}")
+            await self.executor.refresh(entry.credentials, user_id, http=getattr(entry.service, "_http", None))
+            await self._database().refresh_youtube_token(user_id, entry.credentials.token, entry.credentials.expiry)
+            self.stats["refreshes"] += 1
+            return True
+        except Exception as e:
+            self.stats["refresh_failures"] += 1
+            logger.error(f"YouTube token refresh failed for {user_id}: {e}")
+            if self._entries.get(user_id) is entry:
+                del self._entries[user_id]
+            return False
+
+    def invalidate(self, user_id: str):
+        """Forget the cached service (credentials stored again or access revoked)"""
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        if self._entries.pop(user_id, None) is not None:
+            self.stats["invalidations"] += 1
+
+    # ------------------------------------------------------------------
+    # Background refresher
+    # ------------------------------------------------------------------
+
+    def _ensure_refresher(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(YOUTUBE_REFRESH_INTERVAL)
+            try:
+                await self.refresh_due()
+            except Exception as e:
+                logger.error(f"YouTube token refresher error: {e}")
+
+    async def refresh_due(self):
+        """Evict idle services and renew tokens about to expire"""
+        now = time.monotonic()
+        due = []
+        for user_id, entry in list(self._entries.items()):
+            if now - entry.last_used > YOUTUBE_SERVICE_IDLE_TTL:
+                del self._entries[user_id]
+                self._locks.pop(user_id, None)
+                self.stats["evictions"] += 1
+            elif self._expiring(entry.credentials):
+                due.append((user_id, entry))
+
+        async def refresh_one(user_id: str, entry: CachedService):
+            async with self._locks.setdefault(user_id, asyncio.Lock()):
+                if self._entries.get(user_id) is entry and self._expiring(entry.credentials):
+                    await self._refresh(user_id, entry)
+
+        if due:
+            await asyncio.gather(*(refresh_one(u, e) for u, e in due))
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def get_status(self) -> dict:
+        return {
+            "cached_services": len(self._entries),
+            "refresh_ahead_seconds": YOUTUBE_TOKEN_REFRESH_AHEAD,
+            "idle_ttl_seconds": YOUTUBE_SERVICE_IDLE_TTL,
+            "refresher_running": bool(self._task and not self._task.done()),
+            **self.stats,
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+youtube_executor = None
+
+def get_youtube_executor() -> YouTubeAPIExecutor:
+    """Get global YouTube API executor instance"""
+    global youtube_executor
+    if not youtube_executor:
+        youtube_executor = YouTubeAPIExecutor()
+    return youtube_executor
+
+
+youtube_service_cache = None
+
+def get_youtube_service_cache() -> YouTubeServiceCache:
+    """Get global YouTube service cache instance"""
+    global youtube_service_cache
+    if not youtube_service_cache:
+        youtube_service_cache = YouTubeServiceCache()
+    return youtube_service_cache
+
+
+def youtube_async(service, user_id: Optional[str] = None) -> AsyncYouTubeClient:
+    """Async client over an authenticated googleapiclient service"""
+    return AsyncYouTubeClient(service, user_id)
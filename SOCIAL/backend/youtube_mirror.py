@@ -0,0 +1,267 @@
+"""
+youtube_mirror.py - Incremental Channel Video Mirror
+==================================================
+Local copy of each connected channel's uploads in the `channel_videos`
+collection, so the dashboard, analytics and auto-reply video picker read
+Mongo instead of spending 100 quota units on search().list per page load.
+
+FEATURES:
+- Uploads playlist sync via playlistItems.list (1 unit per 50 videos)
+- First page sent with If-None-Match: an unchanged channel costs one 304
+- Incremental: paging stops at the first page with already-known videos
+- Statistics refreshed in 50-id videos.list batches (new videos at sync
+  time, everything older than YOUTUBE_MIRROR_STATS_TTL on a schedule)
+- Videos missing from a videos.list response are dropped from the mirror
+
+LAYOUT:
+    channel_sync_state: user_id, channel_id, uploads_playlist_id, etag, last_synced_at
+    channel_videos:     user_id, video_id, snippet fields, view/like/comment counts, duration
+
+USAGE:
+    videos = await get_video_mirror().get_videos(user_id, limit=50)
+==================================================
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from googleapiclient.errors import HttpError
+
+from youtube_client import get_youtube_service_cache, youtube_async
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MIRROR_SYNC_TTL = int(os.getenv("YOUTUBE_MIRROR_SYNC_TTL", "120"))                  # seconds between playlist checks on read
+MIRROR_STATS_TTL = int(os.getenv("YOUTUBE_MIRROR_STATS_TTL", "1800"))                # scheduled statistics refresh age
+MIRROR_REFRESH_INTERVAL = int(os.getenv("YOUTUBE_MIRROR_REFRESH_INTERVAL", "900"))
+MIRROR_MAX_PAGES = int(os.getenv("YOUTUBE_MIRROR_MAX_PAGES", "4"))                   # 200 newest uploads on first sync
+MIRROR_STATS_LIMIT = 200
+PAGE_SIZE = 50
+
+
+def _video_from_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """playlistItems resource -> mirror document (None for deleted videos)"""
+    snippet = item.get("snippet", {})
+    details = item.get("contentDetails", {})
+    video_id = details.get("videoId") or snippet.get("resourceId", {}).get("videoId")
+    published_at = details.get("videoPublishedAt")
+    if not video_id or not published_at:
+        return None
+
+    thumbnails = snippet.get("thumbnails", {})
+    return {
+        "video_id": video_id,
+        "title": snippet.get("title", ""),
+        "description": snippet.get("description", ""),
+        "published_at": published_at,
+        "thumbnail_url": (thumbnails.get("medium") or thumbnails.get("default") or {}).get("url"),
+        "thumbnail_default_url": thumbnails.get("default", {}).get("url"),
+        "channel_id": snippet.get("channelId"),
+        "channel_title": snippet.get("channelTitle", ""),
+    }
+
+
+class ChannelVideoMirror:
+    """Keeps channel_videos in step with each user's uploads playlist"""
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"syncs": 0, "not_modified": 0, "pages": 0, "new_videos": 0,
+                      "stats_batches": 0, "removed": 0, "quota_units": 0, "errors": 0}
+
+    @staticmethod
+    def _database():
+        from YTdatabase import get_youtube_database
+        return get_youtube_database()
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    async def get_videos(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Mirrored uploads, newest first; syncs first if the mirror is older than MIRROR_SYNC_TTL"""
+        self._ensure_refresher()
+        await self.sync(user_id)
+        return await self._database().get_channel_videos(user_id, limit)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    async def sync(self, user_id: str, max_age: int = MIRROR_SYNC_TTL, stats_older_than: datetime = datetime.min) -> bool:
+        """
+        Pull new uploads for user_id unless synced within max_age seconds.
+        Statistics are fetched for new videos, plus any refreshed before stats_older_than.
+        """
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            database = self._database()
+            state = await database.get_channel_sync_state(user_id) or {}
+            last_synced = state.get("last_synced_at")
+            if last_synced and (datetime.now() - last_synced).total_seconds() < max_age:
+                return True
+
+            service = await get_youtube_service_cache().get(user_id)
+            if not service:
+                return False
+            client = youtube_async(service, user_id)
+
+            try:
+                playlist_id = state.get("uploads_playlist_id")
+                if not playlist_id:
+                    response = await client.execute(service.channels().list(part="id,contentDetails", mine=True))
+                    self.stats["quota_units"] += 1
+                    items = response.get("items", [])
+                    if not items:
+                        logger.warning(f"No YouTube channel for user {user_id}")
+                        return False
+                    playlist_id = items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+                    state["channel_id"] = items[0]["id"]
+
+                etag = await self._sync_playlist(client, user_id, playlist_id, state.get("etag"))
+                await self._refresh_stats(client, user_id, stats_older_than)
+
+                await database.update_channel_sync_state(user_id, {
+                    "channel_id": state.get("channel_id"),
+                    "uploads_playlist_id": playlist_id,
+                    "etag": etag,
+                    "last_synced_at": datetime.now(),
+                })
+                self.stats["syncs"] += 1
+                return True
+
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"❌ Channel mirror sync failed for {user_id}: {e}")
+                return False
+
+    async def _sync_playlist(self, client, user_id: str, playlist_id: str, etag: Optional[str]) -> Optional[str]:
+        """Page the uploads playlist newest-first until known videos appear; returns the first page's ETag"""
+        database = self._database()
+        page_token = None
+        first_etag = etag
+
+        for page in range(MIRROR_MAX_PAGES):
+            request = client.service.playlistItems().list(
+                part="snippet,contentDetails",
+                playlistId=playlist_id,
+                maxResults=PAGE_SIZE,
+                pageToken=page_token
+            )
+            if page == 0 and etag:
+                request.headers["If-None-Match"] = etag
+
+            try:
+                response = await client.execute(request)
+            except HttpError as e:
+                if e.resp.status == 304:
+                    self.stats["not_modified"] += 1
+                    self.stats["quota_units"] += 1
+                    return etag
+                raise
+
+            self.stats["pages"] += 1
+            self.stats["quota_units"] += 1
+            if page == 0:
+                first_etag = response.get("etag")
+
+            videos = [v for v in map(_video_from_item, response.get("items", [])) if v]
+            new_count = await database.upsert_channel_videos(user_id, videos)
+            self.stats["new_videos"] += new_count
+            if new_count:
+                logger.info(f"📼 Mirrored {new_count} new videos for {user_id}")
+
+            page_token = response.get("nextPageToken")
+            if new_count < len(videos) or not page_token:
+                break
+
+        return first_etag
+
+    async def _refresh_stats(self, client, user_id: str, older_than: datetime = datetime.min):
+        """videos.list in 50-id batches for videos without statistics (or refreshed before older_than)"""
+        database = self._database()
+        video_ids = await database.get_stale_channel_video_ids(user_id, older_than, MIRROR_STATS_LIMIT)
+
+        for start in range(0, len(video_ids), PAGE_SIZE):
+            batch = video_ids[start:start + PAGE_SIZE]
+            response = await client.execute(client.service.videos().list(
+                part="statistics,contentDetails",
+                id=",".join(batch),
+                maxResults=PAGE_SIZE
+            ))
+            self.stats["stats_batches"] += 1
+            self.stats["quota_units"] += 1
+
+            stats = {}
+            for item in response.get("items", []):
+                statistics = item.get("statistics", {})
+                stats[item["id"]] = {
+                    "view_count": int(statistics.get("viewCount", 0)),
+                    "like_count": int(statistics.get("likeCount", 0)),
+                    "comment_count": int(statistics.get("commentCount", 0)),
+                    "duration": item.get("contentDetails", {}).get("duration", "PT0S"),
+                }
+            await database.update_channel_video_stats(user_id, stats)
+
+            gone = [video_id for video_id in batch if video_id not in stats]
+            if gone:
+                self.stats["removed"] += await database.remove_channel_videos(user_id, gone)
+
+    # ------------------------------------------------------------------
+    # Scheduled refresh
+    # ------------------------------------------------------------------
+
+    def _ensure_refresher(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(MIRROR_REFRESH_INTERVAL)
+            try:
+                states = await self._database().get_all_channel_sync_states()
+                stats_cutoff = datetime.now() - timedelta(seconds=MIRROR_STATS_TTL)
+                for state in states:
+                    await self.sync(state["user_id"], max_age=0, stats_older_than=stats_cutoff)
+                    await asyncio.sleep(1)
+            except Exception as e:
+                logger.error(f"Channel mirror refresh error: {e}")
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def get_status(self) -> dict:
+        return {
+            "sync_ttl_seconds": MIRROR_SYNC_TTL,
+            "stats_ttl_seconds": MIRROR_STATS_TTL,
+            "refresher_running": bool(self._task and not self._task.done()),
+            **self.stats,
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+video_mirror = None
+
+def get_video_mirror() -> ChannelVideoMirror:
+    """Get global channel video mirror instance"""
+    global video_mirror
+    if not video_mirror:
+        video_mirror = ChannelVideoMirror()
+    return video_mirror